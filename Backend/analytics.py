@@ -0,0 +1,310 @@
+"""Process-local columnar cache of donation and tour amounts for the dashboard charts.
+
+The government and admin charts only ever aggregate amount, a date, park and
+type over `donations` and `tours`, so each worker keeps those four columns as
+NumPy arrays and answers group-by-park/month/type from memory:
+
+    id       int64     primary key, used to tail the table
+    park     int32     `park_id` (migrations/007); the parks table is the dictionary
+    type     int32     index into a per-table list of donation types / tour names
+    amount   float64
+    <date>   int32     year * 12 + month - 1 for each date column, -1 for NULL
+
+Refresh protocol (every worker runs it independently, on the connection of the
+request that triggers it; chart GETs get a replica when DB_REPLICAS is set, see
+db_router.py, so all workers converge on the same committed rows):
+
+- rebuild(): full load at startup (`python server.py`; gunicorn workers load
+  on their first chart request) and every ANALYTICS_REBUILD_SECONDS. This
+  is the only step that sees deleted rows or edited amounts, parks or dates;
+  the app never changes those columns after insert.
+- ensure_fresh(): before a read, if the last sync is older than
+  ANALYTICS_SYNC_SECONDS, fetch rows with `id > last_id - ANALYTICS_TAIL_OVERLAP`.
+  The overlap catches inserts that committed out of id order; ids already held
+  are skipped. A worker is therefore at most ANALYTICS_SYNC_SECONDS behind
+  writes made through other workers, plus the lag of the replica it synced
+  from, which db_router caps at REPLICA_MAX_LAG_SECONDS.
+- record(): the write paths append their own committed row immediately, so the
+  worker that took a donation or booking shows it on the next chart load.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+ANALYTICS_SYNC_SECONDS = float(os.getenv('ANALYTICS_SYNC_SECONDS', 1))
+ANALYTICS_REBUILD_SECONDS = float(os.getenv('ANALYTICS_REBUILD_SECONDS', 600))
+ANALYTICS_TAIL_OVERLAP = 1000
+INITIAL_CAPACITY = 1024
+DENSE_KEY_LIMIT = 1 << 20
+
+SOURCES = {
+    'donations': {'type': 'donation_type', 'dates': ('created_at',)},
+    'tours': {'type': 'tour_name', 'dates': ('date', 'created_at')},
+}
+
+
+def month_index(value):
+    if value is None:
+        return -1
+    if isinstance(value, str):
+        value = datetime.strptime(value[:10], '%Y-%m-%d')
+    return value.year * 12 + value.month - 1
+
+
+class ColumnTable:
+    """Append-only column arrays for one source table."""
+
+    def __init__(self, name, type_column, date_columns):
+        self.name = name
+        self.type_column = type_column
+        self.date_columns = date_columns
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.loaded_at = None
+        self.synced_at = None
+        self.rebuilds = 0
+        self.syncs = 0
+        self.appended = 0
+        self._reset()
+
+    def _reset(self):
+        self._size = 0
+        self._ids = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self._park = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self._type = np.empty(INITIAL_CAPACITY, dtype=np.int32)
+        self._amount = np.empty(INITIAL_CAPACITY, dtype=np.float64)
+        self._dates = {column: np.empty(INITIAL_CAPACITY, dtype=np.int32) for column in self.date_columns}
+        self._type_codes = {}
+        self._type_names = []
+        self._last_id = 0
+        self._tail_ids = set()
+
+    def _query(self):
+        return (
+            f"SELECT id, park_id, {self.type_column}, amount, {', '.join(self.date_columns)} "
+            f"FROM {self.name} WHERE id > %s ORDER BY id"
+        )
+
+    def _grow(self, needed):
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        # Readers keep views of the old arrays, so grow into new ones rather than resizing in place
+        size = self._size
+        for attribute in ('_ids', '_park', '_type', '_amount'):
+            old = getattr(self, attribute)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:size] = old[:size]
+            setattr(self, attribute, new)
+        for column, old in self._dates.items():
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:size] = old[:size]
+            self._dates[column] = new
+
+    def _type_code(self, value):
+        value = (value or '').strip()
+        code = self._type_codes.get(value)
+        if code is None:
+            code = self._type_codes[value] = len(self._type_names)
+            self._type_names.append(value)
+        return code
+
+    def _append(self, rows):
+        """Append (id, park_id, type, amount, *dates) rows not already held; caller holds the lock."""
+        floor = self._last_id - ANALYTICS_TAIL_OVERLAP
+        rows = [row for row in rows if row[0] > floor and row[0] not in self._tail_ids]
+        if not rows:
+            return 0
+        start = self._size
+        end = start + len(rows)
+        self._grow(end)
+        self._ids[start:end] = [row[0] for row in rows]
+        self._park[start:end] = [row[1] or 0 for row in rows]
+        self._type[start:end] = [self._type_code(row[2]) for row in rows]
+        self._amount[start:end] = [float(row[3] or 0) for row in rows]
+        for offset, column in enumerate(self.date_columns, start=4):
+            self._dates[column][start:end] = [month_index(row[offset]) for row in rows]
+        self._size = end
+
+        self._last_id = max(self._last_id, int(self._ids[start:end].max()))
+        self._tail_ids.update(int(row[0]) for row in rows)
+        if len(self._tail_ids) > 4 * ANALYTICS_TAIL_OVERLAP:
+            floor = self._last_id - ANALYTICS_TAIL_OVERLAP
+            self._tail_ids = {row_id for row_id in self._tail_ids if row_id > floor}
+        self.appended += len(rows)
+        return len(rows)
+
+    def rebuild(self, cursor):
+        cursor.execute(self._query(), (0,))
+        rows = cursor.fetchall()
+        with self._lock:
+            self._reset()
+            self._append(rows)
+            self.loaded_at = self.synced_at = time.monotonic()
+            self.rebuilds += 1
+
+    def sync(self, cursor):
+        cursor.execute(self._query(), (max(self._last_id - ANALYTICS_TAIL_OVERLAP, 0),))
+        rows = cursor.fetchall()
+        with self._lock:
+            added = self._append(rows)
+            self.synced_at = time.monotonic()
+            self.syncs += 1
+        return added
+
+    def ensure_fresh(self, cursor):
+        now = time.monotonic()
+        if self.loaded_at is not None and now - self.synced_at <= ANALYTICS_SYNC_SECONDS:
+            return
+        with self._refresh_lock:
+            now = time.monotonic()
+            if self.loaded_at is None or now - self.loaded_at > ANALYTICS_REBUILD_SECONDS:
+                self.rebuild(cursor)
+            elif now - self.synced_at > ANALYTICS_SYNC_SECONDS:
+                self.sync(cursor)
+
+    def record(self, row_id, park_id, type_value, amount, *dates):
+        with self._lock:
+            if self.loaded_at is not None:
+                self._append([(row_id, park_id, type_value, amount, *dates)])
+
+    def columns(self):
+        """Consistent views of the current rows."""
+        with self._lock:
+            size = self._size
+            return {
+                'park': self._park[:size],
+                'type': self._type[:size],
+                'amount': self._amount[:size],
+                **{column: values[:size] for column, values in self._dates.items()},
+            }, list(self._type_names)
+
+
+class AnalyticsCache:
+    def __init__(self):
+        self.tables = {
+            name: ColumnTable(name, spec['type'], spec['dates']) for name, spec in SOURCES.items()
+        }
+        self.queries = 0
+        self.last_query_us = None
+
+    def rebuild(self, connection):
+        """Load every source table; called at startup."""
+        cursor = connection.cursor()
+        try:
+            for table in self.tables.values():
+                table.rebuild(cursor)
+        finally:
+            cursor.close()
+
+    def ensure_fresh(self, connection, table):
+        cursor = connection.cursor()
+        try:
+            self.tables[table].ensure_fresh(cursor)
+        finally:
+            cursor.close()
+
+    def record(self, table, row_id, park_id, type_value, amount, *dates):
+        """Append a row the caller has just committed."""
+        self.tables[table].record(row_id, park_id, type_value, amount, *dates)
+
+    def group_by(self, table, by=('month',), date_column='created_at', park_id=None):
+        """Count and amount per combination of 'park', 'month' and 'type', ordered by key.
+
+        Rows with a NULL date are left out when grouping by month. Returns dicts
+        with the requested keys (`park_id`, `year` and `month`, `type`) plus
+        `count` and `amount`.
+        """
+        started = time.perf_counter()
+        columns, type_names = self.tables[table].columns()
+        months = columns[date_column]
+        mask = None
+        if park_id is not None:
+            mask = columns['park'] == park_id
+        if 'month' in by:
+            mask = months >= 0 if mask is None else mask & (months >= 0)
+
+        def select(values):
+            return values if mask is None else values[mask]
+
+        amount = select(columns['amount'])
+        # Fold the key columns into one int64 per row: key = ((month * P) + park) * T + type
+        parts = []
+        if 'month' in by:
+            month_values = select(months).astype(np.int64)
+            low = int(month_values.min()) if len(month_values) else 0
+            parts.append(('month', month_values - low, int(month_values.max()) - low + 1 if len(month_values) else 1))
+        if 'park' in by:
+            park_values = select(columns['park']).astype(np.int64)
+            parts.append(('park', park_values, int(park_values.max()) + 1 if len(park_values) else 1))
+        if 'type' in by:
+            parts.append(('type', select(columns['type']).astype(np.int64), max(len(type_names), 1)))
+
+        keys = np.zeros(len(amount), dtype=np.int64)
+        key_space = 1
+        for _, values, cardinality in parts:
+            keys = keys * cardinality + values
+            key_space *= cardinality
+        if key_space <= DENSE_KEY_LIMIT:
+            # Small key space: count straight into a dense array, no sort needed
+            counts = np.bincount(keys, minlength=key_space)
+            sums = np.bincount(keys, weights=amount, minlength=key_space)
+            unique = np.flatnonzero(counts)
+            counts, sums = counts[unique], sums[unique]
+        else:
+            unique, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(unique))
+            sums = np.bincount(inverse, weights=amount, minlength=len(unique))
+
+        groups = []
+        for index, key in enumerate(unique.tolist()):
+            values = {}
+            for name, _, cardinality in reversed(parts):
+                key, values[name] = divmod(key, cardinality)
+            group = {}
+            for name, _, _ in parts:
+                if name == 'month':
+                    year, month = divmod(values[name] + low, 12)
+                    group['year'], group['month'] = year, month + 1
+                elif name == 'park':
+                    group['park_id'] = values[name]
+                else:
+                    group['type'] = type_names[values[name]]
+            group['count'] = int(counts[index])
+            group['amount'] = round(float(sums[index]), 2)
+            groups.append(group)
+
+        self.queries += 1
+        self.last_query_us = round((time.perf_counter() - started) * 1e6, 1)
+        return groups
+
+    def total(self, table, park_id=None):
+        """(count, amount) over the whole table or one park."""
+        groups = self.group_by(table, by=(), park_id=park_id)
+        if not groups:
+            return 0, 0.0
+        return groups[0]['count'], groups[0]['amount']
+
+    def snapshot(self):
+        return {
+            "tables": {
+                name: {
+                    "rows": table._size,
+                    "rebuilds": table.rebuilds,
+                    "syncs": table.syncs,
+                    "appended": table.appended,
+                    "last_id": table._last_id
+                } for name, table in self.tables.items()
+            },
+            "queries": self.queries,
+            "last_query_us": self.last_query_us
+        }
+
+
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,439 @@
+"""Optional ASGI deployment mode.
+
+The read-heavy GET endpoints below run as coroutines on an aiomysql pool, and
+independent queries inside one handler run concurrently with asyncio.gather
+(each on its own pooled connection). Every other route falls through to the
+regular Flask app, so the API surface is unchanged. Responses are serialized
+with Flask's JSON provider so payloads match the sync endpoints.
+
+Each coroutine route runs under the Flask endpoint it replaces (guarded()):
+it takes a slot of that endpoint's bulkhead class, shared with the Flask
+routes of the same worker, or gets the same 503 with Retry-After; and it gets
+that endpoint's query deadline, as the session statement time limit of every
+connection it uses and as a timeout on the whole handler (504 after the
+budget plus QUERY_KILL_GRACE).
+
+    pip install -r requirements-asgi.txt
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+
+The Flask app itself is still what `python server.py` runs.
+"""
+import asyncio
+import contextvars
+import functools
+import math
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+import aiomysql
+import jwt
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from bulkheads import bulkheads
+from deadlines import QUERY_KILL_GRACE
+from server import app as flask_app, db_config, query_deadlines, CORS_SETTINGS
+
+
+ASYNC_POOL_MINSIZE = int(os.getenv('ASYNC_POOL_MINSIZE', 2))
+ASYNC_POOL_MAXSIZE = int(os.getenv('ASYNC_POOL_MAXSIZE', 20))
+
+pool = None
+
+# monotonic() by which the current request's queries must finish, None for no deadline
+_expires = contextvars.ContextVar('query_expires', default=None)
+# Statement time limit last set on each aiomysql connection
+_limits = weakref.WeakKeyDictionary()
+
+
+class JSONResponse(Response):
+    media_type = 'application/json'
+
+    def render(self, content):
+        return (flask_app.json.dumps(content, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def token_required(handler):
+    """Async counterpart of server.token_required."""
+    async def decorated(request):
+        token = request.headers.get('Authorization')
+        if not token:
+            return JSONResponse({'error': 'Token is missing'}, status_code=401)
+        try:
+            data = jwt.decode(token.split()[1], flask_app.config['SECRET_KEY'], algorithms=["HS256"])
+        except jwt.ExpiredSignatureError:
+            return JSONResponse({'error': 'Token has expired'}, status_code=401)
+        except Exception as e:
+            return JSONResponse({'error': f'Invalid token: {str(e)}'}, status_code=401)
+        return await handler(request, data['user_id'])
+    return decorated
+
+
+def guarded(endpoint):
+    """Run a coroutine route under the bulkhead class and query deadline of Flask's `endpoint`."""
+    def wrap(handler):
+        @functools.wraps(handler)
+        async def decorated(request):
+            bulkhead = bulkheads.bulkhead_for(endpoint)
+            # Bulkhead.acquire blocks while the request waits in the queue
+            if bulkhead is not None and not await asyncio.to_thread(bulkhead.acquire):
+                return JSONResponse(
+                    {"error": "Server busy, please retry shortly", "class": bulkhead.name},
+                    status_code=503, headers={'Retry-After': str(bulkhead.retry_after())}
+                )
+            started = time.monotonic()
+            budget = query_deadlines.budget(endpoint)
+            token = _expires.set(started + budget if budget else None)
+            try:
+                if budget is None:
+                    return await handler(request)
+                try:
+                    return await asyncio.wait_for(handler(request), budget + QUERY_KILL_GRACE)
+                except asyncio.TimeoutError:
+                    print(f"{endpoint} overran its {budget}s deadline")
+                    return JSONResponse({"error": "Request took too long"}, status_code=504)
+            finally:
+                _expires.reset(token)
+                elapsed = time.monotonic() - started
+                if budget is not None:
+                    query_deadlines.record(endpoint, budget, elapsed)
+                if bulkhead is not None:
+                    bulkhead.release(elapsed)
+        return decorated
+    return wrap
+
+
+async def _limit_statements(connection):
+    """Set the session statement time limit to what is left of the request's deadline."""
+    expires = _expires.get()
+    seconds = max(1, math.ceil(expires - time.monotonic())) if expires is not None else 0
+    if _limits.get(connection) == seconds:
+        return
+    if 'mariadb' in (connection.get_server_info() or '').lower():
+        sql, value = "SET SESSION max_statement_time = %s", seconds
+    else:
+        sql, value = "SET SESSION max_execution_time = %s", seconds * 1000
+    async with connection.cursor() as cursor:
+        await cursor.execute(sql, (value,))
+    _limits[connection] = seconds
+
+
+async def fetchall(query, params=None):
+    async with pool.acquire() as connection:
+        try:
+            await _limit_statements(connection)
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                return list(await cursor.fetchall())
+        except asyncio.CancelledError:
+            # Cancelled mid-query (deadline): the connection may still have a reply in flight
+            connection.close()
+            raise
+
+
+async def fetchone(query, params=None):
+    rows = await fetchall(query, params)
+    return rows[0] if rows else None
+
+
+@guarded('finance.get_all_approved_data')
+@token_required
+async def get_all_approved_data(request, current_user_id):
+    """Async /api/finance/all-approved-data: the six sections are fetched concurrently."""
+    try:
+        tours, donations, fund_requests, extra_funds_requests, emergency_requests, budgets, items = \
+            await asyncio.gather(
+                fetchall("""
+                    SELECT
+                        id, park_name, tour_name, date, time, guests, amount,
+                        first_name, last_name, email, phone, special_requests,
+                        created_at
+                    FROM tours
+                    ORDER BY created_at DESC
+                """),
+                fetchall("""
+                    SELECT
+                        id, donation_type, amount, park_name,
+                        first_name, last_name, email, message,
+                        is_anonymous, created_at
+                    FROM donations
+                    ORDER BY created_at DESC
+                """),
+                fetchall("""
+                    SELECT
+                        fr.id, fr.title, fr.description, fr.amount,
+                        fr.category, fr.parkname, fr.urgency, fr.status,
+                        fr.created_at, fr.created_by,
+                        ps.first_name, ps.last_name, ps.email AS staff_email,
+                        ps.park_name AS staff_park
+                    FROM fund_requests fr
+                    JOIN parkstaff ps ON fr.created_by = ps.id
+                    WHERE fr.status = 'approved'
+                    ORDER BY fr.created_at DESC
+                """),
+                fetchall("""
+                    SELECT
+                        efr.id, efr.title, efr.description, efr.amount,
+                        efr.park_name AS parkName, efr.category,
+                        efr.justification, efr.expected_duration,
+                        efr.status, efr.created_at, efr.created_by,
+                        fo.first_name, fo.last_name, fo.email AS finance_email
+                    FROM extra_funds_requests efr
+                    JOIN finance_officers fo ON efr.created_by = fo.id
+                    WHERE efr.status = 'approved'
+                    ORDER BY efr.created_at DESC
+                """),
+                fetchall("""
+                    SELECT
+                        er.id, er.title, er.description, er.amount,
+                        er.park_name AS parkName, er.emergency_type,
+                        er.justification, er.timeframe, er.status,
+                        er.created_at, er.created_by,
+                        fo.first_name, fo.last_name, fo.email AS finance_email
+                    FROM emergency_requests er
+                    JOIN finance_officers fo ON er.created_by = fo.id
+                    WHERE er.status = 'approved'
+                    ORDER BY er.created_at DESC
+                """),
+                fetchall("""
+                    SELECT
+                        b.id, b.title, b.fiscal_year, b.total_amount,
+                        b.park_name, b.description, b.status,
+                        b.created_at, b.created_by, b.approved_by,
+                        b.approved_at,
+                        fo.first_name AS created_by_name,
+                        go.first_name AS approved_by_name
+                    FROM budgets b
+                    LEFT JOIN finance_officers fo ON b.created_by = fo.id
+                    LEFT JOIN government_officers go ON b.approved_by = go.id
+                    WHERE b.status = 'approved'
+                    ORDER BY b.created_at DESC
+                """),
+                # Items for every approved budget in one query instead of one per budget
+                fetchall("""
+                    SELECT bi.budget_id, bi.id, bi.category, bi.description, bi.amount
+                    FROM budget_items bi
+                    JOIN budgets b ON b.id = bi.budget_id
+                    WHERE b.status = 'approved'
+                """)
+            )
+
+        for tour in tours:
+            tour['created_at'] = tour['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            tour['date'] = tour['date'].strftime('%Y-%m-%d')
+            tour['time'] = str(tour['time'])
+            tour['amount'] = float(tour['amount'])
+        for donation in donations:
+            donation['created_at'] = donation['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            donation['amount'] = float(donation['amount'])
+        for req in fund_requests + extra_funds_requests + emergency_requests:
+            req['created_at'] = req['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            req['amount'] = float(req['amount'])
+
+        items_by_budget = {}
+        for item in items:
+            budget_id = item.pop('budget_id')
+            item['amount'] = float(item['amount'])
+            items_by_budget.setdefault(budget_id, []).append(item)
+        for budget in budgets:
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            budget['total_amount'] = float(budget['total_amount'])
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            budget['items'] = items_by_budget.get(budget['id'], [])
+
+        return JSONResponse({
+            "tours": tours,
+            "donations": donations,
+            "fund_requests": fund_requests,
+            "extra_funds_requests": extra_funds_requests,
+            "emergency_requests": emergency_requests,
+            "budgets": budgets
+        })
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return JSONResponse({"error": f"Failed to retrieve data: {str(e)}"}, status_code=500)
+
+
+@guarded('government.get_government_all_budgets')
+@token_required
+async def get_government_all_budgets(request, current_user_id):
+    """Async /api/government/budgets: budgets and their items are fetched concurrently."""
+    try:
+        budgets, items = await asyncio.gather(
+            fetchall("""
+                SELECT
+                    b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+                    b.description, b.status, b.created_at, b.created_by,
+                    b.approved_by, b.approved_at, b.reason,
+                    fo.first_name as created_by_name,
+                    fo.last_name as created_by_lastname,
+                    go.first_name as approved_by_name,
+                    go.last_name as approved_by_lastname
+                FROM budgets b
+                LEFT JOIN finance_officers fo ON b.created_by = fo.id
+                LEFT JOIN government_officers go ON b.approved_by = go.id
+                WHERE b.status = 'submitted'
+                ORDER BY b.created_at DESC
+            """),
+            fetchall("""
+                SELECT bi.budget_id, bi.id, bi.category, bi.description, bi.amount, bi.type
+                FROM budget_items bi
+                JOIN budgets b ON b.id = bi.budget_id
+                WHERE b.status = 'submitted'
+            """)
+        )
+
+        items_by_budget = {}
+        for item in items:
+            budget_id = item.pop('budget_id')
+            item['amount'] = float(item['amount'])
+            item['id'] = str(item['id'])
+            items_by_budget.setdefault(budget_id, []).append(item)
+
+        for budget in budgets:
+            budget['items'] = items_by_budget.get(budget['id'], [])
+            budget['id'] = str(budget['id'])
+            budget['total_amount'] = float(budget['total_amount'])
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+            budget['approved_by_full_name'] = (f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+                                             if budget['approved_by_name'] else None)
+            del budget['created_by_name']
+            del budget['created_by_lastname']
+            del budget['approved_by_name']
+            del budget['approved_by_lastname']
+
+        return JSONResponse(budgets)
+
+    except Exception as e:
+        print(f"Error fetching budgets: {e}")
+        return JSONResponse({"error": "Failed to fetch budgets"}, status_code=500)
+
+
+@guarded('admin.get_officer_counts')
+@token_required
+async def get_officer_counts(request, current_user_id):
+    """Async /api/admin/officer-counts: the four COUNTs run concurrently."""
+    try:
+        finance, government, auditors, park_staff = await asyncio.gather(
+            fetchone("SELECT COUNT(*) as finance_count FROM finance_officers"),
+            fetchone("SELECT COUNT(*) as government_count FROM government_officers"),
+            fetchone("SELECT COUNT(*) as auditor_count FROM auditors"),
+            fetchone("SELECT COUNT(*) as park_staff_count FROM parkstaff")
+        )
+        officer_counts = [
+            {"title": "Finance Officers", "value": finance['finance_count'], "icon": "Users", "trend": "neutral"},
+            {"title": "Government Officers", "value": government['government_count'], "icon": "Users", "trend": "neutral"},
+            {"title": "Auditors", "value": auditors['auditor_count'], "icon": "Users", "trend": "neutral"},
+            {"title": "Park Staff", "value": park_staff['park_staff_count'], "icon": "Users", "trend": "neutral"},
+        ]
+        return JSONResponse({"officer_counts": officer_counts})
+
+    except Exception as e:
+        print(f"Error fetching officer counts: {e}")
+        return JSONResponse({"error": "Failed to fetch officer counts"}, status_code=500)
+
+
+@guarded('admin.get_dashboard_stats')
+@token_required
+async def get_dashboard_stats(request, current_user_id):
+    """Async /api/admin/stats."""
+    try:
+        bookings, donations, admins, park_staff = await asyncio.gather(
+            fetchone("SELECT COUNT(*) as total_bookings FROM tours"),
+            fetchone("SELECT SUM(amount) as total_donations FROM donations"),
+            fetchone("SELECT COUNT(*) as total_logins FROM admintable"),
+            fetchone("SELECT COUNT(*) as active_admins FROM parkstaff")
+        )
+        stats = [
+            {"title": "Total Tours Booked", "value": bookings['total_bookings'], "icon": "Calendar", "trend": "up"},
+            {"title": "Total Donations", "value": donations['total_donations'] or 0, "icon": "Cash", "trend": "up"},
+            {"title": "Total Admins", "value": admins['total_logins'], "icon": "LogIn", "trend": "up"},
+            {"title": "Recorded Park stuffs", "value": park_staff['active_admins'], "icon": "Users", "trend": "up"},
+        ]
+        return JSONResponse({"stats": stats})
+
+    except Exception as e:
+        print(f"Error fetching stats: {e}")
+        return JSONResponse({"error": "Failed to fetch stats"}, status_code=500)
+
+
+@guarded('government.get_government_dashboard_stats')
+@token_required
+async def get_government_dashboard_stats(request, current_user_id):
+    """Async /api/government/stats."""
+    try:
+        donations, bookings, approved, emergency = await asyncio.gather(
+            fetchone("SELECT SUM(amount) as total_donations FROM donations"),
+            fetchone("SELECT SUM(amount) as total_bookings FROM tours"),
+            fetchone("SELECT SUM(total_amount) as total_approved FROM budgets WHERE status = 'approved'"),
+            fetchone("SELECT COUNT(*) as total_emergency FROM emergency_requests")
+        )
+        stats = [
+            {"title": "Total Revenue From Donations", "value": float(donations['total_donations'] or 0), "icon": "DollarSign", "trend": "up"},
+            {"title": "Total Revenue From  Tours", "value": bookings['total_bookings'], "icon": "Calendar", "trend": "up"},
+            {"title": "Total Approved Budgets", "value": float(approved['total_approved'] or 0), "icon": "PiggyBank", "trend": "up"},
+            {"title": "Emergency Requests", "value": emergency['total_emergency'], "icon": "AlertTriangle", "trend": "up"}
+        ]
+        return JSONResponse({"stats": stats})
+
+    except Exception as e:
+        print(f"Error fetching government stats: {e}")
+        return JSONResponse({"error": "Failed to fetch statistics"}, status_code=500)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global pool
+    pool = await aiomysql.create_pool(
+        host=db_config['host'],
+        port=db_config['port'],
+        user=db_config['user'],
+        password=db_config['password'],
+        db=db_config['database'],
+        minsize=ASYNC_POOL_MINSIZE,
+        maxsize=ASYNC_POOL_MAXSIZE,
+        autocommit=True,
+        charset='utf8mb4'
+    )
+    try:
+        yield
+    finally:
+        pool.close()
+        await pool.wait_closed()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/finance/all-approved-data', get_all_approved_data, methods=['GET']),
+        Route('/api/government/budgets', get_government_all_budgets, methods=['GET']),
+        Route('/api/admin/officer-counts', get_officer_counts, methods=['GET']),
+        Route('/api/admin/stats', get_dashboard_stats, methods=['GET']),
+        Route('/api/government/stats', get_government_dashboard_stats, methods=['GET']),
+        # Everything else (writes, uploads, the remaining reads) is served by the Flask app
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    middleware=[
+        # The same policy as server.create_app; this middleware also answers for the mounted Flask app
+        Middleware(
+            CORSMiddleware,
+            allow_origins=CORS_SETTINGS["origins"],
+            allow_methods=CORS_SETTINGS["methods"],
+            allow_headers=CORS_SETTINGS["allow_headers"],
+            expose_headers=CORS_SETTINGS["expose_headers"],
+            # The read-your-writes pin cookie, see db_router.py
+            allow_credentials=CORS_SETTINGS["supports_credentials"]
+        )
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,168 @@
+"""Tour slot capacity and the in-memory availability index.
+
+A day is divided into fixed slots of TOUR_SLOT_MINUTES (120). Each (park, date,
+slot) admits at most TOUR_SLOT_CAPACITY guests unless its `tour_slots` row
+carries a different capacity. The `tour_slots` row is the authoritative
+counter: bookings are admitted with a single conditional UPDATE on it, which
+holds the row lock only for the rest of the booking transaction. Failed,
+cancelled and deleted bookings give their places back through the `tours`
+triggers in migrations/014.
+
+The availability index mirrors the booked guest counts per park/date as compact
+arrays so the calendar endpoint never has to scan `tours`. It is rebuilt from
+`tours` when a worker starts, updated on each booking, and rebuilt again once it
+is older than AVAILABILITY_REFRESH_SECONDS to pick up bookings made by other
+workers and places released since.
+"""
+import os
+import threading
+import time as _time
+from array import array
+from datetime import datetime, timedelta
+
+
+# Fixed, not configurable: the 7200-second slots in migrations/002 and 014
+# must use the same width, so change all three together.
+TOUR_SLOT_MINUTES = 120
+TOUR_SLOT_CAPACITY = int(os.getenv('TOUR_SLOT_CAPACITY', 40))
+AVAILABILITY_REFRESH_SECONDS = int(os.getenv('AVAILABILITY_REFRESH_SECONDS', 60))
+SLOTS_PER_DAY = (24 * 60) // TOUR_SLOT_MINUTES
+MAX_CALENDAR_DAYS = 62
+
+# Bookings in these statuses no longer hold their places (migrations/014)
+RELEASED_STATUSES = ('failed', 'cancelled')
+
+
+def slot_index(tour_time):
+    """Slot number for a datetime.time or a timedelta (as returned by MySQL TIME columns)."""
+    if isinstance(tour_time, timedelta):
+        minutes = int(tour_time.total_seconds()) // 60
+    else:
+        minutes = tour_time.hour * 60 + tour_time.minute
+    return (minutes % (24 * 60)) // TOUR_SLOT_MINUTES
+
+
+def slot_start(index):
+    """'HH:MM' label of the slot's first minute."""
+    minutes = index * TOUR_SLOT_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+SLOT_LABELS = [slot_start(i) for i in range(SLOTS_PER_DAY)]
+
+
+class AvailabilityIndex:
+    """Booked guests per slot, keyed by (park_name, date)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._booked = {}
+        self._capacity = {}
+        self._loaded_at = None
+
+    def rebuild(self, connection):
+        """Reload upcoming bookings from `tours` and capacity overrides from `tour_slots`."""
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT park_name, date, time, SUM(guests)
+                FROM tours
+                WHERE date >= CURDATE() AND (status IS NULL OR status NOT IN (%s, %s))
+                GROUP BY park_name, date, time
+            """, RELEASED_STATUSES)
+            booked = {}
+            for park_name, tour_date, tour_time, guests in cursor.fetchall():
+                slots = booked.setdefault((park_name, tour_date), array('I', bytes(4 * SLOTS_PER_DAY)))
+                slots[slot_index(tour_time)] += int(guests)
+
+            capacity = {}
+            try:
+                cursor.execute("""
+                    SELECT park_name, date, slot_start, capacity
+                    FROM tour_slots
+                    WHERE date >= CURDATE() AND capacity <> %s
+                """, (TOUR_SLOT_CAPACITY,))
+                for park_name, slot_date, start, slot_capacity in cursor.fetchall():
+                    slots = capacity.setdefault(
+                        (park_name, slot_date), array('I', [TOUR_SLOT_CAPACITY] * SLOTS_PER_DAY)
+                    )
+                    slots[slot_index(start)] = int(slot_capacity)
+            except Exception as e:
+                print(f"Tour slot capacities unavailable: {e}")
+        finally:
+            cursor.close()
+
+        with self._lock:
+            self._booked = booked
+            self._capacity = capacity
+            self._loaded_at = _time.monotonic()
+
+    def ensure_fresh(self, connection):
+        """Rebuild when the index has never been loaded or is older than the refresh interval."""
+        loaded_at = self._loaded_at
+        if loaded_at is None or _time.monotonic() - loaded_at > AVAILABILITY_REFRESH_SECONDS:
+            self.rebuild(connection)
+
+    def record_booking(self, park_name, tour_date, tour_time, guests):
+        """Apply a committed booking to the index."""
+        with self._lock:
+            slots = self._booked.setdefault((park_name, tour_date), array('I', bytes(4 * SLOTS_PER_DAY)))
+            slots[slot_index(tour_time)] += guests
+
+    def calendar(self, park_name, start_date, days):
+        """Remaining places per slot for each day in [start_date, start_date + days)."""
+        calendar = {}
+        with self._lock:
+            for offset in range(days):
+                day = start_date + timedelta(days=offset)
+                booked = self._booked.get((park_name, day))
+                capacity = self._capacity.get((park_name, day))
+                calendar[day.strftime('%Y-%m-%d')] = [
+                    max((capacity[i] if capacity else TOUR_SLOT_CAPACITY) - (booked[i] if booked else 0), 0)
+                    for i in range(SLOTS_PER_DAY)
+                ]
+        return calendar
+
+
+availability_index = AvailabilityIndex()
+
+
+def admit_booking(cursor, park_name, tour_date, tour_time, guests):
+    """Reserve `guests` places in the booking's slot inside the caller's transaction.
+
+    Returns (admitted, remaining), where remaining already counts this booking
+    when it was admitted. The conditional UPDATE takes the slot row lock,
+    so concurrent bookings for the same slot serialize on it until the caller
+    commits or rolls back; bookings for other slots are unaffected.
+    """
+    start = slot_start(slot_index(tour_time))
+    cursor.execute("""
+        INSERT IGNORE INTO tour_slots (park_name, date, slot_start, capacity, booked_guests)
+        VALUES (%s, %s, %s, %s, 0)
+    """, (park_name, tour_date, start, TOUR_SLOT_CAPACITY))
+
+    cursor.execute("""
+        UPDATE tour_slots
+        SET booked_guests = booked_guests + %s
+        WHERE park_name = %s AND date = %s AND slot_start = %s
+        AND booked_guests + %s <= capacity
+    """, (guests, park_name, tour_date, start, guests))
+    admitted = cursor.rowcount == 1
+
+    cursor.execute("""
+        SELECT capacity - booked_guests
+        FROM tour_slots
+        WHERE park_name = %s AND date = %s AND slot_start = %s
+    """, (park_name, tour_date, start))
+    row = cursor.fetchone()
+    remaining = int(row[0]) if row else 0
+    return admitted, max(remaining, 0)
+
+
+def parse_calendar_range(start_arg, days_arg):
+    """Validate the calendar query parameters; raises ValueError on bad input."""
+    start_date = datetime.strptime(start_arg, '%Y-%m-%d').date() if start_arg else datetime.now().date()
+    days = int(days_arg) if days_arg else 14
+    if days < 1 or days > MAX_CALENDAR_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_CALENDAR_DAYS}")
+    return start_date, days
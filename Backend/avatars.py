@@ -0,0 +1,240 @@
+"""Avatar uploads: validation, thumbnails, content-hashed names and cleanup.
+
+An upload is checked in the request (at most AVATAR_MAX_BYTES, a JPEG, PNG or
+WebP image no larger than AVATAR_MAX_PIXELS) and stored under the first 20 hex
+digits of its SHA-256, so identical uploads share files and a name never
+changes content. A background worker crops it to a square and writes one JPEG
+per size in AVATAR_SIZES:
+
+    uploads/avatars/<digest>-64.jpg, -128.jpg, -256.jpg
+
+`avatar_url` points at the AVATAR_DEFAULT_SIZE thumbnail; clients may swap the
+size suffix. If a thumbnail is requested before the worker has written it, it
+is rendered in the request from the pending original.
+
+A sweeper thread, started by the first upload or download in each worker,
+removes avatar files that no role table references any more, plus the legacy
+`avatar_<id>_<timestamp>.<ext>` uploads, once they are older than
+AVATAR_GC_GRACE_SECONDS so that in-flight uploads are never touched.
+"""
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+AVATAR_MAX_BYTES = int(os.getenv('AVATAR_MAX_BYTES', 5 * 1024 * 1024))
+AVATAR_MAX_PIXELS = int(os.getenv('AVATAR_MAX_PIXELS', 40_000_000))
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_DEFAULT_SIZE = 128
+AVATAR_JPEG_QUALITY = 85
+AVATAR_GC_INTERVAL_SECONDS = float(os.getenv('AVATAR_GC_INTERVAL_SECONDS', 6 * 3600))
+AVATAR_GC_GRACE_SECONDS = float(os.getenv('AVATAR_GC_GRACE_SECONDS', 24 * 3600))
+AVATAR_TABLES = ('admintable', 'auditors', 'finance_officers', 'government_officers', 'parkstaff')
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+HASHED_NAME = re.compile(r"^avatars/(?P<digest>[0-9a-f]{20})-(?P<size>\d+)\.jpg$")
+LEGACY_NAME = re.compile(r"^avatar_\d+_\d{14}\.[A-Za-z]+$")
+
+
+class AvatarError(ValueError):
+    """The upload is not an acceptable avatar; the message is safe to show the user."""
+
+
+class AvatarStore:
+    def __init__(self, upload_root, connect):
+        self.upload_root = upload_root
+        self.directory = os.path.join(upload_root, 'avatars')
+        self.pending = os.path.join(self.directory, 'pending')
+        self._connect = connect
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._sweeper_pid = None
+        self.uploads = 0
+        self.rejected = 0
+        self.rendered = 0
+        self.rendered_on_demand = 0
+        self.collected = 0
+
+    # Upload
+
+    def accept(self, upload):
+        """Validate an uploaded file and queue its thumbnails; returns the avatar URL."""
+        data = upload.stream.read(AVATAR_MAX_BYTES + 1)
+        if len(data) > AVATAR_MAX_BYTES:
+            self.rejected += 1
+            raise AvatarError(f"Avatar must be at most {AVATAR_MAX_BYTES // (1024 * 1024)} MB")
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image_format = image.format
+                width, height = image.size
+                image.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError):
+            self.rejected += 1
+            raise AvatarError("Avatar must be a JPG, PNG or WebP image")
+        if image_format not in ALLOWED_FORMATS:
+            self.rejected += 1
+            raise AvatarError("Avatar must be a JPG, PNG or WebP image")
+        if width * height > AVATAR_MAX_PIXELS:
+            self.rejected += 1
+            raise AvatarError("Avatar dimensions are too large")
+
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        if not self._rendered(digest):
+            os.makedirs(self.pending, exist_ok=True)
+            source = os.path.join(self.pending, digest)
+            if not os.path.exists(source):
+                self._write_atomic(source, data)
+            self._worker().submit(self.render, digest)
+        self.uploads += 1
+        self._ensure_sweeper()
+        return self.url(digest)
+
+    @staticmethod
+    def url(digest, size=AVATAR_DEFAULT_SIZE):
+        return f"/uploads/avatars/{digest}-{size}.jpg"
+
+    def _thumbnail_path(self, digest, size):
+        return os.path.join(self.directory, f"{digest}-{size}.jpg")
+
+    def _rendered(self, digest):
+        return all(os.path.exists(self._thumbnail_path(digest, size)) for size in AVATAR_SIZES)
+
+    @staticmethod
+    def _write_atomic(path, data):
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as handle:
+            handle.write(data)
+        os.replace(temporary, path)
+
+    def _worker(self):
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='avatar-worker')
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+    # Thumbnails
+
+    def render(self, digest):
+        """Write every thumbnail size from the pending original, then drop the original."""
+        source = os.path.join(self.pending, digest)
+        if self._rendered(digest) or not os.path.exists(source):
+            return False
+        try:
+            with Image.open(source) as image:
+                image = ImageOps.exif_transpose(image).convert('RGB')
+                for size in AVATAR_SIZES:
+                    thumbnail = ImageOps.fit(image, (size, size), Image.LANCZOS)
+                    path = self._thumbnail_path(digest, size)
+                    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    thumbnail.save(temporary, 'JPEG', quality=AVATAR_JPEG_QUALITY, optimize=True, progressive=True)
+                    os.replace(temporary, path)
+        except FileNotFoundError:
+            # Another worker finished and removed the original first
+            return False
+        except Exception as e:
+            print(f"Avatar render error for {digest}: {e}")
+            return False
+        try:
+            os.remove(source)
+        except FileNotFoundError:
+            pass
+        self.rendered += 1
+        return True
+
+    def resolve(self, filename):
+        """Make sure an uploads/ path exists, rendering a pending thumbnail in place if needed.
+
+        Returns whether the name is content-hashed (and so safe to cache forever).
+        """
+        self._ensure_sweeper()
+        match = HASHED_NAME.match(filename)
+        if not match:
+            return False
+        if int(match.group('size')) in AVATAR_SIZES and not os.path.exists(
+                self._thumbnail_path(match.group('digest'), int(match.group('size')))):
+            if self.render(match.group('digest')):
+                self.rendered_on_demand += 1
+        return True
+
+    # Garbage collection
+
+    def _ensure_sweeper(self):
+        if self._sweeper_pid != os.getpid():
+            self._sweeper_pid = os.getpid()
+            threading.Thread(target=self._sweep_forever, name='avatar-gc', daemon=True).start()
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(AVATAR_GC_INTERVAL_SECONDS)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Avatar cleanup error: {e}")
+
+    def referenced(self):
+        """Basenames of every file an `avatar_url` currently points at."""
+        connection = self._connect()
+        if not connection or isinstance(connection, str):
+            raise RuntimeError("Database connection failed")
+        try:
+            cursor = connection.cursor()
+            cursor.execute(" UNION ".join(
+                f"SELECT avatar_url FROM {table} WHERE avatar_url IS NOT NULL" for table in AVATAR_TABLES
+            ))
+            urls = [row[0] for row in cursor.fetchall()]
+            cursor.close()
+        finally:
+            connection.close()
+        names = set()
+        for url in urls:
+            basename = url.rsplit('/', 1)[-1]
+            names.add(basename)
+            match = HASHED_NAME.match(f"avatars/{basename}")
+            if match:
+                names.update(f"{match.group('digest')}-{size}.jpg" for size in AVATAR_SIZES)
+                names.add(match.group('digest'))
+        return names
+
+    def sweep(self, now=None):
+        """Delete unreferenced avatar files older than the grace period; returns how many."""
+        now = now or time.time()
+        referenced = self.referenced()
+        candidates = []
+        for directory, pattern in ((self.directory, None), (self.pending, None), (self.upload_root, LEGACY_NAME)):
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if entry.is_file() and (pattern is None or pattern.match(entry.name)):
+                    candidates.append(entry)
+
+        removed = 0
+        for entry in candidates:
+            if entry.name in referenced:
+                continue
+            try:
+                if now - entry.stat().st_mtime < AVATAR_GC_GRACE_SECONDS:
+                    continue
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        self.collected += removed
+        return removed
+
+    def snapshot(self):
+        return {
+            "uploads": self.uploads,
+            "rejected": self.rejected,
+            "rendered": self.rendered,
+            "rendered_on_demand": self.rendered_on_demand,
+            "collected": self.collected
+        }
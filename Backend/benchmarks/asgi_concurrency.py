@@ -0,0 +1,76 @@
+"""Compare the sync Flask server with the ASGI mode under concurrent report reads.
+
+Start both servers against the same database, then point this script at them:
+
+    python server.py                                             # sync, port 5000
+    uvicorn asgi:app --port 5001 --workers 1                     # ASGI, port 5001
+    python benchmarks/asgi_concurrency.py --user-id 1 \
+        --sync http://127.0.0.1:5000 --asgi http://127.0.0.1:5001
+
+Each target receives the same number of concurrent requests per endpoint and
+the script prints requests/s and latency percentiles side by side.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import jwt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import app  # noqa: E402
+
+
+ENDPOINTS = [
+    '/api/finance/all-approved-data',
+    '/api/government/budgets',
+    '/api/admin/officer-counts',
+    '/api/government/stats',
+]
+
+
+def fetch(url, token):
+    started = time.perf_counter()
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def run(base_url, path, token, concurrency, requests):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        latencies = sorted(executor.map(lambda _: fetch(base_url + path, token), range(requests)))
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sync', default='http://127.0.0.1:5000')
+    parser.add_argument('--asgi', default='http://127.0.0.1:5001')
+    parser.add_argument('--user-id', default='1', help='user id to put in the benchmark token')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    token = jwt.encode({
+        'user_id': args.user_id,
+        'role': 'auditor',
+        'exp': int(datetime.utcnow().timestamp() + 3600)
+    }, app.config['SECRET_KEY'], algorithm='HS256')
+
+    print(f"{'endpoint':36} {'mode':5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for path in ENDPOINTS:
+        for mode, base_url in (('sync', args.sync), ('asgi', args.asgi)):
+            throughput, p50, p95 = run(base_url, path, token, args.concurrency, args.requests)
+            print(f"{path:36} {mode:5} {throughput:8.1f} {p50 * 1000:8.1f} {p95 * 1000:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
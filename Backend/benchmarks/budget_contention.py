@@ -0,0 +1,263 @@
+"""Contention test for optimistic concurrency on budgets.
+
+N threads edit and review one scratch budget through the real endpoints
+(PUT /api/government/budgets/<id> and .../status). Each edit is a
+read-modify-write: read the budget and its version, add 1 to total_amount and
+one item, PUT it back with If-Match, and on 409 re-read and retry. Afterwards it
+checks that no update was lost (total_amount went up once per accepted edit),
+that the version went up once per accepted write and that the items are
+exactly the last writer's. Run it against a development database with
+migrations/012 applied:
+
+    python benchmarks/budget_contention.py --threads 16 --edits 20
+    python benchmarks/budget_contention.py --threads 16 --edits 20 --no-if-match
+
+or, without a database, with --sqlite: the endpoints then run on SQLiteStandIn,
+just enough of a mysql.connector connection over a temporary SQLite file for
+these queries. Every transaction takes SQLite's write lock when it starts, so
+transactions run one at a time; the conflicts come from the gap between a
+client's read and its PUT, which is what If-Match guards. Like the connector,
+it refuses start_transaction() inside a transaction that is already open.
+
+--no-if-match leaves the header out: each request is still atomic, but the
+client's read is not checked, so concurrent edits overwrite each other and
+"lost updates" shows how many. The scratch budget is removed afterwards.
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Every thread goes straight to the endpoint instead of queueing in its bulkhead
+os.environ.setdefault('BULKHEADS', '0')
+
+import jwt  # noqa: E402
+from mysql.connector.errors import ProgrammingError  # noqa: E402
+
+import blueprints.government  # noqa: E402
+from server import app, get_db_connection  # noqa: E402
+
+
+SQLITE_SCHEMA = """
+    CREATE TABLE budgets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, fiscal_year TEXT, total_amount REAL,
+        park_name TEXT, description TEXT, reason TEXT, status TEXT, created_by INTEGER,
+        approved_by INTEGER, approved_at TEXT, version INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE TABLE budget_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, budget_id INTEGER, category TEXT, description TEXT,
+        amount REAL, type TEXT
+    );
+    CREATE TABLE outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, event_type TEXT, aggregate TEXT, aggregate_id TEXT,
+        park_name TEXT, payload TEXT
+    );
+"""
+
+
+class SQLiteStandIn:
+    """The parts of a mysql.connector connection (autocommit off) the budget endpoints use."""
+
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+
+    @property
+    def in_transaction(self):
+        return self._db.in_transaction
+
+    def start_transaction(self):
+        if self.in_transaction:
+            raise ProgrammingError("Transaction already in progress")
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def cursor(self, *args, **kwargs):
+        return SQLiteCursor(self)
+
+    def commit(self):
+        if self.in_transaction:
+            self._db.execute("COMMIT")
+
+    def rollback(self):
+        if self.in_transaction:
+            self._db.execute("ROLLBACK")
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.rollback()
+        self._db.close()
+
+
+class SQLiteCursor:
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursor = connection._db.cursor()
+
+    def execute(self, sql, params=()):
+        # Autocommit off: the first statement opens the transaction
+        if not self._connection.in_transaction:
+            self._connection._db.execute("BEGIN IMMEDIATE")
+        self._cursor.execute(sql.replace('%s', '?'), params)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+def use_sqlite():
+    """Point the endpoints and this script at a fresh SQLite stand-in."""
+    global get_db_connection
+    path = os.path.join(tempfile.mkdtemp(), 'budgets.db')
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode = WAL")
+    db.executescript(SQLITE_SCHEMA)
+    db.close()
+    get_db_connection = blueprints.government.get_db_connection = lambda: SQLiteStandIn(path)
+    return path
+
+
+def read_budget(budget_id):
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT total_amount, version, status FROM budgets WHERE id = %s", (budget_id,))
+        total, version, status = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM budget_items WHERE budget_id = %s", (budget_id,))
+        return float(total), version, status, cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def budget_body(park_name, total, items):
+    return {
+        'title': 'Contention budget', 'fiscal_year': '2099', 'park_name': park_name,
+        'total_amount': total,
+        'items': [{'category': 'Staff', 'description': f'item {i}', 'amount': 1, 'type': 'expense'}
+                  for i in range(items)],
+    }
+
+
+def editor(budget_id, park_name, edits, token, use_if_match, results, lock):
+    client = app.test_client()
+    accepted, conflicts, latencies = 0, 0, []
+    for _ in range(edits):
+        started = time.perf_counter()
+        while True:
+            total, version, _, items = read_budget(budget_id)
+            headers = {'Authorization': f'Bearer {token}'}
+            if use_if_match:
+                headers['If-Match'] = f'"{version}"'
+            response = client.put(f'/api/government/budgets/{budget_id}', headers=headers,
+                                  json=budget_body(park_name, total + 1, items + 1))
+            if response.status_code != 409:
+                break
+            conflicts += 1
+        if response.status_code != 200:
+            # Anything but 200 or 409 is a failed test, not contention
+            with lock:
+                results['errors'].append((response.status_code, response.get_json()))
+            break
+        accepted += 1
+        latencies.append(time.perf_counter() - started)
+    with lock:
+        results['accepted'] += accepted
+        results['conflicts'] += conflicts
+        results['latencies'].extend(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--edits', type=int, default=20, help='accepted edits per thread')
+    parser.add_argument('--no-if-match', action='store_true')
+    parser.add_argument('--sqlite', action='store_true', help='run on a SQLite stand-in instead of the database')
+    args = parser.parse_args()
+    if args.sqlite:
+        print(f"SQLite stand-in at {use_sqlite()}")
+
+    park_name = f"Benchmark Park {os.getpid()}"
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute("""
+        INSERT INTO budgets (title, fiscal_year, total_amount, park_name, description, reason, status, created_by)
+        VALUES ('Contention budget', '2099', 0, %s, '', '', 'submitted', 0)
+    """, (park_name,))
+    budget_id = cursor.lastrowid
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+    token = jwt.encode({'user_id': '0', 'role': 'government', 'exp': int(datetime.utcnow().timestamp() + 3600)},
+                       app.config['SECRET_KEY'], algorithm='HS256')
+    results = {'accepted': 0, 'conflicts': 0, 'latencies': [], 'errors': []}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=editor, args=(budget_id, park_name, args.edits, token,
+                                              not args.no_if_match, results, lock))
+        for _ in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total, version, _, items = read_budget(budget_id)
+
+    # Two reviewers holding the same version: only the first may win
+    client = app.test_client()
+    review = {'status': 'approved', 'reason': 'Approved by the contention test'}
+    headers = {'Authorization': f'Bearer {token}', 'If-Match': f'"{version}"'}
+    statuses = sorted(client.put(f'/api/government/budgets/{budget_id}/status', headers=headers,
+                                 json=review).status_code for _ in range(2))
+
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM budget_items WHERE budget_id = %s", (budget_id,))
+    cursor.execute("DELETE FROM budgets WHERE id = %s", (budget_id,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+    if results['errors']:
+        raise SystemExit(f"{len(results['errors'])} edits failed, first: {results['errors'][0]}")
+
+    accepted = results['accepted']
+    latencies = sorted(results['latencies'])
+    print(f"threads={args.threads} edits={accepted} if-match={'no' if args.no_if_match else 'yes'} "
+          f"elapsed={elapsed:.2f}s throughput={accepted / elapsed:.0f} edits/s")
+    print(f"conflicts={results['conflicts']} ({results['conflicts'] / accepted:.2f} retries per edit) "
+          f"latency p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+    print(f"total_amount={total:.0f} lost updates={accepted - int(total)} "
+          f"version={version} (expected {accepted + 1}) items={items} (expected {int(total)})")
+    print(f"reviews on one version: {statuses} (expected [200, 409])")
+    if not args.no_if_match and (int(total) != accepted or version != accepted + 1 or items != accepted
+                                 or statuses != [200, 409]):
+        raise SystemExit("FAILED: an edit or review was lost")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Checkout latency while financial reports flood one worker, with and without bulkheads.
+
+Imitates one gthread worker: a fixed pool of --threads request threads serves
+the app, and every request holds one of --threads + 2 "connections" while it
+works. Report requests take --report-ms, checkout requests --checkout-ms. A
+burst of --reports report requests arrives, then --checkouts checkout requests
+arrive one every 20 ms while the burst is being served:
+
+    python benchmarks/bulkheads.py --threads 8 --reports 40
+
+Without bulkheads the reports take every thread and checkout waits behind
+them. With them the reports run a quarter of the threads at a time and
+the rest get an immediate 503 + Retry-After. No database is needed.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+import bulkheads as bulkheads_module  # noqa: E402
+from bulkheads import Bulkheads  # noqa: E402
+
+
+def build_app(args, enabled):
+    app = Flask(__name__)
+    connections = threading.BoundedSemaphore(args.threads + 2)
+
+    def work(seconds):
+        with connections:
+            time.sleep(seconds)
+        return {"ok": True}
+
+    app.add_url_rule('/report', 'report', lambda: work(args.report_ms / 1000))
+    app.add_url_rule('/checkout', 'checkout', lambda: work(args.checkout_ms / 1000), methods=['POST'])
+
+    os.environ['WEB_THREADS'] = str(args.threads)
+    os.environ['DB_POOL_SIZE'] = str(args.threads + 2)
+    bulkheads_module.BULKHEADS_ENABLED = enabled
+    bulkheads = Bulkheads({'report': 'reports', 'checkout': 'checkout'}, set())
+    app.before_request(bulkheads.admit)
+    app.teardown_request(bulkheads.release)
+    return app, bulkheads
+
+
+def run(args, enabled):
+    app, bulkheads = build_app(args, enabled)
+    client = app.test_client()
+    # The worker's request threads: a request waits here until one is free
+    workers = ThreadPoolExecutor(max_workers=args.threads)
+
+    def request(method, path):
+        submitted = time.perf_counter()
+        status = workers.submit(lambda: client.open(path, method=method).status_code).result()
+        return status, time.perf_counter() - submitted
+
+    callers = ThreadPoolExecutor(max_workers=args.reports + args.checkouts)
+    reports = [callers.submit(request, 'GET', '/report') for _ in range(args.reports)]
+    time.sleep(0.05)
+    checkouts = []
+    for _ in range(args.checkouts):
+        checkouts.append(callers.submit(request, 'POST', '/checkout'))
+        time.sleep(0.02)
+
+    checkout_results = [future.result() for future in checkouts]
+    report_results = [future.result() for future in reports]
+    callers.shutdown()
+    workers.shutdown()
+
+    latencies = sorted(latency for _, latency in checkout_results)
+    return {
+        "checkout_ok": sum(1 for status, _ in checkout_results if status == 200),
+        "checkout_p50_ms": statistics.median(latencies) * 1000,
+        "checkout_max_ms": latencies[-1] * 1000,
+        "reports_ok": sum(1 for status, _ in report_results if status == 200),
+        "reports_503": sum(1 for status, _ in report_results if status == 503),
+        "bulkheads": bulkheads.snapshot() if enabled else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--reports', type=int, default=40)
+    parser.add_argument('--checkouts', type=int, default=20)
+    parser.add_argument('--report-ms', type=float, default=500)
+    parser.add_argument('--checkout-ms', type=float, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.reports} reports x {args.report_ms:.0f} ms, "
+          f"{args.checkouts} checkouts x {args.checkout_ms:.0f} ms")
+    print(f"{'bulkheads':<11}{'checkout ok':>12}{'p50 ms':>9}{'max ms':>9}{'reports ok':>12}{'reports 503':>13}")
+    for enabled in (False, True):
+        result = run(args, enabled)
+        print(f"{'on' if enabled else 'off':<11}{result['checkout_ok']:>12}{result['checkout_p50_ms']:>9.0f}"
+              f"{result['checkout_max_ms']:>9.0f}{result['reports_ok']:>12}{result['reports_503']:>13}")
+    for name, snapshot in result['bulkheads'].items():
+        print(f"  {name}: {snapshot}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Email delivery against the local SMTP stand-in (benchmarks/smtp_sink.py).
+
+Compares one connection per message (the naive path), a reused session, and a
+reused session with PIPELINING, at a simulated round-trip latency. Then it
+checks that mailer.EmailSender reports each recipient's outcome (sent,
+re-queued on 451, failed on 550), that the per-server rate limit holds and
+that two servers share a batch:
+
+    python benchmarks/email_dispatch.py --messages 200 --latency-ms 5
+
+No database is needed; the sender's claim/record steps are not exercised.
+"""
+import argparse
+import os
+import smtplib
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mailer  # noqa: E402
+from mailer import build_message, Delivery, EmailSender, SmtpServer  # noqa: E402
+from smtp_sink import SmtpSink  # noqa: E402
+
+
+def deliveries(count, prefix='staff'):
+    return [
+        Delivery(index, 1, f"{prefix}{index}@example.org", f"Staff {index}", 0, "Budget deadline",
+                 "Please submit the Q3 budget by Friday.\n.\nThanks")
+        for index in range(count)
+    ]
+
+
+def naive(port, batch):
+    for delivery in batch:
+        with smtplib.SMTP('127.0.0.1', port) as smtp:
+            smtp.sendmail(mailer.MAIL_FROM, [delivery.email], build_message(delivery))
+
+
+def pooled(port, batch):
+    server = SmtpServer('127.0.0.1', port, rate=0)
+    for delivery in batch:
+        code, text = server.send(delivery.email, build_message(delivery))
+        assert code == 250, (code, text)
+    server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    sink = SmtpSink(('127.0.0.1', 0), args.latency_ms / 1000).start()
+    port = sink.server_address[1]
+    # Same server without PIPELINING in its EHLO reply
+    plain = SmtpSink(('127.0.0.1', 0), args.latency_ms / 1000, pipelining=False).start()
+    batch = deliveries(args.messages)
+
+    print(f"{args.messages} messages, {args.latency_ms} ms per round trip")
+    print(f"{'mode':<22}{'seconds':>10}{'msg/s':>10}{'connections':>13}{'round trips':>13}")
+    for mode, target, run in (
+        ("connection per msg", plain, naive),
+        ("reused session", plain, pooled),
+        ("reused + pipelined", sink, pooled),
+    ):
+        target.messages.clear()
+        target.connections = target.round_trips = 0
+        started = time.perf_counter()
+        run(target.server_address[1], batch)
+        elapsed = time.perf_counter() - started
+        assert len(target.messages) == args.messages, len(target.messages)
+        print(f"{mode:<22}{elapsed:>10.2f}{args.messages / elapsed:>10.0f}{target.connections:>13}{target.round_trips:>13}")
+
+    # Dot-stuffed body arrives intact
+    assert b"\r\n.\r\nThanks" in sink.messages[-1][2], sink.messages[-1][2][-60:]
+
+    # Per-recipient outcomes through the sender
+    sink.messages.clear()
+    mixed = deliveries(3) + deliveries(2, 'reject') + deliveries(2, 'defer')
+    mixed = [delivery._replace(id=index) for index, delivery in enumerate(mixed)]
+    mixed[-1] = mixed[-1]._replace(attempts=mailer.MAIL_MAX_ATTEMPTS - 1)
+    sender = EmailSender(None, [('127.0.0.1', port)])
+    outcomes = {outcome.delivery_id: outcome for outcome in sender.deliver(mixed)}
+    statuses = [(outcomes[index].status, outcomes[index].code) for index in range(len(mixed))]
+    assert statuses == [('sent', 250)] * 3 + [('failed', 550)] * 2 + [('queued', 451), ('failed', 451)], statuses
+    assert len(sink.messages) == 3
+    assert outcomes[5].retry_seconds == mailer.retry_delay(1) and outcomes[6].retry_seconds is None
+    print("outcomes:", statuses, f"retry in {outcomes[5].retry_seconds}s")
+
+    # Addresses that would break the RCPT command fail without reaching the server
+    sink.messages.clear()
+    bad = [delivery._replace(id=index, email=email) for index, (delivery, email) in enumerate(zip(
+        deliveries(3), ['a@x.test\r\nRCPT TO:<b@x.test>', 'jos\u00e9@x.test', 'ok@x.test']
+    ))]
+    outcomes = {outcome.delivery_id: outcome for outcome in sender.deliver(bad)}
+    assert [outcomes[index].status for index in range(3)] == ['failed', 'failed', 'sent'], outcomes
+    assert len(sink.messages) == 1
+    print("invalid recipients:", [outcomes[index].error for index in range(2)])
+
+    # Rate limit: 40 messages at 20/s take at least ~1s after the initial burst
+    limited = SmtpServer('127.0.0.1', port, rate=20)
+    started = time.perf_counter()
+    for delivery in deliveries(40):
+        limited.send(delivery.email, build_message(delivery))
+    elapsed = time.perf_counter() - started
+    assert elapsed >= 0.9, elapsed
+    print(f"rate limit: 40 messages at 20/s in {elapsed:.2f}s, {limited.connects} connection")
+
+    # Two servers split one batch
+    second = SmtpSink(('127.0.0.1', 0), args.latency_ms / 1000).start()
+    sender = EmailSender(None, [('127.0.0.1', port), ('127.0.0.1', second.server_address[1])])
+    sink.messages.clear()
+    outcomes = sender.deliver(deliveries(20))
+    assert all(outcome.status == 'sent' for outcome in outcomes) and len(outcomes) == 20
+    print(f"two servers: {len(sink.messages)} + {len(second.messages)} messages")
+    print([server.snapshot() for server in sender.servers][0])
+
+
+if __name__ == '__main__':
+    main()
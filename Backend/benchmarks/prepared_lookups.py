@@ -0,0 +1,100 @@
+"""Text-protocol lookups versus the prepared, cached statements in repository.py.
+
+Runs the hot account lookups the old way (a dictionary cursor per call, one
+query per role table for login) and through repository.py on the same
+connection, and reports the per-call latency of each:
+
+    python benchmarks/prepared_lookups.py --email admin@example.com --staff-id 1 --iterations 2000
+
+Point it at a development database; it only reads.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repository  # noqa: E402
+from server import get_db_connection  # noqa: E402
+
+
+def text_login(connection, email):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for table, role in repository.USER_TABLES:
+            cursor.execute(f"SELECT * FROM {table} WHERE email = %s", (email,))
+            row = cursor.fetchone()
+            if row:
+                return row
+    finally:
+        cursor.close()
+
+
+def text_staff_park(connection, staff_id):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT park_name, park_id FROM finance_officers WHERE id = %s", (staff_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def text_password_hash(connection, staff_id):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT password_hash FROM parkstaff WHERE id = %s", (staff_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def measure(call, iterations):
+    call()  # prepare / warm up
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return {
+        "mean_us": round(statistics.mean(latencies), 1),
+        "p50_us": round(latencies[len(latencies) // 2], 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1], 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--email', required=True, help="an existing account email")
+    parser.add_argument('--staff-id', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    connection = get_db_connection()
+    if isinstance(connection, str):
+        raise SystemExit(f"Database connection failed: {connection}")
+
+    cases = [
+        ("login lookup", lambda: text_login(connection, args.email),
+         lambda: repository.find_user_by_email(connection, args.email)),
+        ("finance park", lambda: text_staff_park(connection, args.staff_id),
+         lambda: repository.staff_park(connection, 'finance_officers', args.staff_id)),
+        ("password hash", lambda: text_password_hash(connection, args.staff_id),
+         lambda: repository.get_password_hash(connection, 'parkstaff', args.staff_id)),
+    ]
+    try:
+        print(f"{'lookup':<16}{'protocol':<12}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+        for name, text_call, prepared_call in cases:
+            for protocol, call in (("text", text_call), ("prepared", prepared_call)):
+                result = measure(call, args.iterations)
+                connection.rollback()
+                print(f"{name:<16}{protocol:<12}{result['mean_us']:>10}{result['p50_us']:>10}{result['p99_us']:>10}")
+        print(repository.statements.snapshot())
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Local SMTP stand-in for developing and checking mailer.py.
+
+Accepts every message and keeps it in memory. It advertises PIPELINING and
+adds a configurable delay per round trip, so a LAN or internet mail server can
+be imitated on localhost. Recipients whose local part starts with "reject"
+get a permanent 550; "defer" gets a transient 451.
+
+    python benchmarks/smtp_sink.py --port 2525 --latency-ms 20
+    MAIL_SERVERS=localhost:2525 python mailer.py
+
+benchmarks/email_dispatch.py starts it in-process.
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, latency=0.0, pipelining=True):
+        super().__init__(address, SmtpSession)
+        self.latency = latency
+        self.pipelining = pipelining
+        self.messages = []
+        self.connections = 0
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def deliver(self, sender, recipients, data):
+        with self._lock:
+            self.messages.append((sender, recipients, data))
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class SmtpSession(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.server.connections += 1
+        self.buffer = b''
+        self.sender = None
+        self.recipients = []
+        self.in_data = False
+        self.request.sendall(b"220 sink ESMTP\r\n")
+
+    def reply(self, replies):
+        # One delay per batch of replies: a pipelined group costs a single round trip
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.server.round_trips += 1
+        self.request.sendall(''.join(f"{line}\r\n" for line in replies).encode())
+
+    def command(self, line):
+        verb = line[:4].upper()
+        argument = line[5:].strip() if len(line) > 4 else ''
+        if verb in ('EHLO', 'HELO'):
+            if verb == 'HELO':
+                return "250 sink"
+            return "250-sink\r\n250-PIPELINING\r\n250 8BITMIME" if self.server.pipelining else "250 sink"
+        if verb == 'MAIL':
+            self.sender, self.recipients = argument, []
+            return "250 OK"
+        if verb == 'RCPT':
+            if self.sender is None:
+                return "503 MAIL first"
+            address = argument.partition('<')[2].rpartition('>')[0]
+            if address.startswith('reject'):
+                return "550 No such user"
+            if address.startswith('defer'):
+                return "451 Try again later"
+            self.recipients.append(address)
+            return "250 OK"
+        if verb == 'DATA':
+            if not self.recipients:
+                return "554 No valid recipients"
+            self.in_data = True
+            return "354 End data with <CR><LF>.<CR><LF>"
+        if verb == 'RSET':
+            self.sender, self.recipients = None, []
+            return "250 OK"
+        if verb == 'NOOP':
+            return "250 OK"
+        if verb == 'QUIT':
+            return None
+        return "502 Command not implemented"
+
+    def handle(self):
+        while True:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return
+            self.buffer += chunk
+            replies = []
+            while True:
+                if self.in_data:
+                    end = self.buffer.find(b'\r\n.\r\n')
+                    if end < 0:
+                        break
+                    data = self.buffer[:end + 2].replace(b'\r\n..', b'\r\n.')
+                    self.buffer = self.buffer[end + 5:]
+                    self.in_data = False
+                    self.server.deliver(self.sender, self.recipients, data)
+                    self.sender, self.recipients = None, []
+                    replies.append("250 Queued")
+                    continue
+                line, separator, rest = self.buffer.partition(b'\r\n')
+                if not separator:
+                    break
+                self.buffer = rest
+                response = self.command(line.decode(errors='replace'))
+                if response is None:
+                    self.reply(replies + ["221 Bye"])
+                    return
+                replies.append(response)
+            if replies:
+                self.reply(replies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=2525)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--no-pipelining', action='store_true')
+    args = parser.parse_args()
+
+    sink = SmtpSink(('127.0.0.1', args.port), args.latency_ms / 1000, not args.no_pipelining)
+    print(f"SMTP sink on 127.0.0.1:{args.port}")
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        print(f"{len(sink.messages)} messages over {sink.connections} connections")
+
+
+if __name__ == '__main__':
+    main()
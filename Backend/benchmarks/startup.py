@@ -0,0 +1,59 @@
+"""Worker startup cost: import time, peak RSS and which heavy modules get loaded.
+
+Each run imports the app in a fresh interpreter, as a gunicorn worker or
+`python server.py` would:
+
+    python benchmarks/startup.py --runs 10
+
+No database is needed; the connection pool and caches are created lazily.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'numpy', 'PIL', 'bcrypt', 'mysql.connector', 'jwt', 'flask_cors')
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import server
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "import_ms": elapsed * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "routes": len(list(server.app.url_map.iter_rules())),
+    "loaded": [name for name in %r if name in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=BACKEND, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    import_ms = sorted(result['import_ms'] for result in results)
+    rss = [result['max_rss_mb'] for result in results]
+    print(f"runs:         {args.runs}")
+    print(f"routes:       {results[0]['routes']}")
+    print(f"import ms:    median {statistics.median(import_ms):.1f}  min {import_ms[0]:.1f}  max {import_ms[-1]:.1f}")
+    print(f"max RSS MB:   median {statistics.median(rss):.1f}")
+    print(f"loaded:       {', '.join(results[0]['loaded'])}")
+    print(f"not loaded:   {', '.join(name for name in HEAVY_MODULES if name not in results[0]['loaded'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Contention benchmark for tour slot admission.
+
+Many visitors booking the same slot serialize on that slot's `tour_slots` row.
+This runs N threads that each admit bookings against a scratch park and reports
+throughput, latency and whether the slot was ever overbooked. Run it against a
+development database with migrations/002 applied:
+
+    python benchmarks/tour_contention.py --threads 32 --bookings 50 --slots 1
+    python benchmarks/tour_contention.py --threads 32 --bookings 50 --slots 8
+
+The scratch rows are removed afterwards.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import get_db_connection  # noqa: E402
+from availability import admit_booking, TOUR_SLOT_CAPACITY, TOUR_SLOT_MINUTES  # noqa: E402
+
+
+def worker(park_name, tour_date, slots, bookings, guests, results, lock):
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    latencies, admitted, rejected = [], 0, 0
+    try:
+        for i in range(bookings):
+            slot = i % slots
+            minutes = slot * TOUR_SLOT_MINUTES
+            tour_time = dtime(minutes // 60, minutes % 60)
+            started = time.perf_counter()
+            ok, _ = admit_booking(cursor, park_name, tour_date, tour_time, guests)
+            if ok:
+                connection.commit()
+                admitted += 1
+            else:
+                connection.rollback()
+                rejected += 1
+            latencies.append(time.perf_counter() - started)
+    finally:
+        cursor.close()
+        connection.close()
+    with lock:
+        results['latencies'].extend(latencies)
+        results['admitted'] += admitted
+        results['rejected'] += rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--bookings', type=int, default=50, help='bookings attempted per thread')
+    parser.add_argument('--slots', type=int, default=1, help='number of slots the bookings are spread over')
+    parser.add_argument('--guests', type=int, default=1)
+    args = parser.parse_args()
+
+    park_name = f"Benchmark Park {os.getpid()}"
+    tour_date = date.today() + timedelta(days=365)
+    results = {'latencies': [], 'admitted': 0, 'rejected': 0}
+    lock = threading.Lock()
+
+    threads = [
+        threading.Thread(target=worker, args=(park_name, tour_date, args.slots, args.bookings,
+                                              args.guests, results, lock))
+        for _ in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    cursor.execute("SELECT MAX(booked_guests) FROM tour_slots WHERE park_name = %s", (park_name,))
+    max_booked = cursor.fetchone()[0] or 0
+    cursor.execute("DELETE FROM tour_slots WHERE park_name = %s", (park_name,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+    latencies = sorted(results['latencies'])
+    attempts = len(latencies)
+    print(f"threads={args.threads} slots={args.slots} attempts={attempts} elapsed={elapsed:.2f}s")
+    print(f"throughput={attempts / elapsed:.0f} admissions/s "
+          f"admitted={results['admitted']} rejected={results['rejected']}")
+    print(f"latency p50={statistics.median(latencies) * 1000:.2f}ms "
+          f"p95={latencies[int(attempts * 0.95) - 1] * 1000:.2f}ms")
+    print(f"max booked per slot={max_booked} capacity={TOUR_SLOT_CAPACITY} "
+          f"overbooked={'yes' if max_booked > TOUR_SLOT_CAPACITY else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,8 @@
+"""Route blueprints, one module per role.
+
+server.create_app() imports each module listed in BLUEPRINTS and registers
+its `bp`. Shared helpers (database access, token_required, per-process
+services) live in core.py.
+"""
+
+BLUEPRINTS = ('public', 'visitor', 'admin', 'parkstaff', 'finance', 'government', 'auditor')
@@ -0,0 +1,1111 @@
+"""Administrator endpoints: /api/admin/*, staff management and /api/metrics."""
+from datetime import date, datetime, timedelta
+import hashlib
+
+from flask import Blueprint, current_app, jsonify, request
+import jwt
+
+from core import email_sender, get_db_connection, idempotency_store, login_activity, token_required, update_avatar
+from analytics import analytics_cache
+from mailer import (
+    campaign_status, create_campaign, MAX_BODY_LENGTH, MAX_RECIPIENTS, MAX_SUBJECT_LENGTH, resolve_recipients
+)
+import metrics
+import repository
+
+
+bp = Blueprint('admin', __name__)
+
+
+@bp.route('/api/park-staff', methods=['GET'])
+def get_park_staff():
+    """Retrieve all park staff members."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                id, 
+                first_name, 
+                last_name, 
+                CONCAT(first_name, ' ', last_name) as name,
+                email, 
+                park_name as park,
+                role,
+                last_login
+            FROM parkstaff
+        """)
+        staff = cursor.fetchall()
+        
+        # Format dates for frontend
+        for member in staff:
+            if member['last_login']:
+                member['last_login'] = member['last_login'].strftime('%Y-%m-%d')
+            else:
+                member['last_login'] = 'Never'
+        
+        return jsonify(staff), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve park staff"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+# In server.py, update the add_park_staff endpoint
+@bp.route('/api/park-staff', methods=['POST'])
+def add_park_staff():
+    """Add a new park staff member."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email', 'park', 'password']  # Added password
+        
+        # Validate all required fields
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({
+                "error": "Missing required fields", 
+                "missing": missing_fields
+            }), 400
+
+        # Check if email already exists
+        cursor = connection.cursor()
+        cursor.execute("SELECT id FROM parkstaff WHERE email = %s", (data['email'],))
+        existing_user = cursor.fetchone()
+        
+        if existing_user:
+            return jsonify({"error": "Email already exists"}), 409
+
+        # Hash the password
+        password_hash = hashlib.sha256(data['password'].encode()).hexdigest()
+
+        # Insert new staff member with password
+        cursor.execute('''
+            INSERT INTO parkstaff (
+                first_name, last_name, email, password_hash, park_name, role
+            ) VALUES (%s, %s, %s, %s, %s, %s)
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            password_hash,
+            data['park'],
+            'park-staff'  # Default role
+        ))
+        connection.commit()
+        
+        new_staff_id = cursor.lastrowid
+        
+        return jsonify({
+            "message": "Park staff added successfully",
+            "id": new_staff_id
+        }), 201
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to add park staff: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+# Optional: Add endpoint to update password separately
+@bp.route('/api/park-staff/password/<int:staff_id>', methods=['PUT'])
+@token_required
+def update_park_staff_password(staff_id, current_user_id):
+    """Update park staff password."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        if 'password' not in data:
+            return jsonify({"error": "Password is required"}), 400
+
+        # Check if staff exists
+        if not repository.user_exists(connection, 'parkstaff', staff_id):
+            return jsonify({"error": "Staff member not found"}), 404
+        
+        # Hash the new password
+        password_hash = hashlib.sha256(data['password'].encode()).hexdigest()
+        
+        # Update password
+        repository.set_password_hash(connection, 'parkstaff', staff_id, password_hash)
+        connection.commit()
+        
+        return jsonify({
+            "message": "Password updated successfully"
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update password: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+@bp.route('/api/park-staff/<int:staff_id>', methods=['PUT'])
+def update_park_staff(staff_id):
+    """Update an existing park staff member."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email', 'park']
+        
+        # Validate all required fields
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({
+                "error": "Missing required fields", 
+                "missing": missing_fields
+            }), 400
+
+        # Check if staff exists
+        cursor = connection.cursor()
+        cursor.execute("SELECT id FROM parkstaff WHERE id = %s", (staff_id,))
+        existing_staff = cursor.fetchone()
+        
+        if not existing_staff:
+            return jsonify({"error": "Staff member not found"}), 404
+        
+        # Check if email exists for another user
+        cursor.execute("SELECT id FROM parkstaff WHERE email = %s AND id != %s", 
+                      (data['email'], staff_id))
+        email_exists = cursor.fetchone()
+        
+        if email_exists:
+            return jsonify({"error": "Email already in use by another staff member"}), 409
+
+        # Update staff member
+        cursor.execute('''
+            UPDATE parkstaff SET
+                first_name = %s,
+                last_name = %s,
+                email = %s,
+                park_name = %s
+            WHERE id = %s
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            data['park'],
+            staff_id
+        ))
+        connection.commit()
+        
+        return jsonify({
+            "message": "Park staff updated successfully",
+            "id": staff_id
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update park staff: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/park-staff/<int:staff_id>', methods=['DELETE'])
+def delete_parkstaff(staff_id):
+    """Delete a park staff member."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor()
+        
+        # Check if staff exists
+        cursor.execute("SELECT id FROM parkstaff WHERE id = %s", (staff_id,))
+        existing_staff = cursor.fetchone()
+        
+        if not existing_staff:
+            return jsonify({"error": "Staff member not found"}), 404
+        
+        # Delete staff member
+        cursor.execute("DELETE FROM parkstaff WHERE id = %s", (staff_id,))
+        connection.commit()
+        
+        return jsonify({
+            "message": "Park staff deleted successfully"
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to delete park staff: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/park-staff/update-login/<int:staff_id>', methods=['PUT'])
+def update_login_time(staff_id):
+    """Update the last login time for a park staff member."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor()
+        
+        # Check if staff exists
+        cursor.execute("SELECT id FROM parkstaff WHERE id = %s", (staff_id,))
+        existing_staff = cursor.fetchone()
+        
+        if not existing_staff:
+            return jsonify({"error": "Staff member not found"}), 404
+        
+        # Update last login time (flushed in the background with other logins)
+        login_activity.record('parkstaff', staff_id, log=False)
+        
+        return jsonify({
+            "message": "Last login time updated successfully"
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update login time: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+@bp.route('/api/admin/login', methods=['POST'])
+def admin_login():
+    connection = get_db_connection()
+    if isinstance(connection, tuple):  # Check if connection failed
+        return connection
+    
+    try:
+        data = request.json
+        email = data.get('email')
+        password = data.get('password')
+        
+        if not email or not password:
+            return jsonify({"error": "Email and password are required"}), 400
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM admintable WHERE email = %s", (email,))
+        admin = cursor.fetchone()
+        print(f"Found admin: {admin}")
+        
+        if not admin or hashlib.sha256(password.encode()).hexdigest() != admin['password_hash']:
+            print(f"Password hash attempted: {hashlib.sha256(password.encode()).hexdigest()}")
+            print(f"Stored hash: {admin['password_hash'] if admin else 'No user'}")
+            return jsonify({"error": "Invalid credentials"}), 401
+
+        login_activity.record('admintable', admin['id'], admin['email'], admin['role'])
+
+        # Create JWT token with explicit types
+        token = jwt.encode({
+            'user_id': str(admin['id']),
+            'email': admin['email'],
+            'role': admin['role'],
+            'exp': int(datetime.utcnow().timestamp() + 86400)  # 24 hours (86400 seconds)
+        }, current_app.config['SECRET_KEY'], algorithm='HS256')  # Explicitly specify algorithm
+
+        return jsonify({
+            "message": "Login successful",
+            "token": token,
+            "user": {
+                "id": str(admin['id']),
+                "firstName": admin['first_name'],
+                "lastName": admin['last_name'],
+                "email": admin['email'],
+                "role": admin['role'],
+                "park": admin['park_name'],
+                "avatarUrl": admin['avatar_url']
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Login error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/admin/profile', methods=['PUT'])
+@token_required
+def update_admin_profile(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email']
+        
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        cursor = connection.cursor()
+        cursor.execute('''
+            UPDATE admintable SET
+                first_name = %s,
+                last_name = %s,
+                email = %s,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            current_user_id
+        ))
+        connection.commit()
+
+        return jsonify({"message": "Profile updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Profile update error: {e}")
+        return jsonify({"error": "Failed to update profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/admin/avatar', methods=['POST'])
+@token_required
+def update_admin_avatar(current_user_id):
+    return update_avatar('admintable', current_user_id)
+
+@bp.route('/api/admin/account', methods=['DELETE'])
+@token_required
+def delete_admin_account(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, dict):
+        return connection, 500
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM admintable WHERE id = %s", (current_user_id,))
+        connection.commit()
+        return jsonify({"message": "Account deleted successfully"}), 200
+    except Exception as e:
+        print(f"Account deletion error: {e}")
+        return jsonify({"error": "Failed to delete account"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/admin/password', methods=['PUT'])
+@token_required
+def update_admin_password(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        data = request.json
+        current_password = data.get('currentPassword')
+        new_password = data.get('newPassword')
+        confirm_password = data.get('confirmPassword')
+
+        if not all([current_password, new_password, confirm_password]):
+            return jsonify({"error": "All password fields are required"}), 400
+
+        if new_password != confirm_password:
+            return jsonify({"error": "New passwords don't match"}), 400
+
+        password_hash = repository.get_password_hash(connection, 'admintable', current_user_id)
+
+        if hashlib.sha256(current_password.encode()).hexdigest() != password_hash:
+            return jsonify({"error": "Current password is incorrect"}), 401
+
+        new_password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+        repository.set_password_hash(connection, 'admintable', current_user_id, new_password_hash)
+        connection.commit()
+
+        return jsonify({"message": "Password updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Password update error: {e}")
+        return jsonify({"error": "Failed to update password"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+@bp.route('/api/admin/tour-bookings', methods=['GET'])
+@token_required
+def get_tour_bookings(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, dict):
+        return connection, 500
+    
+    try:
+        analytics_cache.ensure_fresh(connection, 'tours')
+        bookings = [{
+            "month": date(group['year'], group['month'], 1).strftime('%b'),
+            "bookings": group['count']
+        } for group in analytics_cache.group_by('tours', ('month',), 'created_at')]
+        return jsonify({"tour_bookings": bookings}), 200
+    except Exception as e:
+        print(f"Error fetching tour bookings: {e}")
+        return jsonify({"error": "Failed to fetch tour bookings"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+
+
+@bp.route('/api/admin/donations', methods=['GET'])
+@token_required
+def get_admin_donations(current_user_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        query = """
+        SELECT d.*, p.transaction_id, p.status as payment_status
+        FROM donations d
+        LEFT JOIN payments p ON p.customer_email = d.email 
+            AND p.park_name = d.park_name 
+            AND p.payment_type = 'donation'
+        ORDER BY d.created_at DESC
+        """
+        
+        cursor.execute(query)
+        donations = cursor.fetchall()
+        
+        # Format dates
+        for donation in donations:
+            donation['created_at'] = donation['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            donation['amount'] = float(donation['amount'])
+        
+        cursor.close()
+        conn.close()
+        
+        return jsonify(donations)
+    except Exception as e:
+        print(f"Database error: {str(e)}")
+        return jsonify({"error": "Failed to fetch donations"}), 500
+
+@bp.route('/api/admin/services', methods=['GET'])
+@token_required
+def get_admin_services(current_user_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        query = """
+        SELECT id, first_name, last_name, email, phone, 
+               company_type, provided_service, company_name,
+               created_at, status, tax_id
+        FROM services
+        ORDER BY created_at DESC
+        """
+        
+        cursor.execute(query)
+        services = cursor.fetchall()
+        
+        # Format dates
+        for service in services:
+            service['created_at'] = service['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+        
+        cursor.close()
+        conn.close()
+        
+        return jsonify(services)
+    except Exception as e:
+        print(f"Database error: {str(e)}")
+        return jsonify({"error": "Failed to fetch services"}), 500
+
+@bp.route('/api/admin/recent-logins', methods=['GET'])
+@token_required
+def get_recent_logins(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, dict):
+        return connection, 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT email, role, login_time as last_login "
+            "FROM login_logs ORDER BY login_time DESC LIMIT 5"
+        )
+        logins = cursor.fetchall()
+        return jsonify({"recent_logins": logins}), 200
+    except Exception as e:
+        print(f"Error fetching logins: {e}")
+        return jsonify({"error": "Failed to fetch recent logins"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/admin/login-metrics', methods=['GET'])
+@token_required
+def get_login_metrics(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, dict):
+        return connection, 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        # Finished days come from the daily rollup (login_retention.py); only
+        # the days since the last rollup are counted from login_logs itself.
+        cursor.execute("SELECT MAX(day) AS rolled FROM login_daily_counts")
+        rolled = cursor.fetchone()['rolled']
+        live_since = rolled + timedelta(days=1) if rolled else date(1970, 1, 2)
+        cursor.execute(
+            "SELECT DATE_FORMAT(day, '%b') as month, SUM(logins) as logins FROM ("
+            "  SELECT day, logins FROM login_daily_counts WHERE day < %s"
+            "  UNION ALL"
+            "  SELECT DATE(login_time) AS day, COUNT(*) AS logins FROM login_logs"
+            "  WHERE login_time >= %s GROUP BY DATE(login_time)"
+            ") d GROUP BY YEAR(day), MONTH(day) "
+            "ORDER BY MIN(day)",
+            (live_since, live_since)
+        )
+        metrics = cursor.fetchall()
+        for metric in metrics:
+            metric['logins'] = int(metric['logins'])
+        return jsonify({"login_metrics": metrics}), 200
+    except Exception as e:
+        print(f"Error fetching login metrics: {e}")
+        return jsonify({"error": "Failed to fetch login metrics"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/metrics', methods=['GET'])
+@token_required
+def get_metrics(current_user_id):
+    """Runtime metrics of this worker process (replica lag, caches, queues)."""
+    return jsonify(metrics.collect()), 200
+
+@bp.route('/api/admin/stats', methods=['GET'])
+@token_required
+def get_dashboard_stats(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, dict):
+        return connection, 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        
+        cursor.execute("SELECT COUNT(*) as total_bookings FROM tours")
+        total_bookings = cursor.fetchone()['total_bookings']
+        
+        cursor.execute("SELECT SUM(amount) as total_donations FROM donations")
+        total_donations = cursor.fetchone()['total_donations'] or 0
+        
+        cursor.execute("SELECT COUNT(*) as total_logins FROM admintable")
+        total_logins = cursor.fetchone()['total_logins']
+        
+        cursor.execute("SELECT COUNT(*) as active_admins FROM parkstaff")
+        active_admins = cursor.fetchone()['active_admins']
+
+        stats = [
+            {"title": "Total Tours Booked", "value": total_bookings, "icon": "Calendar", "trend": "up"},
+            {"title": "Total Donations", "value": total_donations, "icon": "Cash", "trend": "up"},
+            {"title": "Total Admins", "value": total_logins, "icon": "LogIn", "trend": "up"},
+            {"title": "Recorded Park stuffs", "value": active_admins, "icon": "Users", "trend": "up"},
+        ]
+        return jsonify({"stats": stats}), 200
+    except Exception as e:
+        print(f"Error fetching stats: {e}")
+        return jsonify({"error": "Failed to fetch stats"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()    
+
+
+
+
+@bp.route('/api/admin/officer-counts', methods=['GET'])
+@token_required
+def get_officer_counts(current_user_id):
+    """Retrieve the total count of each officer type."""
+    print(f"Handling GET request for /api/admin/officer-counts by user {current_user_id}")
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        
+        # Count finance officers
+        cursor.execute("SELECT COUNT(*) as finance_count FROM finance_officers")
+        finance_count = cursor.fetchone()['finance_count']
+        
+        # Count government officers
+        cursor.execute("SELECT COUNT(*) as government_count FROM government_officers")
+        government_count = cursor.fetchone()['government_count']
+        
+        # Count auditors
+        cursor.execute("SELECT COUNT(*) as auditor_count FROM auditors")
+        auditor_count = cursor.fetchone()['auditor_count']
+        
+        # Count park staff
+        cursor.execute("SELECT COUNT(*) as park_staff_count FROM parkstaff")
+        park_staff_count = cursor.fetchone()['park_staff_count']
+
+        officer_counts = [
+            {"title": "Finance Officers", "value": finance_count, "icon": "Users", "trend": "neutral"},
+            {"title": "Government Officers", "value": government_count, "icon": "Users", "trend": "neutral"},
+            {"title": "Auditors", "value": auditor_count, "icon": "Users", "trend": "neutral"},
+            {"title": "Park Staff", "value": park_staff_count, "icon": "Users", "trend": "neutral"},
+        ]
+        
+        return jsonify({"officer_counts": officer_counts}), 200
+    except Exception as e:
+        print(f"Error fetching officer counts: {e}")
+        return jsonify({"error": "Failed to fetch officer counts"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+
+@bp.route('/api/staff', methods=['POST'])
+def add_staff():
+    """Add a new staff member."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email', 'role', 'password']
+        
+        # Validate required fields
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+        
+        # Validate role
+        valid_roles = ['park-staff', 'auditor', 'government', 'finance']
+        if data['role'] not in valid_roles:
+            return jsonify({"error": f"Invalid role. Must be one of: {', '.join(valid_roles)}"}), 400
+
+        # Validate park_name for roles requiring it
+        roles_requiring_park = ['park-staff', 'auditor', 'government']
+        if data['role'] in roles_requiring_park and not data.get('park_name'):
+            return jsonify({"error": f"park_name is required for {data['role']} role"}), 400
+
+        cursor = connection.cursor()
+        
+        # Check if email already exists across all staff tables
+        tables = ['parkstaff', 'auditors', 'government_officers', 'finance_officers']
+        for table in tables:
+            cursor.execute(f"SELECT id FROM {table} WHERE email = %s", (data['email'],))
+            if cursor.fetchone():
+                return jsonify({"error": "Email already exists"}), 409
+
+        # Hash password
+        password_hash = hashlib.sha256(data['password'].encode()).hexdigest()
+
+        # Map role to table
+        table_map = {
+            'park-staff': 'parkstaff',
+            'auditor': 'auditors',
+            'government': 'government_officers',
+            'finance': 'finance_officers'
+        }
+        table = table_map[data['role']]
+
+        # Log query details for debugging
+        print(f"Inserting into table: {table}")
+        print(f"Data: {data}")
+
+        # Insert into appropriate table
+        if data['role'] == 'park-staff':
+            query = """
+                INSERT INTO parkstaff (
+                    first_name, last_name, email, password_hash, park_name
+                ) VALUES (%s, %s, %s, %s, %s)
+            """
+            params = (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                password_hash,
+                data['park_name']
+            )
+        elif data['role'] == 'auditor':
+            query = """
+                INSERT INTO auditors (
+                    first_name, last_name, email, password_hash, park_name
+                ) VALUES (%s, %s, %s, %s, %s)
+            """
+            params = (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                password_hash,
+                data['park_name']
+            )
+        elif data['role'] == 'government':
+            query = """
+                INSERT INTO government_officers (
+                    first_name, last_name, email, password_hash, park_name
+                ) VALUES (%s, %s, %s, %s, %s)
+            """
+            params = (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                password_hash,
+                data['park_name']
+            )
+        elif data['role'] == 'finance':
+            query = """
+                INSERT INTO finance_officers (
+                    first_name, last_name, email, password_hash, park_name
+                ) VALUES (%s, %s, %s, %s, %s)
+            """
+            params = (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                password_hash,
+                data.get('park_name')  # Fixed: Changed data('park_name') to data.get('park_name')
+            )
+
+        print(f"Executing query: {query}")
+        print(f"Parameters: {params}")
+        cursor.execute(query, params)
+
+        connection.commit()
+        new_staff_id = cursor.lastrowid
+        
+        return jsonify({
+            "message": "Staff member added successfully",
+            "id": new_staff_id
+        }), 201
+
+    except Exception as e:
+        print(f"Database error: {str(e)}")
+        return jsonify({"error": f"Failed to add staff: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/staff', methods=['GET'])
+@token_required
+def get_staff(current_user_id):
+    """Retrieve all staff members across all roles."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        # Verify the user is an admin
+        cursor.execute("SELECT id FROM admintable WHERE id = %s", (current_user_id,))
+        if not cursor.fetchone():
+            return jsonify({"error": "Unauthorized: Admin access required"}), 403
+
+        # Query all staff tables with UNION
+        query = """
+            SELECT id, first_name, last_name, email, park_name, role, last_login, created_at
+            FROM parkstaff
+            UNION
+            SELECT id, first_name, last_name, email, park_name, role, last_login, created_at
+            FROM auditors
+            UNION
+            SELECT id, first_name, last_name, email, park_name, role, last_login, created_at
+            FROM government_officers
+            UNION
+            SELECT id, first_name, last_name, email, park_name, role, last_login, created_at
+            FROM finance_officers
+            ORDER BY created_at DESC
+        """
+        cursor.execute(query)
+        staff = cursor.fetchall()
+
+        # Format dates and clean up response
+        for member in staff:
+            member['id'] = str(member['id'])  # Convert to string for frontend
+            if member['last_login']:
+                member['last_login'] = member['last_login'].strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                member['last_login'] = None
+            member['created_at'] = member['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            # Ensure role is consistent
+            if member['role'] == 'park-staff':
+                member['role'] = 'park-staff'
+            elif member['role'] == 'auditor':
+                member['role'] = 'auditor'
+            elif member['role'] == 'government':
+                member['role'] = 'government'
+            elif member['role'] == 'finance':
+                member['role'] = 'finance'
+
+        return jsonify(staff), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve staff"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/staff/<int:staff_id>', methods=['DELETE'])
+@token_required
+def delete_staff(current_user_id, staff_id):
+    """Delete a staff member from any role."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        role = request.args.get('role')
+        if not role:
+            return jsonify({"error": "Role parameter is required"}), 400
+
+        table = repository.STAFF_TABLES.get(role)
+        if not table:
+            return jsonify({"error": "Invalid role"}), 400
+        
+        # Delete staff member
+        if not repository.delete_user(connection, table, staff_id):
+            return jsonify({"error": "Staff member not found"}), 404
+        connection.commit()
+        
+        return jsonify({
+            "message": "Staff member deleted successfully"
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to delete staff: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+@bp.route('/api/staff/<int:staff_id>', methods=['PUT'])
+@token_required
+def update_staff(current_user_id, staff_id):
+    """Update an existing staff member."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        role = request.args.get('role')
+        required_fields = ['firstName', 'lastName', 'email', 'role']
+        
+        # Validate required fields
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+        
+        if not role:
+            return jsonify({"error": "Role parameter is required"}), 400
+            
+        if role not in ['park-staff', 'auditor', 'government', 'finance']:
+            return jsonify({"error": "Invalid role"}), 400
+
+        cursor = connection.cursor()
+        
+        table = repository.STAFF_TABLES.get(role)
+        if not table:
+            return jsonify({"error": "Invalid role"}), 400
+        
+        # Check if staff exists
+        if not repository.user_exists(connection, table, staff_id):
+            return jsonify({"error": "Staff member not found"}), 404
+        
+        # Check if email is already in use by another user
+        if repository.email_in_use(connection, data['email'], table, staff_id):
+            return jsonify({"error": "Email already in use by another staff member"}), 409
+        
+        # Update staff member
+        if role == 'park-staff':
+            if not data.get('park'):
+                return jsonify({"error": "Park is required for park staff"}), 400
+            cursor.execute(f"""
+                UPDATE {table} SET
+                    first_name = %s,
+                    last_name = %s,
+                    email = %s,
+                    park_name = %s
+                WHERE id = %s
+            """, (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                data['park'],
+                staff_id
+            ))
+        elif role == 'finance':
+            cursor.execute(f"""
+                UPDATE {table} SET
+                    first_name = %s,
+                    last_name = %s,
+                    email = %s,
+                    park_name = %s
+                WHERE id = %s
+            """, (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                data.get('park', None),
+                staff_id
+            ))
+        else:  # auditor, government
+            cursor.execute(f"""
+                UPDATE {table} SET
+                    first_name = %s,
+                    last_name = %s,
+                    email = %s
+                WHERE id = %s
+            """, (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                staff_id
+            ))
+        
+        # Update password if provided
+        if data.get('password'):
+            password_hash = hashlib.sha256(data['password'].encode()).hexdigest()
+            cursor.execute(f"""
+                UPDATE {table} SET password_hash = %s WHERE id = %s
+            """, (password_hash, staff_id))
+        
+        connection.commit()
+        
+        return jsonify({
+            "message": "Staff member updated successfully",
+            "id": staff_id
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update staff: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/admin/email-campaigns', methods=['POST'])
+@token_required
+@idempotency_store.idempotent
+def create_email_campaign(current_user_id):
+    """Queue an email to the selected staff; delivery happens in the background."""
+    data = request.json or {}
+    subject = (data.get('subject') or '').strip()
+    message = (data.get('message') or '').strip()
+    roles = data.get('roles') or []
+    recipients = data.get('recipients') or []
+
+    if not subject or not message:
+        return jsonify({"error": "Subject and message are required"}), 400
+    if len(subject) > MAX_SUBJECT_LENGTH or len(message) > MAX_BODY_LENGTH:
+        return jsonify({"error": f"Subject must be at most {MAX_SUBJECT_LENGTH} and message at most {MAX_BODY_LENGTH} characters"}), 400
+    if not isinstance(roles, list) or not isinstance(recipients, list) or not (roles or recipients):
+        return jsonify({"error": "Select recipients by roles and/or recipients ([{role, id}])"}), 400
+
+    connection = get_db_connection()
+    if not connection or isinstance(connection, str):
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = None
+    try:
+        if not repository.user_exists(connection, 'admintable', current_user_id):
+            return jsonify({"error": "Unauthorized: Admin access required"}), 403
+
+        cursor = connection.cursor()
+        try:
+            selected = resolve_recipients(cursor, roles, recipients)
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+        if not selected:
+            return jsonify({"error": "No recipients with an email address selected"}), 400
+        if len(selected) > MAX_RECIPIENTS:
+            return jsonify({"error": f"At most {MAX_RECIPIENTS} recipients per campaign"}), 400
+
+        campaign_id, count = create_campaign(cursor, subject, message, current_user_id, selected)
+        idempotency_store.applied(cursor)
+        connection.commit()
+        email_sender.wake()
+        print(f"Email campaign {campaign_id} queued for {count} recipients by admin {current_user_id}")
+        return jsonify({
+            "message": "Email campaign queued",
+            "id": campaign_id,
+            "recipients": count
+        }), 202
+
+    except Exception as e:
+        print(f"Email campaign error: {e}")
+        connection.rollback()
+        return jsonify({"error": "Failed to queue email campaign"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        connection.close()
+
+
+@bp.route('/api/admin/email-campaigns/<int:campaign_id>', methods=['GET'])
+@token_required
+def get_email_campaign(current_user_id, campaign_id):
+    """A campaign's progress and the delivery status of each recipient."""
+    connection = get_db_connection()
+    if not connection or isinstance(connection, str):
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = None
+    try:
+        if not repository.user_exists(connection, 'admintable', current_user_id):
+            return jsonify({"error": "Unauthorized: Admin access required"}), 403
+        cursor = connection.cursor()
+        campaign = campaign_status(cursor, campaign_id)
+        if not campaign:
+            return jsonify({"error": "Campaign not found"}), 404
+        return jsonify(campaign), 200
+
+    except Exception as e:
+        print(f"Email campaign error: {e}")
+        return jsonify({"error": "Failed to retrieve email campaign"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        connection.close()
@@ -0,0 +1,309 @@
+"""Auditor endpoints: /api/auditor/*."""
+import hashlib
+
+from flask import Blueprint, jsonify, request
+
+from core import get_db_connection, token_required, update_avatar
+import repository
+
+
+bp = Blueprint('auditor', __name__)
+
+
+@bp.route('/api/auditor/financial-report', methods=['GET'])
+@token_required
+def get_auditor_financial_report(current_user_id):
+    """Income versus expense report computed server-side, optionally scoped by park and status."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        park_name = request.args.get('park')
+        status = request.args.get('status')
+        from reports import get_financial_report
+        report, cached = get_financial_report(connection, park_name, status)
+
+        response = jsonify(report)
+        response.headers['X-Report-Cache'] = 'hit' if cached else 'miss'
+        return response, 200
+
+    except Exception as e:
+        print(f"Financial report error: {e}")
+        return jsonify({"error": f"Failed to build financial report: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+# ... existing code ...
+
+# @bp.route('/api/government/budgets/approved', methods=['GET'])
+# @token_required
+# def get_government_approved_budgets(current_user_id):
+#     """Get all approved budgets for government view."""
+#     connection = get_db_connection()
+#     if not connection:
+#         return jsonify({"error": "Database connection failed"}), 500
+    
+#     try:
+#         cursor = connection.cursor(dictionary=True)
+#         cursor.execute("""
+#             SELECT 
+#                 b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+#                 b.description, b.status, b.created_at, b.approved_at,
+#                 b.reason, b.created_by, b.approved_by,
+#                 fo.first_name as created_by_name,
+#                 fo.last_name as created_by_lastname,
+#                 go.first_name as approved_by_name,
+#                 go.last_name as approved_by_lastname
+#             FROM budgets b
+#             LEFT JOIN finance_officers fo ON b.created_by = fo.id
+#             LEFT JOIN government_officers go ON b.approved_by = go.id
+#             WHERE b.status = 'approved'
+#             ORDER BY b.approved_at DESC
+#         """)
+#         budgets = cursor.fetchall()
+        
+#         # Format the response data
+#         for budget in budgets:
+#             budget['total_amount'] = float(budget['total_amount'])
+#             budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+#             if budget['approved_at']:
+#                 budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+#             # Get budget items
+#             cursor.execute("""
+#                 SELECT id, category, description, amount, type
+#                 FROM budget_items
+#                 WHERE budget_id = %s
+#             """, (budget['id'],))
+#             items = cursor.fetchall()
+            
+#             # Format items
+#             for item in items:
+#                 item['amount'] = float(item['amount'])
+            
+#             budget['items'] = items
+#             budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+#             budget['approved_by_full_name'] = f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+            
+#             # Clean up response
+#             del budget['created_by_name']
+#             del budget['created_by_lastname']
+#             del budget['approved_by_name']
+#             del budget['approved_by_lastname']
+        
+#         return jsonify(budgets), 200
+        
+#     except Exception as e:
+#         print(f"Error fetching approved budgets: {e}")
+#         return jsonify({"error": "Failed to fetch approved budgets"}), 500
+#     finally:
+#         if connection.is_connected():
+#             cursor.close()
+#             connection.close()
+
+# @bp.route('/api/government/budgets/rejected', methods=['GET'])
+# @token_required
+# def get_government_rejected_budgets(current_user_id):
+#     """Get all rejected budgets for government view."""
+#     connection = get_db_connection()
+#     if not connection:
+#         return jsonify({"error": "Database connection failed"}), 500
+    
+#     try:
+#         cursor = connection.cursor(dictionary=True)
+#         cursor.execute("""
+#             SELECT 
+#                 b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+#                 b.description, b.status, b.created_at, b.approved_at,
+#                 b.reason, b.created_by, b.approved_by,
+#                 fo.first_name as created_by_name,
+#                 fo.last_name as created_by_lastname,
+#                 go.first_name as approved_by_name,
+#                 go.last_name as approved_by_lastname
+#             FROM budgets b
+#             LEFT JOIN finance_officers fo ON b.created_by = fo.id
+#             LEFT JOIN government_officers go ON b.approved_by = go.id
+#             WHERE b.status = 'rejected'
+#             ORDER BY b.approved_at DESC
+#         """)
+#         budgets = cursor.fetchall()
+        
+#         # Format the response data
+#         for budget in budgets:
+#             budget['total_amount'] = float(budget['total_amount'])
+#             budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+#             if budget['approved_at']:
+#                 budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+#             # Get budget items
+#             cursor.execute("""
+#                 SELECT id, category, description, amount, type
+#                 FROM budget_items
+#                 WHERE budget_id = %s
+#             """, (budget['id'],))
+#             items = cursor.fetchall()
+            
+#             # Format items
+#             for item in items:
+#                 item['amount'] = float(item['amount'])
+            
+#             budget['items'] = items
+#             budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+#             budget['approved_by_full_name'] = f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+            
+#             # Clean up response
+#             del budget['created_by_name']
+#             del budget['created_by_lastname']
+#             del budget['approved_by_name']
+#             del budget['approved_by_lastname']
+        
+#         return jsonify(budgets), 200
+        
+#     except Exception as e:
+#         print(f"Error fetching rejected budgets: {e}")
+#         return jsonify({"error": "Failed to fetch rejected budgets"}), 500
+#     finally:
+#         if connection.is_connected():
+#             cursor.close()
+#             connection.close()
+
+
+@bp.route('/api/auditor/profile', methods=['PUT'])
+@token_required
+def update_auditor_profile(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email']
+        
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        cursor = connection.cursor()
+        cursor.execute('''
+            UPDATE auditors SET
+                first_name = %s,
+                last_name = %s,
+                email = %s
+            WHERE id = %s
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            current_user_id
+        ))
+        connection.commit()
+
+        return jsonify({"message": "Profile updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Profile update error: {e}")
+        return jsonify({"error": "Failed to update profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/auditor/avatar', methods=['POST'])
+@token_required
+def update_auditor_avatar(current_user_id):
+    return update_avatar('auditors', current_user_id)
+
+@bp.route('/api/auditor/password', methods=['PUT'])
+@token_required
+def update_auditor_password(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        data = request.json
+        current_password = data.get('currentPassword')
+        new_password = data.get('newPassword')
+        confirm_password = data.get('confirmPassword')
+
+        if not all([current_password, new_password, confirm_password]):
+            return jsonify({"error": "All password fields are required"}), 400
+
+        if new_password != confirm_password:
+            return jsonify({"error": "New passwords don't match"}), 400
+
+        password_hash = repository.get_password_hash(connection, 'auditors', current_user_id)
+
+        if hashlib.sha256(current_password.encode()).hexdigest() != password_hash:
+            return jsonify({"error": "Current password is incorrect"}), 401
+
+        new_password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+        repository.set_password_hash(connection, 'auditors', current_user_id, new_password_hash)
+        connection.commit()
+
+        return jsonify({"message": "Password updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Password update error: {e}")
+        return jsonify({"error": "Failed to update password"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+@bp.route('/api/auditor/account', methods=['DELETE'])
+@token_required
+def delete_auditor_account(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM auditors WHERE id = %s", (current_user_id,))
+        connection.commit()
+        return jsonify({"message": "Account deleted successfully"}), 200
+    except Exception as e:
+        print(f"Account deletion error: {e}")
+        return jsonify({"error": "Failed to delete account"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/auditor/profile', methods=['GET'])
+@token_required
+def get_auditor_profile(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, first_name, last_name, email, avatar_url, park_name
+            FROM auditors
+            WHERE id = %s
+        """, (current_user_id,))
+        auditor = cursor.fetchone()
+        
+        if not auditor:
+            return jsonify({"error": "Auditor not found"}), 404
+        
+        return jsonify({
+            "id": str(auditor['id']),
+            "firstName": auditor['first_name'],
+            "lastName": auditor['last_name'],
+            "email": auditor['email'],
+            "avatarUrl": auditor['avatar_url'],
+            "park": auditor['park_name'],
+            "role": "auditor"
+        }), 200
+        
+    except Exception as e:
+        print(f"Profile retrieval error: {e}")
+        return jsonify({"error": "Failed to retrieve profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
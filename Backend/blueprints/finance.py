@@ -0,0 +1,1336 @@
+"""Finance officer endpoints: /api/finance/*."""
+import hashlib
+
+from flask import Blueprint, jsonify, request
+
+from core import get_db_connection, token_required, update_avatar
+from outbox import enqueue
+import repository
+
+
+bp = Blueprint('finance', __name__)
+
+
+@bp.route('/api/finance/fund-requests', methods=['GET'])
+@token_required
+def get_all_fund_requests(current_user_id):
+    """Retrieve all fund requests for finance officer, filtered by their park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+        if not officer or not officer.park_name:
+            return jsonify({"error": "Finance officer or park not found"}), 404
+        
+        park_name = officer.park_name
+        
+        cursor.execute("""
+            SELECT 
+                fr.id, fr.title, fr.description, fr.amount, fr.category,
+                fr.parkname, fr.urgency, fr.status, fr.created_at,
+                fr.created_by, ps.first_name, ps.last_name, ps.email AS staff_email,
+                ps.park_name AS staff_park
+            FROM fund_requests fr
+            JOIN parkstaff ps ON fr.created_by = ps.id
+            WHERE fr.parkname = %s
+            ORDER BY fr.created_at DESC
+        """, (park_name,))
+        requests = cursor.fetchall()
+        
+        for req in requests:
+            req['created_at'] = req['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            req['amount'] = float(req['amount'])
+            
+        return jsonify(requests), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to retrieve fund requests: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+# Add these new endpoints after the existing ones in server.py
+
+@bp.route('/api/finance/tours', methods=['GET'])
+@token_required
+def get_all_tours(current_user_id):
+    """Retrieve all booked tours for finance officer, filtered by their park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+        if not officer or not officer.park_id:
+            return jsonify({"error": "Finance officer or park not found"}), 404
+        
+        cursor.execute("""
+            SELECT 
+                id, park_name, tour_name, date, time, guests, amount,
+                first_name, last_name, email, phone, special_requests,
+                created_at
+            FROM tours
+            WHERE park_id = %s
+            ORDER BY created_at DESC
+        """, (officer.park_id,))
+        tours = cursor.fetchall()
+        
+        for tour in tours:
+            tour['created_at'] = tour['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            tour['date'] = tour['date'].strftime('%Y-%m-%d')
+            tour['time'] = str(tour['time'])
+            tour['amount'] = float(tour['amount'])
+            
+        return jsonify(tours), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to retrieve tours: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+@bp.route('/api/finance/donations', methods=['GET'])
+@token_required
+def get_all_donations(current_user_id):
+    """Retrieve all donations for finance officer, filtered by their park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+        if not officer or not officer.park_id:
+            return jsonify({"error": "Finance officer or park not found"}), 404
+        
+        cursor.execute("""
+            SELECT 
+                id, donation_type, amount, park_name,
+                first_name, last_name, email, message,
+                is_anonymous, created_at
+            FROM donations
+            WHERE park_id = %s
+            ORDER BY created_at DESC
+        """, (officer.park_id,))
+        donations = cursor.fetchall()
+        
+        for donation in donations:
+            donation['created_at'] = donation['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            donation['amount'] = float(donation['amount'])
+            
+        return jsonify(donations), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve donations"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+@bp.route('/api/finance/services', methods=['GET'])
+@token_required
+def get_all_services(current_user_id):
+    """Retrieve all service applications"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                id, first_name, last_name, email, phone,
+                company_type, provided_service, company_name,
+                tax_id, created_at,
+                status IS NULL as 'pending',
+                status
+            FROM services
+            ORDER BY created_at DESC
+        """)
+        services = cursor.fetchall()
+        
+        for service in services:
+            service['created_at'] = service['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+        return jsonify(services), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve services"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/finance/services/<int:service_id>/status', methods=['PUT'])
+@token_required
+def update_service_status(current_user_id, service_id):
+    """Approve or deny service application"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        status = data.get('status')  # 'approved' or 'denied'
+        
+        if status not in ['approved', 'denied']:
+            return jsonify({"error": "Invalid status"}), 400
+            
+        cursor = connection.cursor()
+        cursor.execute("""
+            ALTER TABLE services ADD COLUMN IF NOT EXISTS status ENUM('approved', 'denied') DEFAULT NULL
+        """)
+        cursor.execute("""
+            UPDATE services 
+            SET status = %s
+            WHERE id = %s
+        """, (status, service_id))
+        enqueue(cursor, 'service.status', None, 'services', service_id, status=status, reviewed_by=current_user_id)
+        connection.commit()
+        
+        return jsonify({"message": f"Service {status} successfully"}), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update service status: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+@bp.route('/api/finance/fund-requests/<id>/status', methods=['PUT'])
+@token_required
+def update_fund_request_status(current_user_id, id):
+    """Update the status of a fund request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+        if not officer or not officer.park_name:
+            return jsonify({"error": "Finance officer or park not found"}), 404
+        
+        park_name = officer.park_name
+        
+        cursor.execute("""
+            SELECT id FROM fund_requests 
+            WHERE id = %s AND parkname = %s
+        """, (id, park_name))
+        fund_request = cursor.fetchone()
+        if not fund_request:
+            return jsonify({"error": "Fund request not found or not associated with your park"}), 404
+        
+        data = request.json
+        status = data.get('status')
+        if status not in ['approved', 'rejected']:
+            return jsonify({"error": "Invalid status. Must be 'approved' or 'rejected'"}), 400
+        
+        cursor.execute("""
+            UPDATE fund_requests 
+            SET status = %s 
+            WHERE id = %s
+        """, (status, id))
+        enqueue(cursor, 'fund_request.status', park_name, 'fund_requests', int(id),
+                status=status, reviewed_by=current_user_id)
+        connection.commit()
+        
+        return jsonify({"message": f"Fund request {status} successfully"}), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update fund request status: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+@bp.route('/api/finance/budgets', methods=['GET'])
+@token_required
+def get_budgets(current_user_id):
+    """Retrieve all budgets for finance officer with item types."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+                b.description, b.status, b.created_at, b.created_by,
+                b.approved_by, b.approved_at, b.version,
+                fo.first_name as created_by_name,
+                go.first_name as approved_by_name
+            FROM budgets b
+            LEFT JOIN finance_officers fo ON b.created_by = fo.id
+            LEFT JOIN government_officers go ON b.approved_by = go.id
+            WHERE b.created_by = %s
+            ORDER BY b.created_at DESC
+        """, (current_user_id,))
+        budgets = cursor.fetchall()
+        
+        for budget in budgets:
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            # Fetch budget items with type
+            cursor.execute("""
+                SELECT id, category, description, amount, type
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            for item in items:
+                item['amount'] = float(item['amount'])
+            budget['items'] = items
+            
+        return jsonify(budgets), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+@bp.route('/api/finance/budgets', methods=['POST'])
+@token_required
+def create_budget(current_user_id):
+    """Create a new budget with items, specifying expense or income."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'fiscal_year', 'total_amount', 'park_name', 'items']
+        
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        # Validate items
+        for item in data['items']:
+            if 'type' not in item or item['type'] not in ['expense', 'income']:
+                return jsonify({"error": "Each item must specify type as 'expense' or 'income'"}), 400
+            if not all(key in item for key in ['category', 'description', 'amount', 'type']):
+                return jsonify({"error": "Invalid budget item format"}), 400
+            if not isinstance(item['amount'], (int, float)) or item['amount'] <= 0:
+                return jsonify({"error": "Item amount must be positive"}), 400
+
+        cursor = connection.cursor()
+        # Insert budget
+        cursor.execute("""
+            INSERT INTO budgets (
+                title, fiscal_year, total_amount, park_name,
+                description, status, created_by
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data['title'],
+            data['fiscal_year'],
+            float(data['total_amount']),
+            data['park_name'],
+            data.get('description', ''),
+            data.get('status', 'draft'),
+            current_user_id
+        ))
+        
+        budget_id = cursor.lastrowid
+        
+        # Insert budget items with type
+        for item in data['items']:
+            cursor.execute("""
+                INSERT INTO budget_items (
+                    budget_id, category, description, amount, type
+                ) VALUES (%s, %s, %s, %s, %s)
+            """, (
+                budget_id,
+                item['category'],
+                item['description'],
+                float(item['amount']),
+                item['type']
+            ))
+
+        enqueue(cursor, 'budget.created', data['park_name'], 'budgets', budget_id,
+                status=data.get('status', 'draft'), fiscal_year=data['fiscal_year'],
+                total_amount=float(data['total_amount']), created_by=current_user_id)
+        connection.commit()
+        
+        return jsonify({
+            "message": "Budget created successfully",
+            "id": budget_id
+        }), 201
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        connection.rollback()
+        return jsonify({"error": f"Failed to create budget: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+@bp.route('/api/finance/budgets/approved', methods=['GET'])
+@token_required
+def get_approved_budgets(current_user_id):
+    """Retrieve the total sum of approved budgets for finance officer"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT SUM(total_amount) AS total_approved_amount
+            FROM budgets
+            WHERE status = 'approved' AND created_by = %s
+        """, (current_user_id,))
+        result = cursor.fetchone()
+        total_approved_amount = float(result['total_approved_amount'] or 0)
+        return jsonify({"total_approved_amount": total_approved_amount}), 200
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve approved budgets total"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()  
+
+
+
+@bp.route('/api/finance/budgets/pending', methods=['GET'])
+@token_required
+def get_pending_budgets(current_user_id):
+    """Retrieve pending (submitted) budgets for the finance officer's park."""
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        # Get the finance officer's park name
+        officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+        if not officer or not officer.park_name:
+            return jsonify({"error": "Finance officer or park not found"}), 404
+        
+        park_name = officer.park_name
+        
+        # Retrieve pending budgets filtered by park_name
+        cursor.execute("""
+            SELECT 
+                id, title, fiscal_year AS fiscalYear, total_amount AS totalAmount,
+                park_name AS parkName, status, created_at AS createdAt,
+                created_by, description, version
+            FROM budgets
+            WHERE park_name = %s AND status = 'submitted'
+            ORDER BY created_at DESC
+        """, (park_name,))
+        budgets = cursor.fetchall()
+        
+        for budget in budgets:
+            # Fetch budget items with type
+            cursor.execute("""
+                SELECT id, category, description, amount, type
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            for item in items:
+                item['amount'] = float(item['amount'])
+                item['id'] = str(item['id'])
+                # Ensure type is included (expense/income)
+                item['type'] = item['type'] if item['type'] in ['expense', 'income'] else 'expense'
+            budget['items'] = items
+            budget['id'] = str(budget['id'])
+            budget['totalAmount'] = float(budget['totalAmount'])
+            budget['createdAt'] = budget['createdAt'].isoformat()
+            # Include creator details
+            cursor.execute("""
+                SELECT CONCAT(first_name, ' ', last_name) AS created_by_name
+                FROM finance_officers
+                WHERE id = %s
+            """, (budget['created_by'],))
+            creator = cursor.fetchone()
+            budget['createdByName'] = creator['created_by_name'] if creator else 'Unknown'
+        
+        return jsonify(budgets), 200
+    
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve pending budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+
+
+@bp.route('/api/finance/budgets/newlyapproved', methods=['GET'])
+@token_required
+def get_approved_newlybudgets(current_user_id):
+    """Retrieve approved budgets for finance officer"""
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                id, title, fiscal_year AS fiscalYear, total_amount AS totalAmount,
+                park_name AS parkName, status, created_at AS createdAt
+            FROM budgets
+            WHERE created_by = %s AND status = 'approved'
+            ORDER BY created_at DESC
+        """, (current_user_id,))
+        budgets = cursor.fetchall()
+        
+        for budget in budgets:
+            cursor.execute("""
+                SELECT id, category, description, amount
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            for item in items:
+                item['amount'] = float(item['amount'])
+                item['id'] = str(item['id'])
+            budget['items'] = items
+            budget['id'] = str(budget['id'])
+            budget['totalAmount'] = float(budget['totalAmount'])
+            budget['createdAt'] = budget['createdAt'].isoformat()
+        
+        return jsonify(budgets), 200
+    
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve approved budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+
+
+
+@bp.route('/api/finance/budgets/rejected', methods=['GET'])
+@token_required
+def get_rejected_budgets(current_user_id):
+    """Retrieve rejected budgets"""
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                id, title, fiscal_year AS fiscalYear, total_amount AS totalAmount,
+                park_name AS parkName, status, created_at AS createdAt
+            FROM budgets
+            WHERE created_by = %s AND status = 'rejected'
+            ORDER BY created_at DESC
+        """, (current_user_id,))
+        budgets = cursor.fetchall()
+        
+        for budget in budgets:
+            cursor.execute("""
+                SELECT id, category, description, amount
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            for item in items:
+                item['amount'] = float(item['amount'])
+                item['id'] = str(item['id'])
+            budget['items'] = items
+            budget['id'] = str(budget['id'])
+            budget['totalAmount'] = float(budget['totalAmount'])
+            budget['createdAt'] = budget['createdAt'].isoformat()
+        
+        return jsonify(budgets), 200
+    
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve rejected budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+@bp.route('/api/finance/emergency-requests', methods=['POST'])
+@token_required
+def create_emergency_request(current_user_id):
+    """Create a new emergency fund request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'description', 'amount', 'parkName', 'emergencyType', 'justification', 'timeframe']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Validate amount
+        try:
+            amount = float(data['amount'])
+            if amount <= 0:
+                return jsonify({"error": "Amount must be positive"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid amount"}), 400
+
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO emergency_requests (
+                title, description, amount, park_name, emergency_type,
+                justification, timeframe, status, created_by
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data['title'],
+            data['description'],
+            amount,
+            data['parkName'],
+            data['emergencyType'],
+            data['justification'],
+            data['timeframe'],
+            'pending',
+            current_user_id
+        ))
+        new_request_id = cursor.lastrowid
+        enqueue(cursor, 'emergency_request.created', data['parkName'], 'emergency_requests', new_request_id,
+                amount=amount, created_by=current_user_id)
+        connection.commit()
+        
+        return jsonify({
+            "message": "Emergency fund request created successfully",
+            "id": new_request_id
+        }), 201
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to create emergency request: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+@bp.route('/api/finance/emergency-requests', methods=['GET'])
+@token_required
+def get_emergency_requests(current_user_id):
+    """Retrieve all emergency fund requests for the finance officer, filtered by their park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        # Get the finance officer's park
+        officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+        if not officer or not officer.park_id:
+            return jsonify({"error": "Finance officer or park not found"}), 404
+        
+        # Retrieve emergency requests for the officer's park
+        cursor.execute("""
+            SELECT 
+                id, title, description, amount, park_name as parkName,
+                emergency_type as emergencyType, justification, timeframe,
+                status, created_at
+            FROM emergency_requests
+            WHERE created_by = %s AND park_id = %s
+            ORDER BY created_at DESC
+        """, (current_user_id, officer.park_id))
+        requests = cursor.fetchall()
+        
+        # Format dates for frontend
+        for req in requests:
+            req['amount'] = float(req['amount'])  # Convert Decimal to float
+            req['submittedDate'] = req['created_at'].strftime('%Y-%m-%d') if req['created_at'] else None
+            req['id'] = str(req['id'])  # Match frontend expectation
+            del req['created_at']
+        
+        return jsonify(requests), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve emergency requests"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+@bp.route('/api/finance/extra-funds', methods=['POST'])
+@token_required
+def create_extra_funds_request(current_user_id):
+    """Create a new extra funds request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'description', 'amount', 'parkName', 'category', 'justification', 'expectedDuration']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Validate amount
+        try:
+            amount = float(data['amount'])
+            if amount <= 0:
+                return jsonify({"error": "Amount must be positive"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid amount"}), 400
+
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO extra_funds_requests (
+                title, description, amount, park_name, category,
+                justification, expected_duration, status, created_by
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data['title'],
+            data['description'],
+            amount,
+            data['parkName'],
+            data['category'],
+            data['justification'],
+            data['expectedDuration'],
+            'pending',
+            current_user_id
+        ))
+        new_request_id = cursor.lastrowid
+        enqueue(cursor, 'extra_funds_request.created', data['parkName'], 'extra_funds_requests', new_request_id,
+                amount=amount, created_by=current_user_id)
+        connection.commit()
+        
+        return jsonify({
+            "message": "Extra funds request created successfully",
+            "id": new_request_id
+        }), 201
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to create extra funds request: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+@bp.route('/api/finance/extra-funds', methods=['GET'])
+@token_required
+def get_extra_funds_requests(current_user_id):
+    """Retrieve all extra funds requests for the finance officer, filtered by their park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        # Get the finance officer's park
+        officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+        if not officer or not officer.park_id:
+            return jsonify({"error": "Finance officer or park not found"}), 404
+        
+        # Retrieve extra funds requests for the officer's park
+        cursor.execute("""
+            SELECT 
+                id, title, description, amount, park_name as parkName,
+                category, justification, expected_duration as expectedDuration,
+                status, created_at, created_by as submittedById
+            FROM extra_funds_requests
+            WHERE created_by = %s AND park_id = %s
+            ORDER BY created_at DESC
+        """, (current_user_id, officer.park_id))
+        requests = cursor.fetchall()
+        
+        # Get finance officer details for submittedBy
+        cursor.execute("""
+            SELECT id, CONCAT(first_name, ' ', last_name) as name
+            FROM finance_officers
+            WHERE id = %s
+        """, (current_user_id,))
+        officer = cursor.fetchone()
+        officer_name = officer['name'] if officer else 'Unknown'
+        
+        # Format data for frontend
+        for req in requests:
+            req['amount'] = float(req['amount'])  # Convert Decimal to float
+            req['dateSubmitted'] = req['created_at'].strftime('%Y-%m-%d') if req['created_at'] else None
+            req_id = int(req['id'])  # Convert to int explicitly
+            req['id'] = f"ef-{req_id:03d}"  # Format as ef-001
+            req['parkId'] = f"park-{req_id:03d}"  # Format as park-001
+            req['submittedBy'] = officer_name
+            req['park'] = req['parkName']  # Add park field for frontend
+            del req['created_at']
+        
+        return jsonify(requests), 200
+
+    except ValueError as ve:
+        print(f"ValueError: {ve}")
+        return jsonify({"error": "Invalid data format in database"}), 500
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve extra funds requests"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+@bp.route('/api/finance/all-approved-data', methods=['GET'])
+@token_required
+def get_all_approved_data(current_user_id):
+    """Retrieve all booked tours, donations, approved fund requests, approved extra funds requests, approved emergency requests, and approved budgets."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        
+        # 1. Booked Tours
+        cursor.execute("""
+            SELECT 
+                id, park_name, tour_name, date, time, guests, amount,
+                first_name, last_name, email, phone, special_requests,
+                created_at
+            FROM tours
+            ORDER BY created_at DESC
+        """)
+        tours = cursor.fetchall()
+        for tour in tours:
+            tour['created_at'] = tour['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            tour['date'] = tour['date'].strftime('%Y-%m-%d')
+            tour['time'] = str(tour['time'])
+            tour['amount'] = float(tour['amount'])
+        
+        # 2. Donations
+        cursor.execute("""
+            SELECT 
+                id, donation_type, amount, park_name,
+                first_name, last_name, email, message,
+                is_anonymous, created_at
+            FROM donations
+            ORDER BY created_at DESC
+        """)
+        donations = cursor.fetchall()
+        for donation in donations:
+            donation['created_at'] = donation['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            donation['amount'] = float(donation['amount'])
+        
+        # 3. Approved Fund Requests
+        cursor.execute("""
+            SELECT 
+                fr.id, fr.title, fr.description, fr.amount,
+                fr.category, fr.parkname, fr.urgency, fr.status,
+                fr.created_at, fr.created_by,
+                ps.first_name, ps.last_name, ps.email AS staff_email,
+                ps.park_name AS staff_park
+            FROM fund_requests fr
+            JOIN parkstaff ps ON fr.created_by = ps.id
+            WHERE fr.status = 'approved'
+            ORDER BY fr.created_at DESC
+        """)
+        fund_requests = cursor.fetchall()
+        for req in fund_requests:
+            req['created_at'] = req['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            req['amount'] = float(req['amount'])
+        
+        # 4. Approved Extra Funds Requests
+        cursor.execute("""
+            SELECT 
+                efr.id, efr.title, efr.description, efr.amount,
+                efr.park_name AS parkName, efr.category,
+                efr.justification, efr.expected_duration,
+                efr.status, efr.created_at, efr.created_by,
+                fo.first_name, fo.last_name, fo.email AS finance_email
+            FROM extra_funds_requests efr
+            JOIN finance_officers fo ON efr.created_by = fo.id
+            WHERE efr.status = 'approved'
+            ORDER BY efr.created_at DESC
+        """)
+        extra_funds_requests = cursor.fetchall()
+        for req in extra_funds_requests:
+            req['created_at'] = req['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            req['amount'] = float(req['amount'])
+        
+        # 5. Approved Emergency Requests
+        cursor.execute("""
+            SELECT 
+                er.id, er.title, er.description, er.amount,
+                er.park_name AS parkName, er.emergency_type,
+                er.justification, er.timeframe, er.status,
+                er.created_at, er.created_by,
+                fo.first_name, fo.last_name, fo.email AS finance_email
+            FROM emergency_requests er
+            JOIN finance_officers fo ON er.created_by = fo.id
+            WHERE er.status = 'approved'
+            ORDER BY er.created_at DESC
+        """)
+        emergency_requests = cursor.fetchall()
+        for req in emergency_requests:
+            req['created_at'] = req['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            req['amount'] = float(req['amount'])
+        
+        # 6. Approved Budgets
+        cursor.execute("""
+            SELECT 
+                b.id, b.title, b.fiscal_year, b.total_amount,
+                b.park_name, b.description, b.status,
+                b.created_at, b.created_by, b.approved_by,
+                b.approved_at,
+                fo.first_name AS created_by_name,
+                go.first_name AS approved_by_name
+            FROM budgets b
+            LEFT JOIN finance_officers fo ON b.created_by = fo.id
+            LEFT JOIN government_officers go ON b.approved_by = go.id
+            WHERE b.status = 'approved'
+            ORDER BY b.created_at DESC
+        """)
+        budgets = cursor.fetchall()
+        for budget in budgets:
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            budget['total_amount'] = float(budget['total_amount'])
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            # Fetch budget items
+            cursor.execute("""
+                SELECT id, category, description, amount
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            for item in items:
+                item['amount'] = float(item['amount'])
+            budget['items'] = items
+        
+        return jsonify({
+            "tours": tours,
+            "donations": donations,
+            "fund_requests": fund_requests,
+            "extra_funds_requests": extra_funds_requests,
+            "emergency_requests": emergency_requests,
+            "budgets": budgets
+        }), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to retrieve data: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+@bp.route('/api/finance/extra-funds/<int:request_id>', methods=['PUT'])
+@token_required
+def update_extra_funds_request(current_user_id, request_id):
+    """Update an existing extra funds request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'description', 'amount', 'parkName', 'category', 'justification', 'expectedDuration']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Validate amount
+        try:
+            amount = float(data['amount'])
+            if amount <= 0:
+                return jsonify({"error": "Amount must be positive"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid amount"}), 400
+
+        cursor = connection.cursor(dictionary=True)
+        
+        # Verify the request exists and belongs to the user
+        cursor.execute("""
+            SELECT id FROM extra_funds_requests 
+            WHERE id = %s AND created_by = %s
+        """, (request_id, current_user_id))
+        
+        if not cursor.fetchone():
+            return jsonify({"error": "Extra funds request not found or unauthorized"}), 404
+
+        # Update the request
+        cursor.execute("""
+            UPDATE extra_funds_requests SET
+                title = %s,
+                description = %s,
+                amount = %s,
+                park_name = %s,
+                category = %s,
+                justification = %s,
+                expected_duration = %s
+            WHERE id = %s AND created_by = %s
+        """, (
+            data['title'],
+            data['description'],
+            amount,
+            data['parkName'],
+            data['category'],
+            data['justification'],
+            data['expectedDuration'],
+            request_id,
+            current_user_id
+        ))
+        enqueue(cursor, 'extra_funds_request.updated', data['parkName'], 'extra_funds_requests', request_id, amount=amount)
+        
+        connection.commit()
+        
+        # Fetch the updated request
+        cursor.execute("""
+            SELECT 
+                id, title, description, amount, park_name as parkName,
+                category, justification, expected_duration as expectedDuration,
+                status, created_at, created_by as submittedById
+            FROM extra_funds_requests
+            WHERE id = %s
+        """, (request_id,))
+        
+        updated_request = cursor.fetchone()
+        if updated_request:
+            # Format the response data
+            formatted_request = {
+                'id': f"ef-{updated_request['id']:03d}",
+                'title': updated_request['title'],
+                'description': updated_request['description'],
+                'amount': float(updated_request['amount']),
+                'parkName': updated_request['parkName'],
+                'category': updated_request['category'],
+                'justification': updated_request['justification'],
+                'expectedDuration': updated_request['expectedDuration'],
+                'status': updated_request['status'],
+                'dateSubmitted': updated_request['created_at'].strftime('%Y-%m-%d'),
+                'submittedById': updated_request['submittedById']
+            }
+            
+            return jsonify({
+                "message": "Extra funds request updated successfully",
+                "request": formatted_request
+            }), 200
+        else:
+            return jsonify({"error": "Failed to retrieve updated request"}), 500
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        connection.rollback()
+        return jsonify({"error": f"Failed to update extra funds request: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/finance/emergency-requests/<int:request_id>', methods=['PUT'])
+@token_required
+def update_emergency_request(current_user_id, request_id):
+    """Update an existing emergency request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'description', 'amount', 'parkName', 'emergencyType', 'justification', 'timeframe']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Validate amount
+        try:
+            amount = float(data['amount'])
+            if amount <= 0:
+                return jsonify({"error": "Amount must be positive"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid amount"}), 400
+
+        cursor = connection.cursor(dictionary=True)
+        
+        # Verify the request exists and belongs to the user
+        cursor.execute("""
+            SELECT id FROM emergency_requests 
+            WHERE id = %s AND created_by = %s
+        """, (request_id, current_user_id))
+        
+        if not cursor.fetchone():
+            return jsonify({"error": "Emergency request not found or unauthorized"}), 404
+
+        # Update the request
+        cursor.execute("""
+            UPDATE emergency_requests SET
+                title = %s,
+                description = %s,
+                amount = %s,
+                park_name = %s,
+                emergency_type = %s,
+                justification = %s,
+                timeframe = %s
+            WHERE id = %s AND created_by = %s
+        """, (
+            data['title'],
+            data['description'],
+            amount,
+            data['parkName'],
+            data['emergencyType'],
+            data['justification'],
+            data['timeframe'],
+            request_id,
+            current_user_id
+        ))
+        enqueue(cursor, 'emergency_request.updated', data['parkName'], 'emergency_requests', request_id, amount=amount)
+        
+        connection.commit()
+        
+        # Fetch the updated request
+        cursor.execute("""
+            SELECT 
+                id, title, description, amount, park_name as parkName,
+                emergency_type as emergencyType, justification, timeframe,
+                status, created_at
+            FROM emergency_requests
+            WHERE id = %s
+        """, (request_id,))
+        
+        updated_request = cursor.fetchone()
+        if updated_request:
+            # Format the response data
+            formatted_request = {
+                'id': str(updated_request['id']),
+                'title': updated_request['title'],
+                'description': updated_request['description'],
+                'amount': float(updated_request['amount']),
+                'parkName': updated_request['parkName'],
+                'emergencyType': updated_request['emergencyType'],
+                'justification': updated_request['justification'],
+                'timeframe': updated_request['timeframe'],
+                'status': updated_request['status'],
+                'submittedDate': updated_request['created_at'].strftime('%Y-%m-%d')
+            }
+            
+            return jsonify({
+                "message": "Emergency request updated successfully",
+                "request": formatted_request
+            }), 200
+        else:
+            return jsonify({"error": "Failed to retrieve updated request"}), 500
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        connection.rollback()
+        return jsonify({"error": f"Failed to update emergency request: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+@bp.route('/api/finance/profile', methods=['PUT'])
+@token_required
+def update_finance_profile(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email']
+        
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        cursor = connection.cursor()
+        cursor.execute('''
+            UPDATE finance_officers SET
+                first_name = %s,
+                last_name = %s,
+                email = %s
+            WHERE id = %s
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            current_user_id
+        ))
+        connection.commit()
+
+        return jsonify({"message": "Profile updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Profile update error: {e}")
+        return jsonify({"error": "Failed to update profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/finance/avatar', methods=['POST'])
+@token_required
+def update_finance_avatar(current_user_id):
+    return update_avatar('finance_officers', current_user_id)
+
+@bp.route('/api/finance/password', methods=['PUT'])
+@token_required
+def update_finance_password(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        data = request.json
+        current_password = data.get('currentPassword')
+        new_password = data.get('newPassword')
+        confirm_password = data.get('confirmPassword')
+
+        if not all([current_password, new_password, confirm_password]):
+            return jsonify({"error": "All password fields are required"}), 400
+
+        if new_password != confirm_password:
+            return jsonify({"error": "New passwords don't match"}), 400
+
+        password_hash = repository.get_password_hash(connection, 'finance_officers', current_user_id)
+
+        if hashlib.sha256(current_password.encode()).hexdigest() != password_hash:
+            return jsonify({"error": "Current password is incorrect"}), 401
+
+        new_password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+        repository.set_password_hash(connection, 'finance_officers', current_user_id, new_password_hash)
+        connection.commit()
+
+        return jsonify({"message": "Password updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Password update error: {e}")
+        return jsonify({"error": "Failed to update password"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+@bp.route('/api/finance/account', methods=['DELETE'])
+@token_required
+def delete_finance_account(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM finance_officers WHERE id = %s", (current_user_id,))
+        connection.commit()
+        return jsonify({"message": "Account deleted successfully"}), 200
+    except Exception as e:
+        print(f"Account deletion error: {e}")
+        return jsonify({"error": "Failed to delete account"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/finance/profile', methods=['GET'])
+@token_required
+def get_finance_profile(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, first_name, lastName, email, avatar_url, park_name
+            FROM finance_officers
+            WHERE id = %s
+        """, (current_user_id,))
+        
+        officer = cursor.fetchone()
+        if not officer:
+            return jsonify({"error": "Finance officer not found"}), 404
+            
+        return jsonify({
+            "id": str(officer['id']),
+            "firstName": officer['first_name'],
+            "lastName": officer['last_name'],
+            "email": officer['email'],
+            "avatarUrl": officer['avatar_url'],
+            "park": officer['park_name'],
+            "role": "finance"
+        }), 200
+        
+    except Exception as e:
+        print(f"Profile retrieval error: {e}")
+        return jsonify({"error": "Failed to retrieve profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
@@ -0,0 +1,1397 @@
+"""Government officer endpoints: /api/government/*."""
+from datetime import date
+import hashlib
+
+from flask import Blueprint, jsonify, request
+import mysql.connector
+
+from core import get_db_connection, token_required, update_avatar
+from analytics import analytics_cache
+from outbox import enqueue
+from parks import parks
+import repository
+
+
+bp = Blueprint('government', __name__)
+
+
+def _if_match_version():
+    """The budget version the client last read, from If-Match; None when not sent."""
+    header = (request.headers.get('If-Match') or '').strip()
+    if not header or header == '*':
+        return None
+    return int(header.removeprefix('W/').strip('"'))
+
+
+def _version_conflict(version):
+    response = jsonify({
+        "error": "Budget was changed by someone else; reload it and retry",
+        "currentVersion": version
+    })
+    response.headers['ETag'] = f'"{version}"'
+    return response, 409
+
+
+@bp.route('/api/government/emergency-requests', methods=['GET'])
+@token_required
+def get_all_emergency_requests(current_user_id):
+    """Retrieve all emergency fund requests for government officers."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                er.id, er.title, er.description, er.amount, er.park_name AS parkName,
+                er.emergency_type AS emergencyType, er.justification, er.timeframe,
+                er.status, er.created_at, er.created_by,
+                fo.first_name, fo.last_name, fo.email AS finance_email
+            FROM emergency_requests er
+            JOIN finance_officers fo ON er.created_by = fo.id
+            ORDER BY er.created_at DESC
+        """)
+        requests = cursor.fetchall()
+        
+        for req in requests:
+            req['amount'] = float(req['amount'])  # Convert Decimal to float
+            req['submittedDate'] = req['created_at'].strftime('%Y-%m-%d') if req['created_at'] else None
+            req['id'] = str(req['id'])
+            req['requestedBy'] = f"{req['first_name']} {req['last_name']}"
+            del req['created_at']
+            del req['first_name']
+            del req['last_name']
+            del req['finance_email']
+        
+        return jsonify(requests), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve emergency requests"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/extra-funds', methods=['GET'])
+@token_required
+def get_all_extra_funds_requests(current_user_id):
+    """Retrieve all extra funds requests for government officers."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                efr.id, efr.title, efr.description, efr.amount, efr.park_name AS parkName,
+                efr.category, efr.justification, efr.expected_duration AS expectedDuration,
+                efr.status, efr.created_at, efr.created_by,
+                fo.first_name, fo.last_name, fo.email AS finance_email
+            FROM extra_funds_requests efr
+            JOIN finance_officers fo ON efr.created_by = fo.id
+            ORDER BY efr.created_at DESC
+        """)
+        requests = cursor.fetchall()
+        
+        for req in requests:
+            req['amount'] = float(req['amount'])
+            req['dateSubmitted'] = req['created_at'].strftime('%Y-%m-%d') if req['created_at'] else None
+            req['id'] = str(req['id'])
+            req['requestedBy'] = f"{req['first_name']} {req['last_name']}"
+            del req['created_at']
+            del req['first_name']
+            del req['last_name']
+            del req['finance_email']
+        
+        return jsonify(requests), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve extra funds requests"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/emergency-requests/<int:request_id>/status', methods=['PUT'])
+@token_required
+def update_emergency_request_status(current_user_id, request_id):
+    """Approve or reject an emergency fund request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        status = data.get('status')
+        reason = data.get('reason')
+        
+        if status not in ['approved', 'rejected']:
+            return jsonify({"error": "Invalid status"}), 400
+        if not reason or len(reason) < 10:
+            return jsonify({"error": "Reason must be at least 10 characters"}), 400
+            
+        cursor = connection.cursor()
+        cursor.execute("""
+            UPDATE emergency_requests 
+            SET status = %s, reviewed_by = %s, reviewed_date = CURRENT_TIMESTAMP, reason = %s
+            WHERE id = %s
+        """, (status, current_user_id, reason, request_id))
+        
+        if cursor.rowcount == 0:
+            return jsonify({"error": "Request not found"}), 404
+        cursor.execute("SELECT park_name FROM emergency_requests WHERE id = %s", (request_id,))
+        park_name = cursor.fetchone()[0]
+        enqueue(cursor, 'emergency_request.status', park_name, 'emergency_requests', request_id,
+                status=status, reviewed_by=current_user_id, reason=reason)
+            
+        connection.commit()
+        
+        return jsonify({"message": f"Emergency request {status} successfully"}), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update emergency request status: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+@bp.route('/api/government/extra-funds/<int:request_id>/status', methods=['PUT'])
+@token_required
+def update_extra_funds_request_status(current_user_id, request_id):
+    """Approve or reject an extra funds request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        status = data.get('status')
+        reason = data.get('reason')
+        
+        if status not in ['approved', 'rejected']:
+            return jsonify({"error": "Invalid status"}), 400
+        if not reason or len(reason) < 10:
+            return jsonify({"error": "Reason must be at least 10 characters"}), 400
+            
+        cursor = connection.cursor()
+        cursor.execute("""
+            UPDATE extra_funds_requests 
+            SET status = %s, reviewed_by = %s, reviewed_date = CURRENT_TIMESTAMP, reason = %s
+            WHERE id = %s
+        """, (status, current_user_id, reason, request_id))
+        
+        if cursor.rowcount == 0:
+            return jsonify({"error": "Request not found"}), 404
+        cursor.execute("SELECT park_name FROM extra_funds_requests WHERE id = %s", (request_id,))
+        park_name = cursor.fetchone()[0]
+        enqueue(cursor, 'extra_funds_request.status', park_name, 'extra_funds_requests', request_id,
+                status=status, reviewed_by=current_user_id, reason=reason)
+            
+        connection.commit()
+        
+        return jsonify({"message": f"Extra funds request {status} successfully"}), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update extra funds request status: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+@bp.route('/api/government/budgets', methods=['GET'])
+@token_required
+def get_government_all_budgets(current_user_id):  # Renamed from get_all_budgets
+    """Get all budgets with detailed financial data."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+                b.description, b.status, b.created_at, b.created_by,
+                b.approved_by, b.approved_at, b.reason, b.version,
+                fo.first_name as created_by_name,
+                fo.last_name as created_by_lastname,
+                go.first_name as approved_by_name,
+                go.last_name as approved_by_lastname
+            FROM budgets b
+            LEFT JOIN finance_officers fo ON b.created_by = fo.id
+            LEFT JOIN government_officers go ON b.approved_by = go.id
+            WHERE b.status = 'submitted'
+            ORDER BY b.created_at DESC
+        """)
+        budgets = cursor.fetchall()
+        
+        # Format and enhance budget data
+        for budget in budgets:
+            # Get budget items
+            cursor.execute("""
+                SELECT id, category, description, amount, type
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            
+            # Format items
+            for item in items:
+                item['amount'] = float(item['amount'])
+                item['id'] = str(item['id'])
+            
+            budget['items'] = items
+            budget['id'] = str(budget['id'])
+            budget['total_amount'] = float(budget['total_amount'])
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+            # Add creator and approver full names
+            budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+            budget['approved_by_full_name'] = (f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+                                             if budget['approved_by_name'] else None)
+            
+            # Clean up response
+            del budget['created_by_name']
+            del budget['created_by_lastname']
+            del budget['approved_by_name']
+            del budget['approved_by_lastname']
+            
+        return jsonify(budgets), 200
+        
+    except Exception as e:
+        print(f"Error fetching budgets: {e}")
+        return jsonify({"error": "Failed to fetch budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/budgets/approved', methods=['GET'])
+@token_required
+def get_government_approved_budgets_v2(current_user_id):  # Renamed from get_government_approved_budgets
+    """Get all approved budgets with detailed financial data."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+                b.description, b.status, b.created_at, b.approved_at,
+                b.reason, b.created_by, b.approved_by,
+                fo.first_name as created_by_name,
+                fo.last_name as created_by_lastname,
+                go.first_name as approved_by_name,
+                go.last_name as approved_by_lastname
+            FROM budgets b
+            LEFT JOIN finance_officers fo ON b.created_by = fo.id
+            LEFT JOIN government_officers go ON b.approved_by = go.id
+            WHERE b.status = 'approved'
+            ORDER BY b.approved_at DESC
+        """)
+        budgets = cursor.fetchall()
+        
+        # Format and enhance budget data
+        for budget in budgets:
+            # Get budget items
+            cursor.execute("""
+                SELECT id, category, description, amount, type
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            
+            # Format items
+            for item in items:
+                item['amount'] = float(item['amount'])
+                item['id'] = str(item['id'])
+            
+            budget['items'] = items
+            budget['id'] = str(budget['id'])
+            budget['total_amount'] = float(budget['total_amount'])
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+            # Add creator and approver full names
+            budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+            budget['approved_by_full_name'] = f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+            
+            # Clean up response
+            del budget['created_by_name']
+            del budget['created_by_lastname']
+            del budget['approved_by_name']
+            del budget['approved_by_lastname']
+            
+        return jsonify(budgets), 200
+        
+    except Exception as e:
+        print(f"Error fetching approved budgets: {e}")
+        return jsonify({"error": "Failed to fetch approved budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/budgets/rejected', methods=['GET'])
+@token_required
+def get_government_rejected_budgets_v2(current_user_id):  # Renamed from get_government_rejected_budgets
+    """Get all rejected budgets with detailed financial data."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+                b.description, b.status, b.created_at, b.approved_at,
+                b.reason, b.created_by, b.approved_by,
+                fo.first_name as created_by_name,
+                fo.last_name as created_by_lastname,
+                go.first_name as approved_by_name,
+                go.last_name as approved_by_lastname
+            FROM budgets b
+            LEFT JOIN finance_officers fo ON b.created_by = fo.id
+            LEFT JOIN government_officers go ON b.approved_by = go.id
+            WHERE b.status = 'rejected'
+            ORDER BY b.approved_at DESC
+        """)
+        budgets = cursor.fetchall()
+        
+        # Format and enhance budget data
+        for budget in budgets:
+            # Get budget items
+            cursor.execute("""
+                SELECT id, category, description, amount, type
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            
+            # Format items
+            for item in items:
+                item['amount'] = float(item['amount'])
+                item['id'] = str(item['id'])
+            
+            budget['items'] = items
+            budget['id'] = str(budget['id'])
+            budget['total_amount'] = float(budget['total_amount'])
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+            # Add creator and approver full names
+            budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+            budget['approved_by_full_name'] = f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+            
+            # Clean up response
+            del budget['created_by_name']
+            del budget['created_by_lastname']
+            del budget['approved_by_name']
+            del budget['approved_by_lastname']
+            
+        return jsonify(budgets), 200
+        
+    except Exception as e:
+        print(f"Error fetching rejected budgets: {e}")
+        return jsonify({"error": "Failed to fetch rejected budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+@bp.route('/api/government/budgets/<int:budget_id>', methods=['PUT'])
+@token_required
+def update_budget(current_user_id, budget_id):
+    """Update an existing budget and its items with expense/income type."""
+    try:
+        expected_version = _if_match_version()
+    except ValueError:
+        return jsonify({"error": "Invalid If-Match header"}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'fiscal_year', 'total_amount', 'park_name', 'items']
+        
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        # Validate items
+        for item in data['items']:
+            if 'type' not in item or item['type'] not in ['expense', 'income']:
+                return jsonify({"error": "Each item must specify type as 'expense' or 'income'"}), 400
+            if not all(key in item for key in ['category', 'description', 'amount', 'type']):
+                return jsonify({"error": "Invalid budget item format"}), 400
+            if not isinstance(item['amount'], (int, float)) or item['amount'] <= 0:
+                return jsonify({"error": "Item amount must be positive"}), 400
+            if not item['category'].strip() or not item['description'].strip():
+                return jsonify({"error": "Item category and description cannot be empty"}), 400
+
+        cursor = connection.cursor()
+        # Verify budget exists and is in submitted status
+        cursor.execute("SELECT id, version FROM budgets WHERE id = %s AND status = 'submitted'", (budget_id,))
+        budget = cursor.fetchone()
+        if not budget:
+            return jsonify({"error": "Budget not found or not in submitted status"}), 404
+        # Without If-Match, at least nothing may change between this read and the write
+        if expected_version is None:
+            expected_version = budget[1]
+
+        # The SELECT above opened the transaction (autocommit is off).
+        # Update budget only if nobody else has since; the row stays locked until commit
+        cursor.execute("""
+            UPDATE budgets 
+            SET title = %s, fiscal_year = %s, total_amount = %s, park_name = %s,
+                description = %s, version = version + 1
+            WHERE id = %s AND version = %s AND status = 'submitted'
+        """, (
+            data['title'],
+            data['fiscal_year'],
+            float(data['total_amount']),
+            data['park_name'],
+            data.get('description', ''),
+            budget_id,
+            expected_version
+        ))
+        if cursor.rowcount == 0:
+            connection.rollback()
+            cursor.execute("SELECT version, status FROM budgets WHERE id = %s", (budget_id,))
+            current = cursor.fetchone()
+            if not current or current[1] != 'submitted':
+                return jsonify({"error": "Budget not found or not in submitted status"}), 404
+            return _version_conflict(current[0])
+
+        # Delete existing items
+        cursor.execute("DELETE FROM budget_items WHERE budget_id = %s", (budget_id,))
+
+        # Insert updated items with type
+        for item in data['items']:
+            cursor.execute("""
+                INSERT INTO budget_items (
+                    budget_id, category, description, amount, type
+                ) VALUES (%s, %s, %s, %s, %s)
+            """, (
+                budget_id,
+                item['category'],
+                item['description'],
+                float(item['amount']),
+                item['type']
+            ))
+
+        enqueue(cursor, 'budget.updated', data['park_name'], 'budgets', budget_id,
+                fiscal_year=data['fiscal_year'], total_amount=float(data['total_amount']), updated_by=current_user_id,
+                version=expected_version + 1)
+        connection.commit()
+        print(f"Budget {budget_id} updated by user {current_user_id}")
+        response = jsonify({"message": "Budget updated successfully", "version": expected_version + 1})
+        response.headers['ETag'] = f'"{expected_version + 1}"'
+        return response, 200
+
+    except Exception as e:
+        connection.rollback()
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update budget: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+@bp.route('/api/government/budgets/<int:budget_id>/status', methods=['PUT'])
+@token_required
+def update_budget_status(current_user_id, budget_id):
+    """Approve or reject a budget"""
+    try:
+        expected_version = _if_match_version()
+    except ValueError:
+        return jsonify({"error": "Invalid If-Match header"}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        status = data.get('status')
+        reason = data.get('reason')
+        
+        if status not in ['approved', 'rejected']:
+            return jsonify({"error": "Invalid status, must be 'approved' or 'rejected'"}), 400
+        if not reason or len(reason.strip()) < 10:
+            return jsonify({"error": "Reason must be at least 10 characters long"}), 400
+            
+        cursor = connection.cursor()
+        cursor.execute("SELECT id, status, park_name, version FROM budgets WHERE id = %s", (budget_id,))
+        budget = cursor.fetchone()
+        
+        if not budget:
+            return jsonify({"error": "Budget not found"}), 404
+        if expected_version is not None and budget[3] != expected_version:
+            return _version_conflict(budget[3])
+        if budget[1] != 'submitted':
+            return jsonify({"error": "Budget is not in submitted status"}), 400
+        expected_version = budget[3]
+
+        # Compare-and-set: an edit or review committed since the read matches no row
+        cursor.execute("""
+            UPDATE budgets 
+            SET status = %s, approved_by = %s, approved_at = CURRENT_TIMESTAMP, reason = %s,
+                version = version + 1
+            WHERE id = %s AND version = %s AND status = 'submitted'
+        """, (status, current_user_id, reason, budget_id, expected_version))
+        if cursor.rowcount == 0:
+            connection.rollback()
+            cursor.execute("SELECT version FROM budgets WHERE id = %s", (budget_id,))
+            current = cursor.fetchone()
+            if not current:
+                return jsonify({"error": "Budget not found"}), 404
+            return _version_conflict(current[0])
+        enqueue(cursor, 'budget.status', budget[2], 'budgets', budget_id,
+                status=status, reviewed_by=current_user_id, reason=reason, version=expected_version + 1)
+        
+        connection.commit()
+        print(f"Budget {budget_id} {status} by user {current_user_id}")
+        response = jsonify({"message": f"Budget {status} successfully", "version": expected_version + 1})
+        response.headers['ETag'] = f'"{expected_version + 1}"'
+        return response, 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update budget status: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/stats', methods=['GET'])
+@token_required
+def get_government_dashboard_stats(current_user_id):
+    """Get statistics for government dashboard."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        
+        # Get total donations
+        cursor.execute("SELECT SUM(amount) as total_donations FROM donations")
+        total_donations = cursor.fetchone()['total_donations'] or 0
+        
+        # Get total tour bookings
+        cursor.execute("SELECT SUM(amount) as total_bookings FROM tours")
+        total_bookings = cursor.fetchone()['total_bookings']
+        
+        # Get total approved budgets
+        cursor.execute("SELECT SUM(total_amount) as total_approved FROM budgets WHERE status = 'approved'")
+        total_approved = cursor.fetchone()['total_approved'] or 0
+        
+        # Get total emergency requests
+        cursor.execute("SELECT COUNT(*) as total_emergency FROM emergency_requests")
+        total_emergency = cursor.fetchone()['total_emergency']
+
+        stats = [
+            {"title": "Total Revenue From Donations", "value": float(total_donations), "icon": "DollarSign", "trend": "up"},
+            {"title": "Total Revenue From  Tours", "value": total_bookings, "icon": "Calendar", "trend": "up"},
+            {"title": "Total Approved Budgets", "value": float(total_approved), "icon": "PiggyBank", "trend": "up"},
+            {"title": "Emergency Requests", "value": total_emergency, "icon": "AlertTriangle", "trend": "up"}
+        ]
+        
+        return jsonify({"stats": stats}), 200
+        
+    except Exception as e:
+        print(f"Error fetching government stats: {e}")
+        return jsonify({"error": "Failed to fetch statistics"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/tour-bookings', methods=['GET'])
+@token_required
+def get_government_tour_bookings(current_user_id):
+    """Get all tour bookings for government dashboard."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        analytics_cache.ensure_fresh(connection, 'tours')
+        bookings = [{
+            "month": date(group['year'], group['month'], 1).strftime('%b'),
+            "bookings": group['count'],
+            "revenue": group['amount']
+        } for group in analytics_cache.group_by('tours', ('month',), 'date')]
+            
+        return jsonify(bookings), 200
+        
+    except Exception as e:
+        print(f"Error fetching government tour bookings: {e}")
+        return jsonify({"error": "Failed to fetch tour bookings"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+@bp.route('/api/government/allbudgets', methods=['GET'])
+@token_required
+def get_all_government_budgets(current_user_id):
+    """Get all budgets regardless of status."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+                b.description, b.status, b.created_at, b.created_by,
+                b.approved_by, b.approved_at, b.reason,
+                fo.first_name as created_by_name,
+                go.first_name as approved_by_name
+            FROM budgets b
+            LEFT JOIN finance_officers fo ON b.created_by = fo.id
+            LEFT JOIN government_officers go ON b.approved_by = go.id
+            ORDER BY b.created_at DESC
+        """)
+        budgets = cursor.fetchall()
+        
+        for budget in budgets:
+            budget['total_amount'] = float(budget['total_amount'])
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+                
+            # Fetch budget items
+            cursor.execute("""
+                SELECT id, category, description, amount, type
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            for item in items:
+                item['amount'] = float(item['amount'])
+            budget['items'] = items
+            
+        return jsonify(budgets), 200
+        
+    except Exception as e:
+        print(f"Error fetching all government budgets: {e}")
+        return jsonify({"error": "Failed to fetch budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/budgets/allapproved', methods=['GET'])
+@token_required
+def get_all_approved_budgets(current_user_id):
+    """Get all approved budgets across all parks."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+                b.description, b.status, b.created_at, b.approved_at,
+                fo.first_name as created_by_name,
+                go.first_name as approved_by_name
+            FROM budgets b
+            LEFT JOIN finance_officers fo ON b.created_by = fo.id
+            LEFT JOIN government_officers go ON b.approved_by = go.id
+            WHERE b.status = 'approved'
+            ORDER BY b.approved_at DESC
+        """)
+        budgets = cursor.fetchall()
+        
+        for budget in budgets:
+            budget['total_amount'] = float(budget['total_amount'])
+            budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if budget['approved_at']:
+                budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+                
+            # Fetch budget items
+            cursor.execute("""
+                SELECT id, category, description, amount, type
+                FROM budget_items
+                WHERE budget_id = %s
+            """, (budget['id'],))
+            items = cursor.fetchall()
+            for item in items:
+                item['amount'] = float(item['amount'])
+            budget['items'] = items
+            
+        return jsonify(budgets), 200
+        
+    except Exception as e:
+        print(f"Error fetching all approved budgets: {e}")
+        return jsonify({"error": "Failed to fetch approved budgets"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/allemergency-requests', methods=['GET'])
+@token_required
+def get_all_emergency_requests_gov(current_user_id):
+    """Get all emergency requests across all parks."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                er.id, er.title, er.description, er.amount,
+                er.park_name as parkName, er.emergency_type as emergencyType,
+                er.justification, er.timeframe, er.status,
+                er.created_at, er.created_by, er.reviewed_by,
+                er.reviewed_date, er.reason,
+                fo.first_name as submitted_by_name,
+                go.first_name as reviewed_by_name
+            FROM emergency_requests er
+            LEFT JOIN finance_officers fo ON er.created_by = fo.id
+            LEFT JOIN government_officers go ON er.reviewed_by = go.id
+            ORDER BY er.created_at DESC
+        """)
+        requests = cursor.fetchall()
+        
+        for req in requests:
+            req['amount'] = float(req['amount'])
+            req['created_at'] = req['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if req['reviewed_date']:
+                req['reviewed_date'] = req['reviewed_date'].strftime('%Y-%m-%d %H:%M:%S')
+            req['id'] = str(req['id'])
+            
+        return jsonify(requests), 200
+        
+    except Exception as e:
+        print(f"Error fetching all emergency requests: {e}")
+        return jsonify({"error": "Failed to fetch emergency requests"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/services', methods=['GET'])
+@token_required
+def get_government_services(current_user_id):
+    """Get all service applications with detailed status information."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                id,
+                first_name,
+                last_name,
+                email,
+                phone,
+                company_type,
+                provided_service,
+                company_name,
+                tax_id,
+                status,
+                created_at
+            FROM services
+            ORDER BY created_at DESC
+        """)
+        services = cursor.fetchall()
+        
+        # Process services to get counts by status
+        status_counts = {
+            'pending': 0,
+            'approved': 0,
+            'rejected': 0
+        }
+        
+        for service in services:
+            service['created_at'] = service['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            status = service['status'] or 'pending'  # Default to pending if status is NULL
+            status_counts[status] = status_counts.get(status, 0) + 1
+        
+        # Format data for chart
+        chart_data = [
+            {'status': 'Pending', 'count': status_counts['pending']},
+            {'status': 'Approved', 'count': status_counts['approved']},
+            {'status': 'Rejected', 'count': status_counts['rejected']}
+        ]
+        
+        return jsonify({
+            'services': services,
+            'chartData': chart_data,
+            'totalApplications': len(services),
+            'statusCounts': status_counts
+        }), 200
+        
+    except Exception as e:
+        print(f"Error fetching government services: {e}")
+        return jsonify({"error": "Failed to fetch services"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/donations', methods=['GET'])
+@token_required
+def get_government_donations(current_user_id):
+    """Get all donations grouped by month for government dashboard."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        analytics_cache.ensure_fresh(connection, 'donations')
+        donations = [{
+            "month": date(group['year'], group['month'], 1).strftime('%b'),
+            "count": group['count'],
+            "amount": group['amount']
+        } for group in analytics_cache.group_by('donations', ('month',), 'created_at')]
+            
+        return jsonify(donations), 200
+        
+    except Exception as e:
+        print(f"Error fetching government donations: {e}")
+        return jsonify({"error": "Failed to fetch donations"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+
+
+
+# Retrieve government officer profile
+@bp.route('/api/government/profile', methods=['GET'])
+@token_required
+def get_profile(current_user):
+    try:
+        return jsonify({
+            'id': current_user['id'],
+            'first_name': current_user['first_name'],
+            'last_name': current_user['last_name'],
+            'email': current_user['email'],
+            'role': current_user['role'],
+            'avatar_url': current_user['avatar_url'] or ''
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Update government officer profile
+@bp.route('/api/government/profile', methods=['PUT'])
+@token_required
+def update_profile(current_user_id):
+    """Update government officer profile."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        required_fields = ['firstName', 'lastName', 'email']
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        cursor = connection.cursor(dictionary=True)
+        
+        # Check if email is already in use by another officer
+        cursor.execute("""
+            SELECT id FROM government_officers 
+            WHERE email = %s AND id != %s
+        """, (data['email'], current_user_id))
+        
+        if cursor.fetchone():
+            return jsonify({"error": "Email already in use"}), 409
+
+        # Update profile
+        cursor.execute("""
+            UPDATE government_officers 
+            SET first_name = %s,
+                last_name = %s,
+                email = %s
+            WHERE id = %s
+        """, (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            current_user_id
+        ))
+        
+        if cursor.rowcount == 0:
+            return jsonify({"error": "Officer not found"}), 404
+
+        connection.commit()
+
+        # Fetch updated profile
+        cursor.execute("""
+            SELECT id, first_name, last_name, email, role, park_name
+            FROM government_officers
+            WHERE id = %s
+        """, (current_user_id,))
+        
+        updated_user = cursor.fetchone()
+        
+        return jsonify({
+            "message": "Profile updated successfully",
+            "user": {
+                "id": str(updated_user['id']),
+                "firstName": updated_user['first_name'],
+                "lastName": updated_user['last_name'],
+                "email": updated_user['email'],
+                "role": updated_user['role'],
+                "park": updated_user['park_name'],
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Profile update error: {e}")
+        connection.rollback()
+        return jsonify({"error": "Failed to update profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/avatar', methods=['POST'])
+@token_required
+def update_government_avatar(current_user_id):
+    return update_avatar('government_officers', current_user_id)
+
+# Change government officer password
+@bp.route('/api/government/password', methods=['PUT'])
+@token_required
+def change_password(current_user_id):
+    """Update government officer password."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        current_password = data.get('currentPassword')
+        new_password = data.get('newPassword')
+        confirm_password = data.get('confirmPassword')
+
+        if not all([current_password, new_password, confirm_password]):
+            return jsonify({"error": "All password fields are required"}), 400
+
+        if new_password != confirm_password:
+            return jsonify({"error": "New passwords do not match"}), 400
+
+        # Verify current password
+        password_hash = repository.get_password_hash(connection, 'government_officers', current_user_id)
+        if password_hash is None:
+            return jsonify({"error": "Officer not found"}), 404
+
+        current_password_hash = hashlib.sha256(current_password.encode()).hexdigest()
+        if current_password_hash != password_hash:
+            return jsonify({"error": "Current password is incorrect"}), 401
+
+        # Update password
+        new_password_hash = hashlib.sha256(new_password.encode()).hexdigest()
+        repository.set_password_hash(connection, 'government_officers', current_user_id, new_password_hash)
+        
+        connection.commit()
+        
+        return jsonify({"message": "Password updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Password update error: {e}")
+        connection.rollback()
+        return jsonify({"error": "Failed to update password"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+# Delete government officer account
+@bp.route('/api/government/account', methods=['DELETE'])
+@token_required
+def delete_account(current_user):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM government_officers WHERE id = %s", (current_user['id'],))
+        
+        if cursor.rowcount == 0:
+            cursor.close()
+            conn.close()
+            return jsonify({'error': 'Account not found'}), 404
+            
+        conn.commit()
+        cursor.close()
+        conn.close()
+        
+        return jsonify({'message': 'Account deleted successfully'}), 200
+        
+    except mysql.connector.Error as e:
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+@bp.route('/api/government/park-income/<park_name>', methods=['GET'])
+@token_required
+def get_park_income(current_user_id, park_name):
+    """Get detailed income data for a specific park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        park_id = parks.park_id(cursor, park_name)
+        
+        # Donation and tour totals for the park from the columnar cache
+        analytics_cache.ensure_fresh(connection, 'donations')
+        analytics_cache.ensure_fresh(connection, 'tours')
+        _, total_donations = analytics_cache.total('donations', park_id=park_id or -1)
+        _, total_tours = analytics_cache.total('tours', park_id=park_id or -1)
+        
+        # Calculate totals
+        base_income = total_donations + total_tours
+        gov_support = base_income * 0.15 / (1 - 0.15)  # Government support is 15% of total income
+        
+        income_data = {
+            "donations": total_donations,
+            "tours": total_tours,
+            "government_support": gov_support,
+            "total_income": base_income + gov_support
+        }
+        
+        return jsonify(income_data), 200
+        
+    except Exception as e:
+        print(f"Error fetching park income: {e}")
+        return jsonify({"error": "Failed to fetch park income data"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/government/park-expenses/<park_name>', methods=['GET'])
+@token_required
+def get_park_expenses(current_user_id, park_name):
+    """Get detailed expense data for a specific park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        park_id = parks.park_id(cursor, park_name)
+        
+        # Get approved fund requests
+        cursor.execute("""
+            SELECT SUM(amount) as total_fund_requests
+            FROM fund_requests
+            WHERE park_id = %s AND status = 'approved'
+        """, (park_id,))
+        fund_requests = cursor.fetchone()
+        
+        # Get approved extra funds requests
+        cursor.execute("""
+            SELECT SUM(amount) as total_extra_funds
+            FROM extra_funds_requests
+            WHERE park_id = %s AND status = 'approved'
+        """, (park_id,))
+        extra_funds = cursor.fetchone()
+        
+        # Get approved emergency requests
+        cursor.execute("""
+            SELECT SUM(amount) as total_emergency
+            FROM emergency_requests
+            WHERE park_id = %s AND status = 'approved'
+        """, (park_id,))
+        emergency = cursor.fetchone()
+        
+        expense_data = {
+            "fund_requests": float(fund_requests['total_fund_requests'] or 0),
+            "extra_funds": float(extra_funds['total_extra_funds'] or 0),
+            "emergency": float(emergency['total_emergency'] or 0),
+            "total_expenses": float(fund_requests['total_fund_requests'] or 0) +
+                            float(extra_funds['total_extra_funds'] or 0) +
+                            float(emergency['total_emergency'] or 0)
+        }
+        
+        return jsonify(expense_data), 200
+        
+    except Exception as e:
+        print(f"Error fetching park expenses: {e}")
+        return jsonify({"error": "Failed to fetch park expense data"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+# @bp.route('/api/government/budgets', methods=['GET'])
+# @token_required
+# def get_government_all_budgets(current_user_id):  # Renamed from get_all_budgets
+#     """Get all budgets with detailed financial data."""
+#     connection = get_db_connection()
+#     if not connection:
+#         return jsonify({"error": "Database connection failed"}), 500
+    
+#     try:
+#         cursor = connection.cursor(dictionary=True)
+#         cursor.execute("""
+#             SELECT 
+#                 b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+#                 b.description, b.status, b.created_at, b.created_by,
+#                 b.approved_by, b.approved_at, b.reason,
+#                 fo.first_name as created_by_name,
+#                 fo.last_name as created_by_lastname,
+#                 go.first_name as approved_by_name,
+#                 go.last_name as approved_by_lastname
+#             FROM budgets b
+#             LEFT JOIN finance_officers fo ON b.created_by = fo.id
+#             LEFT JOIN government_officers go ON b.approved_by = go.id
+#             WHERE b.status = 'submitted'
+#             ORDER BY b.created_at DESC
+#         """)
+#         budgets = cursor.fetchall()
+        
+#         # Format and enhance budget data
+#         for budget in budgets:
+#             # Get budget items
+#             cursor.execute("""
+#                 SELECT id, category, description, amount, type
+#                 FROM budget_items
+#                 WHERE budget_id = %s
+#             """, (budget['id'],))
+#             items = cursor.fetchall()
+            
+#             # Format items
+#             for item in items:
+#                 item['amount'] = float(item['amount'])
+#                 item['id'] = str(item['id'])
+            
+#             budget['items'] = items
+#             budget['id'] = str(budget['id'])
+#             budget['total_amount'] = float(budget['total_amount'])
+#             budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+#             if budget['approved_at']:
+#                 budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+#             # Add creator and approver full names
+#             budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+#             budget['approved_by_full_name'] = (f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+#                                              if budget['approved_by_name'] else None)
+            
+#             # Clean up response
+#             del budget['created_by_name']
+#             del budget['created_by_lastname']
+#             del budget['approved_by_name']
+#             del budget['approved_by_lastname']
+            
+#         return jsonify(budgets), 200
+        
+#     except Exception as e:
+#         print(f"Error fetching budgets: {e}")
+#         return jsonify({"error": "Failed to fetch budgets"}), 500
+#     finally:
+#         if connection.is_connected():
+#             cursor.close()
+#             connection.close()
+
+# @bp.route('/api/government/budgets/approved', methods=['GET'])
+# @token_required
+# def get_government_approved_budgets_v2(current_user_id):  # Renamed from get_government_approved_budgets
+#     """Get all approved budgets with detailed financial data."""
+#     connection = get_db_connection()
+#     if not connection:
+#         return jsonify({"error": "Database connection failed"}), 500
+    
+#     try:
+#         cursor = connection.cursor(dictionary=True)
+#         cursor.execute("""
+#             SELECT 
+#                 b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+#                 b.description, b.status, b.created_at, b.approved_at,
+#                 b.reason, b.created_by, b.approved_by,
+#                 fo.first_name as created_by_name,
+#                 fo.last_name as created_by_lastname,
+#                 go.first_name as approved_by_name,
+#                 go.last_name as approved_by_lastname
+#             FROM budgets b
+#             LEFT JOIN finance_officers fo ON b.created_by = fo.id
+#             LEFT JOIN government_officers go ON b.approved_by = go.id
+#             WHERE b.status = 'approved'
+#             ORDER BY b.approved_at DESC
+#         """)
+#         budgets = cursor.fetchall()
+        
+#         # Format and enhance budget data
+#         for budget in budgets:
+#             # Get budget items
+#             cursor.execute("""
+#                 SELECT id, category, description, amount, type
+#                 FROM budget_items
+#                 WHERE budget_id = %s
+#             """, (budget['id'],))
+#             items = cursor.fetchall()
+            
+#             # Format items
+#             for item in items:
+#                 item['amount'] = float(item['amount'])
+#                 item['id'] = str(item['id'])
+            
+#             budget['items'] = items
+#             budget['id'] = str(budget['id'])
+#             budget['total_amount'] = float(budget['total_amount'])
+#             budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+#             if budget['approved_at']:
+#                 budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+#             # Add creator and approver full names
+#             budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+#             budget['approved_by_full_name'] = f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+            
+#             # Clean up response
+#             del budget['created_by_name']
+#             del budget['created_by_lastname']
+#             del budget['approved_by_name']
+#             del budget['approved_by_lastname']
+            
+#         return jsonify(budgets), 200
+        
+#     except Exception as e:
+#         print(f"Error fetching approved budgets: {e}")
+#         return jsonify({"error": "Failed to fetch approved budgets"}), 500
+#     finally:
+#         if connection.is_connected():
+#             cursor.close()
+#             connection.close()
+
+# @bp.route('/api/government/budgets/rejected', methods=['GET'])
+# @token_required
+# def get_government_rejected_budgets_v2(current_user_id):  # Renamed from get_government_rejected_budgets
+#     """Get all rejected budgets with detailed financial data."""
+#     connection = get_db_connection()
+#     if not connection:
+#         return jsonify({"error": "Database connection failed"}), 500
+    
+#     try:
+#         cursor = connection.cursor(dictionary=True)
+#         cursor.execute("""
+#             SELECT 
+#                 b.id, b.title, b.fiscal_year, b.total_amount, b.park_name,
+#                 b.description, b.status, b.created_at, b.approved_at,
+#                 b.reason, b.created_by, b.approved_by,
+#                 fo.first_name as created_by_name,
+#                 fo.last_name as created_by_lastname,
+#                 go.first_name as approved_by_name,
+#                 go.last_name as approved_by_lastname
+#             FROM budgets b
+#             LEFT JOIN finance_officers fo ON b.created_by = fo.id
+#             LEFT JOIN government_officers go ON b.approved_by = go.id
+#             WHERE b.status = 'rejected'
+#             ORDER BY b.approved_at DESC
+#         """)
+#         budgets = cursor.fetchall()
+        
+#         # Format and enhance budget data
+#         for budget in budgets:
+#             # Get budget items
+#             cursor.execute("""
+#                 SELECT id, category, description, amount, type
+#                 FROM budget_items
+#                 WHERE budget_id = %s
+#             """, (budget['id'],))
+#             items = cursor.fetchall()
+            
+#             # Format items
+#             for item in items:
+#                 item['amount'] = float(item['amount'])
+#                 item['id'] = str(item['id'])
+            
+#             budget['items'] = items
+#             budget['id'] = str(budget['id'])
+#             budget['total_amount'] = float(budget['total_amount'])
+#             budget['created_at'] = budget['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+#             if budget['approved_at']:
+#                 budget['approved_at'] = budget['approved_at'].strftime('%Y-%m-%d %H:%M:%S')
+            
+#             # Add creator and approver full names
+#             budget['created_by_full_name'] = f"{budget['created_by_name']} {budget['created_by_lastname']}"
+#             budget['approved_by_full_name'] = f"{budget['approved_by_name']} {budget['approved_by_lastname']}"
+            
+#             # Clean up response
+#             del budget['created_by_name']
+#             del budget['created_by_lastname']
+#             del budget['approved_by_name']
+#             del budget['approved_by_lastname']
+            
+#         return jsonify(budgets), 200
+        
+#     except Exception as e:
+#         print(f"Error fetching rejected budgets: {e}")
+#         return jsonify({"error": "Failed to fetch rejected budgets"}), 500
+#     finally:
+#         if connection.is_connected():
+#             cursor.close()
+#             connection.close()
@@ -0,0 +1,486 @@
+"""Park staff endpoints: /api/parkstaff/* and fund requests (/api/fund-requests)."""
+import hashlib
+
+from flask import Blueprint, jsonify, request
+
+from core import get_db_connection, token_required, update_avatar
+from outbox import enqueue
+import repository
+
+
+bp = Blueprint('parkstaff', __name__)
+
+
+@bp.route('/api/fund-requests', methods=['POST'])
+@token_required
+def create_fund_request(current_user_id):
+    """Create a new fund request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'description', 'amount', 'category', 'urgency']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Validate amount
+        try:
+            amount = float(data['amount'])
+            if amount <= 0:
+                return jsonify({"error": "Amount must be positive"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid amount"}), 400
+
+        # Get user's park_name
+        cursor = connection.cursor()
+        user = repository.staff_park(connection, 'parkstaff', current_user_id)
+        if not user or not user.park_name:
+            return jsonify({"error": "User or park not found"}), 404
+        
+        park_name = user.park_name
+        
+        cursor.execute("""
+            INSERT INTO fund_requests (
+                title, description, amount, category, parkname, urgency, status, created_by
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            data['title'],
+            data['description'],
+            amount,
+            data['category'],
+            park_name,  # Use park_name from user
+            data['urgency'],
+            'pending',
+            current_user_id
+        ))
+        new_request_id = cursor.lastrowid
+        enqueue(cursor, 'fund_request.created', park_name, 'fund_requests', new_request_id,
+                amount=amount, category=data['category'], created_by=current_user_id)
+        connection.commit()
+        
+        return jsonify({
+            "message": "Fund request created successfully",
+            "id": new_request_id
+        }), 201
+    
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to create fund request: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/fund-requests', methods=['GET'])
+@token_required
+def get_fund_requests(current_user_id):
+    """Retrieve fund requests for the staff member's park."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        
+        # First get the staff member's park
+        cursor.execute("""
+            SELECT park_id 
+            FROM parkstaff 
+            WHERE id = %s
+        """, (current_user_id,))
+        staff_result = cursor.fetchone()
+        
+        if not staff_result:
+            return jsonify({"error": "Staff member not found"}), 404
+            
+        staff_park_id = staff_result['park_id']
+        
+        # Get fund requests for the staff's park
+        cursor.execute("""
+            SELECT 
+                fr.*, 
+                ps.first_name,
+                ps.last_name,
+                ps.email as staff_email,
+                ps.park_name as staff_park
+            FROM fund_requests fr
+            LEFT JOIN parkstaff ps ON fr.created_by = ps.id
+            WHERE fr.park_id = %s
+            ORDER BY fr.created_at DESC
+        """, (staff_park_id,))
+        
+        requests = cursor.fetchall()
+        
+        # Format dates and amounts
+        for request in requests:
+            if request['created_at']:
+                request['created_at'] = request['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            if request['amount']:
+                request['amount'] = float(request['amount'])
+        
+        return jsonify(requests), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve fund requests"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+@bp.route('/api/fund-requests/<int:request_id>', methods=['PUT'])
+@token_required
+def update_fund_request(request_id, current_user_id):
+    """Update an existing fund request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['title', 'description', 'amount', 'category', 'urgency']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Get user's park_name
+        cursor = connection.cursor()
+        user = repository.staff_park(connection, 'parkstaff', current_user_id)
+        if not user or not user.park_name:
+            return jsonify({"error": "User or park not found"}), 404
+        
+        park_name = user.park_name
+        
+        # Verify the request exists and belongs to the user's park
+        cursor.execute("SELECT id FROM fund_requests WHERE id = %s AND parkname = %s", 
+                       (request_id, park_name))
+        if not cursor.fetchone():
+            return jsonify({"error": "Fund request not found or unauthorized"}), 404
+
+        cursor.execute("""
+            UPDATE fund_requests SET
+                title = %s, description = %s, amount = %s, category = %s, parkname = %s,
+                urgency = %s
+            WHERE id = %s
+        """, (
+            data['title'], data['description'], float(data['amount']),
+            data['category'], park_name, data['urgency'], request_id
+        ))
+        enqueue(cursor, 'fund_request.updated', park_name, 'fund_requests', request_id, amount=float(data['amount']))
+        connection.commit()
+        
+        return jsonify({"message": "Fund request updated successfully"}), 200
+    
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update fund request: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+@bp.route('/api/fund-requests/<int:request_id>', methods=['DELETE'])
+@token_required
+def delete_fund_request(request_id, current_user_id):
+    """Delete a fund request."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor()
+        # Get user's park_name
+        user = repository.staff_park(connection, 'parkstaff', current_user_id)
+        if not user or not user.park_name:
+            return jsonify({"error": "User or park not found"}), 404
+        
+        park_name = user.park_name
+        
+        # Verify the request exists and belongs to the user's park
+        cursor.execute("SELECT id FROM fund_requests WHERE id = %s AND parkname = %s", 
+                       (request_id, park_name))
+        if not cursor.fetchone():
+            return jsonify({"error": "Fund request not found or unauthorized"}), 404
+
+        cursor.execute("DELETE FROM fund_requests WHERE id = %s", (request_id,))
+        enqueue(cursor, 'fund_request.deleted', park_name, 'fund_requests', request_id, deleted_by=current_user_id)
+        connection.commit()
+        
+        return jsonify({"message": "Fund request deleted successfully"}), 200
+    
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to delete fund request: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+
+@bp.route('/api/park-staff/fund-request-stats', methods=['GET'])
+@token_required
+def get_fund_request_stats(current_user_id):
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    parkname = request.args.get('parkname')
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT 
+                SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
+                SUM(CASE WHEN status = 'approved' THEN 1 ELSE 0 END) as approved,
+                SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END) as rejected,
+                COUNT(*) as total
+            FROM fund_requests
+            WHERE created_by = %s AND parkname = %s
+        """, (current_user_id, parkname))
+        stats = cursor.fetchone()
+        return jsonify({
+            "stats": [
+                {"title": "All Park Staff Requests", "value": stats['total'] or 0, "icon": "FileText"},
+                {"title": "Pending Requests", "value": stats['pending'] or 0, "icon": "Clock"},
+                {"title": "Approved Requests", "value": stats['approved'] or 0, "icon": "CheckCircle"},
+                {"title": "Rejected Requests", "value": stats['rejected'] or 0, "icon": "XCircle"}
+            ]
+        }), 200
+    except Exception as e:
+        print(f"Error fetching fund request stats: {e}")
+        return jsonify({"error": "Failed to fetch fund request stats"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+
+@bp.route('/api/parkstaff/profile', methods=['PUT'])
+@token_required
+def update_parkstaff_profile(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        cursor = connection.cursor(dictionary=True)
+        
+        # Check for email uniqueness
+        cursor.execute(
+            "SELECT id FROM parkstaff WHERE email = %s AND id != %s",
+            (data['email'], current_user_id)
+        )
+        if cursor.fetchone():
+            return jsonify({"error": "Email already in use by another staff member"}), 409
+
+        # Update profile without phone field
+        cursor.execute('''
+            UPDATE parkstaff SET
+                first_name = %s,
+                last_name = %s,
+                email = %s
+            WHERE id = %s
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            current_user_id
+        ))
+
+        if cursor.rowcount == 0:
+            return jsonify({"error": "Staff member not found"}), 404
+
+        connection.commit()
+
+        # Retrieve updated profile
+        cursor.execute(
+            "SELECT id, first_name, last_name, email, park_name FROM parkstaff WHERE id = %s",
+            (current_user_id,)
+        )
+        updated_user = cursor.fetchone()
+
+        return jsonify({
+            "message": "Profile updated successfully",
+            "user": {
+                "id": str(updated_user['id']),
+                "firstName": updated_user['first_name'],
+                "lastName": updated_user['last_name'],
+                "email": updated_user['email'],
+                "park": updated_user['park_name'],
+                "role": "park-staff"
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Profile update error: {e}")
+        return jsonify({"error": "Failed to update profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/parkstaff/avatar', methods=['POST'])
+@token_required
+def update_parkstaff_avatar(current_user_id):
+    return update_avatar('parkstaff', current_user_id)
+
+@bp.route('/api/parkstaff/password', methods=['PUT'])
+@token_required
+def update_parkstaff_password(current_user_id):
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['currentPassword', 'newPassword', 'confirmPassword']
+        
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "All password fields are required"}), 400
+
+        if data['newPassword'] != data['confirmPassword']:
+            return jsonify({"error": "New passwords don't match"}), 400
+
+        password_hash = repository.get_password_hash(connection, 'parkstaff', current_user_id)
+
+        if password_hash is None:
+            return jsonify({"error": "Staff member not found"}), 404
+
+        # Verify current password
+        if hashlib.sha256(data['currentPassword'].encode()).hexdigest() != password_hash:
+            return jsonify({"error": "Current password is incorrect"}), 401
+
+        # Update password
+        new_password_hash = hashlib.sha256(data['newPassword'].encode()).hexdigest()
+        repository.set_password_hash(connection, 'parkstaff', current_user_id, new_password_hash)
+
+        connection.commit()
+
+        return jsonify({"message": "Password updated successfully"}), 200
+
+    except Exception as e:
+        print(f"Password update error: {e}")
+        return jsonify({"error": f"Failed to update password: {str(e)}"}), 500
+    finally:
+        if connection and connection.is_connected():
+            connection.close()
+
+@bp.route('/api/parkstaff/account', methods=['DELETE'])
+@token_required
+def delete_parkstaff_account(current_user_id):
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT id FROM parkstaff WHERE id = %s",
+            (current_user_id,)
+        )
+        if not cursor.fetchone():
+            return jsonify({"error": "Staff member not found"}), 404
+
+        cursor.execute(
+            "DELETE FROM parkstaff WHERE id = %s",
+            (current_user_id,)
+        )
+        connection.commit()
+
+        return jsonify({"message": "Account deleted successfully"}), 200
+
+    except Exception as e:
+        print(f"Account deletion error: {e}")
+        return jsonify({"error": f"Failed to delete account: {str(e)}"}), 500
+    finally:
+        if connection and connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/parkstaff/profile', methods=['GET'])
+@token_required
+def get_parkstaff_profile(current_user_id):
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return connection
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, first_name, last_name, email, phone, park_name, avatar_url 
+            FROM parkstaff 
+            WHERE id = %s
+        """, (current_user_id,))
+        
+        user = cursor.fetchone()
+        if not user:
+            return jsonify({"error": "Staff member not found"}), 404
+
+        return jsonify({
+            "id": str(user['id']),
+            "firstName": user['first_name'],
+            "lastName": user['last_name'],
+            "email": user['email'],
+            "phone": user['phone'],
+            "park": user['park_name'],
+            "avatarUrl": user['avatar_url'],
+            "role": "park-staff"
+        }), 200
+
+    except Exception as e:
+        print(f"Profile retrieval error: {e}")
+        return jsonify({"error": "Failed to retrieve profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
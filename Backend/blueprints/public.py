@@ -0,0 +1,832 @@
+"""Public endpoints (donations, tour bookings, service applications, payments, login,
+uploads) and the cross-role ones: search, the event stream and bulk status changes.
+"""
+from datetime import datetime
+import hashlib
+import random
+
+from flask import Blueprint, current_app, g, jsonify, request, Response, send_file, send_from_directory
+from mysql.connector import Error
+import jwt
+
+from core import (
+    event_hub, get_avatar_store, get_db_connection, idempotency_store, login_activity, token_required,
+    visitor_from_token
+)
+from analytics import analytics_cache
+from availability import (
+    admit_booking, availability_index, parse_calendar_range, SLOT_LABELS, TOUR_SLOT_CAPACITY, TOUR_SLOT_MINUTES
+)
+from invoices import document_cache, FORMATS, load_documents, parse_month, render_month
+from outbox import enqueue, enqueue_many
+from parks import parks
+from search import MAX_PER_PAGE, MIN_QUERY_LENGTH, search, SEARCH_TYPES
+from transitions import apply_transition, MAX_BATCH_SIZE, TRANSITIONS, validate_reason
+import repository
+
+
+bp = Blueprint('public', __name__)
+
+
+@bp.route('/api/donate', methods=['POST'])
+@idempotency_store.idempotent
+def donate():
+    """Handles donation submissions."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['donationType', 'amount', 'parkName', 'firstName', 'lastName', 'email']
+        
+        # Validate all required fields
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        # Validate amount
+        try:
+            donation_amount = float(data['amount'])
+            if donation_amount <= 0:
+                return jsonify({"error": "Donation amount must be positive"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid donation amount"}), 400
+
+        cursor = connection.cursor()
+        cursor.execute('''
+            INSERT INTO donations (
+                donation_type, amount, park_name, 
+                first_name, last_name, email, 
+                message, is_anonymous, visitor_id
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ''', (
+            data['donationType'],
+            donation_amount,
+            data['parkName'],
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            data.get('message', ''),
+            False,  # Adding the missing value for is_anonymous
+            visitor_from_token()
+        ))
+        donation_id = cursor.lastrowid
+        enqueue(cursor, 'donation.created', data['parkName'], 'donations', donation_id,
+                donation_type=data['donationType'], amount=donation_amount, email=data['email'])
+        park_id = parks.park_id(cursor, data['parkName'])
+        idempotency_store.applied(cursor)
+        connection.commit()
+        # The donation has committed: a cache failure must not turn it into a 500 the client retries
+        try:
+            analytics_cache.record('donations', donation_id, park_id, data['donationType'], donation_amount,
+                                   datetime.now())
+        except Exception as e:
+            print(f"Analytics cache update failed for donation {donation_id}: {e}")
+        return jsonify({"message": "Donation recorded successfully"}), 201
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Database operation failed"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+@bp.route('/api/login', methods=['POST'])
+def login():
+    connection = get_db_connection()
+    if isinstance(connection, tuple):  # Check if connection failed
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        email = data.get('email')
+        password = data.get('password')
+        
+        if not email or not password:
+            return jsonify({"error": "Email and password are required"}), 400
+
+        # One lookup across every role table
+        user = repository.find_user_by_email(connection, email)
+        
+        if not user:
+            return jsonify({"error": "Invalid credentials"}), 401
+        user_role = user.role
+        user_table = user.table
+
+        # Check password: try SHA-256 first, then bcrypt as fallback
+        sha256_hash = hashlib.sha256(password.encode()).hexdigest()
+        password_match = sha256_hash == user.password_hash
+        
+        if not password_match:
+            try:
+                # Attempt bcrypt check for legacy passwords
+                import bcrypt
+                password_match = bcrypt.checkpw(password.encode(), user.password_hash.encode())
+                if password_match:
+                    # Rehash to SHA-256 and update database
+                    repository.set_password_hash(connection, user_table, user.id, sha256_hash)
+                    connection.commit()
+            except ValueError:
+                # Invalid bcrypt hash (e.g., not bcrypt format)
+                return jsonify({"error": "Invalid credentials"}), 401
+
+        if not password_match:
+            return jsonify({"error": "Invalid credentials"}), 401
+
+        login_activity.record(user_table, user.id, user.email, user_role)
+
+        # Create JWT token
+        token = jwt.encode({
+            'user_id': str(user.id),
+            'email': user.email,
+            'role': user_role,
+            'exp': int(datetime.utcnow().timestamp() + 86400)
+        }, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+        # Prepare user response
+        user_data = {
+            "id": str(user.id),
+            "firstName": user.first_name,
+            "lastName": user.last_name,
+            "email": user.email,
+            "role": user_role,
+            "park": user.park_name,
+            "avatarUrl": user.avatar_url
+        }
+
+        return jsonify({
+            "message": "Login successful",
+            "token": token,
+            "user": user_data,
+            "dashboard": f"/{user_role.replace('-', '')}/dashboard"
+        }), 200
+
+    except Exception as e:
+        print(f"Login error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+
+
+
+
+
+
+@bp.route('/api/book-tour', methods=['POST'])
+@idempotency_store.idempotent
+def book_tour():
+    """Handle tour booking with specific tour purpose validation."""
+    connection = get_db_connection()
+    cursor = None
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    # Define valid tour purposes
+    VALID_TOUR_PURPOSES = {
+        'Wildlife Photography', 'Bird Watching', 'Hiking Adventure',
+        'Nature Trail Walking', 'Canopy Walk', 'Forest Exploration',
+        'Educational Tour', 'Research Visit', 'Cultural Experience',
+        'Waterfall Visit', 'Mountain Climbing', 'Camping',
+        'Animal Observation', 'Conservation Learning', 'School Field Trip'
+    }
+
+    try:
+        data = request.json
+        required_fields = ['parkName', 'tourName', 'date', 'time', 'guests', 'amount', 'firstName', 'lastName', 'email']
+
+        # Validate required fields
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({
+                "error": "Missing required fields",
+                "missing": missing_fields
+            }), 400
+
+        # Validate tour purpose
+        tour_purpose = data['tourName'].strip()
+        if not tour_purpose or tour_purpose not in VALID_TOUR_PURPOSES:
+            return jsonify({
+                "error": "Invalid tour purpose",
+                "message": "Please select a valid tour purpose",
+                "valid_purposes": sorted(list(VALID_TOUR_PURPOSES))
+            }), 400
+
+        # Validate guests and amount
+        try:
+            guests = int(data['guests'])
+            amount = int(data['amount'])
+            if guests < 1 or guests > 20:
+                return jsonify({"error": "Number of guests must be between 1 and 20"}), 400
+            if amount != guests * 75:
+                return jsonify({"error": "Invalid amount: must be $75 per guest"}), 400
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid guests or amount value"}), 400
+
+        # Validate date and time
+        try:
+            tour_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+            tour_time = datetime.strptime(data['time'], '%H:%M').time()
+            
+            if tour_date < datetime.now().date():
+                return jsonify({"error": "Tour date must be in the future"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid date or time format"}), 400
+
+        # Reserve places in the slot; the slot row stays locked until commit
+        cursor = connection.cursor()
+        admitted, remaining = admit_booking(cursor, data['parkName'], tour_date, tour_time, guests)
+        if not admitted:
+            connection.rollback()
+            return jsonify({
+                "error": "Tour slot is fully booked",
+                "message": f"Only {remaining} places left for this time slot",
+                "remaining": remaining
+            }), 409
+
+        # Insert the tour booking
+        cursor.execute('''
+            INSERT INTO tours (
+                park_name, tour_name, date, time, guests, amount,
+                first_name, last_name, email, special_requests,
+                status, visitor_id, created_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+        ''', (
+            data['parkName'],
+            tour_purpose,
+            data['date'],
+            data['time'],
+            guests,
+            amount,
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            data.get('specialRequests', ''),
+            'pending',
+            visitor_from_token()
+        ))
+        tour_id = cursor.lastrowid
+        enqueue(cursor, 'tour.booked', data['parkName'], 'tours', tour_id, tour_name=tour_purpose,
+                date=data['date'], time=data['time'], guests=guests, amount=amount, email=data['email'],
+                remaining=remaining)
+        park_id = parks.park_id(cursor, data['parkName'])
+        idempotency_store.applied(cursor)
+        connection.commit()
+        # The booking has committed: a cache failure must not turn it into a 500 the client retries
+        try:
+            availability_index.record_booking(data['parkName'], tour_date, tour_time, guests)
+            analytics_cache.record('tours', tour_id, park_id, tour_purpose, amount, tour_date, datetime.now())
+        except Exception as e:
+            print(f"Cache update failed for tour {tour_id}: {e}")
+        
+        return jsonify({
+            "message": "Tour booked successfully",
+            "details": {
+                "park": data['parkName'],
+                "purpose": tour_purpose,
+                "date": data['date'],
+                "time": data['time'],
+                "guests": guests,
+                "amount": amount,
+                "status": "pending",
+                "remaining": remaining
+            }
+        }), 201
+
+    except Error as e:
+        connection.rollback()
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Database operation failed: {str(e)}"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if connection.is_connected():
+            connection.close()
+
+
+@bp.route('/api/tours/availability', methods=['GET'])
+def get_tour_availability():
+    """Remaining places per time slot for a park over a range of days."""
+    park_name = request.args.get('park')
+    if not park_name:
+        return jsonify({"error": "park parameter is required"}), 400
+
+    try:
+        start_date, days = parse_calendar_range(request.args.get('from'), request.args.get('days'))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date range: {str(e)}"}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        availability_index.ensure_fresh(connection)
+        return jsonify({
+            "park": park_name,
+            "slotMinutes": TOUR_SLOT_MINUTES,
+            "capacity": TOUR_SLOT_CAPACITY,
+            "slots": SLOT_LABELS,
+            "days": availability_index.calendar(park_name, start_date, days)
+        }), 200
+
+    except Exception as e:
+        print(f"Availability error: {e}")
+        return jsonify({"error": "Failed to retrieve availability"}), 500
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+
+
+
+
+
+@bp.route('/api/services', methods=['POST'])
+def services():
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.form
+        files = request.files
+
+        required_fields = ['firstName', 'lastName', 'email', 'companyType', 'companyName', 'taxId']
+        if not all(field in data for field in required_fields):
+            return jsonify({"error": "Missing required fields"}), 400
+
+        if 'companyRegistration' not in files:
+            return jsonify({"error": "Company registration file is required"}), 400
+
+        company_registration = files['companyRegistration'].read()
+        application_letter = files['applicationLetter'].read() if 'applicationLetter' in files else None
+
+        cursor = connection.cursor()
+        cursor.execute('''
+            INSERT INTO services (
+                first_name, last_name, email, phone, company_type, 
+                provided_service, company_name, tax_id, 
+                company_registration, application_letter, visitor_id
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ''', (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            data.get('phone', ''),  
+            data['companyType'],
+            data.get('providedService', ''),  
+            data['companyName'],
+            data['taxId'],
+            company_registration,
+            application_letter,
+            visitor_from_token()
+        ))
+        service_id = cursor.lastrowid
+        enqueue(cursor, 'service.submitted', None, 'services', service_id,
+                company_name=data['companyName'], email=data['email'])
+
+        connection.commit()
+        return jsonify({"message": "Service application submitted successfully"}), 201
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": f"Internal Server Error: {str(e)}"}), 500
+
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+@bp.route('/api/process_payment', methods=['POST'])
+@idempotency_store.idempotent
+def process_payment():
+    """Handle payment processing for donations and tour bookings."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['paymentType', 'amount', 'cardName', 'cardNumber', 
+                         'expiryDate', 'cvv', 'customerEmail']
+        
+        # Validate all required fields
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({
+                "error": "Missing required payment fields",
+                "missing": missing_fields
+            }), 400
+
+        # Validate amount
+        try:
+            payment_amount = float(data['amount'])
+            if payment_amount <= 0:
+                return jsonify({"error": "Payment amount must be positive"}), 400
+        except ValueError:
+            return jsonify({"error": "Invalid payment amount"}), 400
+
+        cursor = connection.cursor()
+
+        # First, ensure the necessary columns exist
+        try:
+            # Add status column to donations if it doesn't exist
+            cursor.execute("""
+                ALTER TABLE donations 
+                ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'pending',
+                ADD COLUMN IF NOT EXISTS transaction_id VARCHAR(50)
+            """)
+            
+            # Add status column to tours if it doesn't exist
+            cursor.execute("""
+                ALTER TABLE tours 
+                ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'pending',
+                ADD COLUMN IF NOT EXISTS transaction_id VARCHAR(50)
+            """)
+            
+            connection.commit()
+        except Exception as e:
+            print(f"Table alteration error: {e}")
+            # Continue even if alteration fails (columns might already exist)
+            pass
+
+        # Generate a unique transaction ID
+        timestamp = datetime.now().strftime('%y%m%d%H%M%S')
+        random_num = str(random.randint(100, 999))
+        transaction_id = f"TR-{timestamp}-{random_num}"
+        
+        # Process card details securely
+        card_number = data['cardNumber'].replace(' ', '')
+        last_four_digits = card_number[-4:] if len(card_number) >= 4 else "0000"
+        
+        # Insert payment record
+        visitor_id = visitor_from_token()
+        cursor.execute('''
+            INSERT INTO payments (
+                transaction_id, payment_type, amount, 
+                card_name, card_number_last4, expiry_date, 
+                status, park_name, customer_email, visitor_id
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ''', (
+            transaction_id,
+            data['paymentType'],
+            payment_amount,
+            data['cardName'],
+            last_four_digits,
+            data['expiryDate'],
+            'completed',
+            data.get('parkName', ''),
+            data['customerEmail'],
+            visitor_id
+        ))
+        
+        # Update the corresponding record based on payment type
+        if data['paymentType'] == 'donation':
+            cursor.execute('''
+                UPDATE donations 
+                SET status = %s, 
+                    transaction_id = %s,
+                    visitor_id = COALESCE(visitor_id, %s)
+                WHERE email = %s 
+                AND amount = %s 
+                AND created_at >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
+                ORDER BY created_at DESC 
+                LIMIT 1
+            ''', ('completed', transaction_id, visitor_id, data['customerEmail'], payment_amount))
+            
+            if cursor.rowcount == 0:
+                raise Exception("No matching donation record found")
+                
+        elif data['paymentType'] == 'tour':
+            cursor.execute('''
+                UPDATE tours 
+                SET status = %s, 
+                    transaction_id = %s,
+                    visitor_id = COALESCE(visitor_id, %s)
+                WHERE email = %s 
+                AND amount = %s 
+                AND created_at >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
+                ORDER BY created_at DESC 
+                LIMIT 1
+            ''', ('completed', transaction_id, visitor_id, data['customerEmail'], payment_amount))
+            
+            if cursor.rowcount == 0:
+                raise Exception("No matching tour record found")
+
+        enqueue(cursor, 'payment.completed', data.get('parkName') or None, 'payments', transaction_id,
+                payment_type=data['paymentType'], amount=payment_amount, email=data['customerEmail'])
+        idempotency_store.applied(cursor)
+        connection.commit()
+        
+        return jsonify({
+            "message": "Payment processed successfully",
+            "transactionId": transaction_id,
+            "status": "completed",
+            "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }), 201
+
+    except Exception as e:
+        print(f"Payment processing error: {e}")
+        connection.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/uploads/<path:filename>', methods=['GET'])
+@bp.route('/Uploads/<path:filename>', methods=['GET'])
+def serve_upload(filename):
+    """Uploaded files with conditional GET support; content-hashed avatars are immutable."""
+    immutable = get_avatar_store().resolve(filename)
+    response = send_from_directory(
+        get_avatar_store().upload_root, filename,
+        conditional=True, etag=True,
+        max_age=31536000 if immutable else 3600
+    )
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+
+
+@bp.route('/api/search', methods=['GET'])
+@token_required
+def search_records(current_user_id):
+    """Ranked full-text search over services, requests and donations, scoped to the officer's park."""
+    text = (request.args.get('q') or '').strip()
+    if len(text) < MIN_QUERY_LENGTH:
+        return jsonify({"error": f"Query must be at least {MIN_QUERY_LENGTH} characters"}), 400
+
+    types = request.args.get('types')
+    types = types.split(',') if types else list(SEARCH_TYPES)
+    invalid = [t for t in types if t not in SEARCH_TYPES]
+    if invalid:
+        return jsonify({"error": "Invalid search types", "invalid": invalid, "valid": list(SEARCH_TYPES)}), 400
+
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), MAX_PER_PAGE)
+    except ValueError:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
+
+    role = g.token_claims.get('role')
+    if role == 'visitor':
+        return jsonify({"error": "Unauthorized: staff access required"}), 403
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = connection.cursor(dictionary=True)
+
+        # Finance officers and park staff only ever see their own park
+        park_tables = {'finance': 'finance_officers', 'park-staff': 'parkstaff'}
+        if role in park_tables:
+            officer = repository.staff_park(connection, park_tables[role], current_user_id)
+            if not officer or not officer.park_name:
+                return jsonify({"error": "Officer or park not found"}), 404
+            park_name = officer.park_name
+        else:
+            park_name = request.args.get('park')
+
+        hits, has_more = search(cursor, text, types, park_name, page, per_page)
+
+        return jsonify({
+            "query": text,
+            "park": park_name,
+            "page": page,
+            "per_page": per_page,
+            "has_more": has_more,
+            "results": hits
+        }), 200
+
+    except Exception as e:
+        print(f"Search error: {e}")
+        return jsonify({"error": "Search failed"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+@bp.route('/api/events', methods=['GET'])
+def stream_events():
+    """Server-Sent Events stream of changes in the caller's park.
+
+    EventSource cannot send headers, so the token may also be passed as ?token=.
+    """
+    auth = request.headers.get('Authorization')
+    token = auth.split()[1] if auth and len(auth.split()) > 1 else request.args.get('token')
+    if not token:
+        return jsonify({'error': 'Token is missing'}), 401
+    try:
+        claims = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        return jsonify({'error': 'Token has expired'}), 401
+    except Exception as e:
+        return jsonify({'error': f'Invalid token: {str(e)}'}), 401
+
+    role = claims.get('role')
+    if role == 'visitor':
+        return jsonify({"error": "Unauthorized: staff access required"}), 403
+
+    park_name = None
+    park_tables = {'finance': 'finance_officers', 'park-staff': 'parkstaff'}
+    if role in park_tables:
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({"error": "Database connection failed"}), 500
+        try:
+            officer = repository.staff_park(connection, park_tables[role], claims['user_id'])
+        finally:
+            connection.close()
+        if not officer or not officer.park_name:
+            return jsonify({"error": "Officer or park not found"}), 404
+        park_name = officer.park_name
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    subscription = event_hub.subscribe(park_name, last_event_id)
+    if subscription is None:
+        # Every stream holds a request thread; this worker has none to spare
+        response = jsonify({"error": "Too many event streams, keep polling"})
+        response.status_code = 503
+        response.headers['Retry-After'] = '60'
+        return response
+    return Response(event_hub.stream(subscription), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+BULK_EVENT_TYPES = {
+    'fund_requests': 'fund_request',
+    'extra_funds': 'extra_funds_request',
+    'emergency': 'emergency_request',
+    'services': 'service',
+    'budgets': 'budget',
+}
+
+
+@bp.route('/api/bulk/status', methods=['PUT'])
+@token_required
+def bulk_update_status(current_user_id):
+    """Approve or reject many requests, services or budgets in one transaction."""
+    data = request.json or {}
+    kind = data.get('kind')
+    status = data.get('status')
+    reason = data.get('reason')
+    ids = data.get('ids')
+
+    if kind not in TRANSITIONS:
+        return jsonify({"error": "Invalid kind", "valid": list(TRANSITIONS)}), 400
+    spec = TRANSITIONS[kind]
+    if g.token_claims.get('role') != spec['role']:
+        return jsonify({"error": f"Unauthorized: {spec['role']} access required"}), 403
+    if status not in spec['targets']:
+        return jsonify({"error": f"Invalid status. Must be one of {list(spec['targets'])}"}), 400
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return jsonify({"error": "ids must be a non-empty list of integers"}), 400
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} ids per request"}), 400
+    reason_error = validate_reason(kind, reason)
+    if reason_error:
+        return jsonify({"error": reason_error}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = connection.cursor()
+
+        # Fund requests are scoped to the finance officer's park, as in update_fund_request_status
+        park_name = None
+        if kind == 'fund_requests':
+            officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+            if not officer or not officer.park_name:
+                return jsonify({"error": "Finance officer or park not found"}), 404
+            park_name = officer.park_name
+
+        results, updated = apply_transition(
+            cursor, kind, ids, status, current_user_id,
+            reason=reason, park_name=park_name,
+            all_or_nothing=bool(data.get('all_or_nothing'))
+        )
+        enqueue_many(cursor, [
+            (f"{BULK_EVENT_TYPES[kind]}.status", result['park'], TRANSITIONS[kind]['table'], result['id'],
+             {'status': status, 'reviewed_by': current_user_id, 'reason': reason})
+            for result in results if result['outcome'] == 'updated'
+        ])
+        connection.commit()
+        print(f"Bulk {kind} {status}: {len(updated)} of {len(ids)} by user {current_user_id}")
+        return jsonify({
+            "kind": kind,
+            "status": status,
+            "updated": len(updated),
+            "results": results
+        }), 200
+
+    except Exception as e:
+        connection.rollback()
+        print(f"Bulk status error: {e}")
+        return jsonify({"error": f"Failed to update {kind}: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+DOCUMENT_ROLES = ('admin', 'auditor', 'finance', 'government')
+
+
+@bp.route('/api/documents/<any(payments, tours, donations):source>/<int:record_id>.<any(pdf, html):fmt>',
+          methods=['GET'])
+@token_required
+def get_document(current_user_id, source, record_id, fmt):
+    """Invoice or receipt for a payment, tour booking or donation, served from the render cache."""
+    role = g.token_claims.get('role')
+    if role not in DOCUMENT_ROLES:
+        return jsonify({"error": "Unauthorized: staff access required"}), 403
+
+    connection = get_db_connection()
+    if not connection or isinstance(connection, str):
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        documents = load_documents(cursor, source, "id = %s", (record_id,))
+        if not documents:
+            return jsonify({"error": "Record not found"}), 404
+        digest, document = documents[0]
+
+        # Finance officers only see their own park's documents
+        if role == 'finance':
+            officer = repository.staff_park(connection, 'finance_officers', current_user_id)
+            if not officer or officer.park_name != document['park']:
+                return jsonify({"error": "Record not found"}), 404
+    except Exception as e:
+        print(f"Document error: {e}")
+        return jsonify({"error": "Failed to load document"}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        connection.close()
+
+    # The digest covers the source rows, so a matching If-None-Match gets a 304 without rendering
+    etag = f"{digest}.{fmt}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['X-Document-Cache'] = 'hit'
+        return response
+
+    path, cached = document_cache.fetch(digest, document, fmt)
+    response = send_file(path, mimetype=FORMATS[fmt], etag=etag, max_age=0,
+                         download_name=f"{document['number']}.{fmt}", as_attachment=fmt == 'pdf')
+    response.cache_control.private = True
+    response.headers['X-Document-Cache'] = 'hit' if cached else 'miss'
+    return response
+
+
+@bp.route('/api/documents/month-end', methods=['POST'])
+@token_required
+def render_month_documents(current_user_id):
+    """Pre-render every invoice and receipt created in a month (month-end run)."""
+    if g.token_claims.get('role') not in ('admin', 'auditor'):
+        return jsonify({"error": "Unauthorized: admin or auditor access required"}), 403
+    data = request.json or {}
+    try:
+        year, month = parse_month(data.get('month'))
+    except ValueError:
+        return jsonify({"error": "month must be YYYY-MM"}), 400
+    formats = data.get('formats') or list(FORMATS)
+    if not isinstance(formats, list) or not set(formats) <= set(FORMATS):
+        return jsonify({"error": f"formats must be a subset of {list(FORMATS)}"}), 400
+
+    connection = get_db_connection()
+    if not connection or isinstance(connection, str):
+        return jsonify({"error": "Database connection failed"}), 500
+    try:
+        return jsonify(render_month(connection, year, month, tuple(formats))), 200
+    except Exception as e:
+        print(f"Month-end render error: {e}")
+        return jsonify({"error": f"Failed to render documents: {str(e)}"}), 500
+    finally:
+        connection.close()
@@ -0,0 +1,409 @@
+"""Visitor accounts: /api/visitor/*."""
+from datetime import datetime
+import hashlib
+import re
+
+from flask import Blueprint, current_app, jsonify, request
+import jwt
+
+from core import generate_salt, get_db_connection, hash_password, login_activity, token_required
+from timeline import DEFAULT_LIMIT, MAX_LIMIT, timeline
+from visitor_links import link_visitor
+
+
+bp = Blueprint('visitor', __name__)
+
+
+@bp.route('/api/visitor/profile', methods=['GET'])
+@token_required
+def get_visitor_profile(current_user_id):
+    """Retrieve the logged-in visitor's profile information."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, first_name, last_name, email
+            FROM visitors
+            WHERE id = %s
+        """, (current_user_id,))
+        visitor = cursor.fetchone()
+        
+        if not visitor:
+            return jsonify({"error": "Visitor not found"}), 404
+        
+        return jsonify({
+            "user": {
+                "id": str(visitor['id']),
+                "firstName": visitor['first_name'],
+                "lastName": visitor['last_name'],
+                "email": visitor['email']
+            }
+        }), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve visitor profile"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/visitor/profile', methods=['PUT'])
+@token_required
+def update_visitor_profile(current_user_id):
+    """Update the logged-in visitor's profile information."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Validate email format
+        if not re.match(r"[^@]+@[^@]+\.[^@]+", data['email']):
+            return jsonify({"error": "Invalid email format"}), 400
+
+        cursor = connection.cursor()
+        
+        # Check if email is already in use by another visitor
+        cursor.execute("SELECT id FROM visitors WHERE email = %s AND id != %s", 
+                      (data['email'], current_user_id))
+        if cursor.fetchone():
+            return jsonify({"error": "Email already in use by another visitor"}), 409
+
+        # If password update is requested
+        if 'currentPassword' in data and 'newPassword' in data:
+            # Verify current password
+            cursor.execute("SELECT password_hash FROM visitors WHERE id = %s", (current_user_id,))
+            visitor = cursor.fetchone()
+            if not visitor:
+                return jsonify({"error": "Visitor not found"}), 404
+
+            stored_password = visitor[0]
+            
+            # Check if password is in salted format
+            if ':' in stored_password:
+                stored_salt, stored_hash = stored_password.split(':')
+                if hash_password(data['currentPassword'], stored_salt) != stored_hash:
+                    return jsonify({"error": "Current password is incorrect"}), 401
+            else:
+                if hashlib.sha256(data['currentPassword'].encode()).hexdigest() != stored_password:
+                    return jsonify({"error": "Current password is incorrect"}), 401
+
+            # Generate new salt and hash for the new password
+            new_salt = generate_salt()
+            new_hash = hash_password(data['newPassword'], new_salt)
+            new_stored_password = f"{new_salt}:{new_hash}"
+
+            # Update visitor with new password
+            cursor.execute("""
+                UPDATE visitors 
+                SET first_name = %s, 
+                    last_name = %s, 
+                    email = %s,
+                    password_hash = %s
+                WHERE id = %s
+            """, (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                new_stored_password,
+                current_user_id
+            ))
+        else:
+            # Update visitor without password change
+            cursor.execute("""
+                UPDATE visitors 
+                SET first_name = %s, 
+                    last_name = %s, 
+                    email = %s
+                WHERE id = %s
+            """, (
+                data['firstName'],
+                data['lastName'],
+                data['email'],
+                current_user_id
+            ))
+
+        connection.commit()
+        
+        return jsonify({
+            "message": "Profile updated successfully",
+            "passwordUpdated": 'currentPassword' in data
+        }), 200
+        
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": f"Failed to update visitor profile: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+
+
+
+
+
+
+
+@bp.route('/api/visitor/data', methods=['GET'])
+@token_required
+def get_visitor_data(current_user_id):
+    """Retrieve all donations, tours, and services for the logged-in visitor."""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        visitor_id = int(current_user_id)
+
+        # Fetch donations
+        cursor.execute("""
+            SELECT 
+                id, donation_type AS donationType, amount, park_name AS parkName,
+                first_name AS firstName, last_name AS lastName, email,
+                message, is_anonymous AS isAnonymous, created_at AS createdAt
+            FROM donations
+            WHERE visitor_id = %s
+            ORDER BY created_at DESC
+        """, (visitor_id,))
+        donations = cursor.fetchall()
+        for donation in donations:
+            donation['createdAt'] = donation['createdAt'].strftime('%Y-%m-%d %H:%M:%S')
+            donation['amount'] = float(donation['amount'])
+
+        # Fetch tours
+        cursor.execute("""
+            SELECT 
+                id, park_name AS parkName, tour_name AS tourName, date, time,
+                guests, amount, first_name AS firstName, last_name AS lastName,
+                email, special_requests AS specialRequests, created_at AS createdAt
+            FROM tours
+            WHERE visitor_id = %s
+            ORDER BY created_at DESC
+        """, (visitor_id,))
+        tours = cursor.fetchall()
+        for tour in tours:
+            tour['createdAt'] = tour['createdAt'].strftime('%Y-%m-%d %H:%M:%S')
+            tour['date'] = tour['date'].strftime('%Y-%m-%d')
+            tour['time'] = str(tour['time'])
+            tour['amount'] = float(tour['amount'])
+
+        # Fetch services
+        cursor.execute("""
+            SELECT 
+                id, first_name AS firstName, last_name AS lastName, email, phone,
+                company_type AS companyType, provided_service AS providedService,
+                company_name AS companyName, tax_id AS taxId, status,
+                created_at AS createdAt
+            FROM services
+            WHERE visitor_id = %s
+            ORDER BY created_at DESC
+        """, (visitor_id,))
+        services = cursor.fetchall()
+        for service in services:
+            service['createdAt'] = service['createdAt'].strftime('%Y-%m-%d %H:%M:%S')
+
+        return jsonify({
+            "donations": donations,
+            "tours": tours,
+            "services": services
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve visitor data"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/visitor/timeline', methods=['GET'])
+@token_required
+def get_visitor_timeline(current_user_id):
+    """One page of the visitor's donations, tours and services, newest first.
+
+    Pass the returned nextCursor as ?cursor= to fetch the following page.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = connection.cursor(dictionary=True)
+        try:
+            entries, next_cursor = timeline(cursor, int(current_user_id), limit, request.args.get('cursor'))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        return jsonify({
+            "entries": entries,
+            "limit": limit,
+            "nextCursor": next_cursor
+        }), 200
+
+    except Exception as e:
+        print(f"Database error: {e}")
+        return jsonify({"error": "Failed to retrieve visitor timeline"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/visitor/register', methods=['POST'])
+def visitor_register():
+    """Register a new visitor."""
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        required_fields = ['firstName', 'lastName', 'email', 'password']
+        
+        if not all(field in data for field in required_fields):
+            missing_fields = [field for field in required_fields if field not in data]
+            return jsonify({"error": "Missing required fields", "missing": missing_fields}), 400
+
+        # Validate email format
+        if not re.match(r"[^@]+@[^@]+\.[^@]+", data['email']):
+            return jsonify({"error": "Invalid email format"}), 400
+
+        # Validate password strength
+        if len(data['password']) < 8:
+            return jsonify({"error": "Password must be at least 8 characters long"}), 400
+        if not re.search(r"[A-Z]", data['password']) or not re.search(r"[0-9]", data['password']):
+            return jsonify({"error": "Password must contain at least one uppercase letter and one number"}), 400
+
+        cursor = connection.cursor()
+        # Check if email already exists
+        cursor.execute("SELECT id FROM visitors WHERE email = %s", (data['email'],))
+        if cursor.fetchone():
+            return jsonify({"error": "Email already exists"}), 409
+
+        # Generate salt and hash password
+        salt = generate_salt()
+        password_hash = hash_password(data['password'], salt)
+
+        # Store salt and hash together (e.g., "salt:hash")
+        stored_password = f"{salt}:{password_hash}"
+
+        # Insert new visitor
+        cursor.execute("""
+            INSERT INTO visitors (
+                first_name, last_name, email, password_hash
+            ) VALUES (%s, %s, %s, %s)
+        """, (
+            data['firstName'],
+            data['lastName'],
+            data['email'],
+            stored_password
+        ))
+        new_visitor_id = cursor.lastrowid
+        # Donations, bookings and payments made as a guest before signing up
+        link_visitor(cursor, new_visitor_id, data['email'])
+        connection.commit()
+        
+        return jsonify({
+            "message": "Visitor registered successfully",
+            "id": new_visitor_id
+        }), 201
+
+    except Exception as e:
+        print(f"Visitor registration error: {str(e)}")
+        return jsonify({"error": f"Failed to register visitor: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+@bp.route('/api/visitor/login', methods=['POST'])
+def visitor_login():
+    """Authenticate a visitor using email and password."""
+    connection = get_db_connection()
+    if isinstance(connection, tuple):
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    try:
+        data = request.json
+        email = data.get('email')
+        password = data.get('password')
+        
+        if not email or not password:
+            return jsonify({"error": "Email and password are required"}), 400
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM visitors WHERE email = %s", (email,))
+        visitor = cursor.fetchone()
+        
+        if not visitor:
+            return jsonify({"error": "Invalid credentials"}), 401
+
+        # Check if password is in salted format
+        password_match = False
+        if ':' in visitor['password_hash']:
+            # New salted format
+            stored_salt, stored_hash = visitor['password_hash'].split(':')
+            password_hash = hash_password(password, stored_salt)
+            password_match = password_hash == stored_hash
+        else:
+            # Legacy unsalted SHA-256
+            password_hash = hashlib.sha256(password.encode()).hexdigest()
+            password_match = password_hash == visitor['password_hash']
+            if password_match:
+                # Upgrade to salted hash
+                salt = generate_salt()
+                new_hash = hash_password(password, salt)
+                new_stored_password = f"{salt}:{new_hash}"
+                cursor.execute("UPDATE  visitors SET password_hash = %s WHERE id = %s", 
+                              (new_stored_password, visitor['id']))
+                connection.commit()
+
+        if not password_match:
+            return jsonify({"error": "Invalid credentials"}), 401
+
+        login_activity.record('visitors', visitor['id'], visitor['email'], 'visitor')
+
+        # Create JWT token
+        token = jwt.encode({
+            'user_id': str(visitor['id']),
+            'email': visitor['email'],
+            'role': 'visitor',
+            'exp': int(datetime.utcnow().timestamp() + 86400)
+        }, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+        return jsonify({
+            "message": "Login successful",
+            "token": token,
+            "user": {
+                "id": str(visitor['id']),
+                "firstName": visitor['first_name'],
+                "lastName": visitor['last_name'],
+                "email": visitor['email'],
+                "role": "visitor"
+            },
+            "dashboard": "/visitors/Dashboard"
+        }), 200
+
+    except Exception as e:
+        print(f"Visitor login error: {str(e)}")
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
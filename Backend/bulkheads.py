@@ -0,0 +1,226 @@
+"""Per-class concurrency budgets ("bulkheads") for the request threads and DB pool.
+
+Every endpoint belongs to one class (ENDPOINT_CLASSES, anything unlisted is
+`default`). A class may run `limit` requests at once; further requests wait in
+its queue for up to `wait` seconds, and once `queue` requests are already
+waiting, new ones are refused at once. A refused or timed-out request gets a
+503 with Retry-After instead of holding a worker thread and a connection, so a
+burst of financial reports cannot take the threads checkout needs:
+
+    class      limit                    queue    wait
+    checkout   C                        C        5s
+    reports    R = max(1, C // 4)       R        2s
+    default    max(1, C - 2 * R)        R        2s
+
+Reports and default together stay below C, so at least R slots are always
+left for checkout once C >= 3 (below that each class still gets one slot).
+C is the worker's DB pool size (DB_POOL_SIZE, capped at WEB_THREADS), or
+WEB_THREADS without a pool. Override a class with BULKHEAD_<CLASS>=limit:queue:wait,
+e.g. BULKHEAD_REPORTS=1:0:0 to run one report at a time and refuse the rest,
+or turn them all off with BULKHEADS=0. Limits are per worker process; in the
+ASGI mode the coroutine routes in asgi.py take the same slots as the Flask
+routes of their worker.
+"""
+import math
+import os
+import threading
+import time
+
+from flask import g, jsonify, request
+
+
+BULKHEADS_ENABLED = os.getenv('BULKHEADS', '1') != '0'
+
+ENDPOINT_CLASSES = {
+    # Visitor payments and bookings: the traffic the other budgets protect
+    'public.donate': 'checkout',
+    'public.book_tour': 'checkout',
+    'public.process_payment': 'checkout',
+    'public.services': 'checkout',
+    # Whole-table reads and aggregations
+    'finance.get_all_approved_data': 'reports',
+    'auditor.get_auditor_financial_report': 'reports',
+    'government.get_park_income': 'reports',
+    'government.get_park_expenses': 'reports',
+    'government.get_government_dashboard_stats': 'reports',
+    'admin.get_dashboard_stats': 'reports',
+    'admin.get_login_metrics': 'reports',
+    'public.search_records': 'reports',
+    'public.render_month_documents': 'reports',
+}
+
+# Long-lived streams, file serving and the metrics endpoint never queue
+EXEMPT_ENDPOINTS = {'public.stream_events', 'public.serve_upload', 'admin.get_metrics', 'static'}
+
+
+def capacity():
+    threads = int(os.getenv('WEB_THREADS', 4))
+    pool = int(os.getenv('DB_POOL_SIZE', 0))
+    return max(min(pool, threads) if pool > 0 else threads, 1)
+
+
+def default_settings(total):
+    """{class: (limit, queue, wait seconds)} for a worker with `total` slots."""
+    reports = max(1, total // 4)
+    return {
+        'checkout': (total, total, 5.0),
+        'reports': (reports, reports, 2.0),
+        # Leaves `reports` slots that only checkout can take
+        'default': (max(1, total - 2 * reports), reports, 2.0),
+    }
+
+
+def parse_setting(value, fallback):
+    limit, queue, wait = (value.split(':') + ['', '', ''])[:3]
+    return (
+        max(int(limit), 1) if limit else fallback[0],
+        max(int(queue), 0) if queue else fallback[1],
+        max(float(wait), 0.0) if wait else fallback[2],
+    )
+
+
+class Bulkhead:
+    """A semaphore of `limit` slots with a bounded, deadline-limited wait queue."""
+
+    def __init__(self, name, limit, queue, wait):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.waited = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.hold_average = 0.0
+
+    def acquire(self):
+        """Take a slot; returns False when the request should be refused."""
+        if self._slots.acquire(blocking=False):
+            self._admit()
+            return True
+
+        with self._lock:
+            if self.queued >= self.queue:
+                self.shed += 1
+                return False
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.wait) if self.wait > 0 else False
+        waited = time.monotonic() - started
+        with self._lock:
+            self.queued -= 1
+            self.waited += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            if not acquired:
+                self.timed_out += 1
+        if acquired:
+            self._admit()
+        return acquired
+
+    def _admit(self):
+        with self._lock:
+            self.active += 1
+            self.admitted += 1
+
+    def release(self, held):
+        with self._lock:
+            self.active -= 1
+            # Moving average of how long a request keeps its slot, for Retry-After
+            self.hold_average += 0.1 * (held - self.hold_average)
+        self._slots.release()
+
+    def retry_after(self):
+        """Seconds until a slot is likely free: the queue ahead, drained `limit` at a time."""
+        with self._lock:
+            backlog = self.queued + 1
+        return max(1, math.ceil(self.hold_average * backlog / self.limit))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "queue_limit": self.queue,
+                "wait_seconds": self.wait,
+                "active": self.active,
+                "queued": self.queued,
+                "peak_queued": self.peak_queued,
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "timed_out": self.timed_out,
+                "avg_wait_ms": round(self.wait_total / self.waited * 1000, 1) if self.waited else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 1),
+                "avg_hold_ms": round(self.hold_average * 1000, 1),
+            }
+
+
+class Bulkheads:
+    """The per-process set of bulkheads, sized on first use in each worker."""
+
+    def __init__(self, endpoint_classes=ENDPOINT_CLASSES, exempt=EXEMPT_ENDPOINTS):
+        self.endpoint_classes = endpoint_classes
+        self.exempt = exempt
+        self._bulkheads = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def classes(self):
+        # Sized after fork, from the DB_POOL_SIZE production.py gives each worker
+        if self._bulkheads is None or self._pid != os.getpid():
+            with self._lock:
+                if self._bulkheads is None or self._pid != os.getpid():
+                    bulkheads = {}
+                    for name, fallback in default_settings(capacity()).items():
+                        limit, queue, wait = parse_setting(os.getenv(f'BULKHEAD_{name.upper()}', ''), fallback)
+                        bulkheads[name] = Bulkhead(name, limit, queue, wait)
+                    self._bulkheads = bulkheads
+                    self._pid = os.getpid()
+        return self._bulkheads
+
+    def classify(self, endpoint):
+        if endpoint is None or endpoint in self.exempt:
+            return None
+        return self.endpoint_classes.get(endpoint, 'default')
+
+    def bulkhead_for(self, endpoint):
+        """The endpoint's bulkhead, or None when it is exempt or bulkheads are off."""
+        name = self.classify(endpoint) if BULKHEADS_ENABLED else None
+        return None if name is None else self.classes()[name]
+
+    def admit(self):
+        """before_request hook: hold a slot for the request or refuse it with a 503."""
+        if request.method == 'OPTIONS':
+            return None
+        bulkhead = self.bulkhead_for(request.endpoint)
+        if bulkhead is None:
+            return None
+
+        if not bulkhead.acquire():
+            response = jsonify({"error": "Server busy, please retry shortly", "class": bulkhead.name})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(bulkhead.retry_after())
+            return response
+        g.bulkhead = (bulkhead, time.monotonic())
+        return None
+
+    def release(self, exc=None):
+        """teardown_request hook: give the slot back, whatever the outcome."""
+        held = g.pop('bulkhead', None)
+        if held is not None:
+            bulkhead, started = held
+            bulkhead.release(time.monotonic() - started)
+
+    def snapshot(self):
+        return {name: bulkhead.snapshot() for name, bulkhead in self.classes().items()}
+
+
+bulkheads = Bulkheads()
@@ -0,0 +1,353 @@
+"""Online latin1 -> utf8mb4 conversion for donations, tours, payments and services.
+
+These four tables are latin1_swedish_ci while `visitors`, the staff tables and
+the request tables are utf8mb4_general_ci, so a join such as
+`payments.customer_email = donations.email` (get_admin_donations) converts one
+side row by row and cannot use an index. `ALTER TABLE ... CONVERT TO` rebuilds
+the table with writes blocked, so this tool converts it next to the live one:
+
+1. create `_<table>_new` like the table, converted to utf8mb4 and with the
+   email indexes the joins need (EXTRA_INDEXES);
+2. add triggers that mirror every INSERT/UPDATE/DELETE into the copy;
+3. copy the rows in primary-key chunks of --chunk-size, each under a shared
+   lock on its source range, and compare a per-chunk checksum of both sides
+   (row count and BIT_XOR of CRC32 over every column), recopying a chunk that
+   differs;
+4. verify every chunk once more, then swap the tables with one atomic
+   RENAME, move the table's own triggers and foreign keys to the new table and
+   drop the old one (kept as `_<table>_old` with --keep-old).
+
+Finally it EXPLAINs the queries in PLAN_CHECKS and fails unless each one reads
+the checked table through the expected key (`ref`, `eq_ref` or `range`). Run it against a
+backup first, then:
+
+    python charset_migration.py                      # all four tables
+    python charset_migration.py --tables donations --chunk-size 2000 --sleep 0.05
+    python charset_migration.py --check-plans        # only the EXPLAIN checks
+
+While a table's triggers are being moved at the swap, its existing triggers
+(change counters, park_id) can fire twice for a write; both are idempotent or
+only bump a cache counter.
+"""
+import argparse
+import sys
+import time
+
+
+TARGET_CHARSET = 'utf8mb4'
+TARGET_COLLATION = 'utf8mb4_general_ci'
+TABLES = ('donations', 'tours', 'payments', 'services')
+# The email keys are the ones migrations/010 builds, for process_payment and link_visitor
+EXTRA_INDEXES = {
+    'donations': ["ADD KEY IF NOT EXISTS `email_created` (`email`, `created_at`)"],
+    'tours': ["ADD KEY IF NOT EXISTS `email_created` (`email`, `created_at`)"],
+    'services': ["ADD KEY IF NOT EXISTS `email_created` (`email`, `created_at`)"],
+    'payments': ["ADD KEY `customer_email_park` (`customer_email`, `park_name`)"],
+}
+STRING_TYPES = {'char', 'varchar', 'tinytext', 'text', 'mediumtext', 'longtext', 'enum', 'set'}
+VERIFY_ATTEMPTS = 3
+
+# (description, query, table alias that must be an index lookup, acceptable keys)
+PLAN_CHECKS = [
+    ("process_payment: newest donation for an email",
+     "SELECT d.id FROM donations d WHERE d.email = 'visitor@example.org' "
+     "AND d.created_at >= NOW() - INTERVAL 1 HOUR ORDER BY d.created_at DESC LIMIT 1",
+     'd', ('email_created',)),
+    ("process_payment: newest tour for an email",
+     "SELECT t.id FROM tours t WHERE t.email = 'visitor@example.org' "
+     "AND t.created_at >= NOW() - INTERVAL 1 HOUR ORDER BY t.created_at DESC LIMIT 1",
+     't', ('email_created',)),
+    ("link_visitor: guest services for an email",
+     "SELECT s.id FROM services s WHERE s.email = 'visitor@example.org' AND s.visitor_id IS NULL",
+     's', ('email_created',)),
+    ("get_admin_donations: donations -> payments",
+     "SELECT d.id, p.transaction_id FROM donations d LEFT JOIN payments p "
+     "ON p.customer_email = d.email AND p.park_name = d.park_name AND p.payment_type = 'donation'",
+     'p', ('customer_email_park',)),
+]
+
+
+class VerificationError(RuntimeError):
+    pass
+
+
+def columns(cursor, table):
+    """(name, data_type) of every column in ordinal order."""
+    cursor.execute("""
+        SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY ORDINAL_POSITION
+    """, (table,))
+    return [(row[0], row[1].lower()) for row in cursor.fetchall()]
+
+
+def table_collation(cursor, table):
+    cursor.execute("""
+        SELECT TABLE_COLLATION FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def table_triggers(cursor, table):
+    """(name, timing, event, statement) of the triggers defined on `table`."""
+    cursor.execute("""
+        SELECT TRIGGER_NAME, ACTION_TIMING, EVENT_MANIPULATION, ACTION_STATEMENT
+        FROM information_schema.TRIGGERS
+        WHERE EVENT_OBJECT_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = %s
+        ORDER BY ACTION_TIMING, EVENT_MANIPULATION, ACTION_ORDER
+    """, (table,))
+    return cursor.fetchall()
+
+
+def foreign_keys(cursor, table):
+    cursor.execute("""
+        SELECT CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND REFERENCED_TABLE_NAME IS NOT NULL
+        ORDER BY CONSTRAINT_NAME, ORDINAL_POSITION
+    """, (table,))
+    return cursor.fetchall()
+
+
+def checksum_sql(table, cols):
+    """Row count and order-independent checksum of an id range, comparable across charsets."""
+    parts = []
+    for name, data_type in cols:
+        if data_type in STRING_TYPES:
+            parts.append(f"CONVERT(`{name}` USING {TARGET_CHARSET})")
+        else:
+            parts.append(f"`{name}`")
+    nulls = ", ".join(f"ISNULL(`{name}`)" for name, _ in cols)
+    return (
+        f"SELECT COUNT(*), COALESCE(BIT_XOR(CRC32(CONCAT_WS('#', {', '.join(parts)}, CONCAT({nulls})))), 0) "
+        f"FROM `{table}` WHERE id BETWEEN %s AND %s"
+    )
+
+
+class TableConversion:
+    def __init__(self, connection, table, chunk_size=1000, sleep=0.0, keep_old=False):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.table = table
+        self.shadow = f"_{table}_new"
+        self.old = f"_{table}_old"
+        self.chunk_size = chunk_size
+        self.sleep = sleep
+        self.keep_old = keep_old
+        self.cols = columns(self.cursor, table)
+        self.col_list = ", ".join(f"`{name}`" for name, _ in self.cols)
+        self.copied = 0
+        self.recopied_chunks = 0
+
+    def log(self, message):
+        print(f"[{self.table}] {message}", flush=True)
+
+    def execute(self, sql, params=None):
+        self.cursor.execute(sql, params or ())
+
+    def run(self):
+        if not self.cols:
+            raise RuntimeError(f"Table {self.table} does not exist")
+        if not any(name == 'id' and data_type.endswith('int') for name, data_type in self.cols):
+            raise RuntimeError(f"Table {self.table} has no integer id column to chunk on")
+        if (table_collation(self.cursor, self.table) or '').startswith(TARGET_CHARSET):
+            self.log("already utf8mb4, skipping")
+            return
+        started = time.monotonic()
+        self.prepare()
+        try:
+            self.copy()
+            self.verify_all()
+        except Exception:
+            self.log("aborted; removing the copy and its triggers")
+            self.drop_mirror_triggers()
+            self.execute(f"DROP TABLE IF EXISTS `{self.shadow}`")
+            raise
+        self.swap()
+        self.log(f"done: {self.copied} rows, {self.recopied_chunks} chunks recopied, "
+                 f"{time.monotonic() - started:.1f}s")
+
+    def prepare(self):
+        self.execute(f"DROP TABLE IF EXISTS `{self.shadow}`")
+        self.execute(f"CREATE TABLE `{self.shadow}` LIKE `{self.table}`")
+        changes = [f"CONVERT TO CHARACTER SET {TARGET_CHARSET} COLLATE {TARGET_COLLATION}"]
+        changes += EXTRA_INDEXES.get(self.table, [])
+        self.execute(f"ALTER TABLE `{self.shadow}` {', '.join(changes)}")
+
+        new_values = ", ".join(f"NEW.`{name}`" for name, _ in self.cols)
+        self.execute(
+            f"CREATE TRIGGER `{self.table}_osc_ai` AFTER INSERT ON `{self.table}` FOR EACH ROW "
+            f"REPLACE INTO `{self.shadow}` ({self.col_list}) VALUES ({new_values})"
+        )
+        self.execute(
+            f"CREATE TRIGGER `{self.table}_osc_au` AFTER UPDATE ON `{self.table}` FOR EACH ROW "
+            f"BEGIN "
+            f"DELETE FROM `{self.shadow}` WHERE id = OLD.id; "
+            f"REPLACE INTO `{self.shadow}` ({self.col_list}) VALUES ({new_values}); "
+            f"END"
+        )
+        self.execute(
+            f"CREATE TRIGGER `{self.table}_osc_ad` AFTER DELETE ON `{self.table}` FOR EACH ROW "
+            f"DELETE FROM `{self.shadow}` WHERE id = OLD.id"
+        )
+        self.log(f"created {self.shadow} and mirror triggers")
+
+    def drop_mirror_triggers(self):
+        for suffix in ('ai', 'au', 'ad'):
+            self.execute(f"DROP TRIGGER IF EXISTS `{self.table}_osc_{suffix}`")
+
+    def id_bounds(self):
+        self.execute(f"SELECT MIN(id), MAX(id) FROM `{self.table}`")
+        return self.cursor.fetchone()
+
+    def chunks(self):
+        low, high = self.id_bounds()
+        if low is None:
+            return
+        start = low
+        while start <= high:
+            yield start, start + self.chunk_size - 1
+            start += self.chunk_size
+
+    def copy_chunk(self, start, end, replace=False):
+        verb = "REPLACE" if replace else "INSERT IGNORE"
+        self.execute(
+            f"{verb} INTO `{self.shadow}` ({self.col_list}) "
+            f"SELECT {self.col_list} FROM `{self.table}` WHERE id BETWEEN %s AND %s LOCK IN SHARE MODE",
+            (start, end)
+        )
+        copied = self.cursor.rowcount
+        if replace:
+            # Rows deleted from the source since the first copy
+            self.execute(
+                f"DELETE s FROM `{self.shadow}` s LEFT JOIN `{self.table}` t ON t.id = s.id "
+                f"WHERE s.id BETWEEN %s AND %s AND t.id IS NULL",
+                (start, end)
+            )
+        self.connection.commit()
+        return copied
+
+    def chunk_matches(self, start, end):
+        """Compare both sides of a range while the source range is share-locked."""
+        self.execute(checksum_sql(self.table, self.cols) + " LOCK IN SHARE MODE", (start, end))
+        source = self.cursor.fetchone()
+        self.execute(checksum_sql(self.shadow, self.cols), (start, end))
+        copy = self.cursor.fetchone()
+        self.connection.commit()
+        return tuple(source) == tuple(copy)
+
+    def verify_chunk(self, start, end):
+        for _ in range(VERIFY_ATTEMPTS):
+            if self.chunk_matches(start, end):
+                return
+            self.recopied_chunks += 1
+            self.copy_chunk(start, end, replace=True)
+        raise VerificationError(f"{self.table} ids {start}-{end} still differ after {VERIFY_ATTEMPTS} recopies")
+
+    def copy(self):
+        for start, end in self.chunks():
+            self.copied += self.copy_chunk(start, end)
+            self.verify_chunk(start, end)
+            if self.sleep:
+                time.sleep(self.sleep)
+        self.log(f"copied {self.copied} rows")
+
+    def verify_all(self):
+        for start, end in self.chunks():
+            self.verify_chunk(start, end)
+            if self.sleep:
+                time.sleep(self.sleep)
+        self.execute(f"SELECT COUNT(*) FROM `{self.table}`")
+        source_rows = self.cursor.fetchone()[0]
+        self.execute(f"SELECT COUNT(*) FROM `{self.shadow}`")
+        copy_rows = self.cursor.fetchone()[0]
+        self.connection.commit()
+        if source_rows != copy_rows:
+            raise VerificationError(f"{self.table} has {source_rows} rows but the copy has {copy_rows}")
+        self.log(f"verified {source_rows} rows")
+
+    def swap(self):
+        own_triggers = [t for t in table_triggers(self.cursor, self.table) if '_osc_' not in t[0]]
+        own_foreign_keys = foreign_keys(self.cursor, self.table)
+
+        # Give the copy the table's own triggers first so no write goes without them
+        for name, timing, event, statement in own_triggers:
+            self.execute(f"CREATE TRIGGER `{name}_osc` {timing} {event} ON `{self.shadow}` FOR EACH ROW {statement}")
+
+        self.execute(f"DROP TABLE IF EXISTS `{self.old}`")
+        self.execute(f"RENAME TABLE `{self.table}` TO `{self.old}`, `{self.shadow}` TO `{self.table}`")
+        self.log("swapped tables")
+
+        self.drop_mirror_triggers()
+        for name, timing, event, statement in own_triggers:
+            self.execute(f"DROP TRIGGER IF EXISTS `{name}`")
+            self.execute(f"CREATE TRIGGER `{name}` {timing} {event} ON `{self.table}` FOR EACH ROW {statement}")
+            self.execute(f"DROP TRIGGER IF EXISTS `{name}_osc`")
+
+        if own_foreign_keys:
+            self.execute("SET SESSION foreign_key_checks = 0")
+            try:
+                for name, column, ref_table, ref_column in own_foreign_keys:
+                    self.execute(f"ALTER TABLE `{self.old}` DROP FOREIGN KEY `{name}`")
+                    self.execute(
+                        f"ALTER TABLE `{self.table}` ADD CONSTRAINT `{name}` FOREIGN KEY (`{column}`) "
+                        f"REFERENCES `{ref_table}` (`{ref_column}`)"
+                    )
+            finally:
+                self.execute("SET SESSION foreign_key_checks = 1")
+
+        if not self.keep_old:
+            self.execute(f"DROP TABLE `{self.old}`")
+
+
+def check_plans(cursor):
+    """EXPLAIN each PLAN_CHECKS query; returns the failures as readable strings."""
+    failures = []
+    for description, query, alias, keys in PLAN_CHECKS:
+        cursor.execute("EXPLAIN " + query)
+        names = [column[0] for column in cursor.description]
+        rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+        step = next((row for row in rows if row.get('table') == alias), None)
+        if step is None:
+            failures.append(f"{description}: no plan step for {alias}")
+        elif step.get('type') not in ('ref', 'eq_ref', 'range') or step.get('key') not in keys:
+            failures.append(f"{description}: {alias} uses type={step.get('type')} key={step.get('key')}, "
+                            f"expected a lookup on {' or '.join(keys)}")
+        else:
+            print(f"ok  {description}: {step.get('type')} on {step.get('key')}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tables', default=','.join(TABLES))
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--sleep', type=float, default=0.0, help="pause between chunks, in seconds")
+    parser.add_argument('--keep-old', action='store_true', help="keep the latin1 table as _<table>_old")
+    parser.add_argument('--check-plans', action='store_true', help="only run the EXPLAIN checks")
+    args = parser.parse_args(argv)
+
+    from server import get_db_connection
+
+    connection = get_db_connection()
+    if isinstance(connection, str):
+        raise SystemExit(f"Database connection failed: {connection}")
+    try:
+        if not args.check_plans:
+            for table in filter(None, args.tables.split(',')):
+                if table not in TABLES:
+                    raise SystemExit(f"Unknown table {table}; expected one of {', '.join(TABLES)}")
+                TableConversion(connection, table, args.chunk_size, args.sleep, args.keep_old).run()
+        failures = check_plans(connection.cursor())
+    finally:
+        connection.close()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
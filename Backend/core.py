@@ -0,0 +1,269 @@
+"""Shared state for the route blueprints: database access, auth and per-process services.
+
+Everything here is independent of the Flask app object, so the blueprints in
+blueprints/ can import it without importing server.py.
+"""
+import os
+import threading
+import time as time_module
+import hashlib
+from functools import wraps
+
+import jwt
+import mysql.connector
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+from dotenv import load_dotenv
+from flask import request, jsonify, has_request_context, g, current_app
+
+from idempotency import IdempotencyStore
+from db_router import PIN_COOKIE, PIN_HEADER, ReplicaRouter, parse_replicas
+import metrics
+import events
+from parks import parks
+from analytics import analytics_cache
+from login_activity import LoginActivityBuffer
+from mailer import EmailSender
+from invoices import document_cache
+from bulkheads import bulkheads
+from deadlines import QueryDeadlines
+import outbox
+import repository
+
+load_dotenv()
+
+UPLOAD_FOLDER = 'uploads'
+UPLOAD_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), UPLOAD_FOLDER)
+
+# MySQL database configuration
+db_config = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'park_conservation',
+    'port': 3306
+}
+
+# Per-process connection pool, enabled by DB_POOL_SIZE (set by production.py for each worker).
+# The pool is created lazily and re-created after fork so workers never share sockets.
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+_db_pool = None
+_db_pool_pid = None
+_db_pool_lock = threading.Lock()
+
+
+def db_pool_size():
+    # Read when a pool is created, not at import: `FLASK_ENV=production python server.py`
+    # imports this module before production.main() sets DB_POOL_SIZE
+    return int(os.getenv('DB_POOL_SIZE', 0))
+
+
+def get_db_pool():
+    global _db_pool, _db_pool_pid
+    pool_size = db_pool_size()
+    if pool_size <= 0:
+        return None
+    if _db_pool is None or _db_pool_pid != os.getpid():
+        with _db_pool_lock:
+            if _db_pool is None or _db_pool_pid != os.getpid():
+                # No session reset on return: it would drop the prepared statements
+                # cached by repository.py. Checkout rolls back any open transaction instead.
+                _db_pool = pooling.MySQLConnectionPool(
+                    pool_name=f"parkhub-{os.getpid()}",
+                    pool_size=pool_size,
+                    pool_reset_session=False,
+                    **db_config
+                )
+                _db_pool_pid = os.getpid()
+    return _db_pool
+
+
+# GET handlers read from DB_REPLICAS when configured, see db_router.py
+replica_router = ReplicaRouter(parse_replicas(os.getenv('DB_REPLICAS', ''), db_config), db_pool_size)
+metrics.register('replicas', replica_router.snapshot)
+metrics.register('parks', parks.snapshot)
+metrics.register('analytics', analytics_cache.snapshot)
+metrics.register('statements', repository.statements.snapshot)
+
+
+# Per-endpoint statement deadlines and KILL QUERY for abandoned requests, see deadlines.py
+query_deadlines = QueryDeadlines(
+    lambda host, port: mysql.connector.connect(**dict(db_config, host=host, port=port, connection_timeout=5))
+)
+metrics.register('deadlines', query_deadlines.snapshot)
+
+
+def get_db_connection():
+    connection = _checkout_connection()
+    if not isinstance(connection, str):
+        query_deadlines.attach(connection)
+    return connection
+
+
+def _checkout_connection():
+    try:
+        if replica_router.enabled and has_request_context() and request.method == 'GET':
+            client = ReplicaRouter.client_key(request.headers, request.remote_addr)
+            token = request.headers.get(PIN_HEADER) or request.cookies.get(PIN_COOKIE)
+            connection = replica_router.read_connection(client, token, current_app.config['SECRET_KEY'])
+            if connection is not None:
+                return connection
+
+        pool = get_db_pool()
+        if pool is None:
+            return mysql.connector.connect(**db_config)
+
+        # The pool does not block when exhausted, so wait briefly for a connection to be returned
+        deadline = time_module.monotonic() + DB_POOL_TIMEOUT
+        while True:
+            try:
+                connection = pool.get_connection()
+                connection.rollback()
+                return connection
+            except PoolError:
+                if time_module.monotonic() >= deadline:
+                    raise
+                time_module.sleep(0.01)
+    except Error as f:
+        return(f"The error '{f}' occurred")
+
+
+def pin_reads_after_write(response):
+    """Send a client's reads to the primary for a while after it has written."""
+    if replica_router.enabled and request.method in ('POST', 'PUT', 'DELETE') and response.status_code < 400:
+        # Handed to the client so whichever worker serves its next GET sees the pin
+        token, window = replica_router.pin(
+            ReplicaRouter.client_key(request.headers, request.remote_addr), current_app.config['SECRET_KEY']
+        )
+        response.headers[PIN_HEADER] = token
+        response.set_cookie(PIN_COOKIE, token, max_age=int(window) + 1, path='/api',
+                            httponly=True, samesite='Lax')
+    return response
+
+
+# SSE fan-out of committed outbox events, see events.py
+event_hub = events.EventHub(get_db_connection)
+metrics.register('events', event_hub.snapshot)
+
+# Response store for retried POSTs that carry an Idempotency-Key header
+idempotency_store = IdempotencyStore(get_db_connection)
+
+# last_login and login_logs writes, batched off the login path
+login_activity = LoginActivityBuffer(get_db_connection)
+metrics.register('login_activity', login_activity.snapshot)
+
+# Staff email campaigns, sent off the request path, see mailer.py
+email_sender = EmailSender(get_db_connection)
+metrics.register('email', email_sender.snapshot)
+
+# Rendered invoices and receipts on disk, see invoices.py
+metrics.register('documents', document_cache.snapshot)
+
+# Concurrency, queueing and shedding per endpoint class, see bulkheads.py
+metrics.register('bulkheads', bulkheads.snapshot)
+
+# Undelivered outbox events per relay consumer, see outbox.py
+metrics.register('outbox', lambda: outbox.backlog(get_db_connection))
+
+# Pillow is only imported once an avatar is uploaded or served
+_avatar_store = None
+_avatar_store_lock = threading.Lock()
+
+
+def get_avatar_store():
+    global _avatar_store
+    if _avatar_store is None:
+        with _avatar_store_lock:
+            if _avatar_store is None:
+                from avatars import AvatarStore
+                _avatar_store = AvatarStore(UPLOAD_ROOT, get_db_connection)
+                metrics.register('avatars', _avatar_store.snapshot)
+    return _avatar_store
+
+
+def generate_salt():
+    return os.urandom(16).hex()
+
+
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = request.headers.get('Authorization')
+        if not token:
+            print("Token missing")
+            return jsonify({'error': 'Token is missing'}), 401
+        try:
+            data = jwt.decode(token.split()[1], current_app.config['SECRET_KEY'], algorithms=["HS256"])
+            print(f"Token valid for user_id: {data['user_id']}")
+            kwargs['current_user_id'] = data['user_id']
+            g.token_claims = data
+        except jwt.ExpiredSignatureError:
+            print("Token expired")
+            return jsonify({'error': 'Token has expired'}), 401
+        except Exception as e:
+            print(f"Token error: {str(e)}")
+            return jsonify({'error': f'Invalid token: {str(e)}'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+
+def visitor_from_token():
+    """The visitor id from the request's token, or None for guests.
+
+    For endpoints guests may also use, so a missing, expired or non-visitor
+    token is not an error.
+    """
+    token = request.headers.get('Authorization')
+    if not token or len(token.split()) < 2:
+        return None
+    try:
+        data = jwt.decode(token.split()[1], current_app.config['SECRET_KEY'], algorithms=["HS256"])
+        return int(data['user_id']) if data.get('role') == 'visitor' else None
+    except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+        return None
+
+
+def hash_password(password, salt):
+    return hashlib.sha256((password + salt).encode()).hexdigest()
+
+
+def update_avatar(table, current_user_id):
+    """Validate an uploaded avatar, queue its thumbnails and point `table`'s row at it."""
+    from avatars import AvatarError, AVATAR_MAX_BYTES
+
+    # Reject oversized bodies before the form parser spools them to disk
+    if request.content_length and request.content_length > AVATAR_MAX_BYTES + 64 * 1024:
+        return jsonify({"error": f"Avatar must be at most {AVATAR_MAX_BYTES // (1024 * 1024)} MB"}), 413
+    if 'avatar' not in request.files:
+        return jsonify({"error": "No avatar file provided"}), 400
+
+    avatar = request.files['avatar']
+    if avatar.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+
+    try:
+        avatar_url = get_avatar_store().accept(avatar)
+    except AvatarError as e:
+        return jsonify({"error": str(e)}), 400
+
+    connection = get_db_connection()
+    if not connection or isinstance(connection, str):
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"UPDATE {table} SET avatar_url = %s WHERE id = %s", (avatar_url, current_user_id))
+        connection.commit()
+
+        return jsonify({
+            "message": "Avatar updated successfully",
+            "avatarUrl": avatar_url
+        }), 200
+
+    except Exception as e:
+        print(f"Avatar update error: {e}")
+        return jsonify({"error": "Failed to update avatar"}), 500
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
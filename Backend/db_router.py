@@ -0,0 +1,225 @@
+"""Read-replica routing with read-your-writes stickiness.
+
+GET handlers read from a replica listed in DB_REPLICAS ("host[:port],..."; the
+user, password and database are the primary's) and everything else uses the
+primary. After a client's write succeeds, that client's reads are pinned to the
+primary for READ_YOUR_WRITES_SECONDS, extended by the current replica lag, so
+the client always sees its own change (e.g. a new fund request right after
+create_fund_request). Clients are identified by their bearer token, or by
+address when anonymous.
+
+The next GET usually reaches another worker (or host), so the pin travels with
+the client: the write's response carries a signed pin token, as the
+PIN_HEADER response header and the PIN_COOKIE cookie, and every worker routes
+a GET that brings back an unexpired token for the same client to the primary.
+Cross-origin browser clients send the cookie when they fetch with
+credentials, or can echo the header. The worker that handled the write also
+remembers the pin itself, for clients that send back neither.
+
+A monitor thread polls each replica's replication status every
+REPLICA_LAG_CHECK_SECONDS. A replica that is unreachable, not replicating or
+more than REPLICA_MAX_LAG_SECONDS behind is taken out of rotation until it
+recovers; with no healthy replica every read falls back to the primary.
+"""
+import hashlib
+import hmac
+import itertools
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv('READ_YOUR_WRITES_SECONDS', 5))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 10))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', 5))
+MAX_PINNED_CLIENTS = 10000
+PIN_HEADER = 'X-Primary-Until'
+PIN_COOKIE = 'primary_until'
+
+
+def parse_replicas(spec, base_config):
+    """Build a connection config per replica from "host[:port],host[:port]"."""
+    replicas = []
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, port = entry.partition(':')
+        config = dict(base_config, host=host, port=int(port) if port else base_config.get('port', 3306))
+        replicas.append(config)
+    return replicas
+
+
+class Replica:
+    def __init__(self, config):
+        self.config = config
+        self.name = f"{config['host']}:{config['port']}"
+        self.healthy = True
+        self.lag = None
+        self.last_error = None
+        self.reads = 0
+        self.failures = 0
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def connect(self, pool_size):
+        if pool_size <= 0:
+            return mysql.connector.connect(**self.config)
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    # Keep prepared statements across checkouts, see server.get_db_pool
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=f"replica-{self.name}-{os.getpid()}",
+                        pool_size=pool_size,
+                        pool_reset_session=False,
+                        **self.config
+                    )
+                    self._pool_pid = os.getpid()
+        connection = self._pool.get_connection()
+        connection.rollback()
+        return connection
+
+
+class ReplicaRouter:
+    def __init__(self, replica_configs, pool_size=lambda: 0):
+        self.replicas = [Replica(config) for config in replica_configs]
+        # Called per connect, so the size production.py sets after import applies
+        self.pool_size = pool_size
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._cycle_lock = threading.Lock()
+        self._pins = {}
+        self._pins_lock = threading.Lock()
+        self._monitor_pid = None
+        self.pinned_reads = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self):
+        return bool(self.replicas)
+
+    @staticmethod
+    def client_key(headers, remote_addr):
+        token = headers.get('Authorization')
+        if token:
+            return hashlib.sha1(token.encode()).hexdigest()
+        return remote_addr or 'anonymous'
+
+    @staticmethod
+    def _signature(secret, client, expires):
+        return hmac.new(secret.encode(), f"{client}|{expires}".encode(), hashlib.sha256).hexdigest()[:32]
+
+    def pin(self, client, secret):
+        """Route `client`'s reads to the primary until its write has reached the replicas.
+
+        Returns (pin token, seconds it is valid) for the response.
+        """
+        lags = [replica.lag for replica in self.replicas if replica.healthy and replica.lag is not None]
+        window = max([READ_YOUR_WRITES_SECONDS] + [lag + 1 for lag in lags])
+        with self._pins_lock:
+            if len(self._pins) >= MAX_PINNED_CLIENTS:
+                now = time.monotonic()
+                self._pins = {key: until for key, until in self._pins.items() if until > now}
+            self._pins[client] = time.monotonic() + window
+        expires = int((time.time() + window) * 1000)
+        return f"{expires}.{self._signature(secret, client, expires)}", window
+
+    def is_pinned(self, client, token=None, secret=None):
+        """True while `client` has a pin on this worker or brought back a valid pin token."""
+        if token and secret:
+            expires, _, signature = token.partition('.')
+            if expires.isdigit() and int(expires) > time.time() * 1000 and hmac.compare_digest(
+                    signature, self._signature(secret, client, int(expires))):
+                return True
+        until = self._pins.get(client)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            with self._pins_lock:
+                self._pins.pop(client, None)
+            return False
+        return True
+
+    def read_connection(self, client, token=None, secret=None):
+        """A replica connection for `client`, or None when the read must go to the primary."""
+        self._ensure_monitor()
+        if self.is_pinned(client, token, secret):
+            self.pinned_reads += 1
+            return None
+        for _ in range(len(self.replicas)):
+            with self._cycle_lock:
+                replica = next(self._cycle)
+            if not replica.healthy:
+                continue
+            try:
+                connection = replica.connect(self.pool_size())
+                replica.reads += 1
+                return connection
+            except PoolError:
+                # Busy, not broken: try the next replica or the primary
+                continue
+            except Error as e:
+                replica.healthy = False
+                replica.failures += 1
+                replica.last_error = str(e)
+        self.fallbacks += 1
+        return None
+
+    def _ensure_monitor(self):
+        if self._monitor_pid != os.getpid():
+            self._monitor_pid = os.getpid()
+            threading.Thread(target=self._monitor, name='replica-lag-monitor', daemon=True).start()
+
+    def _monitor(self):
+        while True:
+            for replica in self.replicas:
+                self.check(replica)
+            time.sleep(REPLICA_LAG_CHECK_SECONDS)
+
+    def check(self, replica):
+        """Refresh a replica's lag and health from its replication status."""
+        try:
+            connection = mysql.connector.connect(connection_timeout=2, **replica.config)
+        except Error as e:
+            replica.healthy, replica.lag, replica.last_error = False, None, str(e)
+            return
+        try:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Error:
+                # MariaDB and MySQL < 8.0.22
+                cursor.execute("SHOW SLAVE STATUS")
+            status = cursor.fetchone()
+            cursor.close()
+            lag = None
+            if status:
+                lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            replica.lag = float(lag) if lag is not None else None
+            replica.healthy = replica.lag is not None and replica.lag <= REPLICA_MAX_LAG_SECONDS
+            replica.last_error = None if replica.healthy else 'replication stopped or lagging'
+        except Error as e:
+            replica.healthy, replica.lag, replica.last_error = False, None, str(e)
+        finally:
+            connection.close()
+
+    def snapshot(self):
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "reads": replica.reads,
+                    "failures": replica.failures,
+                    "last_error": replica.last_error
+                }
+                for replica in self.replicas
+            ],
+            "pinned_clients": len(self._pins),
+            "pinned_reads": self.pinned_reads,
+            "fallback_reads": self.fallbacks,
+            "max_lag_seconds": REPLICA_MAX_LAG_SECONDS
+        }
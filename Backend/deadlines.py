@@ -0,0 +1,256 @@
+"""Per-endpoint query deadlines and server-side cancellation.
+
+Every request gets a budget (ENDPOINT_DEADLINES, else QUERY_DEADLINE_DEFAULT
+seconds) that starts once it is admitted. Each connection the request checks
+out (core.get_db_connection) carries what is left of it to the server:
+
+- as the session's statement time limit: `max_statement_time` (seconds) on
+  MariaDB, `max_execution_time` (ms, SELECTs only) on MySQL. This is the
+  MAX_EXECUTION_TIME hint applied to every statement of the connection, so the
+  handlers' SQL does not change;
+- as the connector's read timeout, one second later, so a statement the server
+  does not limit still releases the request thread.
+
+A watchdog thread also sends `KILL QUERY` for a request's connections when its
+client has disconnected or its deadline has passed by QUERY_KILL_GRACE seconds,
+so the server stops the work and releases its locks. Pooled connections keep
+session settings, so a checkout outside a request (outbox, mailer, scripts)
+clears them again.
+
+asgi.py gives its coroutine routes the budgets of the Flask endpoints they
+replace, as a statement time limit on each aiomysql connection and a timeout
+on the handler.
+
+Configuration: QUERY_DEADLINE_DEFAULT (10), QUERY_DEADLINES
+("endpoint=seconds,...", 0 for none), QUERY_KILL_GRACE (2).
+Per-endpoint overruns and kills are under `deadlines` in /api/metrics.
+"""
+import math
+import os
+import socket
+import threading
+import time
+import weakref
+
+from flask import g, has_request_context, request
+from mysql.connector import Error
+
+
+QUERY_DEADLINE_DEFAULT = float(os.getenv('QUERY_DEADLINE_DEFAULT', 10))
+QUERY_KILL_GRACE = float(os.getenv('QUERY_KILL_GRACE', 2))
+QUERY_WATCHDOG_INTERVAL = 0.5
+
+# Seconds per endpoint; None for no deadline
+ENDPOINT_DEADLINES = {
+    'admin.get_admin_donations': 15,
+    'finance.get_all_approved_data': 30,
+    'auditor.get_auditor_financial_report': 30,
+    'government.get_park_income': 20,
+    'government.get_park_expenses': 20,
+    'public.search_records': 5,
+    'public.render_month_documents': 300,
+    'public.stream_events': None,
+}
+
+
+def parse_deadlines(value):
+    """"endpoint=seconds,..." -> {endpoint: seconds or None}."""
+    deadlines = {}
+    for item in value.split(','):
+        endpoint, _, seconds = item.strip().partition('=')
+        if endpoint and seconds:
+            deadlines[endpoint] = float(seconds) or None
+    return deadlines
+
+
+QUERY_DEADLINES = parse_deadlines(os.getenv('QUERY_DEADLINES', ''))
+
+
+def client_disconnected(sock):
+    """True once the client has closed its side of the connection."""
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b''
+    except (BlockingIOError, InterruptedError):
+        return False
+    except OSError:
+        return True
+
+
+class Deadline:
+    """One in-flight request's budget and the connections it has checked out."""
+
+    def __init__(self, endpoint, budget, sock):
+        self.endpoint = endpoint
+        self.budget = budget
+        self.started = time.monotonic()
+        self.expires = self.started + budget
+        self.sock = sock
+        self.connections = []
+        self.killed = False
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+
+class QueryDeadlines:
+    def __init__(self, connect, deadlines=QUERY_DEADLINES, default=QUERY_DEADLINE_DEFAULT):
+        # connect(host, port) opens the side connection KILL QUERY is sent on
+        self.connect = connect
+        self.deadlines = {**ENDPOINT_DEADLINES, **deadlines}
+        self.default = default or None
+        self._inflight = set()
+        self._owners = {}
+        self._applied = weakref.WeakKeyDictionary()
+        self._flavors = weakref.WeakKeyDictionary()
+        self._killers = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._thread = None
+        self._pid = None
+
+    def budget(self, endpoint):
+        return self.deadlines.get(endpoint, self.default)
+
+    def start(self):
+        """before_request hook: start the request's deadline."""
+        budget = self.budget(request.endpoint)
+        if budget is None or request.method == 'OPTIONS':
+            return None
+        sock = request.environ.get('gunicorn.socket') or request.environ.get('werkzeug.socket')
+        deadline = Deadline(request.endpoint, budget, sock)
+        with self._lock:
+            self._inflight.add(deadline)
+        g.query_deadline = deadline
+        self._ensure_watchdog()
+        return None
+
+    def finish(self, exc=None):
+        """teardown_request hook: stop watching the request and record an overrun."""
+        deadline = g.pop('query_deadline', None)
+        if deadline is None:
+            return
+        with self._lock:
+            self._inflight.discard(deadline)
+            for owner_key in deadline.connections:
+                if self._owners.get(owner_key) is deadline:
+                    del self._owners[owner_key]
+        self.record(deadline.endpoint, deadline.budget, time.monotonic() - deadline.started)
+
+    def record(self, endpoint, budget, elapsed):
+        """Count a finished request against its endpoint's budget."""
+        with self._lock:
+            stats = self._endpoint_stats(endpoint, budget)
+            stats['requests'] += 1
+            stats['max_ms'] = max(stats['max_ms'], round(elapsed * 1000, 1))
+            if elapsed > budget:
+                stats['overruns'] += 1
+
+    def attach(self, connection):
+        """Give a freshly checked-out connection the current request's remaining budget."""
+        deadline = g.get('query_deadline') if has_request_context() else None
+        seconds = None
+        if deadline is not None:
+            seconds = max(1, math.ceil(deadline.remaining()))
+        raw = getattr(connection, '_cnx', connection)
+        # Keyed by connection id too: a pooled connection that reconnected has lost its settings
+        applied = (connection.connection_id, seconds)
+        try:
+            if self._applied.get(raw) != applied:
+                self._set_limit(connection, raw, seconds)
+                self._applied[raw] = applied
+        except Error as e:
+            print(f"Query deadline error: {e}")
+            return
+        if deadline is not None:
+            owner_key = (connection.server_host, connection.server_port, connection.connection_id)
+            with self._lock:
+                self._owners[owner_key] = deadline
+                if owner_key not in deadline.connections:
+                    deadline.connections.append(owner_key)
+
+    def _set_limit(self, connection, raw, seconds):
+        flavor = self._flavors.get(raw)
+        if flavor is None:
+            flavor = 'mariadb' if 'mariadb' in (connection.get_server_info() or '').lower() else 'mysql'
+            self._flavors[raw] = flavor
+        cursor = connection.cursor()
+        try:
+            if flavor == 'mariadb':
+                cursor.execute("SET SESSION max_statement_time = %s", (seconds or 0,))
+            else:
+                cursor.execute("SET SESSION max_execution_time = %s", (int((seconds or 0) * 1000),))
+        finally:
+            cursor.close()
+        # Older connectors have no per-connection read timeout
+        if hasattr(type(raw), 'read_timeout'):
+            raw.read_timeout = int(seconds + 1) if seconds else None
+
+    def _endpoint_stats(self, endpoint, budget):
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {
+                "budget_s": budget, "requests": 0, "overruns": 0,
+                "killed_deadline": 0, "killed_disconnect": 0, "max_ms": 0.0,
+            }
+        return stats
+
+    def _ensure_watchdog(self):
+        if self._thread is None or self._pid != os.getpid():
+            with self._lock:
+                if self._thread is None or self._pid != os.getpid():
+                    self._killers = {}
+                    self._thread = threading.Thread(target=self._watch, name='query-deadlines', daemon=True)
+                    self._thread.start()
+                    self._pid = os.getpid()
+
+    def _watch(self):
+        while True:
+            time.sleep(QUERY_WATCHDOG_INTERVAL)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Query watchdog error: {e}")
+
+    def check(self):
+        """Cancel the queries of requests that were abandoned or overran; returns the kill count."""
+        with self._lock:
+            inflight = [deadline for deadline in self._inflight if not deadline.killed and deadline.connections]
+        killed = 0
+        for deadline in inflight:
+            if deadline.remaining() < -QUERY_KILL_GRACE:
+                reason = 'killed_deadline'
+            elif deadline.sock is not None and client_disconnected(deadline.sock):
+                reason = 'killed_disconnect'
+            else:
+                continue
+            deadline.killed = True
+            # Under the lock, so a connection already handed to another request is never killed
+            with self._lock:
+                owned = [key for key in deadline.connections if self._owners.get(key) is deadline]
+                for owner_key in owned:
+                    self._kill(*owner_key)
+                if owned:
+                    self._endpoint_stats(deadline.endpoint, deadline.budget)[reason] += 1
+            killed += len(owned)
+        return killed
+
+    def _kill(self, host, port, connection_id):
+        killer = self._killers.get((host, port))
+        try:
+            if killer is None or not killer.is_connected():
+                killer = self._killers[(host, port)] = self.connect(host, port)
+            cursor = killer.cursor()
+            cursor.execute(f"KILL QUERY {int(connection_id)}")
+            cursor.close()
+        except Error as e:
+            # 1094: the connection has already gone
+            if getattr(e, 'errno', None) != 1094:
+                print(f"KILL QUERY {connection_id} on {host}:{port} failed: {e}")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "default_budget_s": self.default,
+                "inflight": len(self._inflight),
+                "endpoints": {endpoint: dict(stats) for endpoint, stats in self._stats.items()},
+            }
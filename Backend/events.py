@@ -0,0 +1,232 @@
+"""Fan-out of committed change events to Server-Sent Events subscribers.
+
+Write handlers record their changes in the outbox (outbox.enqueue, in the same
+transaction as the write). While a worker has subscribers, its hub tails the
+outbox from the database (an OutboxRelay without a stored checkpoint), so every
+worker's streams see the changes committed by every worker. GET /api/events
+streams the events a dashboard may see: park-scoped roles (finance, park
+staff) get their park's events plus events that belong to no park (services);
+government, admin and auditors get everything.
+
+Event ids are outbox ids, the same on every worker. The last EVENTS_REPLAY_SIZE
+events are kept so a reconnecting EventSource that sends Last-Event-ID gets
+what it missed, whichever worker it reaches. When the id has already fallen out
+of the replay buffer, or the worker has only just started tailing, the stream
+starts with a "reset" event and the client re-fetches its lists. A worker that
+has had no subscribers for EVENTS_IDLE_SECONDS stops tailing until the next one
+arrives.
+
+Each subscriber has a buffer of EVENTS_SUBSCRIBER_BUFFER events. A subscriber
+that falls that far behind is disconnected rather than slowing the others
+down; its EventSource reconnects and catches up from the replay buffer.
+Streams send a heartbeat comment every EVENTS_HEARTBEAT_SECONDS and end after
+EVENTS_MAX_STREAM_SECONDS. Every open stream holds one of the worker's request
+threads, so a worker serves at most EVENTS_MAX_STREAMS of them (a quarter of
+WEB_THREADS by default) and answers further ones with 503 and Retry-After;
+those dashboards keep polling.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from outbox import OUTBOX_BATCH_SIZE, OutboxRelay
+
+
+EVENTS_REPLAY_SIZE = int(os.getenv('EVENTS_REPLAY_SIZE', 1000))
+EVENTS_SUBSCRIBER_BUFFER = int(os.getenv('EVENTS_SUBSCRIBER_BUFFER', 100))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv('EVENTS_HEARTBEAT_SECONDS', 15))
+EVENTS_MAX_STREAM_SECONDS = float(os.getenv('EVENTS_MAX_STREAM_SECONDS', 300))
+EVENTS_MAX_STREAMS = int(os.getenv('EVENTS_MAX_STREAMS', max(1, int(os.getenv('WEB_THREADS', 4)) // 4)))
+EVENTS_POLL_SECONDS = float(os.getenv('EVENTS_POLL_SECONDS', 0.5))
+EVENTS_IDLE_SECONDS = float(os.getenv('EVENTS_IDLE_SECONDS', 60))
+EVENTS_RETRY_MILLISECONDS = 3000
+
+# Outbox payload fields dashboards do not get
+PRIVATE_FIELDS = ('email',)
+
+
+class Event:
+    __slots__ = ('seq', 'type', 'park', 'data')
+
+    def __init__(self, seq, event_type, park, data):
+        self.seq = seq
+        self.type = event_type
+        self.park = park
+        self.data = data
+
+    def format(self):
+        payload = json.dumps(dict(self.data, park=self.park), default=str, separators=(',', ':'))
+        return f"id: {self.seq}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, park, after=0):
+        self.park = park
+        self.after = after
+        self.reset = False
+        self.reset_id = None
+        self.overflowed = False
+        self._events = deque()
+        self._ready = threading.Condition()
+
+    def wants(self, event):
+        return event.seq > self.after and (self.park is None or event.park is None or event.park == self.park)
+
+    def offer(self, event):
+        with self._ready:
+            if len(self._events) >= EVENTS_SUBSCRIBER_BUFFER:
+                self.overflowed = True
+            else:
+                self._events.append(event)
+            self._ready.notify()
+
+    def wait(self, timeout):
+        """Pending events, waiting up to `timeout`; None once the buffer has overflowed."""
+        with self._ready:
+            if not self._events and not self.overflowed:
+                self._ready.wait(timeout)
+            if self.overflowed:
+                return None
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+
+class EventHub:
+    def __init__(self, connect, max_streams=EVENTS_MAX_STREAMS):
+        self._connect = connect
+        self.max_streams = max_streams
+        # Highest outbox id this worker has tailed to; None until it has started
+        self._seq = None
+        self._history = deque(maxlen=EVENTS_REPLAY_SIZE)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._feed_pid = None
+        self._relay = None
+        self.published = 0
+        self.replayed = 0
+        self.resets = 0
+        self.overflows = 0
+        self.refused = 0
+
+    def publish(self, event):
+        """Fan an OutboxEvent out to this worker's subscribers."""
+        data = {key: value for key, value in event.data.items() if key not in PRIVATE_FIELDS}
+        aggregate_id = event.aggregate_id
+        data['id'] = int(aggregate_id) if aggregate_id and aggregate_id.isdigit() else aggregate_id
+        hub_event = Event(event.id, event.type, event.park, data)
+        with self._lock:
+            self._seq = max(self._seq or 0, event.id)
+            self._history.append(hub_event)
+            subscribers = [sub for sub in self._subscribers if sub.wants(hub_event)]
+            self.published += 1
+        for sub in subscribers:
+            sub.offer(hub_event)
+
+    def subscribe(self, park=None, last_event_id=None):
+        """Register a subscriber, queueing whatever it missed since `last_event_id`.
+
+        Returns None when the worker already serves max_streams streams.
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_streams:
+                self.refused += 1
+                return None
+            seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+            sub = Subscription(park, seq or 0)
+            if last_event_id:
+                oldest = self._history[0].seq if self._history else None
+                if seq is None or self._seq is None or (seq < self._seq and (oldest is None or seq < oldest - 1)):
+                    sub.reset = True
+                else:
+                    # Ahead of this worker's tail is fine: later events are filtered by `after`
+                    missed = [event for event in self._history if sub.wants(event)]
+                    sub.reset = len(missed) > EVENTS_SUBSCRIBER_BUFFER
+                if sub.reset:
+                    self.resets += 1
+                    sub.after = 0
+                else:
+                    sub._events.extend(missed)
+                    self.replayed += len(missed)
+            sub.reset_id = self._seq or 0
+            self._subscribers.add(sub)
+        self._ensure_feed()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+            if sub.overflowed:
+                self.overflows += 1
+
+    def stream(self, sub):
+        """Yield the SSE wire format for `sub` until it overflows or the stream times out."""
+        try:
+            yield f"retry: {EVENTS_RETRY_MILLISECONDS}\n\n"
+            if sub.reset:
+                yield f"id: {sub.reset_id}\nevent: reset\ndata: {{}}\n\n"
+            deadline = time.monotonic() + EVENTS_MAX_STREAM_SECONDS
+            while time.monotonic() < deadline:
+                events = sub.wait(EVENTS_HEARTBEAT_SECONDS)
+                if events is None:
+                    break
+                if not events:
+                    yield ": heartbeat\n\n"
+                for event in events:
+                    yield event.format()
+        finally:
+            self.unsubscribe(sub)
+
+    def _ensure_feed(self):
+        if self._feed_pid != os.getpid():
+            with self._lock:
+                if self._feed_pid != os.getpid():
+                    self._feed_pid = os.getpid()
+                    threading.Thread(target=self._feed, name='event-hub-feed', daemon=True).start()
+
+    def _feed(self):
+        """Tail the outbox into the hub while this worker has subscribers."""
+        relay = self._relay = OutboxRelay(self._connect, consumer=f'events-{os.getpid()}', durable=False)
+        relay.subscribe('*', self.publish)
+        idle_since = None
+        while True:
+            if self._subscribers:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > EVENTS_IDLE_SECONDS:
+                if relay.checkpoint is not None:
+                    # Nobody is listening: stop tailing, the next subscriber starts from the head
+                    relay.checkpoint = None
+                    with self._lock:
+                        self._seq = None
+                        self._history.clear()
+                time.sleep(EVENTS_POLL_SECONDS)
+                continue
+
+            failures = relay.failures
+            try:
+                delivered = relay.poll_once()
+            except Exception as e:
+                print(f"Event hub feed error: {e}")
+                delivered = 0
+            with self._lock:
+                if relay.checkpoint is not None:
+                    self._seq = max(self._seq or 0, relay.checkpoint)
+            if relay.failures != failures or delivered < OUTBOX_BATCH_SIZE:
+                time.sleep(EVENTS_POLL_SECONDS)
+
+    def snapshot(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "max_streams": self.max_streams,
+            "refused": self.refused,
+            "published": self.published,
+            "replayed": self.replayed,
+            "resets": self.resets,
+            "overflows": self.overflows,
+            "last_event_id": self._seq,
+            "feed": self._relay.snapshot() if self._relay else None
+        }
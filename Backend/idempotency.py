@@ -0,0 +1,231 @@
+"""Idempotency-Key support for retry-prone POST endpoints.
+
+A client that sends an `Idempotency-Key` header gets at-most-once execution of
+the request. The first request with a key claims it by inserting an
+`in_flight` row into `idempotency_keys`, runs the handler and stores the
+response. Retries with the same key replay the stored response without running
+the handler, so they never touch the business tables. A duplicate that arrives
+while the first request is still running waits for its result instead of
+executing again.
+
+The handler marks the key applied in its own transaction, just before it
+commits its business write (applied()). Until then a server error (5xx)
+releases the key, since the handler rolled back and a retry may run the
+request again; once the write has committed the key is never released and
+whatever response followed is stored, so a failure after the commit cannot
+lead to a second write. Each claim has an owner token: when a handler outlives
+IDEMPOTENCY_LOCK_SECONDS and a duplicate takes its claim over, the original's
+applied() matches no row and raises IdempotencyConflict, so at most one of them
+commits.
+"""
+import hashlib
+import os
+import secrets
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context, request, jsonify, make_response
+from mysql.connector import errorcode, Error
+
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 24 * 3600))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', 30))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', 10))
+IDEMPOTENCY_PURGE_INTERVAL = 300
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyConflict(Exception):
+    """The request's claim on its Idempotency-Key was taken over; it must not commit."""
+
+
+class IdempotencyStore:
+    """Keyed response store backed by the `idempotency_keys` table."""
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._events = {}
+        self._events_lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def idempotent(self, f):
+        """Decorator that makes a POST handler replay its response for a repeated Idempotency-Key."""
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = request.headers.get('Idempotency-Key')
+            if not key:
+                return f(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return jsonify({"error": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+            # Drop the blueprint prefix so keys stored before the blueprint split still match
+            endpoint = request.endpoint.rpartition('.')[2]
+            request_hash = hashlib.sha256(
+                request.method.encode() + b' ' + request.path.encode() + b'\n' + request.get_data()
+            ).hexdigest()
+
+            connection = self._connect()
+            if isinstance(connection, str):
+                return jsonify({"error": "Database connection failed"}), 500
+            try:
+                owner, outcome = self._claim_or_wait(connection, endpoint, key, request_hash)
+            finally:
+                if connection.is_connected():
+                    connection.close()
+
+            if outcome is not None:
+                return outcome
+
+            event = threading.Event()
+            with self._events_lock:
+                self._events[(endpoint, key)] = event
+            g.idempotency_claim = (endpoint, key, owner)
+            try:
+                response = make_response(f(*args, **kwargs))
+                self._finish(endpoint, key, owner, response)
+                return response
+            except Exception:
+                response = jsonify({"error": "Request failed"})
+                response.status_code = 500
+                self._finish(endpoint, key, owner, response)
+                raise
+            finally:
+                g.pop('idempotency_claim', None)
+                with self._events_lock:
+                    self._events.pop((endpoint, key), None)
+                event.set()
+
+        return decorated
+
+    def applied(self, cursor):
+        """Mark the request's key applied in the caller's open transaction; call it right before commit."""
+        claim = g.get('idempotency_claim') if has_request_context() else None
+        if claim is None:
+            return
+        endpoint, key, owner = claim
+        cursor.execute("""
+            UPDATE idempotency_keys SET state = 'committed'
+            WHERE endpoint = %s AND idempotency_key = %s AND owner = %s AND state = 'in_flight'
+        """, (endpoint, key, owner))
+        if cursor.rowcount != 1:
+            raise IdempotencyConflict(f"Idempotency-Key {key} was taken over by a retry")
+
+    def _claim_or_wait(self, connection, endpoint, key, request_hash):
+        """Return (owner token, None) once the key is claimed, or (None, the response to send instead)."""
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        cursor = connection.cursor(dictionary=True)
+        try:
+            self._maybe_purge(cursor, connection)
+            while True:
+                owner = secrets.token_hex(16)
+                if self._try_claim(cursor, connection, endpoint, key, request_hash, owner):
+                    return owner, None
+
+                cursor.execute("""
+                    SELECT request_hash, state, response_status, response_body, content_type,
+                           expires_at < NOW() AS expired, locked_until < NOW() AS lock_expired
+                    FROM idempotency_keys
+                    WHERE endpoint = %s AND idempotency_key = %s
+                """, (endpoint, key))
+                row = cursor.fetchone()
+                connection.commit()
+                if row is None:
+                    continue
+                if row['expired'] or (row['state'] == 'in_flight' and row['lock_expired']):
+                    # Stale claim (expired entry or crashed owner): take it over atomically
+                    cursor.execute("""
+                        UPDATE idempotency_keys
+                        SET state = 'in_flight', request_hash = %s, owner = %s,
+                            locked_until = NOW() + INTERVAL %s SECOND,
+                            expires_at = NOW() + INTERVAL %s SECOND,
+                            response_status = NULL, response_body = NULL
+                        WHERE endpoint = %s AND idempotency_key = %s
+                        AND (expires_at < NOW() OR (state = 'in_flight' AND locked_until < NOW()))
+                    """, (request_hash, owner, IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_TTL_SECONDS, endpoint, key))
+                    connection.commit()
+                    if cursor.rowcount == 1:
+                        return owner, None
+                    continue
+                if row['request_hash'] != request_hash:
+                    return None, (jsonify({
+                        "error": "Idempotency-Key was already used with a different request"
+                    }), 422)
+                if row['state'] == 'completed':
+                    response = make_response(bytes(row['response_body']), row['response_status'])
+                    response.headers['Content-Type'] = row['content_type']
+                    response.headers['Idempotent-Replayed'] = 'true'
+                    return None, response
+                if row['state'] == 'committed' and row['lock_expired']:
+                    # Its owner committed and then died before storing the response
+                    return None, (jsonify({
+                        "error": "A request with this Idempotency-Key was already applied"
+                    }), 409)
+
+                # In flight elsewhere: wait for its result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    response = jsonify({"error": "A request with this Idempotency-Key is still in progress"})
+                    response.headers['Retry-After'] = '1'
+                    return None, (response, 409)
+                with self._events_lock:
+                    event = self._events.get((endpoint, key))
+                if event is not None:
+                    event.wait(min(remaining, 1.0))
+                else:
+                    time.sleep(min(delay, remaining))
+                    delay = min(delay * 2, 0.5)
+        finally:
+            cursor.close()
+
+    def _try_claim(self, cursor, connection, endpoint, key, request_hash, owner):
+        try:
+            cursor.execute("""
+                INSERT INTO idempotency_keys (
+                    endpoint, idempotency_key, request_hash, owner, state, locked_until, expires_at
+                ) VALUES (%s, %s, %s, %s, 'in_flight', NOW() + INTERVAL %s SECOND, NOW() + INTERVAL %s SECOND)
+            """, (endpoint, key, request_hash, owner, IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_TTL_SECONDS))
+            connection.commit()
+            return True
+        except Error as e:
+            connection.rollback()
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                return False
+            raise
+
+    def _finish(self, endpoint, key, owner, response):
+        """Store the response, or release the key if the handler failed before committing."""
+        connection = self._connect()
+        if isinstance(connection, str):
+            print(f"Idempotency store unavailable, key {key} left claimed: {connection}")
+            return
+        cursor = connection.cursor()
+        try:
+            if response.status_code >= 500:
+                # Only an unapplied claim is released; an applied one keeps its key
+                cursor.execute("""
+                    DELETE FROM idempotency_keys
+                    WHERE endpoint = %s AND idempotency_key = %s AND owner = %s AND state = 'in_flight'
+                """, (endpoint, key, owner))
+                connection.commit()
+                if cursor.rowcount == 1:
+                    return
+            cursor.execute("""
+                UPDATE idempotency_keys
+                SET state = 'completed', response_status = %s, response_body = %s, content_type = %s
+                WHERE endpoint = %s AND idempotency_key = %s AND owner = %s
+            """, (response.status_code, response.get_data(), response.content_type, endpoint, key, owner))
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _maybe_purge(self, cursor, connection):
+        """Delete expired entries at most once per purge interval per process."""
+        now = time.monotonic()
+        if now - self._last_purge < IDEMPOTENCY_PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        cursor.execute("DELETE FROM idempotency_keys WHERE expires_at < NOW() LIMIT 1000")
+        connection.commit()
@@ -0,0 +1,483 @@
+"""Invoices and receipts for payments, tours and donations, rendered to HTML and PDF.
+
+load_documents() reads the source rows together with the payment or booking
+each one is linked to by `transaction_id`, and builds plain document dicts.
+render() turns a document into bytes.
+
+Renders are cached on disk under INVOICE_CACHE_DIR, content-addressed: a
+file's name is the SHA-256 of RENDER_VERSION, the source and the rows it was
+built from, and that digest is also its ETag. Any change to the rows (a
+payment completing a tour, a corrected amount) produces a new name, so
+nothing is ever invalidated. The least recently served files are pruned once
+the cache passes INVOICE_CACHE_MAX_MB.
+
+render_month() pre-renders every document created in a month for the
+month-end run. Missing renders go to a pool of INVOICE_RENDER_PROCESSES. The
+pool is spawned rather than forked, so it is safe to start from a threaded
+worker.
+
+PDFs come from the small writer below: PDF 1.4, the standard Helvetica fonts
+and WinAnsi text, so no PDF library is needed. The same document always
+gives the same bytes.
+
+    python invoices.py --month 2025-04          # month-end run from cron
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import textwrap
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from jinja2 import Environment
+
+
+RENDER_VERSION = 1
+INVOICE_CACHE_DIR = os.getenv(
+    'INVOICE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'documents')
+)
+INVOICE_CACHE_MAX_MB = float(os.getenv('INVOICE_CACHE_MAX_MB', 512))
+INVOICE_RENDER_PROCESSES = int(os.getenv('INVOICE_RENDER_PROCESSES', os.cpu_count() or 2))
+INLINE_RENDER_LIMIT = 200
+PRUNE_EVERY_WRITES = 200
+
+ISSUER = os.getenv('INVOICE_ISSUER', 'Park Conservation')
+SOURCES = ('payments', 'tours', 'donations')
+FORMATS = {'pdf': 'application/pdf', 'html': 'text/html'}
+LINKED_TABLES = {'tour': 'tours', 'donation': 'donations'}
+
+
+def _money(value):
+    return f"${float(value or 0):,.2f}"
+
+
+def _day(value):
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value or '')[:10]
+
+
+def _full_name(row):
+    return ' '.join(part for part in (row.get('first_name'), row.get('last_name')) if part)
+
+
+def _payment_note(payment):
+    if not payment:
+        return None
+    return (f"Paid {_money(payment['amount'])} by card ending {payment.get('card_number_last4') or '----'} "
+            f"on {_day(payment.get('created_at'))}, transaction {payment['transaction_id']}")
+
+
+def build_document(source, row, linked=None):
+    """The document for one source row; `linked` is its payment (tours, donations) or booking (payments)."""
+    if source == 'tours':
+        guests = int(row.get('guests') or 1)
+        amount = float(row.get('amount') or 0)
+        paid = row.get('status') == 'completed'
+        return {
+            'title': 'Receipt' if paid else 'Invoice',
+            'number': f"TOUR-{row['id']:06d}",
+            'issued': _day(row.get('created_at')),
+            'status': row.get('status') or 'pending',
+            'park': row.get('park_name'),
+            'customer': [_full_name(row), row.get('email')],
+            'lines': [(
+                f"{row.get('tour_name') or 'Park tour'}, {row.get('park_name')} on {_day(row.get('date'))} "
+                f"at {str(row.get('time') or '')[:5]}",
+                guests, _money(amount / guests if guests else amount), _money(amount)
+            )],
+            'total': _money(amount),
+            'notes': [note for note in (_payment_note(linked), row.get('special_requests')) if note],
+        }
+    if source == 'donations':
+        amount = float(row.get('amount') or 0)
+        return {
+            'title': 'Donation receipt',
+            'number': f"DON-{row['id']:06d}",
+            'issued': _day(row.get('created_at')),
+            'status': row.get('status') or 'pending',
+            'park': row.get('park_name'),
+            'customer': ['Anonymous donor' if row.get('is_anonymous') else _full_name(row), row.get('email')],
+            'lines': [(f"{row.get('donation_type') or 'General'} donation to {row.get('park_name')}", 1,
+                       _money(amount), _money(amount))],
+            'total': _money(amount),
+            'notes': [note for note in (_payment_note(linked), row.get('message')) if note],
+        }
+    amount = float(row.get('amount') or 0)
+    booking = None
+    if linked:
+        booking = (f"For tour booking TOUR-{linked['id']:06d}" if row.get('payment_type') == 'tour'
+                   else f"For donation DON-{linked['id']:06d}")
+    return {
+        'title': 'Payment receipt',
+        'number': row['transaction_id'],
+        'issued': _day(row.get('created_at')),
+        'status': row.get('status') or 'completed',
+        'park': row.get('park_name') or None,
+        'customer': [row.get('card_name'), row.get('customer_email')],
+        'lines': [(f"{(row.get('payment_type') or 'payment').capitalize()} payment"
+                   + (f", {row['park_name']}" if row.get('park_name') else ''), 1, _money(amount), _money(amount))],
+        'total': _money(amount),
+        'notes': [note for note in (booking, f"Card ending {row.get('card_number_last4') or '----'}") if note],
+    }
+
+
+def _digest(source, row, linked):
+    payload = json.dumps([RENDER_VERSION, source, row, linked], sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_documents(cursor, source, condition, params):
+    """[(digest, document)] for the `source` rows matching `condition`; `cursor` must be a dictionary cursor."""
+    cursor.execute(f"SELECT * FROM {source} WHERE {condition} ORDER BY id", params)
+    rows = cursor.fetchall()
+
+    linked = {}
+    transaction_ids = sorted({row['transaction_id'] for row in rows if row.get('transaction_id')})
+    if transaction_ids:
+        placeholders = ', '.join(['%s'] * len(transaction_ids))
+        tables = sorted({LINKED_TABLES[row['payment_type']] for row in rows
+                         if row.get('payment_type') in LINKED_TABLES}) if source == 'payments' else ['payments']
+        for table in tables:
+            cursor.execute(
+                f"SELECT * FROM {table} WHERE transaction_id IN ({placeholders}) ORDER BY id", transaction_ids
+            )
+            for linked_row in cursor.fetchall():
+                linked.setdefault((table, linked_row['transaction_id']), linked_row)
+
+    documents = []
+    for row in rows:
+        table = LINKED_TABLES.get(row.get('payment_type')) if source == 'payments' else 'payments'
+        match = linked.get((table, row.get('transaction_id')))
+        documents.append((_digest(source, row, match), build_document(source, row, match)))
+    return documents
+
+
+# HTML
+
+HTML_TEMPLATE = Environment(autoescape=True).from_string("""<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{{ doc.title }} {{ doc.number }}</title>
+<style>
+body { font-family: Helvetica, Arial, sans-serif; color: #1f2937; max-width: 720px; margin: 40px auto; }
+header { display: flex; justify-content: space-between; border-bottom: 2px solid #15803d; padding-bottom: 12px; }
+h1 { margin: 0; color: #15803d; font-size: 24px; }
+table { width: 100%; border-collapse: collapse; margin-top: 24px; }
+th, td { padding: 8px; border-bottom: 1px solid #e5e7eb; text-align: left; }
+td.amount, th.amount { text-align: right; }
+tfoot td { font-weight: bold; border-bottom: none; }
+.muted { color: #6b7280; font-size: 13px; }
+</style>
+</head>
+<body>
+<header>
+  <div><h1>{{ doc.title }}</h1><div class="muted">{{ issuer }}</div></div>
+  <div class="muted">No. {{ doc.number }}<br>Issued {{ doc.issued }}<br>Status: {{ doc.status }}</div>
+</header>
+<p>{% for line in doc.customer if line %}{{ line }}{% if not loop.last %}<br>{% endif %}{% endfor %}</p>
+{% if doc.park %}<p class="muted">{{ doc.park }}</p>{% endif %}
+<table>
+  <thead><tr><th>Description</th><th class="amount">Qty</th><th class="amount">Unit price</th><th class="amount">Amount</th></tr></thead>
+  <tbody>
+  {% for description, quantity, unit, amount in doc.lines %}
+    <tr><td>{{ description }}</td><td class="amount">{{ quantity }}</td><td class="amount">{{ unit }}</td><td class="amount">{{ amount }}</td></tr>
+  {% endfor %}
+  </tbody>
+  <tfoot><tr><td colspan="3">Total</td><td class="amount">{{ doc.total }}</td></tr></tfoot>
+</table>
+{% for note in doc.notes %}<p class="muted">{{ note }}</p>{% endfor %}
+</body>
+</html>
+""")
+
+
+def render_html(document):
+    return HTML_TEMPLATE.render(doc=document, issuer=ISSUER).encode()
+
+
+# PDF
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 56
+# Helvetica advance widths (1/1000 em) for the characters used in amounts; others are estimated
+CHAR_WIDTHS = {',': 278, '.': 278, ' ': 278, '-': 333, '$': 556}
+
+
+def _pdf_text(value):
+    text = str(value).encode('cp1252', errors='replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _text_width(value, size):
+    return sum(CHAR_WIDTHS.get(char, 556) for char in str(value)) * size / 1000
+
+
+class _PdfPage:
+    def __init__(self):
+        self.ops = []
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def text(self, x, value, size=10, bold=False, right=False):
+        if right:
+            x -= _text_width(value, size)
+        self.ops.append(f"BT /{'F2' if bold else 'F1'} {size} Tf {x:.2f} {self.y:.2f} Td ({_pdf_text(value)}) Tj ET")
+
+    def rule(self, width=0.5):
+        self.ops.append(f"{width} w {MARGIN} {self.y:.2f} m {PAGE_WIDTH - MARGIN} {self.y:.2f} l S")
+
+
+def render_pdf(document):
+    pages = [_PdfPage()]
+    page = pages[0]
+    right = PAGE_WIDTH - MARGIN
+
+    page.text(MARGIN, document['title'], size=20, bold=True)
+    page.text(right, f"No. {document['number']}", right=True)
+    page.y -= 16
+    page.text(MARGIN, ISSUER, size=10)
+    page.text(right, f"Issued {document['issued']}", right=True)
+    page.y -= 14
+    page.text(right, f"Status: {document['status']}", right=True)
+    page.y -= 10
+    page.rule(1.5)
+    page.y -= 24
+    for line in [line for line in document['customer'] if line] + ([document['park']] if document['park'] else []):
+        page.text(MARGIN, line)
+        page.y -= 14
+
+    columns = (MARGIN, right - 170, right - 85, right)
+    page.y -= 16
+    page.text(columns[0], 'Description', bold=True)
+    for x, label in zip(columns[1:], ('Qty', 'Unit price', 'Amount')):
+        page.text(x, label, bold=True, right=True)
+    page.y -= 6
+    page.rule()
+    for description, quantity, unit, amount in document['lines']:
+        wrapped = textwrap.wrap(description, 55) or ['']
+        if page.y - 16 * len(wrapped) < MARGIN + 60:
+            page = _PdfPage()
+            pages.append(page)
+        page.y -= 16
+        page.text(columns[0], wrapped[0])
+        for x, value in zip(columns[1:], (quantity, unit, amount)):
+            page.text(x, value, right=True)
+        for continuation in wrapped[1:]:
+            page.y -= 13
+            page.text(columns[0], continuation)
+        page.y -= 6
+        page.rule()
+    page.y -= 18
+    page.text(columns[0], 'Total', bold=True)
+    page.text(right, document['total'], bold=True, right=True)
+    page.y -= 30
+    for note in document['notes']:
+        for line in textwrap.wrap(note, 90):
+            if page.y < MARGIN:
+                page = _PdfPage()
+                pages.append(page)
+            page.text(MARGIN, line, size=9)
+            page.y -= 12
+
+    # Objects: 1 catalog, 2 page tree, 3-4 fonts, then a page and its content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            ' '.join(f"{5 + 2 * index} 0 R" for index in range(len(pages))), len(pages))).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    for index, page in enumerate(pages):
+        stream = '\n'.join(page.ops).encode('latin-1')
+        objects.append((
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {6 + 2 * index} 0 R >>"
+        ).encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def render(document, fmt):
+    return render_pdf(document) if fmt == 'pdf' else render_html(document)
+
+
+def _render_job(job):
+    # Runs in the pool: render and write the file here, so only the digest travels back
+    root, digest, document, fmt = job
+    DocumentCache(root, float('inf')).put(digest, fmt, render(document, fmt))
+    return digest
+
+
+class DocumentCache:
+    """Rendered documents on disk, named by content digest."""
+
+    def __init__(self, root=INVOICE_CACHE_DIR, max_bytes=INVOICE_CACHE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.pruned = 0
+        self.last_render_ms = None
+
+    def path(self, digest, fmt):
+        return os.path.join(self.root, digest[:2], f"{digest}.{fmt}")
+
+    def get(self, digest, fmt):
+        path = self.path(digest, fmt)
+        try:
+            # Access time drives pruning; many filesystems mount with noatime
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, digest, fmt, data):
+        path = self.path(digest, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(handle, 'wb') as output:
+            output.write(data)
+        os.replace(temporary, path)
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY_WRITES == 0
+        if prune:
+            self.prune()
+        return path
+
+    def fetch(self, digest, document, fmt):
+        """(path, cached) for the document, rendering it on a miss."""
+        path = self.get(digest, fmt)
+        if path:
+            self.hits += 1
+            return path, True
+        started = time.perf_counter()
+        data = render(document, fmt)
+        self.misses += 1
+        self.renders += 1
+        self.last_render_ms = round((time.perf_counter() - started) * 1000, 2)
+        return self.put(digest, fmt, data), False
+
+    def prune(self):
+        """Remove the least recently used files until the cache is under max_bytes."""
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self.pruned += removed
+        return removed
+
+    def snapshot(self):
+        return {
+            "root": self.root,
+            "hits": self.hits,
+            "misses": self.misses,
+            "renders": self.renders,
+            "pruned": self.pruned,
+            "last_render_ms": self.last_render_ms
+        }
+
+
+document_cache = DocumentCache()
+
+
+def render_month(connection, year, month, formats=('pdf', 'html'), cache=document_cache, processes=None):
+    """Render every document created in the month that is not cached yet; returns counts."""
+    started = time.perf_counter()
+    first = date(year, month, 1)
+    following = date(year + month // 12, month % 12 + 1, 1)
+    cursor = connection.cursor(dictionary=True)
+    try:
+        documents = []
+        for source in SOURCES:
+            documents += load_documents(cursor, source, "created_at >= %s AND created_at < %s", (first, following))
+    finally:
+        cursor.close()
+
+    jobs = [(cache.root, digest, document, fmt) for digest, document in documents for fmt in formats
+            if not os.path.exists(cache.path(digest, fmt))]
+    processes = processes or INVOICE_RENDER_PROCESSES
+    if len(jobs) <= INLINE_RENDER_LIMIT or processes <= 1:
+        # Starting the pool costs more than rendering a few hundred documents
+        for job in jobs:
+            _render_job(job)
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            for _ in pool.map(_render_job, jobs, chunksize=64):
+                pass
+    cache.renders += len(jobs)
+    cache.prune()
+    return {
+        "month": f"{year:04d}-{month:02d}",
+        "documents": len(documents),
+        "rendered": len(jobs),
+        "cached": len(documents) * len(formats) - len(jobs),
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+def parse_month(value):
+    """(year, month) from 'YYYY-MM'; raises ValueError."""
+    year, _, month = (value or '').partition('-')
+    year, month = int(year), int(month)
+    if not 1 <= month <= 12 or not 2000 <= year <= 2100:
+        raise ValueError("month must be YYYY-MM")
+    return year, month
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render a month's invoices and receipts into the cache.")
+    parser.add_argument('--month', required=True, help="YYYY-MM")
+    parser.add_argument('--formats', default='pdf,html')
+    parser.add_argument('--processes', type=int, default=INVOICE_RENDER_PROCESSES)
+    args = parser.parse_args()
+
+    from core import get_db_connection
+
+    year, month = parse_month(args.month)
+    connection = get_db_connection()
+    if isinstance(connection, str):
+        raise SystemExit(f"Database connection failed: {connection}")
+    try:
+        print(render_month(connection, year, month, tuple(args.formats.split(',')), processes=args.processes))
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Buffered last-login timestamps and login events.
+
+The login handlers used to run an `UPDATE ... SET last_login` and a commit on
+every sign-in. They now call record(), which only touches memory; a background
+thread flushes everything every LOGIN_ACTIVITY_FLUSH_SECONDS with one
+multi-row UPDATE per role table (repeat logins of the same user coalesce into
+one row) and one multi-row INSERT into `login_logs`. Requires
+migrations/005, which drops the admintable-only foreign key on `login_logs`.
+
+Memory is bounded by LOGIN_ACTIVITY_MAX_PENDING buffered users plus events:
+a login that reaches the limit flushes in the request instead of waiting for
+the thread. The buffer is also flushed when the process exits (including
+gunicorn worker recycling). A hard crash loses at most one flush interval of
+last-login updates; set LOGIN_ACTIVITY_SYNC=1 to write every login through
+immediately instead. Failed flushes are put back and retried on the next
+flush; if the database stays down, the oldest events are dropped once the
+limit is reached and counted in the metrics.
+"""
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+
+from mysql.connector import Error
+
+
+LOGIN_ACTIVITY_FLUSH_SECONDS = float(os.getenv('LOGIN_ACTIVITY_FLUSH_SECONDS', 2))
+LOGIN_ACTIVITY_MAX_PENDING = int(os.getenv('LOGIN_ACTIVITY_MAX_PENDING', 1000))
+LOGIN_ACTIVITY_SYNC = os.getenv('LOGIN_ACTIVITY_SYNC', '0') == '1'
+FLUSH_BATCH_SIZE = 500
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class LoginActivityBuffer:
+    def __init__(self, connect):
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_login = {}
+        self._events = []
+        self._flusher_pid = None
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = None
+        atexit.register(self.flush)
+
+    def _pending(self):
+        return sum(len(users) for users in self._last_login.values()) + len(self._events)
+
+    def record(self, table, user_id, email=None, role=None, log=True):
+        """Remember that `user_id` in `table` just signed in; `log` also adds a login_logs row."""
+        now = datetime.now().replace(microsecond=0)
+        with self._lock:
+            self._last_login.setdefault(table, {})[user_id] = now
+            if log:
+                self._events.append((user_id, email, role, now))
+            self.recorded += 1
+            pending = self._pending()
+        if LOGIN_ACTIVITY_SYNC or pending >= LOGIN_ACTIVITY_MAX_PENDING:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        if self._flusher_pid != os.getpid():
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._run, name='login-activity-flusher', daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(LOGIN_ACTIVITY_FLUSH_SECONDS)
+            self.flush()
+
+    def _requeue(self, last_login, events):
+        with self._lock:
+            for table, users in last_login.items():
+                current = self._last_login.setdefault(table, {})
+                for user_id, at in users.items():
+                    if user_id not in current or current[user_id] < at:
+                        current[user_id] = at
+            self._events = events + self._events
+            overflow = self._pending() - LOGIN_ACTIVITY_MAX_PENDING
+            if overflow > 0:
+                dropped = min(overflow, len(self._events))
+                del self._events[:dropped]
+                self.dropped += dropped
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                last_login, events = self._last_login, self._events
+                self._last_login, self._events = {}, []
+            if not last_login and not events:
+                return 0
+
+            started = time.perf_counter()
+            connection = self._connect()
+            if not connection or isinstance(connection, str):
+                self.failures += 1
+                self._requeue(last_login, events)
+                return 0
+
+            written = 0
+            cursor = None
+            try:
+                cursor = connection.cursor()
+                for table, users in last_login.items():
+                    for chunk in _chunks(sorted(users.items()), FLUSH_BATCH_SIZE):
+                        # GREATEST keeps a newer value another worker may already have written
+                        cursor.execute(
+                            f"UPDATE {table} SET last_login = GREATEST(IFNULL(last_login, '1000-01-01'), "
+                            f"CASE id {' '.join(['WHEN %s THEN %s'] * len(chunk))} END) "
+                            f"WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                            [value for pair in chunk for value in pair] + [user_id for user_id, _ in chunk]
+                        )
+                        written += len(chunk)
+                for chunk in _chunks(events, FLUSH_BATCH_SIZE):
+                    cursor.execute(
+                        "INSERT INTO login_logs (user_id, email, role, login_time) VALUES "
+                        + ", ".join(["(%s, %s, %s, %s)"] * len(chunk)),
+                        [value for event in chunk for value in event]
+                    )
+                    written += len(chunk)
+                connection.commit()
+            except Error as e:
+                print(f"Login activity flush failed: {e}")
+                connection.rollback()
+                self.failures += 1
+                self._requeue(last_login, events)
+                return 0
+            finally:
+                if cursor:
+                    cursor.close()
+                connection.close()
+
+            self.flushes += 1
+            self.rows_written += written
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            return written
+
+    def snapshot(self):
+        with self._lock:
+            pending = self._pending()
+        return {
+            "pending": pending,
+            "max_pending": LOGIN_ACTIVITY_MAX_PENDING,
+            "sync": LOGIN_ACTIVITY_SYNC,
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "dropped_events": self.dropped,
+            "last_flush_ms": self.last_flush_ms
+        }
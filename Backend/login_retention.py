@@ -0,0 +1,142 @@
+"""Monthly partition maintenance and daily rollup for `login_logs`.
+
+Run once right after migrations/005 and then daily, e.g. from cron:
+
+    15 0 * * *  cd /path/to/Backend && python login_retention.py
+
+Each run:
+
+1. splits the catch-all `pmax` partition so there is one partition per month
+   from the oldest login (first run) or the last existing month up to
+   LOGIN_LOGS_LOOKAHEAD_MONTHS ahead;
+2. rolls finished days into `login_daily_counts`, recomputing the last rolled
+   day so logins recorded just after midnight are still counted;
+3. drops monthly partitions older than LOGIN_LOGS_RETENTION_MONTHS whose days
+   have all been rolled up. Dropping a partition is a metadata change, not a
+   row-by-row DELETE.
+
+Every step is safe to repeat.
+"""
+import os
+from datetime import date, timedelta
+
+
+LOGIN_LOGS_RETENTION_MONTHS = max(int(os.getenv('LOGIN_LOGS_RETENTION_MONTHS', 13)), 1)
+LOGIN_LOGS_LOOKAHEAD_MONTHS = 2
+
+
+def add_months(month, count):
+    years, index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def monthly_partitions(cursor):
+    """First day of each month that has its own partition, oldest first."""
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'login_logs' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    names = [row[0] for row in cursor.fetchall()]
+    if not names:
+        raise RuntimeError("login_logs is not partitioned; apply migrations/005_login_logs_partitioning.sql first")
+    return [date(int(name[1:5]), int(name[5:7]), 1) for name in names if name != 'pmax']
+
+
+def ensure_partitions(cursor, today):
+    """Add monthly partitions up to the lookahead; returns the months added."""
+    months = monthly_partitions(cursor)
+    if months:
+        start = add_months(months[-1], 1)
+    else:
+        cursor.execute("SELECT MIN(login_time) FROM login_logs")
+        oldest = cursor.fetchone()[0]
+        start = (oldest.date() if oldest else today).replace(day=1)
+
+    end = add_months(today.replace(day=1), LOGIN_LOGS_LOOKAHEAD_MONTHS)
+    added = []
+    while start <= end:
+        added.append(start)
+        start = add_months(start, 1)
+    if not added:
+        return []
+
+    definitions = ", ".join(
+        f"PARTITION {partition_name(month)} VALUES LESS THAN (UNIX_TIMESTAMP('{add_months(month, 1):%Y-%m-%d}'))"
+        for month in added
+    )
+    cursor.execute(
+        f"ALTER TABLE login_logs REORGANIZE PARTITION pmax INTO "
+        f"({definitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+    )
+    return added
+
+
+def rolled_up_through(cursor):
+    """The last day in `login_daily_counts`, or None before the first rollup."""
+    cursor.execute("SELECT MAX(day) FROM login_daily_counts")
+    return cursor.fetchone()[0]
+
+
+def roll_up(cursor, today):
+    """Recount every finished day from the last rolled day up to yesterday."""
+    start = rolled_up_through(cursor) or date(1970, 1, 2)
+    cursor.execute("""
+        INSERT INTO login_daily_counts (day, role, logins)
+        SELECT DATE(login_time), role, COUNT(*)
+        FROM login_logs
+        WHERE login_time >= %s AND login_time < %s
+        GROUP BY DATE(login_time), role
+        ON DUPLICATE KEY UPDATE logins = VALUES(logins)
+    """, (start, today))
+    return cursor.rowcount
+
+
+def drop_expired(cursor, today):
+    """Drop rolled-up monthly partitions past the retention period; returns the months dropped."""
+    cutoff = add_months(today.replace(day=1), -LOGIN_LOGS_RETENTION_MONTHS)
+    rolled = rolled_up_through(cursor)
+    if rolled is None:
+        return []
+    expired = [
+        month for month in monthly_partitions(cursor)
+        if month < cutoff and add_months(month, 1) - timedelta(days=1) <= rolled
+    ]
+    if expired:
+        cursor.execute(
+            "ALTER TABLE login_logs DROP PARTITION " + ", ".join(partition_name(month) for month in expired)
+        )
+    return expired
+
+
+def run(connection, today=None):
+    today = today or date.today()
+    cursor = connection.cursor()
+    try:
+        added = ensure_partitions(cursor, today)
+        rolled = roll_up(cursor, today)
+        connection.commit()
+        dropped = drop_expired(cursor, today)
+    finally:
+        cursor.close()
+    return {
+        "partitions_added": [partition_name(month) for month in added],
+        "rollup_rows": rolled,
+        "partitions_dropped": [partition_name(month) for month in dropped]
+    }
+
+
+if __name__ == '__main__':
+    from server import get_db_connection
+
+    connection = get_db_connection()
+    if isinstance(connection, str):
+        raise SystemExit(f"Database connection failed: {connection}")
+    try:
+        print(run(connection))
+    finally:
+        connection.close()
@@ -0,0 +1,575 @@
+"""Staff email campaigns delivered over pooled, rate-limited SMTP connections (migrations/009).
+
+create_campaign() stores the campaign and one delivery row per recipient in
+the request; nothing is sent there. EmailSender claims queued deliveries in
+batches of MAIL_BATCH_SIZE and sends them:
+
+- Each server in MAIL_SERVERS ("host:port,host:port") keeps one SMTP session
+  open across messages and batches. A session idle for MAIL_IDLE_SECONDS is
+  checked with NOOP before reuse, and it is closed after
+  MAIL_MESSAGES_PER_CONNECTION messages because most servers cap that.
+- When the server advertises PIPELINING (RFC 2920), MAIL FROM, RCPT TO and
+  DATA go out in one write. A message then takes two round trips instead of
+  four.
+- Each server has a token bucket of MAIL_RATE_PER_SECOND messages. A batch
+  is spread over the servers round-robin, one thread per server.
+- Every delivery's outcome (status, SMTP code, error) is written back.
+  Transient failures (4xx, dropped connections) are re-queued until
+  MAIL_MAX_ATTEMPTS, each retry waiting twice as long as the one before,
+  starting at MAIL_RETRY_SECONDS (`next_attempt_at`, migrations/017), so a
+  greylisting or briefly unreachable server gets minutes rather than seconds.
+  Permanent failures (5xx) fail at once.
+
+The sender thread is started by the worker that queued the campaign (again
+after a fork), or runs standalone with `python mailer.py`. Only the process
+holding the `email_sender_lease` row sends; the others just keep checking
+whether the lease has expired. The per-server rate limits therefore hold for
+the whole deployment, not per worker. The lease and the claims expire after
+MAIL_CLAIM_SECONDS, so a process that died hands over its batch and its
+lease; a process that exits normally releases the lease at once.
+"""
+import atexit
+import os
+import re
+import smtplib
+import threading
+import time
+import uuid
+from email.message import EmailMessage
+from email.policy import SMTP as SMTP_POLICY
+from email.utils import formataddr, make_msgid
+from typing import NamedTuple, Optional
+
+from mysql.connector import Error
+
+from repository import STAFF_TABLES
+
+
+MAIL_SERVERS = os.getenv('MAIL_SERVERS', 'localhost:25')
+MAIL_FROM = os.getenv('MAIL_FROM', 'no-reply@parkconservation.local')
+MAIL_FROM_NAME = os.getenv('MAIL_FROM_NAME', 'Park Conservation')
+MAIL_USER = os.getenv('MAIL_USER')
+MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+MAIL_STARTTLS = os.getenv('MAIL_STARTTLS', '0') == '1'
+MAIL_TIMEOUT = float(os.getenv('MAIL_TIMEOUT', 30))
+MAIL_RATE_PER_SECOND = float(os.getenv('MAIL_RATE_PER_SECOND', 10))
+MAIL_MESSAGES_PER_CONNECTION = int(os.getenv('MAIL_MESSAGES_PER_CONNECTION', 100))
+MAIL_IDLE_SECONDS = float(os.getenv('MAIL_IDLE_SECONDS', 30))
+MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 50))
+MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', 5))
+MAIL_RETRY_SECONDS = int(os.getenv('MAIL_RETRY_SECONDS', 60))
+MAIL_CLAIM_SECONDS = int(os.getenv('MAIL_CLAIM_SECONDS', 300))
+MAIL_POLL_SECONDS = float(os.getenv('MAIL_POLL_SECONDS', 5))
+MAX_SUBJECT_LENGTH = 255
+MAX_BODY_LENGTH = 50000
+MAX_RECIPIENTS = 5000
+
+# What may go between the angle brackets of RCPT TO: ASCII, no whitespace, control characters or brackets
+ADDRESS_PATTERN = re.compile(r'[^<>@\x00-\x20\x7f]+@[^<>@\x00-\x20\x7f]+')
+
+
+class Delivery(NamedTuple):
+    id: int
+    campaign_id: int
+    email: str
+    name: Optional[str]
+    attempts: int
+    subject: str
+    body: str
+
+
+class Outcome(NamedTuple):
+    delivery_id: int
+    status: str  # 'sent', 'queued' (retry) or 'failed'
+    code: Optional[int]
+    error: Optional[str]
+    retry_seconds: Optional[int] = None
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try of a delivery that has failed `attempts` times."""
+    return MAIL_RETRY_SECONDS * 2 ** (attempts - 1)
+
+
+def parse_servers(value):
+    servers = []
+    for entry in value.split(','):
+        entry = entry.strip()
+        if entry:
+            host, _, port = entry.partition(':')
+            servers.append((host, int(port or 25)))
+    return servers
+
+
+def valid_address(address):
+    """Whether `address` can be sent to as is; SMTPUTF8 addresses are not supported."""
+    return bool(address) and address.isascii() and ADDRESS_PATTERN.fullmatch(address) is not None
+
+
+def build_message(delivery):
+    message = EmailMessage(policy=SMTP_POLICY)
+    message['From'] = formataddr((MAIL_FROM_NAME, MAIL_FROM))
+    message['To'] = formataddr((delivery.name or '', delivery.email))
+    message['Subject'] = delivery.subject
+    message['Message-ID'] = make_msgid(domain=MAIL_FROM.partition('@')[2] or None)
+    message.set_content(delivery.body)
+    return message.as_bytes()
+
+
+def _dot_stuff(payload):
+    payload = re.sub(br'(?m)^\.', b'..', payload)
+    if not payload.endswith(b'\r\n'):
+        payload += b'\r\n'
+    return payload + b'.\r\n'
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second, with bursts of up to one second's worth."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = max(rate, 1)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(max(self.rate, 1), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            self._tokens -= 1
+        if wait > 0:
+            self.waited_seconds += wait
+            time.sleep(wait)
+
+
+class SmtpServer:
+    """One reusable SMTP session to `host:port`; not thread-safe, one sender thread uses it at a time."""
+
+    def __init__(self, host, port, rate=MAIL_RATE_PER_SECOND):
+        self.host = host
+        self.port = port
+        self.limiter = RateLimiter(rate)
+        self._smtp = None
+        self._session_messages = 0
+        self._used_at = 0.0
+        self.pipelining = False
+        self.connects = 0
+        self.reuses = 0
+        self.sent = 0
+        self.failed = 0
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=MAIL_TIMEOUT)
+        smtp.ehlo()
+        if MAIL_STARTTLS:
+            smtp.starttls()
+            smtp.ehlo()
+        if MAIL_USER:
+            smtp.login(MAIL_USER, MAIL_PASSWORD or '')
+        self._smtp = smtp
+        self._session_messages = 0
+        self.pipelining = smtp.has_extn('pipelining')
+        self.connects += 1
+        return smtp
+
+    def _session(self):
+        smtp = self._smtp
+        if smtp is not None and self._session_messages >= MAIL_MESSAGES_PER_CONNECTION:
+            self.close()
+            smtp = None
+        if smtp is not None and time.monotonic() - self._used_at > MAIL_IDLE_SECONDS:
+            try:
+                if smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP refused")
+            except (smtplib.SMTPException, OSError):
+                self.close()
+                smtp = None
+        if smtp is None:
+            return self._connect()
+        self.reuses += 1
+        return smtp
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+    def _send_pipelined(self, smtp, recipient, payload):
+        smtp.send(f"MAIL FROM:<{MAIL_FROM}>\r\nRCPT TO:<{recipient}>\r\nDATA\r\n")
+        replies = [smtp.getreply() for _ in range(3)]
+        if replies[2][0] == 354:
+            # DATA was accepted, so the body has to follow even if MAIL or RCPT failed
+            smtp.send(_dot_stuff(payload))
+            replies.append(smtp.getreply())
+        for code, text in replies:
+            if code not in (250, 251, 354):
+                return code, text
+        return replies[-1]
+
+    def _send_plain(self, smtp, recipient, payload):
+        for command in (lambda: smtp.mail(MAIL_FROM), lambda: smtp.rcpt(recipient)):
+            code, text = command()
+            if code not in (250, 251):
+                return code, text
+        return smtp.data(payload)
+
+    def send(self, recipient, payload):
+        """Send one message; returns (code, text). Raises OSError/SMTPException when the session breaks."""
+        self.limiter.acquire()
+        smtp = self._session()
+        try:
+            if self.pipelining:
+                code, text = self._send_pipelined(smtp, recipient, payload)
+            else:
+                code, text = self._send_plain(smtp, recipient, payload)
+            if code != 250:
+                smtp.rset()
+        except (smtplib.SMTPException, OSError):
+            self.close()
+            raise
+        finally:
+            self._used_at = time.monotonic()
+        self._session_messages += 1
+        if code == 250:
+            self.sent += 1
+        else:
+            self.failed += 1
+        return code, text.decode(errors='replace') if isinstance(text, bytes) else text
+
+    def snapshot(self):
+        return {
+            "server": f"{self.host}:{self.port}",
+            "connected": self._smtp is not None,
+            "pipelining": self.pipelining,
+            "connects": self.connects,
+            "reuses": self.reuses,
+            "sent": self.sent,
+            "failed": self.failed,
+            "rate_per_second": self.limiter.rate,
+            "rate_waited_seconds": round(self.limiter.waited_seconds, 3)
+        }
+
+
+def resolve_recipients(cursor, roles=None, recipients=None):
+    """(table, id, email, name) for the selected staff.
+
+    `roles` selects every member of those roles; `recipients` is a list of
+    {"role", "id"} for individual members. Unknown roles raise ValueError.
+    """
+    selected = []
+    for role in roles or []:
+        if role not in STAFF_TABLES:
+            raise ValueError(f"Invalid role: {role}")
+        table = STAFF_TABLES[role]
+        cursor.execute(f"SELECT '{table}', id, email, CONCAT_WS(' ', first_name, last_name) FROM {table}")
+        selected += cursor.fetchall()
+
+    ids_by_table = {}
+    for recipient in recipients or []:
+        role = recipient.get('role') if isinstance(recipient, dict) else None
+        if role not in STAFF_TABLES:
+            raise ValueError(f"Invalid role: {role}")
+        ids_by_table.setdefault(STAFF_TABLES[role], []).append(int(recipient.get('id')))
+    for table, ids in ids_by_table.items():
+        cursor.execute(
+            f"SELECT '{table}', id, email, CONCAT_WS(' ', first_name, last_name) FROM {table} "
+            f"WHERE id IN ({', '.join(['%s'] * len(ids))})", ids
+        )
+        selected += cursor.fetchall()
+    return [row for row in selected if row[2]]
+
+
+def create_campaign(cursor, subject, body, created_by, recipients):
+    """Store a campaign and its deliveries in the caller's transaction; returns (campaign_id, recipient_count).
+
+    The same address selected twice (or held by two staff accounts) gets one delivery.
+    """
+    cursor.execute(
+        "INSERT INTO email_campaigns (subject, body, created_by) VALUES (%s, %s, %s)",
+        (subject, body, created_by)
+    )
+    campaign_id = cursor.lastrowid
+    count = 0
+    for start in range(0, len(recipients), 500):
+        chunk = recipients[start:start + 500]
+        cursor.execute(
+            "INSERT IGNORE INTO email_deliveries (campaign_id, staff_table, staff_id, email, name) VALUES "
+            + ", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk)),
+            [value for table, staff_id, email, name in chunk for value in (campaign_id, table, staff_id, email, name)]
+        )
+        count += cursor.rowcount
+    cursor.execute("UPDATE email_campaigns SET recipient_count = %s WHERE id = %s", (count, campaign_id))
+    return campaign_id, count
+
+
+def campaign_status(cursor, campaign_id):
+    """The campaign with counts and per-recipient deliveries, or None."""
+    cursor.execute("""
+        SELECT id, subject, status, recipient_count, sent_count, failed_count, created_by, created_at, finished_at
+        FROM email_campaigns WHERE id = %s
+    """, (campaign_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    campaign = dict(zip(
+        ('id', 'subject', 'status', 'recipientCount', 'sentCount', 'failedCount', 'createdBy', 'createdAt',
+         'finishedAt'), row
+    ))
+    cursor.execute("""
+        SELECT email, name, status, attempts, smtp_code, last_error, sent_at
+        FROM email_deliveries WHERE campaign_id = %s ORDER BY id
+    """, (campaign_id,))
+    campaign['deliveries'] = [
+        dict(zip(('email', 'name', 'status', 'attempts', 'smtpCode', 'error', 'sentAt'), delivery))
+        for delivery in cursor.fetchall()
+    ]
+    for key in ('createdAt', 'finishedAt'):
+        if campaign[key]:
+            campaign[key] = campaign[key].strftime('%Y-%m-%d %H:%M:%S')
+    for delivery in campaign['deliveries']:
+        if delivery['sentAt']:
+            delivery['sentAt'] = delivery['sentAt'].strftime('%Y-%m-%d %H:%M:%S')
+    return campaign
+
+
+class EmailSender:
+    def __init__(self, connect, servers=None):
+        self._connect = connect
+        self.servers = [SmtpServer(host, port) for host, port in (servers or parse_servers(MAIL_SERVERS))]
+        self._wake = threading.Event()
+        self._worker_pid = None
+        self._holder = uuid.uuid4().hex
+        self.leader = False
+        self._run_lock = threading.Lock()
+        self.batches = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.errors = 0
+        self.last_batch_ms = None
+
+    def wake(self):
+        """Start the sender thread in this process if needed and have it look for work now."""
+        if self._worker_pid != os.getpid():
+            self._worker_pid = os.getpid()
+            # A forked worker must not share its parent's lease
+            self._holder = uuid.uuid4().hex
+            self.leader = False
+            atexit.register(self.release)
+            threading.Thread(target=self.run, name='email-sender', daemon=True).start()
+        self._wake.set()
+
+    def run(self):
+        while True:
+            if self.run_once() < MAIL_BATCH_SIZE:
+                self._wake.wait(MAIL_POLL_SECONDS)
+                self._wake.clear()
+
+    def lease(self, connection):
+        """Take or renew the sender lease; True while this process is the one sender."""
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE email_sender_lease SET holder = %s, expires_at = NOW(6) + INTERVAL %s SECOND
+                WHERE name = 'sender' AND (holder = %s OR holder IS NULL OR expires_at < NOW(6))
+            """, (self._holder, MAIL_CLAIM_SECONDS, self._holder))
+            connection.commit()
+            self.leader = cursor.rowcount == 1
+            return self.leader
+        finally:
+            cursor.close()
+
+    def release(self):
+        """Give the lease up so another process takes over without waiting for it to expire."""
+        if not self.leader:
+            return
+        connection = self._connect()
+        if not connection or isinstance(connection, str):
+            return
+        cursor = connection.cursor()
+        try:
+            cursor.execute("UPDATE email_sender_lease SET holder = NULL WHERE name = 'sender' AND holder = %s",
+                           (self._holder,))
+            connection.commit()
+            self.leader = False
+        except Error as e:
+            print(f"Email sender lease release failed: {e}")
+        finally:
+            cursor.close()
+            connection.close()
+
+    def claim(self, connection):
+        """Claim up to MAIL_BATCH_SIZE due (or abandoned) deliveries for this sender."""
+        token = uuid.uuid4().hex
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                UPDATE email_deliveries
+                SET status = 'sending', claimed_by = %s, locked_until = NOW() + INTERVAL %s SECOND
+                WHERE (status = 'queued' AND (next_attempt_at IS NULL OR next_attempt_at <= NOW()))
+                   OR (status = 'sending' AND locked_until < NOW())
+                ORDER BY id LIMIT %s
+            """, (token, MAIL_CLAIM_SECONDS, MAIL_BATCH_SIZE))
+            connection.commit()
+            if not cursor.rowcount:
+                return []
+            cursor.execute("""
+                SELECT d.id, d.campaign_id, d.email, d.name, d.attempts, c.subject, c.body
+                FROM email_deliveries d JOIN email_campaigns c ON c.id = d.campaign_id
+                WHERE d.claimed_by = %s ORDER BY d.id
+            """, (token,))
+            deliveries = [Delivery._make(row) for row in cursor.fetchall()]
+            campaign_ids = sorted({delivery.campaign_id for delivery in deliveries})
+            if campaign_ids:
+                cursor.execute(
+                    f"UPDATE email_campaigns SET status = 'sending' "
+                    f"WHERE status = 'queued' AND id IN ({', '.join(['%s'] * len(campaign_ids))})", campaign_ids
+                )
+                connection.commit()
+            return deliveries
+        finally:
+            cursor.close()
+
+    def _send_all(self, server, deliveries, outcomes):
+        for delivery in deliveries:
+            attempts = delivery.attempts + 1
+            if not valid_address(delivery.email):
+                # Would inject commands into the pipelined RCPT, or fail to encode there
+                outcomes.append(Outcome(delivery.id, 'failed', None, "Invalid recipient address"))
+                continue
+            try:
+                payload = build_message(delivery)
+            except ValueError as e:
+                # Header values that cannot be encoded never will be; do not leave the claim behind
+                outcomes.append(Outcome(delivery.id, 'failed', None, str(e)[:255]))
+                continue
+            try:
+                code, text = server.send(delivery.email, payload)
+            except (smtplib.SMTPException, OSError) as e:
+                code, text = None, str(e) or e.__class__.__name__
+            if code == 250:
+                outcomes.append(Outcome(delivery.id, 'sent', code, None))
+            elif (code is None or 400 <= code < 500) and attempts < MAIL_MAX_ATTEMPTS:
+                outcomes.append(Outcome(delivery.id, 'queued', code, text[:255], retry_delay(attempts)))
+            else:
+                outcomes.append(Outcome(delivery.id, 'failed', code, text[:255]))
+
+    def deliver(self, deliveries):
+        """Send `deliveries` across the servers, one thread per server; returns their outcomes."""
+        outcomes = []
+        slices = [deliveries[index::len(self.servers)] for index in range(len(self.servers))]
+        threads = [
+            threading.Thread(target=self._send_all, args=(server, part, outcomes))
+            for server, part in zip(self.servers, slices) if part
+        ]
+        if len(threads) == 1:
+            threads[0].run()
+        else:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return outcomes
+
+    def record(self, connection, outcomes):
+        cursor = connection.cursor()
+        try:
+            cursor.executemany("""
+                UPDATE email_deliveries
+                SET status = %s, smtp_code = %s, last_error = %s, attempts = attempts + 1,
+                    sent_at = IF(%s = 'sent', NOW(), sent_at), claimed_by = NULL, locked_until = NULL,
+                    next_attempt_at = IF(%s IS NULL, NULL, NOW() + INTERVAL %s SECOND)
+                WHERE id = %s
+            """, [(o.status, o.code, o.error, o.status, o.retry_seconds, o.retry_seconds, o.delivery_id)
+                  for o in outcomes])
+            # Campaign counters and completion, recomputed from the deliveries
+            cursor.execute("""
+                UPDATE email_campaigns c
+                JOIN (
+                    SELECT campaign_id,
+                           SUM(status = 'sent') AS sent, SUM(status = 'failed') AS failed,
+                           SUM(status IN ('queued', 'sending')) AS pending
+                    FROM email_deliveries
+                    WHERE campaign_id IN (SELECT campaign_id FROM email_deliveries WHERE id IN ({}))
+                    GROUP BY campaign_id
+                ) d ON d.campaign_id = c.id
+                SET c.sent_count = d.sent, c.failed_count = d.failed,
+                    c.status = IF(d.pending = 0, 'done', 'sending'),
+                    c.finished_at = IF(d.pending = 0, NOW(), NULL)
+            """.format(', '.join(['%s'] * len(outcomes))), [o.delivery_id for o in outcomes])
+            connection.commit()
+        finally:
+            cursor.close()
+
+    def run_once(self):
+        """Claim, send and record one batch; returns the number of deliveries attempted."""
+        with self._run_lock:
+            started = time.perf_counter()
+            connection = self._connect()
+            if not connection or isinstance(connection, str):
+                self.errors += 1
+                return 0
+            try:
+                if not self.lease(connection):
+                    return 0
+                deliveries = self.claim(connection)
+                if not deliveries:
+                    return 0
+                # Do not hold a pooled connection while talking to the mail servers
+                connection.close()
+                connection = None
+                outcomes = self.deliver(deliveries)
+                connection = self._connect()
+                if not connection or isinstance(connection, str):
+                    # The claims expire and the batch is sent again
+                    connection = None
+                    self.errors += 1
+                    return 0
+                self.record(connection, outcomes)
+            except Error as e:
+                print(f"Email sender failed: {e}")
+                self.errors += 1
+                return 0
+            finally:
+                if connection is not None:
+                    connection.close()
+
+            self.batches += 1
+            for outcome in outcomes:
+                if outcome.status == 'sent':
+                    self.sent += 1
+                elif outcome.status == 'queued':
+                    self.retried += 1
+                else:
+                    self.failed += 1
+            self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+            return len(deliveries)
+
+    def snapshot(self):
+        return {
+            "running": self._worker_pid == os.getpid(),
+            "leader": self.leader,
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "errors": self.errors,
+            "last_batch_ms": self.last_batch_ms,
+            "servers": [server.snapshot() for server in self.servers]
+        }
+
+
+if __name__ == '__main__':
+    from core import get_db_connection
+
+    sender = EmailSender(get_db_connection)
+    print(f"Sending through {', '.join(f'{host}:{port}' for host, port in parse_servers(MAIL_SERVERS))}")
+    sender.run()
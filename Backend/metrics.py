@@ -0,0 +1,29 @@
+"""Process-local metrics registry.
+
+Subsystems register a callable that returns a JSON-serializable snapshot of
+their counters; GET /api/metrics returns every snapshot keyed by name. Values
+are per worker process.
+"""
+import threading
+
+
+_sources = {}
+_lock = threading.Lock()
+
+
+def register(name, snapshot):
+    """Expose `snapshot()` under `name` in the metrics endpoint."""
+    with _lock:
+        _sources[name] = snapshot
+
+
+def collect():
+    with _lock:
+        sources = dict(_sources)
+    report = {}
+    for name, snapshot in sources.items():
+        try:
+            report[name] = snapshot()
+        except Exception as e:
+            report[name] = {"error": str(e)}
+    return report
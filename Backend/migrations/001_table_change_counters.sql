@@ -0,0 +1,69 @@
+-- Change counters for the financial source tables.
+--
+-- Every INSERT/UPDATE/DELETE on a tracked table bumps its row in
+-- `table_change_counters`. Report caches use the counters as their cache key,
+-- so a cached report is reused until one of its source tables changes.
+
+CREATE TABLE IF NOT EXISTS `table_change_counters` (
+  `table_name` varchar(64) NOT NULL,
+  `change_count` bigint(20) UNSIGNED NOT NULL DEFAULT 0,
+  PRIMARY KEY (`table_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT IGNORE INTO `table_change_counters` (`table_name`, `change_count`) VALUES
+('tours', 0),
+('donations', 0),
+('fund_requests', 0),
+('extra_funds_requests', 0),
+('emergency_requests', 0),
+('budgets', 0),
+('budget_items', 0);
+
+CREATE TRIGGER IF NOT EXISTS `tours_ai_counter` AFTER INSERT ON `tours` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'tours';
+CREATE TRIGGER IF NOT EXISTS `tours_au_counter` AFTER UPDATE ON `tours` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'tours';
+CREATE TRIGGER IF NOT EXISTS `tours_ad_counter` AFTER DELETE ON `tours` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'tours';
+
+CREATE TRIGGER IF NOT EXISTS `donations_ai_counter` AFTER INSERT ON `donations` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'donations';
+CREATE TRIGGER IF NOT EXISTS `donations_au_counter` AFTER UPDATE ON `donations` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'donations';
+CREATE TRIGGER IF NOT EXISTS `donations_ad_counter` AFTER DELETE ON `donations` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'donations';
+
+CREATE TRIGGER IF NOT EXISTS `fund_requests_ai_counter` AFTER INSERT ON `fund_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'fund_requests';
+CREATE TRIGGER IF NOT EXISTS `fund_requests_au_counter` AFTER UPDATE ON `fund_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'fund_requests';
+CREATE TRIGGER IF NOT EXISTS `fund_requests_ad_counter` AFTER DELETE ON `fund_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'fund_requests';
+
+CREATE TRIGGER IF NOT EXISTS `extra_funds_requests_ai_counter` AFTER INSERT ON `extra_funds_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'extra_funds_requests';
+CREATE TRIGGER IF NOT EXISTS `extra_funds_requests_au_counter` AFTER UPDATE ON `extra_funds_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'extra_funds_requests';
+CREATE TRIGGER IF NOT EXISTS `extra_funds_requests_ad_counter` AFTER DELETE ON `extra_funds_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'extra_funds_requests';
+
+CREATE TRIGGER IF NOT EXISTS `emergency_requests_ai_counter` AFTER INSERT ON `emergency_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'emergency_requests';
+CREATE TRIGGER IF NOT EXISTS `emergency_requests_au_counter` AFTER UPDATE ON `emergency_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'emergency_requests';
+CREATE TRIGGER IF NOT EXISTS `emergency_requests_ad_counter` AFTER DELETE ON `emergency_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'emergency_requests';
+
+CREATE TRIGGER IF NOT EXISTS `budgets_ai_counter` AFTER INSERT ON `budgets` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'budgets';
+CREATE TRIGGER IF NOT EXISTS `budgets_au_counter` AFTER UPDATE ON `budgets` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'budgets';
+CREATE TRIGGER IF NOT EXISTS `budgets_ad_counter` AFTER DELETE ON `budgets` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'budgets';
+
+CREATE TRIGGER IF NOT EXISTS `budget_items_ai_counter` AFTER INSERT ON `budget_items` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'budget_items';
+CREATE TRIGGER IF NOT EXISTS `budget_items_au_counter` AFTER UPDATE ON `budget_items` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'budget_items';
+CREATE TRIGGER IF NOT EXISTS `budget_items_ad_counter` AFTER DELETE ON `budget_items` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1 WHERE `table_name` = 'budget_items';
@@ -0,0 +1,33 @@
+-- Per-slot tour capacity.
+--
+-- One row per (park, date, slot) that has been booked. `booked_guests` is the
+-- authoritative counter that /api/book-tour increments with a conditional
+-- UPDATE, so concurrent bookings can never push a slot past `capacity`.
+-- Slots are 7200 seconds wide, matching availability.TOUR_SLOT_MINUTES (120);
+-- change both together. `slot_start` is the slot's first minute. Raise
+-- `capacity` on a row to open more places for that slot.
+
+CREATE TABLE IF NOT EXISTS `tour_slots` (
+  `park_name` varchar(100) NOT NULL,
+  `date` date NOT NULL,
+  `slot_start` time NOT NULL,
+  `capacity` int(11) NOT NULL DEFAULT 40,
+  `booked_guests` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`park_name`, `date`, `slot_start`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Backfill from existing bookings (120 minute slots, 40 guests per slot).
+INSERT INTO `tour_slots` (`park_name`, `date`, `slot_start`, `capacity`, `booked_guests`)
+SELECT
+  `park_name`,
+  `date`,
+  SEC_TO_TIME(FLOOR(TIME_TO_SEC(`time`) / 7200) * 7200),
+  GREATEST(40, SUM(`guests`)),
+  SUM(`guests`)
+FROM `tours`
+GROUP BY `park_name`, `date`, SEC_TO_TIME(FLOOR(TIME_TO_SEC(`time`) / 7200) * 7200)
+ON DUPLICATE KEY UPDATE
+  `booked_guests` = VALUES(`booked_guests`),
+  `capacity` = GREATEST(`capacity`, VALUES(`booked_guests`));
+
+CREATE INDEX `tours_park_date` ON `tours` (`park_name`, `date`);
@@ -0,0 +1,21 @@
+-- Stored responses for requests sent with an Idempotency-Key header.
+--
+-- Used by /api/donate, /api/book-tour and /api/process_payment. A row is
+-- `in_flight` while the first request runs (claimed until `locked_until`) and
+-- `completed` once its response is stored. Rows past `expires_at` are purged
+-- by the application.
+
+CREATE TABLE IF NOT EXISTS `idempotency_keys` (
+  `endpoint` varchar(100) NOT NULL,
+  `idempotency_key` varchar(255) NOT NULL,
+  `request_hash` char(64) NOT NULL,
+  `state` enum('in_flight','completed') NOT NULL DEFAULT 'in_flight',
+  `response_status` smallint(6) DEFAULT NULL,
+  `response_body` mediumblob DEFAULT NULL,
+  `content_type` varchar(100) DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `locked_until` timestamp NULL DEFAULT NULL,
+  `expires_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`endpoint`, `idempotency_key`),
+  KEY `expires_at` (`expires_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
@@ -0,0 +1,23 @@
+-- FULLTEXT indexes backing GET /api/search.
+--
+-- InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default);
+-- lower it and rebuild these indexes if shorter terms must be searchable.
+
+ALTER TABLE `services`
+  ADD FULLTEXT KEY `ft_services` (`company_name`, `provided_service`);
+
+ALTER TABLE `fund_requests`
+  ADD FULLTEXT KEY `ft_fund_requests` (`title`, `description`),
+  ADD KEY `parkname` (`parkname`);
+
+ALTER TABLE `extra_funds_requests`
+  ADD FULLTEXT KEY `ft_extra_funds_requests` (`title`, `description`, `justification`),
+  ADD KEY `park_name` (`park_name`);
+
+ALTER TABLE `emergency_requests`
+  ADD FULLTEXT KEY `ft_emergency_requests` (`title`, `description`, `justification`),
+  ADD KEY `park_name` (`park_name`);
+
+ALTER TABLE `donations`
+  ADD FULLTEXT KEY `ft_donations` (`first_name`, `last_name`, `message`),
+  ADD KEY `park_name` (`park_name`);
@@ -0,0 +1,39 @@
+-- Monthly partitions for `login_logs` and a daily login-count rollup.
+--
+-- GET /api/admin/login-metrics reads `login_daily_counts` instead of grouping
+-- the whole log, and GET /api/admin/recent-logins walks the new `login_time`
+-- index. Partitioned InnoDB tables cannot have foreign keys and every unique
+-- key must contain the partitioning column, so the admintable foreign key is
+-- dropped and the primary key becomes (id, login_time).
+--
+-- The table starts with a single catch-all partition; run
+-- `python login_retention.py` right after this migration (and daily from cron)
+-- to split it into monthly partitions, roll finished days into
+-- `login_daily_counts` and drop months past LOGIN_LOGS_RETENTION_MONTHS.
+
+CREATE TABLE IF NOT EXISTS `login_daily_counts` (
+  `day` date NOT NULL,
+  `role` varchar(50) NOT NULL,
+  `logins` int(10) UNSIGNED NOT NULL DEFAULT 0,
+  PRIMARY KEY (`day`, `role`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Backfill every finished day
+INSERT INTO `login_daily_counts` (`day`, `role`, `logins`)
+SELECT DATE(`login_time`), `role`, COUNT(*)
+FROM `login_logs`
+WHERE `login_time` < CURDATE()
+GROUP BY DATE(`login_time`), `role`
+ON DUPLICATE KEY UPDATE `logins` = VALUES(`logins`);
+
+ALTER TABLE `login_logs` DROP FOREIGN KEY IF EXISTS `login_logs_ibfk_1`;
+
+ALTER TABLE `login_logs`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `login_time`),
+  ADD KEY `login_time` (`login_time`);
+
+ALTER TABLE `login_logs`
+  PARTITION BY RANGE (UNIX_TIMESTAMP(`login_time`)) (
+    PARTITION `pmax` VALUES LESS THAN MAXVALUE
+  );
@@ -0,0 +1,10 @@
+-- `avatar_url` on every role table that has an avatar endpoint.
+--
+-- Only `admintable` had the column in the original schema. Values are paths
+-- such as /uploads/avatars/<digest>-128.jpg; the avatar cleanup in avatars.py
+-- keeps every file these columns point at.
+
+ALTER TABLE `auditors` ADD COLUMN IF NOT EXISTS `avatar_url` varchar(255) DEFAULT NULL;
+ALTER TABLE `finance_officers` ADD COLUMN IF NOT EXISTS `avatar_url` varchar(255) DEFAULT NULL;
+ALTER TABLE `government_officers` ADD COLUMN IF NOT EXISTS `avatar_url` varchar(255) DEFAULT NULL;
+ALTER TABLE `parkstaff` ADD COLUMN IF NOT EXISTS `avatar_url` varchar(255) DEFAULT NULL;
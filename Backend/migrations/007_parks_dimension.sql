@@ -0,0 +1,460 @@
+-- `parks` dimension table and integer `park_id` columns.
+--
+-- Every table stored its park as a VARCHAR(100-255) name, partly in latin1, so
+-- park scoping compared long strings across charsets. Each table now also has
+-- a SMALLINT `park_id` referencing `parks`, backfilled from the name. The name
+-- columns stay for compatibility: BEFORE INSERT/UPDATE triggers keep
+-- `park_id` in step with them (registering unseen names in `parks`), so the
+-- write handlers are unchanged, and parks.py maps names to ids at the API edge.
+--
+-- Uses DELIMITER for the trigger bodies; apply with the mysql client or
+-- phpMyAdmin's SQL tab.
+
+CREATE TABLE IF NOT EXISTS `parks` (
+  `id` smallint(5) UNSIGNED NOT NULL AUTO_INCREMENT,
+  `name` varchar(255) NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `name` (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Every park name in use
+INSERT IGNORE INTO `parks` (`name`)
+SELECT `name` FROM (
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) AS `name` FROM `tours`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `donations`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `payments`
+UNION
+SELECT TRIM(CONVERT(`parkname` USING utf8mb4)) FROM `fund_requests`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `extra_funds_requests`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `emergency_requests`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `budgets`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `admintable`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `auditors`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `finance_officers`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `government_officers`
+UNION
+SELECT TRIM(CONVERT(`park_name` USING utf8mb4)) FROM `parkstaff`
+) AS `names`
+WHERE `name` IS NOT NULL AND `name` <> '';
+
+ALTER TABLE `tours`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id_created_at` (`park_id`, `created_at`),
+  ADD CONSTRAINT `tours_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `tours` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `donations`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id_created_at` (`park_id`, `created_at`),
+  ADD CONSTRAINT `donations_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `donations` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `payments`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `payments_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `payments` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `fund_requests`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `parkname`,
+  ADD KEY `park_id_created_at` (`park_id`, `created_at`),
+  ADD CONSTRAINT `fund_requests_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `fund_requests` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`parkname` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `extra_funds_requests`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `extra_funds_requests_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `extra_funds_requests` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `emergency_requests`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `emergency_requests_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `emergency_requests` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `budgets`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `budgets_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `budgets` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `admintable`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `admintable_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `admintable` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `auditors`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `auditors_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `auditors` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `finance_officers`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `finance_officers_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `finance_officers` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `government_officers`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `government_officers_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `government_officers` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+ALTER TABLE `parkstaff`
+  ADD COLUMN IF NOT EXISTS `park_id` smallint(5) UNSIGNED DEFAULT NULL AFTER `park_name`,
+  ADD KEY `park_id` (`park_id`),
+  ADD CONSTRAINT `parkstaff_park_fk` FOREIGN KEY (`park_id`) REFERENCES `parks` (`id`);
+UPDATE `parkstaff` t JOIN `parks` p ON p.`name` = TRIM(CONVERT(t.`park_name` USING utf8mb4)) SET t.`park_id` = p.`id`;
+
+DELIMITER $$
+
+CREATE TRIGGER IF NOT EXISTS `tours_bi_park_id` BEFORE INSERT ON `tours` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `tours_bu_park_id` BEFORE UPDATE ON `tours` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `donations_bi_park_id` BEFORE INSERT ON `donations` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `donations_bu_park_id` BEFORE UPDATE ON `donations` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `payments_bi_park_id` BEFORE INSERT ON `payments` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `payments_bu_park_id` BEFORE UPDATE ON `payments` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `fund_requests_bi_park_id` BEFORE INSERT ON `fund_requests` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`parkname`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`parkname`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`parkname`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`parkname`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `fund_requests_bu_park_id` BEFORE UPDATE ON `fund_requests` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`parkname` <=> OLD.`parkname`) THEN
+    IF NULLIF(TRIM(NEW.`parkname`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`parkname`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`parkname`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`parkname`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `extra_funds_requests_bi_park_id` BEFORE INSERT ON `extra_funds_requests` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `extra_funds_requests_bu_park_id` BEFORE UPDATE ON `extra_funds_requests` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `emergency_requests_bi_park_id` BEFORE INSERT ON `emergency_requests` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `emergency_requests_bu_park_id` BEFORE UPDATE ON `emergency_requests` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `budgets_bi_park_id` BEFORE INSERT ON `budgets` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `budgets_bu_park_id` BEFORE UPDATE ON `budgets` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `admintable_bi_park_id` BEFORE INSERT ON `admintable` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `admintable_bu_park_id` BEFORE UPDATE ON `admintable` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `auditors_bi_park_id` BEFORE INSERT ON `auditors` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `auditors_bu_park_id` BEFORE UPDATE ON `auditors` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `finance_officers_bi_park_id` BEFORE INSERT ON `finance_officers` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `finance_officers_bu_park_id` BEFORE UPDATE ON `finance_officers` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `government_officers_bi_park_id` BEFORE INSERT ON `government_officers` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `government_officers_bu_park_id` BEFORE UPDATE ON `government_officers` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `parkstaff_bi_park_id` BEFORE INSERT ON `parkstaff` FOR EACH ROW
+BEGIN
+  IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+    SET NEW.`park_id` = NULL;
+  ELSE
+    SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    IF NEW.`park_id` IS NULL THEN
+      INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `parkstaff_bu_park_id` BEFORE UPDATE ON `parkstaff` FOR EACH ROW
+BEGIN
+  IF NOT (NEW.`park_name` <=> OLD.`park_name`) THEN
+    IF NULLIF(TRIM(NEW.`park_name`), '') IS NULL THEN
+      SET NEW.`park_id` = NULL;
+    ELSE
+      SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      IF NEW.`park_id` IS NULL THEN
+        INSERT IGNORE INTO `parks` (`name`) VALUES (TRIM(NEW.`park_name`));
+        SET NEW.`park_id` = (SELECT `id` FROM `parks` WHERE `name` = TRIM(NEW.`park_name`));
+      END IF;
+    END IF;
+  END IF;
+END$$
+
+DELIMITER ;
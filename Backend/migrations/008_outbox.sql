@@ -0,0 +1,29 @@
+-- Transactional outbox for change events.
+--
+-- The write handlers insert one `outbox` row per business change in the same
+-- transaction as the change itself (outbox.enqueue), so an event exists if and
+-- only if its write committed. outbox.py's relay tails the table by id and
+-- stores how far each consumer has got in `outbox_checkpoints`. Delivered rows
+-- older than OUTBOX_RETENTION_DAYS are purged by the relay.
+--
+-- `created_at` has microseconds so the relay can tell a gap left by a
+-- transaction that has not committed yet from one left by a rollback.
+
+CREATE TABLE IF NOT EXISTS `outbox` (
+  `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT,
+  `event_type` varchar(64) NOT NULL,
+  `aggregate` varchar(64) NOT NULL,
+  `aggregate_id` varchar(64) DEFAULT NULL,
+  `park_name` varchar(255) DEFAULT NULL,
+  `payload` longtext NOT NULL,
+  `created_at` timestamp(6) NOT NULL DEFAULT current_timestamp(6),
+  PRIMARY KEY (`id`),
+  KEY `created_at` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS `outbox_checkpoints` (
+  `consumer` varchar(64) NOT NULL,
+  `last_id` bigint(20) UNSIGNED NOT NULL DEFAULT 0,
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp(),
+  PRIMARY KEY (`consumer`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
@@ -0,0 +1,43 @@
+-- Staff email campaigns and their per-recipient deliveries.
+--
+-- POST /api/admin/email-campaigns stores one `email_campaigns` row and one
+-- `email_deliveries` row per selected staff member, then returns. mailer.py's
+-- sender claims queued deliveries in batches (`claimed_by`, `locked_until`, so
+-- a sender that dies mid-batch only holds them until the claim expires), sends
+-- them over pooled SMTP connections and records the outcome of each one.
+
+CREATE TABLE IF NOT EXISTS `email_campaigns` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `subject` varchar(255) NOT NULL,
+  `body` text NOT NULL,
+  `created_by` int(11) NOT NULL,
+  `status` enum('queued','sending','done') NOT NULL DEFAULT 'queued',
+  `recipient_count` int(11) NOT NULL DEFAULT 0,
+  `sent_count` int(11) NOT NULL DEFAULT 0,
+  `failed_count` int(11) NOT NULL DEFAULT 0,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `finished_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `created_at` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+CREATE TABLE IF NOT EXISTS `email_deliveries` (
+  `id` bigint(20) UNSIGNED NOT NULL AUTO_INCREMENT,
+  `campaign_id` int(11) NOT NULL,
+  `staff_table` varchar(32) NOT NULL,
+  `staff_id` int(11) NOT NULL,
+  `email` varchar(255) NOT NULL,
+  `name` varchar(255) DEFAULT NULL,
+  `status` enum('queued','sending','sent','failed') NOT NULL DEFAULT 'queued',
+  `attempts` tinyint(3) UNSIGNED NOT NULL DEFAULT 0,
+  `smtp_code` smallint(6) DEFAULT NULL,
+  `last_error` varchar(255) DEFAULT NULL,
+  `claimed_by` char(32) DEFAULT NULL,
+  `locked_until` timestamp NULL DEFAULT NULL,
+  `sent_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `campaign_recipient` (`campaign_id`, `email`),
+  KEY `status_locked` (`status`, `locked_until`),
+  KEY `claimed_by` (`claimed_by`),
+  CONSTRAINT `email_deliveries_campaign` FOREIGN KEY (`campaign_id`) REFERENCES `email_campaigns` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
@@ -0,0 +1,27 @@
+-- (email, created_at) indexes for the lookups that still go by typed email.
+--
+-- GET /api/visitor/timeline and /api/visitor/data read by `visitor_id` since
+-- migrations/011 (`visitor_created`), but two writes still find rows by the
+-- email typed into the form:
+--
+-- - process_payment settles the newest donation or tour for an email within
+--   the last hour (`email = ? AND created_at >= ? ORDER BY created_at DESC
+--   LIMIT 1`). With this key that is a short backwards range scan; a plain
+--   `email` key would read and sort every row the visitor ever wrote.
+-- - link_visitor (registration) links a new account's guest rows in donations,
+--   tours and services by email.
+--
+-- These keys serve both, so they replace the single-column `email` keys added
+-- by charset_migration.py instead of sitting next to them.
+
+ALTER TABLE `donations`
+  ADD KEY IF NOT EXISTS `email_created` (`email`, `created_at`),
+  DROP KEY IF EXISTS `email`;
+
+ALTER TABLE `tours`
+  ADD KEY IF NOT EXISTS `email_created` (`email`, `created_at`),
+  DROP KEY IF EXISTS `email`;
+
+ALTER TABLE `services`
+  ADD KEY IF NOT EXISTS `email_created` (`email`, `created_at`),
+  DROP KEY IF EXISTS `email`;
@@ -0,0 +1,31 @@
+-- `visitor_id` on the tables a visitor's activity is recorded in.
+--
+-- Rows were only tied to a visitor by the email typed into each form. New rows
+-- get `visitor_id` from the visitor's token when one is sent; registering links
+-- the new visitor's earlier guest rows; `python visitor_links.py` links the
+-- historical rows by normalized email in batches, resuming from
+-- `visitor_link_checkpoints`. The visitor endpoints read by these keys.
+
+ALTER TABLE `donations`
+  ADD COLUMN IF NOT EXISTS `visitor_id` int(11) DEFAULT NULL,
+  ADD KEY IF NOT EXISTS `visitor_created` (`visitor_id`, `created_at`);
+
+ALTER TABLE `tours`
+  ADD COLUMN IF NOT EXISTS `visitor_id` int(11) DEFAULT NULL,
+  ADD KEY IF NOT EXISTS `visitor_created` (`visitor_id`, `created_at`);
+
+ALTER TABLE `services`
+  ADD COLUMN IF NOT EXISTS `visitor_id` int(11) DEFAULT NULL,
+  ADD KEY IF NOT EXISTS `visitor_created` (`visitor_id`, `created_at`);
+
+ALTER TABLE `payments`
+  ADD COLUMN IF NOT EXISTS `visitor_id` int(11) DEFAULT NULL,
+  ADD KEY IF NOT EXISTS `visitor_created` (`visitor_id`, `created_at`);
+
+CREATE TABLE IF NOT EXISTS `visitor_link_checkpoints` (
+  `table_name` varchar(64) NOT NULL,
+  `last_id` int(11) NOT NULL DEFAULT 0,
+  `linked_count` bigint(20) UNSIGNED NOT NULL DEFAULT 0,
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE current_timestamp(),
+  PRIMARY KEY (`table_name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
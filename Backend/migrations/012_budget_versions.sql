@@ -0,0 +1,9 @@
+-- Row version for optimistic concurrency on `budgets`.
+--
+-- Every write to a budget (PUT /api/government/budgets/<id>, its /status
+-- endpoint and bulk status changes) increments `version` with a compare-and-set
+-- `UPDATE ... WHERE id = ? AND version = ?`. A writer holding a stale version
+-- matches no row and gets 409 with the current version, instead of silently
+-- overwriting the other change. Clients send the version they read in If-Match.
+
+ALTER TABLE `budgets` ADD COLUMN IF NOT EXISTS `version` int(10) UNSIGNED NOT NULL DEFAULT 1;
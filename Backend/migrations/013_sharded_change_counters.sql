@@ -0,0 +1,111 @@
+-- Sharded change counters (replaces the triggers from 001).
+--
+-- With one counter row per table, every transaction that wrote to a tracked
+-- table held that row's lock until it committed, so concurrent bookings and
+-- donations queued behind each other on it. Each table now has 16 counter rows
+-- and a trigger bumps the one picked by its connection id, so concurrent
+-- transactions almost always bump different rows; a multi-row statement keeps
+-- re-bumping the single row its transaction already holds. Readers take the
+-- per-table SUM (reports.get_change_counters), which still changes with every
+-- committed write.
+
+ALTER TABLE `table_change_counters`
+  ADD COLUMN IF NOT EXISTS `shard` tinyint(3) UNSIGNED NOT NULL DEFAULT 0 AFTER `table_name`,
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`table_name`, `shard`);
+
+INSERT IGNORE INTO `table_change_counters` (`table_name`, `shard`, `change_count`)
+SELECT `tables`.`table_name`, `seq_0_to_15`.`seq`, 0
+FROM (SELECT DISTINCT `table_name` FROM `table_change_counters`) AS `tables`
+CROSS JOIN `seq_0_to_15`;
+
+DROP TRIGGER IF EXISTS `tours_ai_counter`;
+CREATE TRIGGER `tours_ai_counter` AFTER INSERT ON `tours` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'tours' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `tours_au_counter`;
+CREATE TRIGGER `tours_au_counter` AFTER UPDATE ON `tours` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'tours' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `tours_ad_counter`;
+CREATE TRIGGER `tours_ad_counter` AFTER DELETE ON `tours` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'tours' AND `shard` = CONNECTION_ID() % 16;
+
+DROP TRIGGER IF EXISTS `donations_ai_counter`;
+CREATE TRIGGER `donations_ai_counter` AFTER INSERT ON `donations` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'donations' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `donations_au_counter`;
+CREATE TRIGGER `donations_au_counter` AFTER UPDATE ON `donations` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'donations' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `donations_ad_counter`;
+CREATE TRIGGER `donations_ad_counter` AFTER DELETE ON `donations` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'donations' AND `shard` = CONNECTION_ID() % 16;
+
+DROP TRIGGER IF EXISTS `fund_requests_ai_counter`;
+CREATE TRIGGER `fund_requests_ai_counter` AFTER INSERT ON `fund_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'fund_requests' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `fund_requests_au_counter`;
+CREATE TRIGGER `fund_requests_au_counter` AFTER UPDATE ON `fund_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'fund_requests' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `fund_requests_ad_counter`;
+CREATE TRIGGER `fund_requests_ad_counter` AFTER DELETE ON `fund_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'fund_requests' AND `shard` = CONNECTION_ID() % 16;
+
+DROP TRIGGER IF EXISTS `extra_funds_requests_ai_counter`;
+CREATE TRIGGER `extra_funds_requests_ai_counter` AFTER INSERT ON `extra_funds_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'extra_funds_requests' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `extra_funds_requests_au_counter`;
+CREATE TRIGGER `extra_funds_requests_au_counter` AFTER UPDATE ON `extra_funds_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'extra_funds_requests' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `extra_funds_requests_ad_counter`;
+CREATE TRIGGER `extra_funds_requests_ad_counter` AFTER DELETE ON `extra_funds_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'extra_funds_requests' AND `shard` = CONNECTION_ID() % 16;
+
+DROP TRIGGER IF EXISTS `emergency_requests_ai_counter`;
+CREATE TRIGGER `emergency_requests_ai_counter` AFTER INSERT ON `emergency_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'emergency_requests' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `emergency_requests_au_counter`;
+CREATE TRIGGER `emergency_requests_au_counter` AFTER UPDATE ON `emergency_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'emergency_requests' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `emergency_requests_ad_counter`;
+CREATE TRIGGER `emergency_requests_ad_counter` AFTER DELETE ON `emergency_requests` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'emergency_requests' AND `shard` = CONNECTION_ID() % 16;
+
+DROP TRIGGER IF EXISTS `budgets_ai_counter`;
+CREATE TRIGGER `budgets_ai_counter` AFTER INSERT ON `budgets` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'budgets' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `budgets_au_counter`;
+CREATE TRIGGER `budgets_au_counter` AFTER UPDATE ON `budgets` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'budgets' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `budgets_ad_counter`;
+CREATE TRIGGER `budgets_ad_counter` AFTER DELETE ON `budgets` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'budgets' AND `shard` = CONNECTION_ID() % 16;
+
+DROP TRIGGER IF EXISTS `budget_items_ai_counter`;
+CREATE TRIGGER `budget_items_ai_counter` AFTER INSERT ON `budget_items` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'budget_items' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `budget_items_au_counter`;
+CREATE TRIGGER `budget_items_au_counter` AFTER UPDATE ON `budget_items` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'budget_items' AND `shard` = CONNECTION_ID() % 16;
+DROP TRIGGER IF EXISTS `budget_items_ad_counter`;
+CREATE TRIGGER `budget_items_ad_counter` AFTER DELETE ON `budget_items` FOR EACH ROW
+  UPDATE `table_change_counters` SET `change_count` = `change_count` + 1
+  WHERE `table_name` = 'budget_items' AND `shard` = CONNECTION_ID() % 16;
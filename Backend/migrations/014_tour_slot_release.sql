@@ -0,0 +1,66 @@
+-- Give a tour's places back to its slot when the booking stops holding them.
+--
+-- /api/book-tour adds a booking's guests to `tour_slots.booked_guests`
+-- (migrations/002), but nothing took them off again, so failed and deleted
+-- bookings kept their places until the slot's date had passed. These triggers
+-- keep the counter equal to the guests of the slot's bookings that still hold
+-- places, whichever path changes the row: a booking holds places unless its
+-- status is 'failed' or 'cancelled' (availability.RELEASED_STATUSES).
+-- Moving a booking to another slot, or back to a holding status, takes the
+-- places again without checking capacity, since the booking already exists.
+--
+-- Slots are 7200 seconds wide, as in migrations/002 and
+-- availability.TOUR_SLOT_MINUTES.
+-- Uses DELIMITER for the trigger bodies; apply with the mysql client or
+-- phpMyAdmin's SQL tab.
+
+ALTER TABLE `tours`
+  MODIFY `status` enum('completed','failed','pending','cancelled') DEFAULT 'pending';
+
+DELIMITER $$
+
+CREATE TRIGGER IF NOT EXISTS `tours_au_slots` AFTER UPDATE ON `tours` FOR EACH ROW
+BEGIN
+  DECLARE old_held, new_held BOOLEAN;
+  DECLARE old_slot, new_slot TIME;
+  SET old_held = OLD.`status` IS NULL OR OLD.`status` NOT IN ('failed', 'cancelled');
+  SET new_held = NEW.`status` IS NULL OR NEW.`status` NOT IN ('failed', 'cancelled');
+  SET old_slot = SEC_TO_TIME(FLOOR(TIME_TO_SEC(OLD.`time`) / 7200) * 7200);
+  SET new_slot = SEC_TO_TIME(FLOOR(TIME_TO_SEC(NEW.`time`) / 7200) * 7200);
+
+  IF NOT (old_held AND new_held AND OLD.`park_name` = NEW.`park_name` AND OLD.`date` = NEW.`date`
+          AND old_slot = new_slot AND OLD.`guests` = NEW.`guests`) THEN
+    IF old_held THEN
+      UPDATE `tour_slots` SET `booked_guests` = GREATEST(`booked_guests` - OLD.`guests`, 0)
+      WHERE `park_name` = OLD.`park_name` AND `date` = OLD.`date` AND `slot_start` = old_slot;
+    END IF;
+    IF new_held THEN
+      INSERT INTO `tour_slots` (`park_name`, `date`, `slot_start`, `capacity`, `booked_guests`)
+      VALUES (NEW.`park_name`, NEW.`date`, new_slot, GREATEST(40, NEW.`guests`), NEW.`guests`)
+      ON DUPLICATE KEY UPDATE `booked_guests` = `booked_guests` + NEW.`guests`;
+    END IF;
+  END IF;
+END$$
+
+CREATE TRIGGER IF NOT EXISTS `tours_ad_slots` AFTER DELETE ON `tours` FOR EACH ROW
+BEGIN
+  IF OLD.`status` IS NULL OR OLD.`status` NOT IN ('failed', 'cancelled') THEN
+    UPDATE `tour_slots` SET `booked_guests` = GREATEST(`booked_guests` - OLD.`guests`, 0)
+    WHERE `park_name` = OLD.`park_name` AND `date` = OLD.`date`
+    AND `slot_start` = SEC_TO_TIME(FLOOR(TIME_TO_SEC(OLD.`time`) / 7200) * 7200);
+  END IF;
+END$$
+
+DELIMITER ;
+
+-- Recount the slots from the bookings that still hold places
+UPDATE `tour_slots` s
+LEFT JOIN (
+  SELECT `park_name`, `date`, SEC_TO_TIME(FLOOR(TIME_TO_SEC(`time`) / 7200) * 7200) AS `slot_start`,
+         SUM(`guests`) AS `guests`
+  FROM `tours`
+  WHERE `status` IS NULL OR `status` NOT IN ('failed', 'cancelled')
+  GROUP BY `park_name`, `date`, SEC_TO_TIME(FLOOR(TIME_TO_SEC(`time`) / 7200) * 7200)
+) t ON t.`park_name` = s.`park_name` AND t.`date` = s.`date` AND t.`slot_start` = s.`slot_start`
+SET s.`booked_guests` = COALESCE(t.`guests`, 0)
+WHERE s.`date` >= CURDATE();
@@ -0,0 +1,11 @@
+-- Owner tokens and the `committed` state for `idempotency_keys` (migrations/003).
+--
+-- A claim now records a random `owner` token. The handler moves its key to
+-- `committed` in the same transaction as its business write
+-- (IdempotencyStore.applied), matching on that token, so a retry that took an
+-- overdue claim over and the original request can never both commit, and a
+-- key whose write has committed is never released again.
+
+ALTER TABLE `idempotency_keys`
+  ADD COLUMN IF NOT EXISTS `owner` char(32) DEFAULT NULL AFTER `request_hash`,
+  MODIFY `state` enum('in_flight','committed','completed') NOT NULL DEFAULT 'in_flight';
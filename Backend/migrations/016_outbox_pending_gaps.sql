@@ -0,0 +1,10 @@
+-- Pending gaps for the outbox relay (migrations/008).
+--
+-- The relay no longer waits at an id gap: it delivers the rows after it and
+-- keeps the missing ids, as a JSON object of id -> first seen (unix seconds),
+-- with the consumer's checkpoint. Each poll looks them up again, so an event
+-- whose transaction committed late is still delivered; an id missing for
+-- OUTBOX_GAP_SECONDS is taken to be a rollback (outbox.py).
+
+ALTER TABLE `outbox_checkpoints`
+  ADD COLUMN IF NOT EXISTS `pending_gaps` text DEFAULT NULL AFTER `last_id`;
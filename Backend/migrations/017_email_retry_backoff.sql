@@ -0,0 +1,23 @@
+-- Retry backoff and a single sender for email campaigns (migrations/009).
+--
+-- A re-queued delivery (4xx reply or dropped connection) is not claimed again
+-- before `next_attempt_at`; mailer.py doubles the wait on every attempt,
+-- starting at MAIL_RETRY_SECONDS.
+--
+-- Only the process holding the `email_sender_lease` row sends, so
+-- MAIL_RATE_PER_SECOND holds across every web worker and `python mailer.py`.
+-- The holder renews it before each batch; it expires after
+-- MAIL_CLAIM_SECONDS when the holder dies.
+
+ALTER TABLE `email_deliveries`
+  ADD COLUMN IF NOT EXISTS `next_attempt_at` timestamp NULL DEFAULT NULL AFTER `locked_until`,
+  ADD KEY IF NOT EXISTS `status_next_attempt` (`status`, `next_attempt_at`);
+
+CREATE TABLE IF NOT EXISTS `email_sender_lease` (
+  `name` varchar(32) NOT NULL,
+  `holder` char(32) DEFAULT NULL,
+  `expires_at` timestamp(6) NULL DEFAULT NULL,
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT IGNORE INTO `email_sender_lease` (`name`) VALUES ('sender');
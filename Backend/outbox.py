@@ -0,0 +1,355 @@
+"""Transactional outbox for change events (migrations/008).
+
+Write handlers call enqueue() with their own cursor before they commit:
+
+    enqueue(cursor, 'donation.created', park_name, 'donations', donation_id, amount=...)
+
+The `outbox` row commits or rolls back with the business write, so there is
+an event for every committed change and none for a failed one. The SSE hub in
+events.py is fed from here too, so dashboards see every worker's changes.
+
+OutboxRelay tails the table for one named consumer and hands each event to
+the handlers registered with subscribe() in its own process:
+
+    relay = OutboxRelay(get_db_connection, consumer='search-index')
+    relay.subscribe('donation.*', handle_donation)
+    relay.run()              # or relay.start() for a background thread
+
+A relay created with durable=False keeps its position in memory only: it
+starts at the current end of the outbox and has no `outbox_checkpoints` row.
+
+Delivery is at least once. A batch of up to OUTBOX_BATCH_SIZE events is read
+while holding the consumer's `outbox_checkpoints` row FOR UPDATE, so two
+relays with the same consumer name never deliver concurrently. The checkpoint
+only moves past events every matching handler returned from; when a handler
+raises, the batch stops there and the event is offered again after
+OUTBOX_RETRY_SECONDS, including to the handlers that already succeeded.
+Handlers must therefore be idempotent.
+
+Ids are assigned at insert but transactions commit in any order, so a gap
+before a visible row may be an event that has not committed yet. The relay
+does not wait at a gap: it delivers the rows after it, records the missing ids
+as pending gaps (with the checkpoint, in `outbox_checkpoints.pending_gaps`,
+migrations/016) and looks them up again on every poll. A pending id that shows
+up is delivered then, out of id order; one still missing after
+OUTBOX_GAP_SECONDS is taken to be a rollback and dropped. At most
+OUTBOX_MAX_PENDING_GAPS ids are tracked, the oldest being dropped first.
+
+    python outbox.py --consumer log --log     # print every event as it commits
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+
+from mysql.connector import Error
+
+
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 500))
+OUTBOX_POLL_SECONDS = float(os.getenv('OUTBOX_POLL_SECONDS', 0.5))
+OUTBOX_RETRY_SECONDS = float(os.getenv('OUTBOX_RETRY_SECONDS', 5))
+OUTBOX_GAP_SECONDS = float(os.getenv('OUTBOX_GAP_SECONDS', 600))
+OUTBOX_MAX_PENDING_GAPS = int(os.getenv('OUTBOX_MAX_PENDING_GAPS', 1000))
+OUTBOX_RETENTION_DAYS = int(os.getenv('OUTBOX_RETENTION_DAYS', 7))
+OUTBOX_PURGE_SECONDS = 3600
+PURGE_BATCH_SIZE = 10000
+
+_enqueued = 0
+
+
+class OutboxEvent(NamedTuple):
+    id: int
+    type: str
+    aggregate: str
+    aggregate_id: Optional[str]
+    park: Optional[str]
+    data: dict
+    created_at: object
+
+
+def _row(event_type, park, aggregate, aggregate_id, data):
+    return (event_type, aggregate, None if aggregate_id is None else str(aggregate_id), park,
+            json.dumps(data, default=str, separators=(',', ':')))
+
+
+def enqueue(cursor, event_type, park, aggregate, aggregate_id=None, **data):
+    """Add an event to the caller's open transaction; it is published when the caller commits."""
+    enqueue_many(cursor, [(event_type, park, aggregate, aggregate_id, data)])
+
+
+def enqueue_many(cursor, events):
+    """enqueue() for a list of (event_type, park, aggregate, aggregate_id, data), in one INSERT."""
+    global _enqueued
+    if not events:
+        return
+    cursor.execute(
+        "INSERT INTO outbox (event_type, aggregate, aggregate_id, park_name, payload) VALUES "
+        + ", ".join(["(%s, %s, %s, %s, %s)"] * len(events)),
+        [value for event in events for value in _row(*event)]
+    )
+    _enqueued += len(events)
+
+
+def backlog(connect):
+    """Checkpoint, undelivered event count and lag of every consumer, for /api/metrics."""
+    connection = connect()
+    if not connection or isinstance(connection, str):
+        return {"enqueued": _enqueued, "error": "Database connection failed"}
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT IFNULL(MAX(id), 0) FROM outbox")
+        head = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT c.consumer, c.last_id,
+                   TIMESTAMPDIFF(MICROSECOND, (SELECT MIN(o.created_at) FROM outbox o WHERE o.id > c.last_id),
+                                 NOW(6)) / 1000000
+            FROM outbox_checkpoints c
+        """)
+        consumers = {
+            consumer: {
+                "checkpoint": last_id,
+                "backlog": max(head - last_id, 0),
+                "lag_seconds": float(lag) if lag is not None else 0.0
+            } for consumer, last_id, lag in cursor.fetchall()
+        }
+        connection.rollback()
+        return {"enqueued": _enqueued, "head": head, "consumers": consumers}
+    finally:
+        cursor.close()
+        connection.close()
+
+
+class OutboxRelay:
+    def __init__(self, connect, consumer=None, durable=True):
+        self._connect = connect
+        self.consumer = consumer or os.getenv('OUTBOX_CONSUMER', 'relay')
+        self.durable = durable
+        self._handlers = []
+        self._thread_pid = None
+        self._purged_at = 0.0
+        self.checkpoint = None
+        # Missing ids below the checkpoint -> time.time() they were first seen missing
+        self.pending_gaps = {}
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self.late_events = 0
+        self.gaps_dropped = 0
+        self.purged = 0
+        self.last_error = None
+        self.last_batch_ms = None
+
+    def subscribe(self, pattern, handler):
+        """Call handler(event) for event types matching `pattern`: 'tour.booked', 'tour.*' or '*'."""
+        self._handlers.append((pattern, handler))
+        return handler
+
+    def _handlers_for(self, event_type):
+        return [
+            handler for pattern, handler in self._handlers
+            if pattern == '*' or pattern == event_type
+            or (pattern.endswith('.*') and event_type.startswith(pattern[:-1]))
+        ]
+
+    def _deliver(self, row):
+        """Hand a row to its handlers; False when one of them raised."""
+        event = OutboxEvent(row[0], row[1], row[2], row[3], row[4], json.loads(row[5]), row[6])
+        try:
+            for handler in self._handlers_for(event.type):
+                handler(event)
+        except Exception as e:
+            print(f"Outbox handler failed on event {event.id} ({event.type}): {e}")
+            self.failures += 1
+            self.last_error = f"{event.id}: {e}"
+            return False
+        return True
+
+    def poll_once(self):
+        """Deliver one batch; returns the number of events delivered."""
+        started = time.perf_counter()
+        connection = self._connect()
+        if not connection or isinstance(connection, str):
+            self.failures += 1
+            self.last_error = "Database connection failed"
+            return 0
+
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            if self.durable:
+                cursor.execute("INSERT IGNORE INTO outbox_checkpoints (consumer, last_id) VALUES (%s, 0)", (self.consumer,))
+                cursor.execute(
+                    "SELECT last_id, pending_gaps FROM outbox_checkpoints WHERE consumer = %s FOR UPDATE",
+                    (self.consumer,)
+                )
+                last_id, stored_gaps = cursor.fetchone()
+                pending = {int(gap_id): seen for gap_id, seen in json.loads(stored_gaps or '{}').items()}
+            elif self.checkpoint is None:
+                cursor.execute("SELECT IFNULL(MAX(id), 0) FROM outbox")
+                self.checkpoint = cursor.fetchone()[0]
+                self.pending_gaps = {}
+                connection.commit()
+                return 0
+            else:
+                last_id = self.checkpoint
+                pending = dict(self.pending_gaps)
+            stored = dict(pending)
+
+            columns = "id, event_type, aggregate, aggregate_id, park_name, payload, created_at"
+            count = 0
+            failed = False
+            now = time.time()
+
+            # Pending gaps first: a late commit is delivered as soon as it is visible
+            if pending:
+                ids = sorted(pending)
+                cursor.execute(
+                    f"SELECT {columns} FROM outbox WHERE id IN ({', '.join(['%s'] * len(ids))}) ORDER BY id", ids
+                )
+                for row in cursor.fetchall():
+                    if not self._deliver(row):
+                        failed = True
+                        break
+                    del pending[row[0]]
+                    self.late_events += 1
+                    count += 1
+                if not failed:
+                    expired = [gap_id for gap_id, seen in pending.items() if now - seen > OUTBOX_GAP_SECONDS]
+                    for gap_id in expired:
+                        del pending[gap_id]
+                    self.gaps_dropped += len(expired)
+
+            delivered_to = last_id
+            if not failed:
+                cursor.execute(
+                    f"SELECT {columns} FROM outbox WHERE id > %s ORDER BY id LIMIT %s", (last_id, OUTBOX_BATCH_SIZE)
+                )
+                for row in cursor.fetchall():
+                    if not self._deliver(row):
+                        break
+                    # Ids skipped on the way may still be committing
+                    first_gap = max(delivered_to + 1, row[0] - OUTBOX_MAX_PENDING_GAPS)
+                    self.gaps_dropped += first_gap - delivered_to - 1
+                    for gap_id in range(first_gap, row[0]):
+                        pending.setdefault(gap_id, now)
+                    delivered_to = row[0]
+                    count += 1
+
+            if len(pending) > OUTBOX_MAX_PENDING_GAPS:
+                oldest = sorted(pending, key=lambda gap_id: (pending[gap_id], gap_id))
+                for gap_id in oldest[:len(pending) - OUTBOX_MAX_PENDING_GAPS]:
+                    del pending[gap_id]
+                    self.gaps_dropped += 1
+
+            if self.durable and (delivered_to != last_id or pending != stored):
+                cursor.execute(
+                    "UPDATE outbox_checkpoints SET last_id = %s, pending_gaps = %s WHERE consumer = %s",
+                    (delivered_to, json.dumps({str(gap_id): seen for gap_id, seen in pending.items()}) if pending else None,
+                     self.consumer)
+                )
+            connection.commit()
+        except Error as e:
+            print(f"Outbox relay failed: {e}")
+            connection.rollback()
+            self.failures += 1
+            self.last_error = str(e)
+            return 0
+        finally:
+            if cursor:
+                cursor.close()
+            connection.close()
+
+        self.checkpoint = delivered_to
+        self.pending_gaps = pending
+        self.delivered += count
+        self.batches += 1
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+        return count
+
+    def purge(self):
+        """Delete events every consumer has passed and that are past retention."""
+        connection = self._connect()
+        if not connection or isinstance(connection, str):
+            return 0
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                DELETE FROM outbox
+                WHERE id <= (SELECT IFNULL(MIN(last_id), 0) FROM outbox_checkpoints)
+                  AND created_at < NOW() - INTERVAL %s DAY
+                ORDER BY id LIMIT %s
+            """, (OUTBOX_RETENTION_DAYS, PURGE_BATCH_SIZE))
+            deleted = cursor.rowcount
+            connection.commit()
+        except Error as e:
+            print(f"Outbox purge failed: {e}")
+            connection.rollback()
+            return 0
+        finally:
+            cursor.close()
+            connection.close()
+        self.purged += deleted
+        return deleted
+
+    def run(self, stop=None):
+        """Poll until `stop` (a threading.Event) is set; full batches are followed immediately by the next."""
+        while stop is None or not stop.is_set():
+            failures = self.failures
+            delivered = self.poll_once()
+            if time.monotonic() - self._purged_at > OUTBOX_PURGE_SECONDS:
+                self._purged_at = time.monotonic()
+                self.purge()
+            if self.failures != failures:
+                time.sleep(OUTBOX_RETRY_SECONDS)
+            elif delivered < OUTBOX_BATCH_SIZE:
+                time.sleep(OUTBOX_POLL_SECONDS)
+
+    def start(self):
+        """Run the relay on a daemon thread in this process (again after a fork)."""
+        if self._thread_pid != os.getpid():
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self.run, name=f'outbox-relay-{self.consumer}', daemon=True).start()
+
+    def snapshot(self):
+        return {
+            "consumer": self.consumer,
+            "handlers": len(self._handlers),
+            "checkpoint": self.checkpoint,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failures": self.failures,
+            "pending_gaps": len(self.pending_gaps),
+            "late_events": self.late_events,
+            "gaps_dropped": self.gaps_dropped,
+            "purged": self.purged,
+            "last_error": self.last_error,
+            "last_batch_ms": self.last_batch_ms
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay committed outbox events to this process's subscribers.")
+    parser.add_argument('--consumer', default=None, help="checkpoint name (default: OUTBOX_CONSUMER or 'relay')")
+    parser.add_argument('--log', action='store_true', help="print every event")
+    parser.add_argument('--once', action='store_true', help="deliver one batch and exit")
+    args = parser.parse_args()
+
+    from core import get_db_connection
+
+    relay = OutboxRelay(get_db_connection, args.consumer)
+    if args.log:
+        relay.subscribe('*', lambda event: print(
+            f"{event.id} {event.created_at} {event.type} {event.aggregate}:{event.aggregate_id} "
+            f"park={event.park} {json.dumps(event.data, default=str)}"
+        ))
+    if args.once:
+        relay.poll_once()
+        print(relay.snapshot())
+    else:
+        relay.run()
+
+
+if __name__ == '__main__':
+    main()
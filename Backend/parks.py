@@ -0,0 +1,81 @@
+"""Park name -> id map for the `parks` dimension table (migrations/007).
+
+The API keeps taking and returning park names; handlers translate them once
+with park_id() and scope their queries on the integer `park_id` columns.
+Names match case-insensitively and ignoring surrounding spaces, like the
+utf8mb4_general_ci unique key on `parks.name`. The whole table is tiny, so it
+is cached per process and reloaded every PARKS_CACHE_SECONDS, or sooner when a
+name is not found (a park registered by another worker's write), at most once
+per PARKS_MISS_RELOAD_SECONDS.
+"""
+import os
+import threading
+import time
+
+
+PARKS_CACHE_SECONDS = float(os.getenv('PARKS_CACHE_SECONDS', 300))
+PARKS_MISS_RELOAD_SECONDS = 5
+
+
+def _key(name):
+    return name.strip().casefold()
+
+
+class ParkDirectory:
+    def __init__(self):
+        self._ids = {}
+        self._names = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _load(self, cursor):
+        cursor.execute("SELECT id, name FROM parks")
+        rows = cursor.fetchall()
+        if rows and isinstance(rows[0], dict):
+            rows = [(row['id'], row['name']) for row in rows]
+        with self._lock:
+            self._ids = {_key(name): park_id for park_id, name in rows}
+            self._names = {park_id: name for park_id, name in rows}
+            self._loaded_at = time.monotonic()
+            self.reloads += 1
+
+    def _age(self):
+        return float('inf') if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    def park_id(self, cursor, name):
+        """The id for a park name, or None when no such park exists."""
+        if not name or not name.strip():
+            return None
+        if self._age() > PARKS_CACHE_SECONDS:
+            self._load(cursor)
+        park_id = self._ids.get(_key(name))
+        if park_id is None and self._age() > PARKS_MISS_RELOAD_SECONDS:
+            self._load(cursor)
+            park_id = self._ids.get(_key(name))
+        if park_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return park_id
+
+    def name(self, cursor, park_id):
+        """The display name for a park id, or None."""
+        if park_id is None:
+            return None
+        if self._age() > PARKS_CACHE_SECONDS or (park_id not in self._names and self._age() > PARKS_MISS_RELOAD_SECONDS):
+            self._load(cursor)
+        return self._names.get(park_id)
+
+    def snapshot(self):
+        return {
+            "parks": len(self._ids),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads
+        }
+
+
+parks = ParkDirectory()
@@ -0,0 +1,142 @@
+"""Production launcher: a preloaded app served by N forked gunicorn workers.
+
+    FLASK_ENV=production python server.py          # or: python production.py
+    python production.py restart                    # zero-downtime code reload
+
+Configuration (environment variables):
+
+    WEB_BIND                  address to listen on (0.0.0.0:5000)
+    WEB_WORKERS               worker processes (2 x CPU cores + 1)
+    WEB_THREADS               request threads per worker (4)
+    WEB_MAX_REQUESTS          recycle a worker after this many requests (1000)
+    WEB_MAX_REQUESTS_JITTER   random extra requests so workers do not recycle together (100)
+    WEB_GRACEFUL_TIMEOUT      seconds a worker may finish in-flight requests on restart (30)
+    WEB_PIDFILE               master pid file used by `restart` (/tmp/parkhub.pid)
+    MYSQL_MAX_CONNECTIONS     the server's max_connections (151, the MySQL default)
+    DB_CONNECTION_RESERVE     connections left for admin tools, migrations and replicas (10)
+    WEB_ROLLING_RESTART       1 to size pools for `restart` (default), 0 for stop/start only
+
+Each worker gets a connection pool of WEB_THREADS + 2 connections, reduced when
+needed so that WEB_WORKERS pools together stay within MYSQL_MAX_CONNECTIONS
+minus the reserve. During `restart` the old and the new master's workers run
+side by side, so by default the pools are sized for two sets of workers: half
+the connections each. With WEB_ROLLING_RESTART=0 every worker gets the whole
+budget and `restart` refuses to run; stop the old master before starting a
+new one instead. The app is imported once in the master (preload) and the
+pool is created lazily in each worker after fork.
+
+Rolling restarts: `kill -HUP <master>` replaces workers gracefully with the
+same code. Because the app is preloaded, new code needs a new master;
+`python production.py restart` sends USR2 to start one next to the old master,
+waits for it to come up, then retires the old master's workers (WINCH) and the
+old master itself (QUIT) so in-flight requests finish first.
+"""
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from mysql.connector.pooling import CNX_POOL_MAXSIZE
+
+
+WEB_BIND = os.getenv('WEB_BIND', '0.0.0.0:5000')
+WEB_WORKERS = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+WEB_THREADS = int(os.getenv('WEB_THREADS', 4))
+WEB_MAX_REQUESTS = int(os.getenv('WEB_MAX_REQUESTS', 1000))
+WEB_MAX_REQUESTS_JITTER = int(os.getenv('WEB_MAX_REQUESTS_JITTER', 100))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+WEB_PIDFILE = os.getenv('WEB_PIDFILE', '/tmp/parkhub.pid')
+MYSQL_MAX_CONNECTIONS = int(os.getenv('MYSQL_MAX_CONNECTIONS', 151))
+DB_CONNECTION_RESERVE = int(os.getenv('DB_CONNECTION_RESERVE', 10))
+WEB_ROLLING_RESTART = os.getenv('WEB_ROLLING_RESTART', '1') != '0'
+
+
+def pool_size_per_worker(workers, threads, rolling_restart=WEB_ROLLING_RESTART):
+    """Connections per worker so that all workers together stay under max_connections.
+
+    With rolling restarts two generations of workers overlap, so each gets half.
+    """
+    generations = 2 if rolling_restart else 1
+    budget = (MYSQL_MAX_CONNECTIONS - DB_CONNECTION_RESERVE) // (max(workers, 1) * generations)
+    if budget < 1:
+        raise SystemExit(
+            f"{workers * generations} workers cannot share {MYSQL_MAX_CONNECTIONS - DB_CONNECTION_RESERVE} "
+            f"MySQL connections; lower WEB_WORKERS, raise MYSQL_MAX_CONNECTIONS or set WEB_ROLLING_RESTART=0"
+        )
+    size = min(threads + 2, budget, CNX_POOL_MAXSIZE)
+    if size < threads:
+        print(f"Warning: pool size {size} is below {threads} threads per worker; "
+              f"requests will wait up to DB_POOL_TIMEOUT for a connection")
+    return size
+
+
+def main():
+    from gunicorn.app.base import BaseApplication
+
+    # Read by each worker when it creates its pools (core.db_pool_size)
+    os.environ['DB_POOL_SIZE'] = str(pool_size_per_worker(WEB_WORKERS, WEB_THREADS))
+
+    class ProductionApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', WEB_BIND)
+            self.cfg.set('workers', WEB_WORKERS)
+            self.cfg.set('threads', WEB_THREADS)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('preload_app', True)
+            self.cfg.set('max_requests', WEB_MAX_REQUESTS)
+            self.cfg.set('max_requests_jitter', WEB_MAX_REQUESTS_JITTER)
+            self.cfg.set('graceful_timeout', WEB_GRACEFUL_TIMEOUT)
+            self.cfg.set('pidfile', WEB_PIDFILE)
+            self.cfg.set('accesslog', '-')
+
+        def load(self):
+            from server import app
+            return app
+
+    print(f"Starting {WEB_WORKERS} workers x {WEB_THREADS} threads on {WEB_BIND}, "
+          f"{os.environ['DB_POOL_SIZE']} DB connections per worker"
+          f"{' (half the budget, for rolling restarts)' if WEB_ROLLING_RESTART else ''}")
+    ProductionApplication().run()
+
+
+def read_pid(path):
+    try:
+        with open(path) as pidfile:
+            return int(pidfile.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def restart(timeout=60):
+    """Start a new master with fresh code, then gracefully retire the old one."""
+    if not WEB_ROLLING_RESTART:
+        raise SystemExit("WEB_ROLLING_RESTART=0: the pools leave no room for a second set of workers; "
+                         "stop the running master, then start a new one")
+    old_pid = read_pid(WEB_PIDFILE)
+    if old_pid is None:
+        raise SystemExit(f"No running master found in {WEB_PIDFILE}")
+
+    os.kill(old_pid, signal.SIGUSR2)
+
+    # The old master renames its pid file to .oldbin once the new master is running
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        new_pid = read_pid(WEB_PIDFILE)
+        if new_pid and new_pid != old_pid and read_pid(WEB_PIDFILE + '.oldbin') == old_pid:
+            break
+        time.sleep(0.5)
+    else:
+        raise SystemExit("New master did not start; old master left running")
+
+    os.kill(old_pid, signal.SIGWINCH)
+    time.sleep(WEB_GRACEFUL_TIMEOUT)
+    os.kill(old_pid, signal.SIGQUIT)
+    print(f"Restarted: master {old_pid} replaced by {new_pid}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'restart':
+        restart()
+    else:
+        main()
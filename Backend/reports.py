@@ -0,0 +1,232 @@
+"""Server-side financial reports for auditors and government officers.
+
+The ledger (tours, donations and the approved fund, extra-funds and emergency
+requests) is loaded once into pandas column arrays and every report section is
+computed with vectorized group-bys. Results are cached per (park, status) and
+keyed by the source tables' change counters (migrations/001 and 013), so repeated
+dashboard loads never rebuild an unchanged report.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+# Fiscal years run July-June and are labelled like the budgets table ("2025-26").
+FISCAL_YEAR_START_MONTH = 7
+
+SOURCE_TABLES = (
+    'tours', 'donations', 'fund_requests', 'extra_funds_requests',
+    'emergency_requests', 'budgets', 'budget_items'
+)
+
+LEDGER_QUERY = """
+    SELECT 'income', 'tours', park_name, amount, created_at, status FROM tours
+    UNION ALL
+    SELECT 'income', 'donations', park_name, amount, created_at, status FROM donations
+    UNION ALL
+    SELECT 'expense', 'fund_requests', parkname, amount, created_at, status
+    FROM fund_requests WHERE status = 'approved'
+    UNION ALL
+    SELECT 'expense', 'extra_funds', park_name, amount, created_at, status
+    FROM extra_funds_requests WHERE status = 'approved'
+    UNION ALL
+    SELECT 'expense', 'emergency', park_name, amount, created_at, status
+    FROM emergency_requests WHERE status = 'approved'
+"""
+
+BUDGET_QUERY = """
+    SELECT b.park_name, b.fiscal_year, bi.type, bi.amount
+    FROM budgets b
+    JOIN budget_items bi ON bi.budget_id = b.id
+    WHERE b.status = 'approved'
+"""
+
+LEDGER_COLUMNS = ['kind', 'category', 'park', 'amount', 'date', 'status']
+
+_CACHE_SIZE = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_change_counters(cursor):
+    """Return the source tables' change counters, or None if they are not installed."""
+    try:
+        cursor.execute(
+            # One row per shard since migrations/013; the sum moves with every write
+            "SELECT table_name, SUM(change_count) FROM table_change_counters "
+            "WHERE table_name IN ({}) GROUP BY table_name".format(', '.join(['%s'] * len(SOURCE_TABLES))),
+            SOURCE_TABLES
+        )
+        counters = dict(cursor.fetchall())
+    except Exception as e:
+        print(f"Change counters unavailable: {e}")
+        return None
+    return tuple(int(counters.get(table, 0)) for table in SOURCE_TABLES)
+
+
+def fiscal_year_labels(dates):
+    """Vectorized fiscal year label ("2025-26") for a datetime Series."""
+    start_year = dates.dt.year - (dates.dt.month < FISCAL_YEAR_START_MONTH).astype(int)
+    end_year = (start_year + 1) % 100
+    return start_year.astype(str) + '-' + end_year.map('{:02d}'.format)
+
+
+def normalize_fiscal_year(label):
+    """Map the free-text budget fiscal_year ("2025" or "2025-26") to a fiscal year label."""
+    label = str(label).strip()
+    if len(label) >= 4 and label[:4].isdigit():
+        start_year = int(label[:4])
+        return f"{start_year}-{(start_year + 1) % 100:02d}"
+    return label
+
+
+def load_ledger(cursor, park_name=None, status=None):
+    """Load the ledger into a DataFrame of column arrays."""
+    cursor.execute(LEDGER_QUERY)
+    rows = cursor.fetchall()
+    if rows:
+        kind, category, park, amount, created_at, row_status = zip(*rows)
+    else:
+        kind = category = park = amount = created_at = row_status = ()
+
+    ledger = pd.DataFrame({
+        'kind': pd.Categorical(kind, categories=['income', 'expense']),
+        'category': pd.Categorical(category),
+        'park': pd.Categorical(park),
+        'amount': np.asarray(amount, dtype=np.float64),
+        'date': pd.to_datetime(pd.Series(created_at, dtype='object')),
+        'status': pd.Categorical(row_status),
+    }, columns=LEDGER_COLUMNS)
+
+    if park_name:
+        ledger = ledger[ledger['park'] == park_name]
+    if status:
+        # The status filter narrows income rows; expenses are already approved-only.
+        ledger = ledger[(ledger['kind'] == 'expense') | (ledger['status'] == status)]
+
+    ledger = ledger.assign(
+        fiscal_year=fiscal_year_labels(ledger['date']),
+        month=ledger['date'].dt.to_period('M').astype(str),
+        signed=np.where(ledger['kind'] == 'expense', -ledger['amount'], ledger['amount'])
+    )
+    return ledger
+
+
+def load_budgets(cursor, park_name=None):
+    """Load approved budget items as a DataFrame."""
+    cursor.execute(BUDGET_QUERY)
+    rows = cursor.fetchall()
+    budgets = pd.DataFrame(rows, columns=['park', 'fiscal_year', 'kind', 'amount'])
+    budgets['amount'] = budgets['amount'].astype(np.float64)
+    budgets['fiscal_year'] = budgets['fiscal_year'].map(normalize_fiscal_year)
+    if park_name:
+        budgets = budgets[budgets['park'] == park_name]
+    return budgets
+
+
+def _income_expense_totals(ledger, keys):
+    """Pivot income and expense sums side by side for the given group keys."""
+    totals = ledger.pivot_table(
+        index=keys, columns='kind', values='amount',
+        aggfunc='sum', fill_value=0.0, observed=True
+    )
+    totals = totals.reindex(columns=['income', 'expense'], fill_value=0.0)
+    totals['net'] = totals['income'] - totals['expense']
+    return totals.reset_index()
+
+
+def _category_totals(ledger):
+    totals = ledger.groupby(['kind', 'category'], observed=True)['amount'].agg(['sum', 'count'])
+    return totals.rename(columns={'sum': 'total'}).reset_index()
+
+
+def _variances(ledger, budgets):
+    """Budgeted versus actual income and expense per park and fiscal year."""
+    keys = ['park', 'fiscal_year']
+    actual = _income_expense_totals(ledger, keys)[keys + ['income', 'expense']]
+    actual['park'] = actual['park'].astype(str)
+    budgeted = budgets.pivot_table(
+        index=keys, columns='kind', values='amount', aggfunc='sum', fill_value=0.0
+    ).reindex(columns=['income', 'expense'], fill_value=0.0).reset_index()
+
+    merged = actual.merge(budgeted, on=keys, how='outer', suffixes=('_actual', '_budgeted'))
+    merged = merged.fillna(0.0)
+    merged['income_variance'] = merged['income_actual'] - merged['income_budgeted']
+    merged['expense_variance'] = merged['expense_budgeted'] - merged['expense_actual']
+    return merged.sort_values(keys)
+
+
+def _running_balances(ledger):
+    """Monthly net movement and cumulative balance per park."""
+    monthly = ledger.groupby(['park', 'month'], observed=True)['signed'].sum().reset_index()
+    monthly = monthly.sort_values(['park', 'month'])
+    monthly['balance'] = monthly.groupby('park', observed=True)['signed'].cumsum()
+    return monthly.rename(columns={'signed': 'net'})
+
+
+def _compact(frame):
+    """Serialize a DataFrame as {"columns": [...], "rows": [[...], ...]}."""
+    frame = frame.copy()
+    for column in frame.columns:
+        if frame[column].dtype.kind == 'f':
+            frame[column] = frame[column].round(2)
+        elif frame[column].dtype.kind not in 'iub':
+            frame[column] = frame[column].astype(str)
+    return {"columns": list(frame.columns), "rows": frame.values.tolist()}
+
+
+def build_financial_report(cursor, park_name=None, status=None):
+    """Compute every report section from freshly loaded column arrays."""
+    ledger = load_ledger(cursor, park_name, status)
+    budgets = load_budgets(cursor, park_name)
+
+    income = float(ledger.loc[ledger['kind'] == 'income', 'amount'].sum())
+    expense = float(ledger.loc[ledger['kind'] == 'expense', 'amount'].sum())
+
+    return {
+        "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "park": park_name,
+        "status": status,
+        "totals": {
+            "income": round(income, 2),
+            "expense": round(expense, 2),
+            "net": round(income - expense, 2),
+            "entries": int(len(ledger))
+        },
+        "by_park": _compact(_income_expense_totals(ledger, ['park'])),
+        "by_category": _compact(_category_totals(ledger)),
+        "by_fiscal_year": _compact(_income_expense_totals(ledger, ['fiscal_year'])),
+        "variances": _compact(_variances(ledger, budgets)),
+        "running_balances": _compact(_running_balances(ledger))
+    }
+
+
+def get_financial_report(connection, park_name=None, status=None):
+    """Return a cached report, rebuilding it only when a source table has changed."""
+    cursor = connection.cursor()
+    try:
+        counters = get_change_counters(cursor)
+        cache_key = (park_name, status)
+
+        if counters is not None:
+            with _cache_lock:
+                cached = _cache.get(cache_key)
+                if cached and cached[0] == counters:
+                    _cache.move_to_end(cache_key)
+                    return cached[1], True
+
+        report = build_financial_report(cursor, park_name, status)
+
+        if counters is not None:
+            report['version'] = '-'.join(str(count) for count in counters)
+            with _cache_lock:
+                _cache[cache_key] = (counters, report)
+                _cache.move_to_end(cache_key)
+                while len(_cache) > _CACHE_SIZE:
+                    _cache.popitem(last=False)
+        return report, False
+    finally:
+        cursor.close()
@@ -0,0 +1,227 @@
+"""Account and staff queries run as server-side prepared statements.
+
+The role tables share one shape, and the handlers used to repeat the same
+lookups with f-string table names. This module owns exactly those cross-role
+queries: the login lookup, existence, delete and email-in-use checks, password
+hashes and staff parks, one SQL string per table built once. Queries that are
+specific to one role's handler (profile updates, dashboards, reports) stay
+inline in its blueprint; they run once per request on one table, where a
+shared statement buys nothing. Each one runs through a prepared
+cursor (binary protocol) that is cached on the underlying connection, so a
+statement is parsed by the server once per pooled connection instead of on
+every call, and results come back already typed.
+
+The pools are created with pool_reset_session=False, because COM_RESET_CONNECTION
+would deallocate the cached statements; get_db_connection() rolls back instead
+when it checks a connection out. If a statement was deallocated anyway (a
+reconnect, or a connection from an unpooled source), it is prepared again once
+and the call retried.
+
+Rows are returned as the NamedTuple types below rather than dicts.
+"""
+import threading
+import weakref
+from typing import NamedTuple, Optional
+
+from mysql.connector import Error
+
+
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+USER_TABLES = (
+    ('admintable', 'admin'),
+    ('parkstaff', 'park-staff'),
+    ('finance_officers', 'finance'),
+    ('auditors', 'auditor'),
+    ('government_officers', 'government'),
+)
+STAFF_TABLES = {
+    'park-staff': 'parkstaff',
+    'auditor': 'auditors',
+    'government': 'government_officers',
+    'finance': 'finance_officers',
+}
+PARK_ID_TABLES = ('finance_officers', 'parkstaff')
+
+
+class UserRow(NamedTuple):
+    id: int
+    table: str
+    role: str
+    first_name: str
+    last_name: str
+    email: str
+    password_hash: str
+    park_name: Optional[str]
+    avatar_url: Optional[str]
+
+
+class StaffPark(NamedTuple):
+    park_name: Optional[str]
+    park_id: Optional[int]
+
+
+# SQL text is built once: the prepared cursor only reuses a statement when it is
+# given the very same string object again.
+AVATAR_COLUMNS = (
+    "SELECT table_name FROM information_schema.columns "
+    "WHERE table_schema = DATABASE() AND column_name = 'avatar_url'"
+)
+EMAIL_IN_USE = "SELECT EXISTS ({})".format(" UNION ALL ".join(
+    f"SELECT 1 FROM {table} WHERE email = %s AND NOT (id = %s AND %s = '{table}')"
+    for table in STAFF_TABLES.values()
+))
+USER_EXISTS = {table: f"SELECT EXISTS (SELECT 1 FROM {table} WHERE id = %s)" for table, _ in USER_TABLES}
+DELETE_USER = {table: f"DELETE FROM {table} WHERE id = %s" for table, _ in USER_TABLES}
+GET_PASSWORD_HASH = {table: f"SELECT password_hash FROM {table} WHERE id = %s" for table, _ in USER_TABLES}
+SET_PASSWORD_HASH = {table: f"UPDATE {table} SET password_hash = %s WHERE id = %s" for table, _ in USER_TABLES}
+GET_STAFF_PARK = {
+    table: f"SELECT park_name, {'park_id' if table in PARK_ID_TABLES else 'NULL'} FROM {table} WHERE id = %s"
+    for table, _ in USER_TABLES
+}
+
+
+class StatementCache:
+    """Prepared cursors per underlying connection, keyed by SQL text."""
+
+    def __init__(self):
+        self._cursors = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.prepares = 0
+        self.hits = 0
+        self.reprepares = 0
+
+    @staticmethod
+    def _raw(connection):
+        # Pooled connections wrap the real one, which outlives each checkout
+        return getattr(connection, '_cnx', None) or connection
+
+    def cursor(self, connection, sql):
+        raw = self._raw(connection)
+        with self._lock:
+            cursors = self._cursors.setdefault(raw, {})
+        cursor = cursors.get(sql)
+        if cursor is None:
+            cursor = cursors[sql] = raw.cursor(prepared=True)
+            self.prepares += 1
+        else:
+            self.hits += 1
+        return cursor
+
+    def discard(self, connection):
+        with self._lock:
+            cursors = self._cursors.pop(self._raw(connection), {})
+        for cursor in cursors.values():
+            try:
+                cursor.close()
+            except Error:
+                pass
+
+    def execute(self, connection, sql, params):
+        """Run `sql` on the connection's prepared cursor for it; returns the cursor."""
+        cursor = self.cursor(connection, sql)
+        try:
+            cursor.execute(sql, params)
+        except Error as e:
+            if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                raise
+            # The server dropped the statement (reconnect or session reset): prepare again
+            self.discard(connection)
+            self.reprepares += 1
+            cursor = self.cursor(connection, sql)
+            cursor.execute(sql, params)
+        return cursor
+
+    def snapshot(self):
+        with self._lock:
+            connections = len(self._cursors)
+            statements = sum(len(cursors) for cursors in self._cursors.values())
+        return {
+            "connections": connections,
+            "statements": statements,
+            "prepares": self.prepares,
+            "hits": self.hits,
+            "reprepares": self.reprepares
+        }
+
+
+statements = StatementCache()
+
+
+def _fetchall(connection, sql, params):
+    return statements.execute(connection, sql, params).fetchall()
+
+
+def _fetchone(connection, sql, params):
+    rows = _fetchall(connection, sql, params)
+    return rows[0] if rows else None
+
+
+def _scalar(connection, sql, params):
+    row = _fetchone(connection, sql, params)
+    return row[0] if row else None
+
+
+def _write(connection, sql, params):
+    return statements.execute(connection, sql, params).rowcount
+
+
+_find_user_sql = None
+_find_user_lock = threading.Lock()
+
+
+def _find_user_by_email_sql(connection):
+    """The login lookup, selecting '' for avatar_url where a table lacks it (before migrations/006)."""
+    global _find_user_sql
+    if _find_user_sql is None:
+        with _find_user_lock:
+            if _find_user_sql is None:
+                with_avatar = {str(name).lower() for name, in _fetchall(connection, AVATAR_COLUMNS, ())}
+                selects = []
+                for priority, (table, role) in enumerate(USER_TABLES):
+                    avatar = 'avatar_url' if table in with_avatar else "''"
+                    selects.append(
+                        f"SELECT {priority} AS priority, id, '{table}' AS tbl, '{role}' AS role, "
+                        f"first_name, last_name, email, password_hash, park_name, {avatar} AS avatar_url "
+                        f"FROM {table} WHERE email = %s"
+                    )
+                _find_user_sql = "SELECT * FROM ({}) users ORDER BY priority LIMIT 1".format(" UNION ALL ".join(selects))
+    return _find_user_sql
+
+
+def find_user_by_email(connection, email):
+    """The account for an email across every role table, in USER_TABLES order, or None."""
+    row = _fetchone(connection, _find_user_by_email_sql(connection), (email,) * len(USER_TABLES))
+    return UserRow._make(row[1:]) if row else None
+
+
+def email_in_use(connection, email, exclude_table=None, exclude_id=None):
+    """Whether another staff account already uses `email`."""
+    params = []
+    for _ in STAFF_TABLES.values():
+        params += [email, exclude_id or 0, exclude_table or '']
+    return bool(_scalar(connection, EMAIL_IN_USE, params))
+
+
+def user_exists(connection, table, user_id):
+    return bool(_scalar(connection, USER_EXISTS[table], (user_id,)))
+
+
+def delete_user(connection, table, user_id):
+    """Delete the account; returns whether a row was removed. The caller commits."""
+    return _write(connection, DELETE_USER[table], (user_id,)) > 0
+
+
+def get_password_hash(connection, table, user_id):
+    return _scalar(connection, GET_PASSWORD_HASH[table], (user_id,))
+
+
+def set_password_hash(connection, table, user_id, password_hash):
+    """Store a new password hash; the caller commits."""
+    return _write(connection, SET_PASSWORD_HASH[table], (password_hash, user_id)) > 0
+
+
+def staff_park(connection, table, user_id):
+    """The park a staff member belongs to, or None when the account does not exist."""
+    row = _fetchone(connection, GET_STAFF_PARK[table], (user_id,))
+    return StaffPark._make(row) if row else None
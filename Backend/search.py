@@ -0,0 +1,102 @@
+"""Ranked full-text search over services, funding requests and donations.
+
+Each source is matched against its FULLTEXT index (migrations/004) in boolean
+mode with prefix terms, so partially typed words still match, and the hits are
+merged by relevance in one UNION query. Park scoping is applied inside each
+branch so the index lookup only returns rows the caller may see. Services carry
+no park and are only searched when no park scope applies.
+"""
+import re
+
+
+SEARCH_TYPES = ('services', 'fund_requests', 'extra_funds', 'emergency', 'donations')
+MAX_PER_PAGE = 50
+MIN_QUERY_LENGTH = 2
+
+# Boolean-mode operators are stripped so user input is always treated as plain words
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+_BRANCHES = {
+    'services': ("""
+        SELECT 'services' AS type, id,
+               CONVERT(company_name USING utf8mb4) AS title,
+               CONVERT(provided_service USING utf8mb4) AS snippet,
+               NULL AS park, NULL AS amount, CONVERT(status USING utf8mb4) AS status, created_at,
+               MATCH(company_name, provided_service) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM services
+        WHERE MATCH(company_name, provided_service) AGAINST (%s IN BOOLEAN MODE)
+    """, None),
+    'fund_requests': ("""
+        SELECT 'fund_requests' AS type, id, title, LEFT(description, 200) AS snippet,
+               parkname AS park, amount, status, created_at,
+               MATCH(title, description) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM fund_requests
+        WHERE MATCH(title, description) AGAINST (%s IN BOOLEAN MODE)
+    """, 'parkname'),
+    'extra_funds': ("""
+        SELECT 'extra_funds' AS type, id, title, LEFT(description, 200) AS snippet,
+               park_name AS park, amount, status, created_at,
+               MATCH(title, description, justification) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM extra_funds_requests
+        WHERE MATCH(title, description, justification) AGAINST (%s IN BOOLEAN MODE)
+    """, 'park_name'),
+    'emergency': ("""
+        SELECT 'emergency' AS type, id, title, LEFT(description, 200) AS snippet,
+               park_name AS park, amount, status, created_at,
+               MATCH(title, description, justification) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM emergency_requests
+        WHERE MATCH(title, description, justification) AGAINST (%s IN BOOLEAN MODE)
+    """, 'park_name'),
+    'donations': ("""
+        SELECT 'donations' AS type, id,
+               CONVERT(CONCAT(first_name, ' ', last_name) USING utf8mb4) AS title,
+               CONVERT(LEFT(message, 200) USING utf8mb4) AS snippet,
+               CONVERT(park_name USING utf8mb4) AS park, amount,
+               CONVERT(status USING utf8mb4) AS status, created_at,
+               MATCH(first_name, last_name, message) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM donations
+        WHERE MATCH(first_name, last_name, message) AGAINST (%s IN BOOLEAN MODE)
+    """, 'park_name'),
+}
+
+
+def boolean_query(text):
+    """Turn free text into a boolean-mode query of prefix terms ("fire camp" -> "fire* camp*")."""
+    return ' '.join(f"{word}*" for word in _WORD.findall(text))
+
+
+def search(cursor, text, types=None, park_name=None, page=1, per_page=20):
+    """Return one page of hits ordered by relevance, plus whether more pages exist."""
+    query = boolean_query(text)
+    types = [t for t in (types or SEARCH_TYPES) if t in _BRANCHES]
+    if park_name:
+        types = [t for t in types if _BRANCHES[t][1]]
+
+    branches, params = [], []
+    for search_type in types:
+        sql, park_column = _BRANCHES[search_type]
+        params.extend([query, query])
+        if park_name:
+            sql += f" AND {park_column} = %s"
+            params.append(park_name)
+        branches.append(sql)
+
+    if not branches or not query:
+        return [], False
+
+    offset = (page - 1) * per_page
+    cursor.execute(
+        " UNION ALL ".join(branches) + " ORDER BY score DESC, created_at DESC LIMIT %s OFFSET %s",
+        params + [per_page + 1, offset]
+    )
+    hits = cursor.fetchall()
+    has_more = len(hits) > per_page
+    hits = hits[:per_page]
+
+    for hit in hits:
+        hit['score'] = round(float(hit['score']), 4)
+        if hit['amount'] is not None:
+            hit['amount'] = float(hit['amount'])
+        if hit['created_at']:
+            hit['created_at'] = hit['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+    return hits, has_more
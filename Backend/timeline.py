@@ -0,0 +1,128 @@
+"""Merged, cursor-paginated activity timeline for one visitor.
+
+A visitor's donations, tour bookings and service applications live in three
+tables. Each page runs one query per table that walks the table's
+(visitor_id, created_at) index (migrations/011) backwards from the cursor and
+stops after `limit + 1` rows, then k-way merges the three already sorted runs
+with heapq.merge. A page therefore reads at most 3 * (limit + 1) rows however long
+the visitor's history is.
+
+Entries are ordered by created_at, newest first; ties are broken by source
+(donations, tours, services) and then by id, so the order is total and the
+cursor (the last entry's position) resumes exactly where the page ended.
+"""
+import base64
+from datetime import datetime
+import heapq
+
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# (type, query); the position in this tuple is the tie-break rank
+SOURCES = (
+    ('donation', """
+        SELECT
+            id, donation_type AS donationType, amount, park_name AS parkName,
+            first_name AS firstName, last_name AS lastName, email,
+            message, is_anonymous AS isAnonymous, status, created_at
+        FROM donations
+        WHERE visitor_id = %s{after}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s
+    """),
+    ('tour', """
+        SELECT
+            id, park_name AS parkName, tour_name AS tourName, date, time,
+            guests, amount, first_name AS firstName, last_name AS lastName,
+            email, special_requests AS specialRequests, status, created_at
+        FROM tours
+        WHERE visitor_id = %s{after}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s
+    """),
+    ('service', """
+        SELECT
+            id, first_name AS firstName, last_name AS lastName, email, phone,
+            company_type AS companyType, provided_service AS providedService,
+            company_name AS companyName, tax_id AS taxId, status, created_at
+        FROM services
+        WHERE visitor_id = %s{after}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s
+    """),
+)
+_RANK = {source_type: rank for rank, (source_type, _) in enumerate(SOURCES)}
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def encode_cursor(entry):
+    """Opaque cursor pointing just past `entry`."""
+    position = f"{entry['created_at'].strftime(_TIME_FORMAT)}|{entry['type']}|{entry['id']}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Return (created_at, rank, id) for a cursor; raises ValueError if it is malformed."""
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        created_at, source_type, record_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.strptime(created_at, _TIME_FORMAT), _RANK[source_type], int(record_id)
+    except (KeyError, TypeError, UnicodeDecodeError, ValueError, base64.binascii.Error):
+        raise ValueError("Invalid cursor")
+
+
+def _after(rank, position):
+    """Keyset condition selecting this source's rows that sort after `position`."""
+    if position is None:
+        return '', []
+    created_at, cursor_rank, record_id = position
+    if rank > cursor_rank:
+        return " AND created_at <= %s", [created_at]
+    if rank < cursor_rank:
+        return " AND created_at < %s", [created_at]
+    return " AND (created_at < %s OR (created_at = %s AND id < %s))", [created_at, created_at, record_id]
+
+
+def _sort_key(entry):
+    return entry['created_at'], -_RANK[entry['type']], entry['id']
+
+
+def _serialize(entry):
+    if entry.get('amount') is not None:
+        entry['amount'] = float(entry['amount'])
+    if entry.get('date') is not None:
+        entry['date'] = entry['date'].strftime('%Y-%m-%d')
+    if entry.get('time') is not None:
+        entry['time'] = str(entry['time'])
+    entry['createdAt'] = entry.pop('created_at').strftime(_TIME_FORMAT)
+    return entry
+
+
+def timeline(cursor, visitor_id, limit=DEFAULT_LIMIT, after=None):
+    """Return (entries, next_cursor) for one page; next_cursor is None on the last page.
+
+    `cursor` must be a dictionary cursor; `after` is a cursor from a previous page.
+    """
+    position = decode_cursor(after) if after else None
+
+    runs = []
+    for rank, (source_type, sql) in enumerate(SOURCES):
+        condition, params = _after(rank, position)
+        cursor.execute(sql.format(after=condition), [visitor_id] + params + [limit + 1])
+        rows = cursor.fetchall()
+        for row in rows:
+            row['type'] = source_type
+        runs.append(rows)
+
+    entries = []
+    for entry in heapq.merge(*runs, key=_sort_key, reverse=True):
+        entries.append(entry)
+        if len(entries) > limit:
+            break
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1])
+    return [_serialize(entry) for entry in entries], next_cursor
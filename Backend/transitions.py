@@ -0,0 +1,134 @@
+"""Set-wise status transitions for the approval workflows.
+
+Each kind mirrors its single-item endpoint (update_fund_request_status,
+update_extra_funds_request_status, update_emergency_request_status,
+update_service_status and update_budget_status): same table, target statuses,
+reason rule and reviewer columns, plus the role allowed to review it. A batch
+is validated against the allowed source statuses in one locking SELECT and
+applied with a single `UPDATE ... WHERE id IN (...)` in the caller's
+transaction.
+"""
+
+
+MAX_BATCH_SIZE = 500
+
+TRANSITIONS = {
+    'fund_requests': {
+        'role': 'finance',
+        'table': 'fund_requests',
+        'park_column': 'parkname',
+        'targets': ('approved', 'rejected'),
+        'sources': ('pending',),
+        'reason_required': False,
+        'review_columns': None,
+        'version_column': None,
+    },
+    'extra_funds': {
+        'role': 'government',
+        'table': 'extra_funds_requests',
+        'park_column': 'park_name',
+        'targets': ('approved', 'rejected'),
+        'sources': ('pending',),
+        'reason_required': True,
+        'review_columns': ('reviewed_by', 'reviewed_date'),
+        'version_column': None,
+    },
+    'emergency': {
+        'role': 'government',
+        'table': 'emergency_requests',
+        'park_column': 'park_name',
+        'targets': ('approved', 'rejected'),
+        'sources': ('pending',),
+        'reason_required': True,
+        'review_columns': ('reviewed_by', 'reviewed_date'),
+        'version_column': None,
+    },
+    'services': {
+        'role': 'finance',
+        'table': 'services',
+        'park_column': None,
+        'targets': ('approved', 'denied'),
+        'sources': ('pending', None),
+        'reason_required': False,
+        'review_columns': None,
+        'version_column': None,
+    },
+    'budgets': {
+        'role': 'government',
+        'table': 'budgets',
+        'park_column': 'park_name',
+        'targets': ('approved', 'rejected'),
+        'sources': ('submitted',),
+        'reason_required': True,
+        'review_columns': ('approved_by', 'approved_at'),
+        'version_column': 'version',
+    },
+}
+
+
+def validate_reason(kind, reason):
+    """Return an error message when the kind needs a reason and none (or too short) was given."""
+    if TRANSITIONS[kind]['reason_required'] and (not reason or len(reason.strip()) < 10):
+        return "Reason must be at least 10 characters long"
+    return None
+
+
+def apply_transition(cursor, kind, ids, status, reviewer_id, reason=None, park_name=None, all_or_nothing=False):
+    """Transition `ids` to `status`; returns (outcomes, updated_ids).
+
+    Rows are locked by the SELECT ... FOR UPDATE, so the validation holds until
+    the caller commits. Each outcome is "updated", "not_found" or
+    "invalid_transition". With all_or_nothing, nothing is updated unless every
+    id is eligible, and the eligible ones are reported as "skipped".
+    """
+    spec = TRANSITIONS[kind]
+    placeholders = ', '.join(['%s'] * len(ids))
+    park_select = spec['park_column'] or 'NULL'
+    query = f"SELECT id, status, {park_select} FROM {spec['table']} WHERE id IN ({placeholders})"
+    params = list(ids)
+    if park_name is not None and spec['park_column']:
+        query += f" AND {spec['park_column']} = %s"
+        params.append(park_name)
+    cursor.execute(query + " FOR UPDATE", params)
+    rows = cursor.fetchall()
+    current = {row[0]: row[1] for row in rows}
+    parks = {row[0]: row[2] for row in rows}
+
+    outcomes, eligible = [], []
+    for request_id in ids:
+        if request_id not in current:
+            outcomes.append({"id": request_id, "outcome": "not_found"})
+        elif current[request_id] not in spec['sources']:
+            outcomes.append({"id": request_id, "outcome": "invalid_transition", "from": current[request_id]})
+        else:
+            outcomes.append({"id": request_id, "outcome": "updated", "from": current[request_id], "park": parks[request_id]})
+            eligible.append(request_id)
+
+    if not eligible or (all_or_nothing and len(eligible) != len(ids)):
+        for outcome in outcomes:
+            if outcome['outcome'] == 'updated':
+                outcome['outcome'] = 'skipped'
+        return outcomes, []
+
+    assignments, values = ["status = %s"], [status]
+    if spec['review_columns']:
+        reviewer_column, date_column = spec['review_columns']
+        assignments += [f"{reviewer_column} = %s", f"{date_column} = CURRENT_TIMESTAMP"]
+        values.append(reviewer_id)
+    if spec['reason_required']:
+        assignments.append("reason = %s")
+        values.append(reason)
+    if spec['version_column']:
+        # Invalidates the version single-item editors hold, see migrations/012
+        assignments.append(f"{spec['version_column']} = {spec['version_column']} + 1")
+
+    sources = [source for source in spec['sources'] if source is not None]
+    source_filter = " OR ".join(["status = %s"] * len(sources) + (
+        ["status IS NULL"] if None in spec['sources'] else []
+    ))
+    cursor.execute(
+        f"UPDATE {spec['table']} SET {', '.join(assignments)} "
+        f"WHERE id IN ({', '.join(['%s'] * len(eligible))}) AND ({source_filter})",
+        values + eligible + sources
+    )
+    return outcomes, eligible
@@ -0,0 +1,161 @@
+"""Link donations, tours, services and payments to visitor accounts by `visitor_id`.
+
+New rows are linked when they are written (the endpoints take the id from a
+visitor token, and registering links the new account's earlier guest rows, see
+link_visitor). Rows written before migrations/011, or by guests whose email
+later matched an account, are linked by the backfill here:
+
+    python visitor_links.py                          # until every table is caught up
+    python visitor_links.py --batch-size 500 --sleep 0.2 --every 3600
+
+It walks each table in primary-key batches from its checkpoint in
+`visitor_link_checkpoints`, matches the batch's emails to `visitors` after
+trimming and lowercasing them, and sets `visitor_id` on the matches. Each batch
+and its checkpoint commit together, so the backfill can be stopped and resumed
+at any point and runs next to live traffic; --sleep spaces the batches out.
+"""
+import argparse
+import os
+import time
+
+
+VISITOR_LINK_BATCH_SIZE = max(int(os.getenv('VISITOR_LINK_BATCH_SIZE', 1000)), 1)
+VISITOR_LINK_SLEEP_SECONDS = float(os.getenv('VISITOR_LINK_SLEEP_SECONDS', 0.05))
+
+# Table -> the column holding the email typed into its form
+LINKED_TABLES = {
+    'donations': 'email',
+    'tours': 'email',
+    'services': 'email',
+    'payments': 'customer_email',
+}
+
+
+def normalize_email(email):
+    return email.strip().lower() if email else None
+
+
+def link_visitor(cursor, visitor_id, email):
+    """Link every unlinked row carrying `email` to `visitor_id`; returns the rows linked."""
+    email = normalize_email(email)
+    linked = 0
+    for table, column in LINKED_TABLES.items():
+        cursor.execute(
+            f"UPDATE `{table}` SET visitor_id = %s WHERE `{column}` = %s AND visitor_id IS NULL",
+            (visitor_id, email)
+        )
+        linked += cursor.rowcount
+    return linked
+
+
+def visitor_ids(cursor, emails):
+    """Map normalized email -> visitor id for the given normalized emails."""
+    if not emails:
+        return {}
+    placeholders = ', '.join(['%s'] * len(emails))
+    cursor.execute(f"SELECT id, email FROM visitors WHERE email IN ({placeholders})", list(emails))
+    return {normalize_email(email): visitor_id for visitor_id, email in cursor.fetchall()}
+
+
+def link_batch(cursor, table, after_id, batch_size=VISITOR_LINK_BATCH_SIZE):
+    """Link the next batch of unlinked rows after `after_id`.
+
+    Returns (last id scanned or None when the table is exhausted, rows linked).
+    """
+    column = LINKED_TABLES[table]
+    cursor.execute(
+        f"SELECT id, `{column}` FROM `{table}` WHERE id > %s AND visitor_id IS NULL ORDER BY id LIMIT %s",
+        (after_id, batch_size)
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return None, 0
+
+    matches = visitor_ids(cursor, {normalize_email(email) for _, email in rows if email})
+    by_visitor = {}
+    for row_id, email in rows:
+        visitor_id = matches.get(normalize_email(email))
+        if visitor_id is not None:
+            by_visitor.setdefault(visitor_id, []).append(row_id)
+
+    linked = 0
+    for visitor_id, row_ids in by_visitor.items():
+        placeholders = ', '.join(['%s'] * len(row_ids))
+        cursor.execute(
+            f"UPDATE `{table}` SET visitor_id = %s WHERE id IN ({placeholders}) AND visitor_id IS NULL",
+            [visitor_id] + row_ids
+        )
+        linked += cursor.rowcount
+    return rows[-1][0], linked
+
+
+def backfill(connect, tables=tuple(LINKED_TABLES), batch_size=VISITOR_LINK_BATCH_SIZE,
+             sleep=VISITOR_LINK_SLEEP_SECONDS, log=print):
+    """Run every table from its checkpoint to its current end; returns rows linked per table."""
+    totals = {}
+    for table in tables:
+        connection = connect()
+        if not connection or isinstance(connection, str):
+            raise RuntimeError(f"Database connection failed: {connection}")
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "INSERT IGNORE INTO visitor_link_checkpoints (table_name, last_id) VALUES (%s, 0)", (table,)
+            )
+            connection.commit()
+            totals[table] = 0
+            while True:
+                # The checkpoint row lock keeps two backfills from working the same table
+                cursor.execute(
+                    "SELECT last_id FROM visitor_link_checkpoints WHERE table_name = %s FOR UPDATE", (table,)
+                )
+                after_id = cursor.fetchone()[0]
+                last_id, linked = link_batch(cursor, table, after_id, batch_size)
+                if last_id is None:
+                    connection.rollback()
+                    break
+                cursor.execute("""
+                    UPDATE visitor_link_checkpoints
+                    SET last_id = %s, linked_count = linked_count + %s
+                    WHERE table_name = %s
+                """, (last_id, linked, table))
+                connection.commit()
+                totals[table] += linked
+                if sleep:
+                    time.sleep(sleep)
+            log(f"{table}: linked {totals[table]} rows, caught up at id {after_id}")
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link historical rows to visitor accounts by normalized email.")
+    parser.add_argument('--tables', default=','.join(LINKED_TABLES))
+    parser.add_argument('--batch-size', type=int, default=VISITOR_LINK_BATCH_SIZE)
+    parser.add_argument('--sleep', type=float, default=VISITOR_LINK_SLEEP_SECONDS,
+                        help="seconds between batches")
+    parser.add_argument('--every', type=float, default=0,
+                        help="keep running, catching up again every N seconds")
+    args = parser.parse_args()
+
+    tables = [table.strip() for table in args.tables.split(',') if table.strip()]
+    unknown = [table for table in tables if table not in LINKED_TABLES]
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(unknown)}")
+
+    from core import get_db_connection
+
+    while True:
+        backfill(get_db_connection, tables, args.batch_size, args.sleep)
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == '__main__':
+    main()